@@ -0,0 +1,66 @@
+"""affiliate revshare accruals
+
+Revision ID: 20261019_01_affiliate_revshare
+Revises: 20260216_03_risk_versioning
+Create Date: 2026-10-19 09:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261019_01_affiliate_revshare"
+down_revision = "20260216_03_risk_versioning"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    tables = inspector.get_table_names()
+
+    if "affiliateoffer" in tables:
+        columns = [c["name"] for c in inspector.get_columns("affiliateoffer")]
+        if "revshare_percent" not in columns:
+            op.add_column("affiliateoffer", sa.Column("revshare_percent", sa.Float(), nullable=True))
+
+    if "affiliateledger" in tables:
+        indexes = [i["name"] for i in inspector.get_indexes("affiliateledger")]
+        if "uq_affiliateledger_revshare_period" not in indexes:
+            op.create_index(
+                "uq_affiliateledger_revshare_period",
+                "affiliateledger",
+                ["tenant_id", "partner_id", "offer_id", "currency", "reference"],
+                unique=True,
+                postgresql_where=sa.text("reason = 'REVSHARE_ACCRUAL'"),
+                sqlite_where=sa.text("reason = 'REVSHARE_ACCRUAL'"),
+            )
+
+    if "ledgertransaction" in tables:
+        indexes = [i["name"] for i in inspector.get_indexes("ledgertransaction")]
+        if "ix_ledgertransaction_tenant_created" not in indexes:
+            op.create_index(
+                "ix_ledgertransaction_tenant_created",
+                "ledgertransaction",
+                ["tenant_id", "created_at"],
+            )
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    tables = inspector.get_table_names()
+
+    if "ledgertransaction" in tables:
+        indexes = [i["name"] for i in inspector.get_indexes("ledgertransaction")]
+        if "ix_ledgertransaction_tenant_created" in indexes:
+            op.drop_index("ix_ledgertransaction_tenant_created", table_name="ledgertransaction")
+
+    if "affiliateledger" in tables:
+        indexes = [i["name"] for i in inspector.get_indexes("affiliateledger")]
+        if "uq_affiliateledger_revshare_period" in indexes:
+            op.drop_index("uq_affiliateledger_revshare_period", table_name="affiliateledger")
+
+    if "affiliateoffer" in tables:
+        columns = [c["name"] for c in inspector.get_columns("affiliateoffer")]
+        if "revshare_percent" in columns:
+            op.drop_column("affiliateoffer", "revshare_percent")
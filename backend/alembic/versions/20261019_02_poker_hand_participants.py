@@ -0,0 +1,54 @@
+"""poker hand participants for rakeback settlement
+
+Revision ID: 20261019_02_poker_hand_participants
+Revises: 20261019_01_affiliate_revshare
+Create Date: 2026-10-19 10:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261019_02_poker_hand_participants"
+down_revision = "20261019_01_affiliate_revshare"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    tables = inspector.get_table_names()
+
+    if "pokerhandaudit" in tables:
+        columns = [c["name"] for c in inspector.get_columns("pokerhandaudit")]
+        if "player_count" not in columns:
+            op.add_column(
+                "pokerhandaudit",
+                sa.Column("player_count", sa.Integer(), nullable=False, server_default="2"),
+            )
+        if "participants" not in columns:
+            op.add_column("pokerhandaudit", sa.Column("participants", sa.JSON(), nullable=True))
+
+        indexes = [i["name"] for i in inspector.get_indexes("pokerhandaudit")]
+        if "ix_pokerhandaudit_tenant_created" not in indexes:
+            op.create_index(
+                "ix_pokerhandaudit_tenant_created",
+                "pokerhandaudit",
+                ["tenant_id", "created_at"],
+            )
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    tables = inspector.get_table_names()
+
+    if "pokerhandaudit" in tables:
+        indexes = [i["name"] for i in inspector.get_indexes("pokerhandaudit")]
+        if "ix_pokerhandaudit_tenant_created" in indexes:
+            op.drop_index("ix_pokerhandaudit_tenant_created", table_name="pokerhandaudit")
+
+        columns = [c["name"] for c in inspector.get_columns("pokerhandaudit")]
+        if "participants" in columns:
+            op.drop_column("pokerhandaudit", "participants")
+        if "player_count" in columns:
+            op.drop_column("pokerhandaudit", "player_count")
@@ -0,0 +1,45 @@
+"""api key lookup prefix
+
+Revision ID: 20261019_03_api_key_prefix
+Revises: 20261019_02_poker_hand_participants
+Create Date: 2026-10-19 11:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261019_03_api_key_prefix"
+down_revision = "20261019_02_poker_hand_participants"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    tables = inspector.get_table_names()
+
+    if "apikey" in tables:
+        columns = [c["name"] for c in inspector.get_columns("apikey")]
+        if "key_prefix" not in columns:
+            # Existing (hash-only) keys stay NULL and are given a derived
+            # lookup id the first time they authenticate.
+            op.add_column("apikey", sa.Column("key_prefix", sa.String(), nullable=True))
+
+        indexes = [i["name"] for i in inspector.get_indexes("apikey")]
+        if "ix_apikey_key_prefix" not in indexes:
+            op.create_index("ix_apikey_key_prefix", "apikey", ["key_prefix"], unique=True)
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    tables = inspector.get_table_names()
+
+    if "apikey" in tables:
+        indexes = [i["name"] for i in inspector.get_indexes("apikey")]
+        if "ix_apikey_key_prefix" in indexes:
+            op.drop_index("ix_apikey_key_prefix", table_name="apikey")
+
+        columns = [c["name"] for c in inspector.get_columns("apikey")]
+        if "key_prefix" in columns:
+            op.drop_column("apikey", "key_prefix")
@@ -0,0 +1,39 @@
+"""bonus grant active lookup index
+
+Revision ID: 20261019_04_bonus_grant_player_index
+Revises: 20261019_03_api_key_prefix
+Create Date: 2026-10-19 12:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261019_04_bonus_grant_player_index"
+down_revision = "20261019_03_api_key_prefix"
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = "ix_bonusgrant_player_active"
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if "bonusgrant" in inspector.get_table_names():
+        indexes = [i["name"] for i in inspector.get_indexes("bonusgrant")]
+        if INDEX_NAME not in indexes:
+            op.create_index(
+                INDEX_NAME,
+                "bonusgrant",
+                ["tenant_id", "player_id", "status", "bonus_type", "granted_at"],
+            )
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if "bonusgrant" in inspector.get_table_names():
+        indexes = [i["name"] for i in inspector.get_indexes("bonusgrant")]
+        if INDEX_NAME in indexes:
+            op.drop_index(INDEX_NAME, table_name="bonusgrant")
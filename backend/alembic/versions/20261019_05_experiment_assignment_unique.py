@@ -0,0 +1,50 @@
+"""experiment assignment unique (experiment_id, player_id)
+
+Revision ID: 20261019_05_experiment_assignment_unique
+Revises: 20261019_04_bonus_grant_player_index
+Create Date: 2026-10-19 13:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261019_05_experiment_assignment_unique"
+down_revision = "20261019_04_bonus_grant_player_index"
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = "ux_experimentassignment_experiment_player"
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if "experimentassignment" in inspector.get_table_names():
+        indexes = [i["name"] for i in inspector.get_indexes("experimentassignment")]
+        if INDEX_NAME not in indexes:
+            # Racing get-or-create calls could store a player twice; keep the earliest
+            # assignment (ids are random uuids, so id only breaks ties).
+            op.execute(
+                "DELETE FROM experimentassignment WHERE EXISTS ("
+                " SELECT 1 FROM experimentassignment AS earlier"
+                " WHERE earlier.experiment_id = experimentassignment.experiment_id"
+                " AND earlier.player_id = experimentassignment.player_id"
+                " AND (earlier.assigned_at < experimentassignment.assigned_at"
+                " OR (earlier.assigned_at = experimentassignment.assigned_at AND earlier.id < experimentassignment.id)))"
+            )
+            op.create_index(
+                INDEX_NAME,
+                "experimentassignment",
+                ["experiment_id", "player_id"],
+                unique=True,
+            )
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if "experimentassignment" in inspector.get_table_names():
+        indexes = [i["name"] for i in inspector.get_indexes("experimentassignment")]
+        if INDEX_NAME in indexes:
+            op.drop_index(INDEX_NAME, table_name="experimentassignment")
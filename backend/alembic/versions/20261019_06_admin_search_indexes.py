@@ -0,0 +1,51 @@
+"""admin search indexes (pg_trgm + prefix)
+
+Revision ID: 20261019_06_admin_search_indexes
+Revises: 20261019_05_experiment_assignment_unique
+Create Date: 2026-10-19 14:00:00.000000
+
+PostgreSQL only: trigram GIN indexes serve ``ILIKE '%term%'`` fragment
+searches, text_pattern_ops B-trees serve prefix searches and lower(email)
+serves exact email lookups (see app/services/admin_search.py). SQLite (tests)
+keeps plain scans and this migration is a no-op there.
+"""
+from alembic import op
+
+revision = "20261019_06_admin_search_indexes"
+down_revision = "20261019_05_experiment_assignment_unique"
+branch_labels = None
+depends_on = None
+
+# (index name, table, definition)
+INDEXES = [
+    ("ix_player_username_trgm", "player", "USING gin (username gin_trgm_ops)"),
+    ("ix_player_email_trgm", "player", "USING gin (email gin_trgm_ops)"),
+    ("ix_player_username_lower_prefix", "player", "(lower(username) text_pattern_ops)"),
+    ("ix_player_email_lower", "player", "(lower(email) text_pattern_ops)"),
+    ("ix_transaction_provider_tx_id_trgm", '"transaction"', "USING gin (provider_tx_id gin_trgm_ops)"),
+    ("ix_transaction_provider_event_id_trgm", '"transaction"', "USING gin (provider_event_id gin_trgm_ops)"),
+    ("ix_transaction_id_prefix", '"transaction"', "(id text_pattern_ops)"),
+    ("ix_transaction_player_id_prefix", '"transaction"', "(player_id text_pattern_ops)"),
+]
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # CONCURRENTLY cannot run inside a transaction; avoids locking writes on large tables.
+    with op.get_context().autocommit_block():
+        for name, table, definition in INDEXES:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} {definition}")
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    with op.get_context().autocommit_block():
+        for name, _table, _definition in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,64 @@
+"""game unique (tenant_id, provider_id, external_id) for catalog upserts;
+game_import_item (job_id, status, id) for chunked imports
+
+Revision ID: 20261019_07_game_catalog_unique
+Revises: 20261019_06_admin_search_indexes
+Create Date: 2026-10-19 16:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261019_07_game_catalog_unique"
+down_revision = "20261019_06_admin_search_indexes"
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = "ux_game_tenant_provider_external"
+ITEM_INDEX_NAME = "ix_game_import_item_job_status_id"
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if "game_import_item" in inspector.get_table_names():
+        indexes = [i["name"] for i in inspector.get_indexes("game_import_item")]
+        if ITEM_INDEX_NAME not in indexes:
+            op.create_index(ITEM_INDEX_NAME, "game_import_item", ["job_id", "status", "id"], unique=False)
+
+    if "game" not in inspector.get_table_names():
+        return
+
+    indexes = [i["name"] for i in inspector.get_indexes("game")]
+    if INDEX_NAME in indexes:
+        return
+
+    # Duplicates cannot be merged blindly: sessions/rounds reference game ids.
+    duplicates = bind.execute(
+        sa.text(
+            "SELECT COUNT(*) FROM (SELECT 1 FROM game WHERE provider_id IS NOT NULL AND external_id IS NOT NULL"
+            " GROUP BY tenant_id, provider_id, external_id HAVING COUNT(*) > 1) d"
+        )
+    ).scalar()
+    if duplicates:
+        raise RuntimeError(
+            f"{duplicates} duplicate (tenant_id, provider_id, external_id) game keys; "
+            "merge them before applying " + revision
+        )
+
+    op.create_index(INDEX_NAME, "game", ["tenant_id", "provider_id", "external_id"], unique=True)
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if "game_import_item" in inspector.get_table_names():
+        indexes = [i["name"] for i in inspector.get_indexes("game_import_item")]
+        if ITEM_INDEX_NAME in indexes:
+            op.drop_index(ITEM_INDEX_NAME, table_name="game_import_item")
+
+    if "game" in inspector.get_table_names():
+        indexes = [i["name"] for i in inspector.get_indexes("game")]
+        if INDEX_NAME in indexes:
+            op.drop_index(INDEX_NAME, table_name="game")
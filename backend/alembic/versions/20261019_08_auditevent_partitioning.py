@@ -0,0 +1,112 @@
+"""auditevent: native monthly RANGE partitioning on timestamp (PostgreSQL)
+
+Revision ID: 20261019_08_auditevent_partitioning
+Revises: 20261019_07_game_catalog_unique
+Create Date: 2026-10-19 18:00:00.000000
+
+Rebuilds ``auditevent`` as ``PARTITION BY RANGE (timestamp)`` with one
+partition per month from the oldest event to two months ahead, plus a
+DEFAULT partition. The primary key becomes (id, timestamp), as Postgres
+requires the partition key in unique constraints. Rows are copied in one
+INSERT ... SELECT; run during a maintenance window on large tables.
+Other dialects are left as-is.
+"""
+from datetime import datetime, timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261019_08_auditevent_partitioning"
+down_revision = "20261019_07_game_catalog_unique"
+branch_labels = None
+depends_on = None
+
+TABLE = "auditevent"
+OLD_TABLE = "auditevent_unpartitioned"
+MONTHS_AHEAD = 2
+
+
+def _month_start(ts):
+    return ts.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(ts):
+    return _month_start(_month_start(ts) + timedelta(days=32))
+
+
+def _is_partitioned(bind) -> bool:
+    row = bind.execute(
+        sa.text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:t)"), {"t": TABLE}
+    ).first()
+    return row is not None
+
+
+def _move_aside(inspector):
+    """Rename the table and its indexes so the new ones can reuse the names."""
+
+    indexes = inspector.get_indexes(TABLE)
+    pk_name = inspector.get_pk_constraint(TABLE).get("name")
+    op.execute(f"ALTER TABLE {TABLE} RENAME TO {OLD_TABLE}")
+    if pk_name:
+        op.execute(f"ALTER TABLE {OLD_TABLE} RENAME CONSTRAINT {pk_name} TO {OLD_TABLE}_pkey")
+    for idx in indexes:
+        op.execute(f"ALTER INDEX {idx['name']} RENAME TO {idx['name']}_old")
+    return indexes
+
+
+def _create_indexes(indexes, *, partitioned: bool):
+    for idx in indexes:
+        columns = list(idx["column_names"])
+        unique = bool(idx.get("unique"))
+        if unique and partitioned and "timestamp" not in columns:
+            columns.append("timestamp")
+        op.create_index(idx["name"], TABLE, columns, unique=unique)
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    inspector = sa.inspect(bind)
+    if TABLE not in inspector.get_table_names() or _is_partitioned(bind):
+        return
+
+    indexes = _move_aside(inspector)
+    op.execute(f"CREATE TABLE {TABLE} (LIKE {OLD_TABLE} INCLUDING DEFAULTS) PARTITION BY RANGE (timestamp)")
+    op.execute(f"ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY (id, timestamp)")
+
+    oldest = bind.execute(sa.text(f"SELECT MIN(timestamp) FROM {OLD_TABLE}")).scalar()
+    now = datetime.utcnow()
+    lower = _month_start(oldest or now)
+    last = _month_start(now)
+    for _ in range(MONTHS_AHEAD):
+        last = _next_month(last)
+    while lower <= last:
+        upper = _next_month(lower)
+        op.execute(
+            f"CREATE TABLE {TABLE}_p{lower:%Y%m} PARTITION OF {TABLE} "
+            f"FOR VALUES FROM ('{lower:%Y-%m-%d}') TO ('{upper:%Y-%m-%d}')"
+        )
+        lower = upper
+    op.execute(f"CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT")
+
+    op.execute(f"INSERT INTO {TABLE} SELECT * FROM {OLD_TABLE}")
+    op.execute(f"DROP TABLE {OLD_TABLE}")
+    _create_indexes(indexes, partitioned=True)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    inspector = sa.inspect(bind)
+    if TABLE not in inspector.get_table_names() or not _is_partitioned(bind):
+        return
+
+    indexes = _move_aside(inspector)
+    op.execute(f"CREATE TABLE {TABLE} (LIKE {OLD_TABLE} INCLUDING DEFAULTS)")
+    # Archived (detached) months are not restored; they live in the archive.
+    op.execute(f"INSERT INTO {TABLE} SELECT * FROM {OLD_TABLE}")
+    op.execute(f"DROP TABLE {OLD_TABLE} CASCADE")
+    op.execute(f"ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY (id)")
+    _create_indexes(indexes, partitioned=False)
@@ -0,0 +1,44 @@
+"""ledgerbalancefinding: mismatch findings from full-ledger verification runs
+
+Revision ID: 20261019_09_ledger_balance_finding
+Revises: 20261019_08_auditevent_partitioning
+Create Date: 2026-10-19 19:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261019_09_ledger_balance_finding"
+down_revision = "20261019_08_auditevent_partitioning"
+branch_labels = None
+depends_on = None
+
+TABLE = "ledgerbalancefinding"
+
+
+def upgrade():
+    bind = op.get_bind()
+    if TABLE in sa.inspect(bind).get_table_names():
+        return
+
+    op.create_table(
+        TABLE,
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("run_id", sa.String(), nullable=False),
+        sa.Column("tenant_id", sa.String(), nullable=False),
+        sa.Column("player_id", sa.String(), nullable=False),
+        sa.Column("currency", sa.String(), nullable=False),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("expected", sa.Float(), nullable=True),
+        sa.Column("actual", sa.Float(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_ledgerbalancefinding_run_id", TABLE, ["run_id"])
+    op.create_index("ix_ledgerbalancefinding_created_at", TABLE, ["created_at"])
+    op.create_index("ix_ledgerbalancefinding_tenant_player", TABLE, ["tenant_id", "player_id"])
+
+
+def downgrade():
+    bind = op.get_bind()
+    if TABLE not in sa.inspect(bind).get_table_names():
+        return
+    op.drop_table(TABLE)
@@ -0,0 +1,55 @@
+"""bonus grant unique active (campaign_id, player_id)
+
+Revision ID: 20261019_10_bonus_grant_campaign_player_unique
+Revises: 20261019_09_ledger_balance_finding
+Create Date: 2026-10-19 16:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261019_10_bonus_grant_campaign_player_unique"
+down_revision = "20261019_09_ledger_balance_finding"
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = "ux_bonusgrant_campaign_player_active"
+ACTIVE = sa.text("status = 'active'")
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if "bonusgrant" in inspector.get_table_names():
+        indexes = [i["name"] for i in inspector.get_indexes("bonusgrant")]
+        if INDEX_NAME not in indexes:
+            # Grants carry balances and ledger rows: never drop duplicates here.
+            duplicates = bind.execute(
+                sa.text(
+                    "SELECT COUNT(*) FROM (SELECT campaign_id, player_id FROM bonusgrant"
+                    " WHERE status = 'active' GROUP BY campaign_id, player_id HAVING COUNT(*) > 1) AS d"
+                )
+            ).scalar()
+            if duplicates:
+                raise RuntimeError(
+                    f"{duplicates} (campaign_id, player_id) pairs hold more than one active bonus grant;"
+                    " forfeit the extra grants before applying this migration"
+                )
+            op.create_index(
+                INDEX_NAME,
+                "bonusgrant",
+                ["campaign_id", "player_id"],
+                unique=True,
+                postgresql_where=ACTIVE,
+                sqlite_where=ACTIVE,
+            )
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if "bonusgrant" in inspector.get_table_names():
+        indexes = [i["name"] for i in inspector.get_indexes("bonusgrant")]
+        if INDEX_NAME in indexes:
+            op.drop_index(INDEX_NAME, table_name="bonusgrant")
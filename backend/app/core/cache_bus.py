@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.redis_client import RedisClient
+
+logger = logging.getLogger(__name__)
+
+# Single Redis channel for all in-process cache invalidations; messages carry a
+# topic so each cache only reacts to its own events.
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+# Identifies this worker process so it can ignore its own echoes.
+_INSTANCE_ID = uuid.uuid4().hex
+
+InvalidationHandler = Callable[[Dict[str, Any]], None]
+
+_handlers: Dict[str, List[InvalidationHandler]] = {}
+_listener_task: Optional[asyncio.Task] = None
+
+
+def register_invalidation_handler(topic: str, handler: InvalidationHandler) -> None:
+    """Register a synchronous handler called with the payload for ``topic``.
+
+    Handlers must be cheap (drop a cache entry, bump a version) and must not
+    raise; failures are logged and swallowed.
+    """
+
+    handlers = _handlers.setdefault(topic, [])
+    if handler not in handlers:
+        handlers.append(handler)
+
+
+def _dispatch_local(topic: str, payload: Dict[str, Any]) -> None:
+    for handler in _handlers.get(topic, []):
+        try:
+            handler(payload)
+        except Exception as exc:  # pragma: no cover - defensive
+            logger.warning(
+                "cache_bus.handler_failed",
+                extra={"event": "cache_bus.handler_failed", "topic": topic, "error": str(exc)},
+            )
+
+
+async def publish_invalidation(topic: str, payload: Optional[Dict[str, Any]] = None) -> None:
+    """Invalidate ``topic`` in this process immediately and fan out to peers.
+
+    Redis is best-effort: when it is unavailable (or the in-memory mock is in
+    use) only the local process is invalidated and peers fall back to their
+    cache TTLs.
+    """
+
+    payload = dict(payload or {})
+    _dispatch_local(topic, payload)
+
+    client = RedisClient.get_instance()
+    publish = getattr(client, "publish", None)
+    if publish is None:
+        return
+    try:
+        await publish(
+            INVALIDATION_CHANNEL,
+            json.dumps({"topic": topic, "payload": payload, "origin": _INSTANCE_ID}),
+        )
+    except Exception as exc:
+        logger.warning(
+            "cache_bus.publish_failed",
+            extra={"event": "cache_bus.publish_failed", "topic": topic, "error": str(exc)},
+        )
+
+
+def _handle_message(raw: Any) -> None:
+    try:
+        msg = json.loads(raw)
+    except (TypeError, ValueError):
+        return
+    if not isinstance(msg, dict) or msg.get("origin") == _INSTANCE_ID:
+        return
+    topic = msg.get("topic")
+    if topic:
+        _dispatch_local(topic, msg.get("payload") or {})
+
+
+async def _listen_forever() -> None:
+    client = RedisClient.get_instance()
+    if getattr(client, "pubsub", None) is None:
+        return
+
+    backoff = 1.0
+    while True:
+        pubsub = client.pubsub()
+        try:
+            await pubsub.subscribe(INVALIDATION_CHANNEL)
+            backoff = 1.0
+            async for message in pubsub.listen():
+                if message.get("type") == "message":
+                    _handle_message(message.get("data"))
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning(
+                "cache_bus.listener_error",
+                extra={"event": "cache_bus.listener_error", "error": str(exc)},
+            )
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+        finally:
+            try:
+                await pubsub.aclose()
+            except Exception:
+                pass
+
+
+def start_invalidation_listener() -> None:
+    global _listener_task
+    if _listener_task is None or _listener_task.done():
+        _listener_task = asyncio.get_event_loop().create_task(_listen_forever())
+
+
+async def stop_invalidation_listener() -> None:
+    global _listener_task
+    if _listener_task is not None:
+        _listener_task.cancel()
+        try:
+            await _listener_task
+        except (asyncio.CancelledError, Exception):
+            pass
+        _listener_task = None
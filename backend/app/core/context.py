@@ -13,3 +13,21 @@ def set_log_context(**kwargs):
 
 def clear_log_context():
     _log_context.set({})
+
+
+# ASGI scope of the current request; the router adds the matched route to it.
+_request_scope: ContextVar[Optional[dict]] = ContextVar("request_scope", default=None)
+
+def set_request_scope(scope: Optional[dict]):
+    return _request_scope.set(scope)
+
+def reset_request_scope(token) -> None:
+    _request_scope.reset(token)
+
+def current_route() -> str:
+    """Route template of the current request ("-" outside requests, "unmatched" before routing)."""
+    scope = _request_scope.get()
+    if scope is None:
+        return "-"
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
@@ -1,7 +1,15 @@
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from fastapi import Depends
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlmodel import SQLModel
 from config import settings
+from app.core.db_pool import InstrumentedAsyncQueuePool, instrument_pool
+from app.core.metrics import metrics, multiprocess_enabled
 import logging
 
 logger = logging.getLogger(__name__)
@@ -20,7 +28,9 @@ try:
     }
 
     if "postgresql" in (settings.database_url or ""):
-        engine_kwargs.update({"pool_size": pool_size, "max_overflow": max_overflow})
+        engine_kwargs.update(
+            {"pool_size": pool_size, "max_overflow": max_overflow, "poolclass": InstrumentedAsyncQueuePool}
+        )
 
     engine = create_async_engine(settings.database_url, **engine_kwargs)
 except Exception as e:
@@ -31,6 +41,121 @@ except Exception as e:
 # Shared session factory (used by middleware/background tasks)
 async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+
+def _register_pool_metrics(name: str, bound_engine):
+    """Expose pool gauges and checkout telemetry for one engine.
+
+    Pools without counters (NullPool, StaticPool) are skipped. Gauges look the
+    pool up on every scrape since ``engine.dispose()`` replaces it.
+    """
+
+    if not hasattr(bound_engine.sync_engine.pool, "checkedout"):
+        return None
+
+    def pool():
+        return bound_engine.sync_engine.pool
+
+    # Callback gauges are invisible to the multi-process collector; the monitor pushes values there.
+    push_gauges = multiprocess_enabled()
+    if not push_gauges:
+        metrics.db_pool_size.labels(engine=name).set_function(lambda: pool().size())
+        metrics.db_pool_checked_out.labels(engine=name).set_function(lambda: pool().checkedout())
+        metrics.db_pool_overflow.labels(engine=name).set_function(lambda: max(0, pool().overflow()))
+    return instrument_pool(
+        name,
+        bound_engine,
+        push_gauges=push_gauges,
+        slow_checkout_seconds=settings.db_pool_slow_checkout_ms / 1000.0,
+        autosize=settings.db_pool_autosize,
+        autosize_max=settings.db_pool_autosize_max,
+        window_seconds=settings.db_pool_autosize_window_seconds,
+    )
+
+
+pool_monitor = _register_pool_metrics("primary", engine)
+
+# Optional read replica for reporting/export traffic.
+replica_engine = None
+replica_session = None
+replica_pool_monitor = None
+if settings.database_replica_url:
+    replica_kwargs = dict(engine_kwargs)
+    if "postgresql" in settings.database_replica_url:
+        replica_kwargs.update(
+            {
+                "pool_size": settings.db_replica_pool_size,
+                "max_overflow": settings.db_replica_max_overflow,
+                "poolclass": InstrumentedAsyncQueuePool,
+            }
+        )
+    replica_engine = create_async_engine(settings.database_replica_url, **replica_kwargs)
+    replica_session = sessionmaker(replica_engine, class_=AsyncSession, expire_on_commit=False)
+    replica_pool_monitor = _register_pool_metrics("replica", replica_engine)
+
+
+_REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class ReplicaHealth:
+    """Cached replica lag check; a failed or lagging check routes reads to the primary."""
+
+    def __init__(self, *, max_lag_seconds: float, check_interval_seconds: float):
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self.lag_seconds: Optional[float] = None
+        self.reason = "unchecked"
+        self._checked_at = 0.0
+
+    async def usable(self, factory) -> bool:
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval_seconds:
+            self._checked_at = now
+            await self._check(factory)
+        return self.reason == "ok"
+
+    async def _check(self, factory) -> None:
+        try:
+            async with factory() as session:
+                if session.bind.dialect.name == "postgresql":
+                    self.lag_seconds = float((await session.execute(_REPLICA_LAG_SQL)).scalar() or 0.0)
+                else:
+                    await session.execute(text("SELECT 1"))
+                    self.lag_seconds = 0.0
+        except Exception as exc:
+            self.lag_seconds = None
+            self.reason = "replica_error"
+            logger.warning("db.replica.check_failed", extra={"event": "db.replica.check_failed", "error": str(exc)})
+            return
+        metrics.db_replica_lag_seconds.set(self.lag_seconds)
+        self.reason = "ok" if self.lag_seconds <= self.max_lag_seconds else "replica_lagging"
+        if self.reason != "ok":
+            logger.warning(
+                "db.replica.lagging",
+                extra={"event": "db.replica.lagging", "lag_seconds": self.lag_seconds, "max": self.max_lag_seconds},
+            )
+
+
+replica_health = ReplicaHealth(
+    max_lag_seconds=settings.db_replica_max_lag_seconds,
+    check_interval_seconds=settings.db_replica_lag_check_interval_seconds,
+)
+
+
+async def _read_factory():
+    """Pick the session factory for a read: the replica when healthy, else the primary."""
+
+    if replica_session is None:
+        metrics.db_read_sessions_total.labels(engine="primary", reason="no_replica").inc()
+        return None
+    if await replica_health.usable(replica_session):
+        metrics.db_read_sessions_total.labels(engine="replica", reason="ok").inc()
+        return replica_session
+    metrics.db_read_sessions_total.labels(engine="primary", reason=replica_health.reason).inc()
+    return None
+
 async def init_db():
     """DB Schema Init.
     
@@ -50,3 +175,31 @@ async def get_session() -> AsyncSession:
     """Dependency for FastAPI Routes to get a DB session."""
     async with async_session() as session:
         yield session
+
+
+@asynccontextmanager
+async def read_session() -> AsyncIterator[AsyncSession]:
+    """Read-only session outside of a request (jobs, streamed exports).
+
+    Usable anywhere a session factory is expected: ``async with read_session() as s``.
+    """
+
+    factory = await _read_factory() or async_session
+    async with factory() as session:
+        yield session
+
+
+async def get_read_session(primary: AsyncSession = Depends(get_session)) -> AsyncSession:
+    """Dependency for report/export routes: routes the request to the read replica.
+
+    Falls back to the request's primary session (the ``get_session`` dependency,
+    which connects lazily) when no replica is configured or it is lagging/down.
+    Only use it for endpoints that tolerate replica lag and never write.
+    """
+
+    factory = await _read_factory()
+    if factory is None:
+        yield primary
+        return
+    async with factory() as session:
+        yield session
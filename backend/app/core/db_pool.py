@@ -0,0 +1,213 @@
+"""Connection pool instrumentation and optional adaptive sizing.
+
+``instrument_pool`` hooks checkout/checkin events on an engine's pool to
+export checkout wait and per-route hold time, and logs slow checkouts with
+the routes currently holding connections. ``InstrumentedAsyncQueuePool``
+adds the wait timing (QueuePool has no "before checkout" event) and lets the
+overflow ceiling be moved at runtime, which the adaptive mode uses.
+
+Adaptive mode applies Little's law over a sliding window:
+``needed = checkouts/sec * mean hold seconds * headroom``, bounded by the
+configured pool size and ``db_pool_autosize_max``. The core pool stays at
+``pool_size``; only the overflow ceiling moves.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.context import current_route
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+AUTOSIZE_HEADROOM = 1.5
+
+
+class PoolMonitor:
+    """Per-engine checkout bookkeeping: holders, wait/hold stats and the size recommendation."""
+
+    def __init__(
+        self,
+        name: str,
+        pool,
+        *,
+        slow_checkout_seconds: float = 0.1,
+        autosize: bool = False,
+        autosize_max: int = 50,
+        window_seconds: float = 30.0,
+        push_gauges: bool = False,
+    ):
+        self.name = name
+        self.push_gauges = push_gauges
+        self.pool = pool
+        self.slow_checkout_seconds = slow_checkout_seconds
+        self.autosize = autosize
+        self.autosize_max = autosize_max
+        self.window_seconds = window_seconds
+        self.recommended_size: Optional[int] = None
+
+        # id(connection record) -> (route, checkout time)
+        self._holders: Dict[int, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._window_checkouts = 0
+        self._window_hold = 0.0
+
+    # -- events ---------------------------------------------------------------
+
+    def on_wait(self, seconds: float, holders: Optional[Dict[str, Tuple[int, float]]] = None) -> None:
+        metrics.db_pool_checkout_wait_seconds.labels(engine=self.name).observe(seconds)
+        if seconds >= self.slow_checkout_seconds:
+            metrics.db_pool_slow_checkouts_total.labels(engine=self.name).inc()
+            self._log_slow_checkout(seconds, self.holders() if holders is None else holders)
+
+    def on_checkout(self, record) -> None:
+        with self._lock:
+            self._holders[id(record)] = (current_route(), time.monotonic())
+        if self.push_gauges:
+            self._push_gauges()
+
+    def on_checkin(self, record) -> None:
+        with self._lock:
+            held = self._holders.pop(id(record), None)
+        if self.push_gauges:
+            self._push_gauges()
+        if held is None:
+            return
+        route, since = held
+        seconds = time.monotonic() - since
+        metrics.db_pool_checkout_hold_seconds.labels(engine=self.name, route=route).observe(seconds)
+        self._sample(seconds)
+
+    def _push_gauges(self) -> None:
+        metrics.db_pool_size.labels(engine=self.name).set(self.pool.size())
+        metrics.db_pool_checked_out.labels(engine=self.name).set(self.pool.checkedout())
+        metrics.db_pool_overflow.labels(engine=self.name).set(max(0, self.pool.overflow()))
+
+    # -- slow checkout log ----------------------------------------------------
+
+    def holders(self) -> Dict[str, Tuple[int, float]]:
+        """Routes holding connections now: ``route -> (connections, longest hold seconds)``."""
+
+        now = time.monotonic()
+        with self._lock:
+            snapshot = list(self._holders.values())
+        counts = Counter(route for route, _ in snapshot)
+        oldest: Dict[str, float] = {}
+        for route, since in snapshot:
+            oldest[route] = max(oldest.get(route, 0.0), now - since)
+        return {route: (counts[route], round(oldest[route], 3)) for route in counts}
+
+    def _log_slow_checkout(self, seconds: float, holders: Dict[str, Tuple[int, float]]) -> None:
+        top = sorted(holders.items(), key=lambda kv: (-kv[1][0], -kv[1][1]))[:5]
+        logger.warning(
+            "db.pool.slow_checkout",
+            extra={
+                "event": "db.pool.slow_checkout",
+                "engine": self.name,
+                "wait_ms": round(seconds * 1000, 1),
+                "route": current_route(),
+                "checked_out": self.pool.checkedout(),
+                "holding_routes": {route: {"connections": n, "longest_s": age} for route, (n, age) in top},
+            },
+        )
+
+    # -- adaptive sizing ------------------------------------------------------
+
+    def _sample(self, hold_seconds: float) -> None:
+        with self._lock:
+            self._window_checkouts += 1
+            self._window_hold += hold_seconds
+            elapsed = time.monotonic() - self._window_start
+            if elapsed < self.window_seconds:
+                return
+            checkouts, hold = self._window_checkouts, self._window_hold
+            self._window_start = time.monotonic()
+            self._window_checkouts = 0
+            self._window_hold = 0.0
+        self.recommend(checkouts / elapsed, hold / checkouts)
+
+    def recommend(self, checkouts_per_second: float, mean_hold_seconds: float) -> int:
+        """Update (and in adaptive mode apply) the recommended pool size."""
+
+        base = self.pool.size()
+        needed = math.ceil(checkouts_per_second * mean_hold_seconds * AUTOSIZE_HEADROOM)
+        size = max(base, min(self.autosize_max, needed))
+        self.recommended_size = size
+        metrics.db_pool_recommended_size.labels(engine=self.name).set(size)
+        if self.autosize and hasattr(self.pool, "set_overflow_limit"):
+            self.pool.set_overflow_limit(size - base)
+        return size
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that reports checkout wait to its monitor."""
+
+    monitor: Optional[PoolMonitor] = None
+
+    def _do_get(self):
+        monitor = self.monitor
+        started = time.perf_counter()
+        # Saturated: remember who holds the connections now, they may be gone once we get one.
+        holders = None
+        if monitor is not None and self.checkedout() >= self.size() + max(0, self._max_overflow):
+            holders = monitor.holders()
+        try:
+            return super()._do_get()
+        finally:
+            if monitor is not None:
+                monitor.on_wait(time.perf_counter() - started, holders)
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep reporting from it.
+        pool = super().recreate()
+        pool.monitor = self.monitor
+        if self.monitor is not None:
+            self.monitor.pool = pool
+        return pool
+
+    def set_overflow_limit(self, max_overflow: int) -> None:
+        # Read on every checkout; connections above a lowered limit drain on checkin.
+        self._max_overflow = max(0, int(max_overflow))
+
+
+def instrument_pool(
+    name: str,
+    bound_engine,
+    *,
+    slow_checkout_seconds: float = 0.1,
+    autosize: bool = False,
+    autosize_max: int = 50,
+    window_seconds: float = 30.0,
+    push_gauges: bool = False,
+) -> Optional[PoolMonitor]:
+    """Attach a PoolMonitor to an (async) engine; pools without counters are skipped."""
+
+    pool = bound_engine.sync_engine.pool if hasattr(bound_engine, "sync_engine") else bound_engine.pool
+    if not hasattr(pool, "checkedout"):
+        return None
+
+    monitor = PoolMonitor(
+        name,
+        pool,
+        slow_checkout_seconds=slow_checkout_seconds,
+        autosize=autosize,
+        autosize_max=autosize_max,
+        window_seconds=window_seconds,
+        push_gauges=push_gauges,
+    )
+    if isinstance(pool, InstrumentedAsyncQueuePool):
+        pool.monitor = monitor
+
+    event.listen(pool, "checkout", lambda dbapi_conn, record, proxy: monitor.on_checkout(record))
+    event.listen(pool, "checkin", lambda dbapi_conn, record: monitor.on_checkin(record))
+    return monitor
@@ -1,4 +1,92 @@
-from prometheus_client import Counter, Histogram
+"""Application metrics: the single Prometheus registry for the backend.
+
+Per-route HTTP latency/status series are recorded by ``MetricsMiddleware``
+through ``observe_request``; domain code records through ``metrics``.
+
+Multi-process: when ``PROMETHEUS_MULTIPROC_DIR`` is set before start-up
+(several uvicorn/gunicorn workers), every worker writes its samples to that
+directory and ``render_latest`` aggregates them; gauges declare how they are
+combined (``livesum``/``livemax``). Callback gauges (``set_function``) only
+exist in-process, so pool gauges are pushed on checkout/checkin there.
+
+Label cardinality: metrics whose labels come from requests (routes, provider
+actions, webhook event types) are wrapped in ``GuardedMetric``, which caps the
+distinct label sets per metric and folds the rest into ``__overflow__``.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+
+from config import settings
+
+OVERFLOW = "__overflow__"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0)
+
+
+def multiprocess_enabled() -> bool:
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+class GuardedMetric:
+    """A labelled metric with at most ``max_series`` label sets.
+
+    ``labels()`` is the recording hot path: a dict hit on the label-value tuple
+    returns the cached child, skipping prometheus_client's validation and lock.
+    Unknown label sets past the cap all share one ``__overflow__`` child
+    (not cached, so the cache stays bounded too).
+    """
+
+    __slots__ = ("metric", "name", "max_series", "_labelnames", "_children", "_overflow", "_lock")
+
+    def __init__(self, metric, max_series: int):
+        self.metric = metric
+        self.name = metric._name
+        self.max_series = max_series
+        self._labelnames = metric._labelnames
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._overflow = None
+        self._lock = threading.Lock()
+
+    def labels(self, *values, **labelvalues):
+        if labelvalues:
+            values = tuple(labelvalues[name] for name in self._labelnames)
+        child = self._children.get(values)
+        if child is None:
+            child = self._admit(tuple(str(v) for v in values))
+        return child
+
+    def _admit(self, values: Tuple[str, ...]):
+        with self._lock:
+            child = self._children.get(values)
+            if child is not None:
+                return child
+            if len(self._children) < self.max_series:
+                child = self.metric.labels(*values)
+                self._children[values] = child
+                return child
+            if self._overflow is None:
+                self._overflow = self.metric.labels(*([OVERFLOW] * len(self._labelnames)))
+        series_overflow_total.labels(metric=self.name).inc()
+        return self._overflow
+
+    def __getattr__(self, item):
+        return getattr(self.metric, item)
+
+
+def guarded(metric, max_series: Optional[int] = None) -> GuardedMetric:
+    return GuardedMetric(metric, max_series or settings.metrics_max_series_per_metric)
+
+
+series_overflow_total = Counter(
+    "metrics_label_overflow_total", "Samples folded into the overflow series by the cardinality guard", ["metric"]
+)
+
 
 class Metrics:
     def __init__(self):
@@ -48,11 +136,11 @@ class Metrics:
         self.risk_score_updates = Counter("risk_score_updates_total", "Total risk score updates")
         self.risk_blocks = Counter("risk_blocks_total", "Total blocked actions due to risk")
         # Provider Metrics
-        self.provider_requests_total = Counter(
+        self.provider_requests_total = guarded(Counter(
             "provider_requests_total",
             "Total provider callback requests",
             ["provider", "method", "status"]
-        )
+        ))
         self.provider_wallet_drift_detected_total = Counter(
             "provider_wallet_drift_detected_total",
             "Total wallet drift detected during reconciliation",
@@ -65,5 +153,178 @@ class Metrics:
         )
         self.risk_flags = Counter("risk_flags_total", "Total actions flagged for review")
 
+        # Password hashing pool
+        self.password_hash_queue_depth = Gauge(
+            "password_hash_queue_depth",
+            "Password hash/verify jobs waiting for a hashing thread",
+            multiprocess_mode="livesum",
+        )
+        self.password_hash_rejected_total = Counter(
+            "password_hash_rejected_total",
+            "Password hash/verify jobs rejected because the pool was saturated",
+        )
+        self.password_hash_seconds = Histogram(
+            "password_hash_seconds",
+            "Password hash/verify latency including queueing",
+            ["operation"]
+        )
+
+        # Database pools (one label per engine: primary, replica)
+        self.db_pool_size = Gauge("db_pool_size", "Configured pool size", ["engine"], multiprocess_mode="livesum")
+        self.db_pool_checked_out = Gauge(
+            "db_pool_checked_out", "Connections currently checked out", ["engine"], multiprocess_mode="livesum"
+        )
+        self.db_pool_overflow = Gauge(
+            "db_pool_overflow", "Connections open beyond the pool size", ["engine"], multiprocess_mode="livesum"
+        )
+        self.db_pool_checkout_wait_seconds = Histogram(
+            "db_pool_checkout_wait_seconds",
+            "Time spent waiting for a pooled connection",
+            ["engine"],
+            buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+        )
+        self.db_pool_checkout_hold_seconds = guarded(Histogram(
+            "db_pool_checkout_hold_seconds",
+            "Time a connection stays checked out, by route template",
+            ["engine", "route"],
+            buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+        ))
+        self.db_pool_slow_checkouts_total = Counter(
+            "db_pool_slow_checkouts_total", "Checkouts slower than the slow-checkout threshold", ["engine"]
+        )
+        self.db_pool_recommended_size = Gauge(
+            "db_pool_recommended_size",
+            "Pool size derived from measured checkout rate and hold time",
+            ["engine"],
+            multiprocess_mode="livemax",
+        )
+        # Per-request SQL profile
+        self.http_request_db_queries = guarded(Histogram(
+            "http_request_db_queries",
+            "SQL statements issued per request, by route template",
+            ["route"],
+            buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+        ))
+        self.http_request_db_seconds = guarded(Histogram(
+            "http_request_db_seconds",
+            "Time spent executing SQL per request, by route template",
+            ["route"],
+            buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+        ))
+        self.http_request_query_budget_exceeded_total = guarded(Counter(
+            "http_request_query_budget_exceeded_total",
+            "Requests over the query budget or repeating one statement (N+1)",
+            ["route", "reason"]
+        ))
+        self.db_replica_lag_seconds = Gauge(
+            "db_replica_lag_seconds", "Replica replay lag at the last check", multiprocess_mode="livemax"
+        )
+        self.db_read_sessions_total = Counter(
+            "db_read_sessions_total",
+            "Read-only sessions handed out, by engine and fallback reason",
+            ["engine", "reason"]
+        )
+
+        # HTTP (MetricsMiddleware), by route template
+        self.http_requests_total = guarded(Counter(
+            "http_requests_total",
+            "HTTP requests by method, route template and status code",
+            ["method", "route", "status"]
+        ))
+        self.http_request_duration_seconds = guarded(Histogram(
+            "http_request_duration_seconds",
+            "HTTP request latency by method and route template",
+            ["method", "route"],
+            buckets=LATENCY_BUCKETS,
+        ))
+
+        # Ops dashboard counters (MetricsService)
+        self.webhook_events_total = guarded(Counter(
+            "webhook_events_total", "PSP webhook events by provider and event type", ["provider", "status"]
+        ))
+        self.webhook_signature_failures_total = guarded(Counter(
+            "webhook_signature_failures_total", "PSP webhooks with an invalid signature", ["provider"]
+        ))
+        self.webhook_replays_deduped_total = Counter(
+            "webhook_replays_deduped_total", "PSP webhook replays dropped by idempotency"
+        )
+        self.payout_attempts_total = Counter("payout_attempts_total", "Payout attempts")
+        self.payout_results_total = Counter("payout_results_total", "Payout outcomes", ["result"])
+        self.reconciliation_runs_total = Counter("reconciliation_runs_total", "Reconciliation runs")
+        self.reconciliation_findings_total = Counter(
+            "reconciliation_findings_total", "Reconciliation findings by severity", ["severity"]
+        )
+
+
+class RequestWindow:
+    """Sliding-window request and error counts (per-second buckets, process-local).
+
+    Backs the ops dashboard error rates; across workers use the Prometheus
+    series (``rate(http_requests_total[5m])``).
+    """
+
+    REQUESTS, ERRORS_4XX, ERRORS_5XX = 0, 1, 2
+
+    def __init__(self, seconds: int = 300):
+        self.seconds = seconds
+        self._stamps = [0] * seconds
+        self._buckets = [[0, 0, 0] for _ in range(seconds)]
+        self.totals = [0, 0, 0]
+
+    def add(self, kind: int, now: Optional[float] = None) -> None:
+        second = int(now if now is not None else time.time())
+        slot = second % self.seconds
+        if self._stamps[slot] != second:
+            self._stamps[slot] = second
+            self._buckets[slot] = [0, 0, 0]
+        self._buckets[slot][kind] += 1
+        self.totals[kind] += 1
+
+    def record(self, status: int, now: Optional[float] = None) -> None:
+        self.add(self.REQUESTS, now)
+        if status >= 500:
+            self.add(self.ERRORS_5XX, now)
+        elif status >= 400:
+            self.add(self.ERRORS_4XX, now)
+
+    def rates(self, window_seconds: Optional[int] = None, now: Optional[float] = None) -> Dict[str, float]:
+        window = min(window_seconds or self.seconds, self.seconds)
+        current = int(now if now is not None else time.time())
+        sums = [0, 0, 0]
+        for slot in range(self.seconds):
+            if current - window < self._stamps[slot] <= current:
+                for kind in range(3):
+                    sums[kind] += self._buckets[slot][kind]
+        requests, e4, e5 = sums
+        return {
+            "window_seconds": window,
+            "requests": requests,
+            "rps": round(requests / window, 3),
+            "errors_4xx": e4,
+            "errors_5xx": e5,
+            "error_rate_4xx": (e4 / requests) if requests else 0.0,
+            "error_rate_5xx": (e5 / requests) if requests else 0.0,
+        }
+
+
 # Global Instance
 metrics = Metrics()
+request_window = RequestWindow(settings.metrics_window_seconds)
+
+
+def observe_request(method: str, route: str, status: int, seconds: float) -> None:
+    """Record one HTTP request (hot path: two cached-child updates and a window bump)."""
+
+    metrics.http_requests_total.labels(method, route, str(status)).inc()
+    metrics.http_request_duration_seconds.labels(method, route).observe(seconds)
+    request_window.record(status)
+
+
+def render_latest() -> Tuple[bytes, str]:
+    """Exposition payload; aggregates all workers in multi-process mode."""
+
+    if multiprocess_enabled():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,121 @@
+"""Per-request SQL profiling and N+1 detection.
+
+Engine-level cursor events feed the ``QueryProfile`` bound to the current
+context (set per request by ``RequestContextMiddleware``). Outside a
+profile the hooks cost one context-variable lookup.
+
+A statement's fingerprint is its SQL text with literals and expanded
+IN-lists collapsed, so the same query issued in a loop (the N+1 shape)
+shows up as one fingerprint with a high count.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST_RE = re.compile(r"\(\s*(?:\?|%s|\$\d+|:\w+)(?:\s*,\s*(?:\?|%s|\$\d+|:\w+))+\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    sql = _STRING_RE.sub("?", statement)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _PLACEHOLDER_LIST_RE.sub("(?...)", sql)
+    return _SPACE_RE.sub(" ", sql).strip()
+
+
+class QueryProfile:
+    """Query count, DB time and statement fingerprints for one request (or test block)."""
+
+    def __init__(self, parent: Optional["QueryProfile"] = None):
+        self.parent = parent
+        self.count = 0
+        self.db_seconds = 0.0
+        self.fingerprints: Counter = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        key = fingerprint(statement)
+        profile = self
+        while profile is not None:
+            profile.count += 1
+            profile.db_seconds += seconds
+            profile.fingerprints[key] += 1
+            profile = profile.parent
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Fingerprints issued at least ``threshold`` times, most frequent first."""
+
+        return [(sql, n) for sql, n in self.fingerprints.most_common() if n >= threshold]
+
+
+_current: ContextVar[Optional[QueryProfile]] = ContextVar("query_profile", default=None)
+
+
+def current_profile() -> Optional[QueryProfile]:
+    return _current.get()
+
+
+def start_profile() -> Tuple[QueryProfile, object]:
+    """Bind a new profile (nested under the current one) to this context."""
+
+    profile = QueryProfile(parent=_current.get())
+    return profile, _current.set(profile)
+
+
+def stop_profile(token) -> None:
+    _current.reset(token)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context, so a statement that raises leaves
+    # nothing behind on the connection.
+    if _current.get() is not None and context is not None:
+        context._query_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current.get()
+    if profile is None:
+        return
+    started = getattr(context, "_query_started", None)
+    seconds = time.perf_counter() - started if started is not None else 0.0
+    profile.record(statement, seconds)
+
+
+@contextmanager
+def assert_max_queries(limit: int, *, repeated_threshold: Optional[int] = None) -> Iterator[QueryProfile]:
+    """Test helper: fail if the block issues more than ``limit`` SQL statements.
+
+    With ``repeated_threshold`` it also fails when any single statement
+    fingerprint repeats that often (an N+1 loop)::
+
+        with assert_max_queries(8, repeated_threshold=3):
+            await client.get("/api/v1/...")
+    """
+
+    profile, token = start_profile()
+    try:
+        yield profile
+    finally:
+        stop_profile(token)
+
+    top = "\n".join(f"  {n}x {sql[:200]}" for sql, n in profile.fingerprints.most_common(5))
+    if profile.count > limit:
+        raise AssertionError(f"{profile.count} queries issued, expected at most {limit}:\n{top}")
+    if repeated_threshold is not None and profile.repeated(repeated_threshold):
+        raise AssertionError(f"statement repeated {repeated_threshold}+ times (N+1?):\n{top}")
@@ -84,6 +84,16 @@ class InMemoryRedis:
             if ex:
                 self._expires[key] = time.time() + ex
 
+    async def mget(self, *keys: Any) -> List[Optional[str]]:
+        if len(keys) == 1 and isinstance(keys[0], (list, tuple)):
+            keys = tuple(keys[0])
+        async with self._lock:
+            out = []
+            for key in keys:
+                self._prune(key)
+                out.append(self._store.get(key))
+            return out
+
     async def setex(self, key: str, time_seconds: int, value: Any):
         await self.set(key, value, ex=time_seconds)
 
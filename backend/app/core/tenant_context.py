@@ -1,11 +1,15 @@
 from __future__ import annotations
 
-from fastapi import Request
+from typing import Optional
+
+from fastapi import Depends, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import select
 
+from app.core.database import get_session
 from app.core.errors import AppError
-from app.models.sql_models import Tenant, AdminUser
+from app.models.sql_models import AdminUser
+from app.services.tenant_snapshot import TenantSnapshot, get_tenant_snapshot
+from app.utils.auth import get_current_admin
 
 
 def _get_header_tenant_id(request: Request | None) -> str | None:
@@ -49,9 +53,7 @@ async def get_current_tenant_id(
     # Owner impersonation
     if header_tenant and bool(getattr(current_admin, "is_platform_owner", False)):
         if session is not None:
-            stmt = select(Tenant.id).where(Tenant.id == header_tenant)
-            res = await session.execute(stmt)
-            if not res.scalar_one_or_none():
+            if await get_tenant_snapshot(session, header_tenant) is None:
                 raise AppError(
                     error_code="INVALID_TENANT_HEADER",
                     message="Invalid X-Tenant-ID",
@@ -61,3 +63,18 @@ async def get_current_tenant_id(
 
     # Default deterministic scope
     return getattr(current_admin, "tenant_id", None) or "default_casino"
+
+
+async def get_current_tenant_snapshot(
+    request: Request,
+    current_admin: AdminUser = Depends(get_current_admin),
+    session: AsyncSession = Depends(get_session),
+) -> Optional[TenantSnapshot]:
+    """FastAPI dependency: configuration snapshot of the active tenant scope.
+
+    Served from the in-process snapshot cache (no queries on a hit); None if
+    the admin's own tenant row does not exist.
+    """
+
+    tenant_id = await get_current_tenant_id(request, current_admin, session=session)
+    return await get_tenant_snapshot(session, tenant_id)
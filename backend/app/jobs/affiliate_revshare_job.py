@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlmodel import select
+
+from app.core.database import async_session
+from app.models.affiliate_p0_models import AffiliateOffer
+from app.services.affiliate_p0_engine import accrue_revshare_for_period
+
+logger = logging.getLogger(__name__)
+
+
+async def _revshare_tenant_ids(session_factory: Callable) -> List[str]:
+    async with session_factory() as session:
+        stmt = select(AffiliateOffer.tenant_id).where(AffiliateOffer.model == "revshare").distinct()
+        return [row[0] for row in (await session.execute(stmt)).all()]
+
+
+async def run_revshare_accruals(
+    *,
+    window_start: datetime,
+    window_end: datetime,
+    tenant_ids: Optional[List[str]] = None,
+    concurrency: int = 4,
+    session_factory: Callable = async_session,
+) -> Dict[str, Any]:
+    """Accrue revshare commissions for every tenant with revshare offers.
+
+    Each tenant runs in its own session/transaction so tenants are processed in
+    parallel (bounded by ``concurrency``) and one failing tenant does not roll
+    back the others. Re-running the same window is a no-op per tenant.
+    """
+
+    started = time.perf_counter()
+    if tenant_ids is None:
+        tenant_ids = await _revshare_tenant_ids(session_factory)
+
+    sem = asyncio.Semaphore(max(1, int(concurrency)))
+
+    async def _one(tenant_id: str) -> Dict[str, Any]:
+        async with sem:
+            async with session_factory() as session:
+                try:
+                    stats = await accrue_revshare_for_period(
+                        session,
+                        tenant_id=tenant_id,
+                        window_start=window_start,
+                        window_end=window_end,
+                    )
+                    await session.commit()
+                    return stats
+                except Exception as exc:
+                    await session.rollback()
+                    logger.error(
+                        "affiliate.revshare.tenant_failed",
+                        extra={"event": "affiliate.revshare.tenant_failed", "tenant_id": tenant_id, "error": str(exc)},
+                    )
+                    return {"tenant_id": tenant_id, "error": str(exc)}
+
+    results = await asyncio.gather(*[_one(t) for t in tenant_ids])
+
+    summary = {
+        "window_start": window_start.isoformat(),
+        "window_end": window_end.isoformat(),
+        "tenants": len(tenant_ids),
+        "failed_tenants": [r["tenant_id"] for r in results if "error" in r],
+        "accrued": sum(int(r.get("accrued", 0)) for r in results),
+        "amount_total": round(sum(float(r.get("amount_total", 0.0)) for r in results), 2),
+        "duration_ms": int((time.perf_counter() - started) * 1000),
+        "results": results,
+    }
+    logger.info(
+        "affiliate.revshare.completed",
+        extra={
+            "event": "affiliate.revshare.completed",
+            "tenants": summary["tenants"],
+            "accrued": summary["accrued"],
+            "duration_ms": summary["duration_ms"],
+        },
+    )
+    return summary
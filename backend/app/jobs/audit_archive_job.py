@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from app.core.database import async_session
+from app.ops.storage import StorageClient, get_storage_client
+from app.services.audit_archive import archive_closed_partitions, ensure_partitions
+
+logger = logging.getLogger(__name__)
+
+
+async def run_audit_archive(
+    *,
+    now: Optional[datetime] = None,
+    storage: Optional[StorageClient] = None,
+    session_factory: Callable = async_session,
+) -> Dict[str, Any]:
+    """Roll the audit partitions: pre-create upcoming months, archive expired ones.
+
+    Safe to run repeatedly (daily cron); a no-op where ``auditevent`` is not
+    partitioned.
+    """
+
+    storage = storage or get_storage_client()
+    async with session_factory() as session:
+        created = await ensure_partitions(session, now=now)
+        summary = await archive_closed_partitions(session, storage, now=now)
+
+    summary["created"] = created
+    logger.info(
+        "audit.archive.completed",
+        extra={"event": "audit.archive.completed", "archived": summary["archived"], "created": created},
+    )
+    return summary
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.database import async_session
+from app.models.bonus_models import BonusCampaign
+from app.services.bonus_bulk_grant import DEFAULT_CHUNK_SIZE, bulk_grant_campaign, mark_bulk_grant_failed
+
+logger = logging.getLogger(__name__)
+
+
+async def run_bulk_grant(
+    *,
+    tenant_id: str,
+    campaign_id: str,
+    reason: str,
+    player_ids: Optional[List[str]] = None,
+    amount_override: Optional[float] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    session_factory: Callable = async_session,
+) -> Dict[str, Any]:
+    """Run (or resume) a campaign-wide bulk grant in its own session.
+
+    Meant for BackgroundTasks / workers. Chunks already committed stay
+    committed on failure; the checkpoint is marked ``failed`` and re-running
+    picks up from its cursor.
+    """
+
+    async with session_factory() as session:
+        campaign = await session.get(BonusCampaign, campaign_id)
+        if campaign is None or campaign.tenant_id != tenant_id:
+            return {"campaign_id": campaign_id, "error": "CAMPAIGN_NOT_FOUND"}
+        try:
+            return await bulk_grant_campaign(
+                session,
+                campaign,
+                reason=reason,
+                player_ids=player_ids,
+                amount_override=amount_override,
+                chunk_size=chunk_size,
+            )
+        except Exception as exc:
+            await session.rollback()
+            logger.error(
+                "bonus.bulk_grant.failed",
+                extra={
+                    "event": "bonus.bulk_grant.failed",
+                    "tenant_id": tenant_id,
+                    "campaign_id": campaign_id,
+                    "error": str(exc),
+                },
+            )
+            try:
+                campaign = await session.get(BonusCampaign, campaign_id)
+                if campaign is not None:
+                    mark_bulk_grant_failed(session, campaign, str(exc))
+                    await session.commit()
+            except Exception:
+                await session.rollback()
+            return {"campaign_id": campaign_id, "error": str(exc)}
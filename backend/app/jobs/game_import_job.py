@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from app.core.database import async_session
+from app.models.game_import_sql import GameImportJob
+from app.services.audit import audit
+from app.services.game_import_service import IMPORT_CHUNK_SIZE, import_staged_items
+
+logger = logging.getLogger(__name__)
+
+
+async def run_game_import(
+    *,
+    tenant_id: str,
+    job_id: str,
+    actor_user_id: str,
+    actor_role: Optional[str] = None,
+    request_id: Optional[str] = None,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    session_factory: Callable = async_session,
+) -> Dict[str, Any]:
+    """Import a claimed (``importing``) job's staged items in its own session.
+
+    Meant for BackgroundTasks / workers. Committed chunks stay imported on
+    failure; the job goes back to ``ready`` so the import can be re-run.
+    """
+
+    async with session_factory() as session:
+        job = await session.get(GameImportJob, job_id)
+        if job is None or job.tenant_id != tenant_id:
+            return {"job_id": job_id, "error": "NOT_FOUND"}
+        try:
+            stats = await import_staged_items(session, job, chunk_size=chunk_size)
+        except Exception as exc:
+            await session.rollback()
+            logger.error(
+                "game_import.import.failed",
+                extra={"event": "game_import.import.failed", "tenant_id": tenant_id, "job_id": job_id, "error": str(exc)},
+            )
+            job = await session.get(GameImportJob, job_id)
+            if job is not None:
+                job.status = "ready"
+                job.error_summary = {**(job.error_summary or {}), "import_error": str(exc)}
+                job.updated_at = datetime.utcnow()
+                session.add(job)
+                await session.commit()
+            return {"job_id": job_id, "error": str(exc)}
+
+        try:
+            await audit.log_event(
+                session=session,
+                request_id=request_id or job_id,
+                actor_user_id=actor_user_id,
+                actor_role=actor_role,
+                tenant_id=str(tenant_id),
+                action="game_import.import.completed",
+                resource_type="game_import_job",
+                resource_id=job_id,
+                result="success",
+                status="SUCCESS",
+                details={"imported_count": stats["imported_count"]},
+            )
+            await session.commit()
+        except Exception:
+            # Never fail a finished import due to audit.
+            await session.rollback()
+        return stats
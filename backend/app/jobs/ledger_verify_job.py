@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import logging
+from typing import Any, Callable, Dict, Optional
+
+from app.core.database import async_session, read_session
+from app.services.ledger_verifier import verify_ledger_balances
+
+logger = logging.getLogger(__name__)
+
+
+async def run_ledger_verification(
+    *,
+    tenant_id: Optional[str] = None,
+    shards: int = 256,
+    workers: int = 4,
+    session_factory: Callable = async_session,
+    read_session_factory: Callable = read_session,
+) -> Dict[str, Any]:
+    """Recompute every wallet from the ledger and store mismatch findings.
+
+    Scans go through the read replica when one is healthy; findings are
+    written to the primary, tagged with the run id.
+    """
+
+    try:
+        summary = await verify_ledger_balances(
+            tenant_id=tenant_id,
+            shards=shards,
+            workers=workers,
+            session_factory=session_factory,
+            read_session_factory=read_session_factory,
+        )
+    except Exception:
+        logger.error("ledger.verify.failed", extra={"event": "ledger.verify.failed"}, exc_info=True)
+        raise
+
+    logger.info(
+        "ledger.verify.completed",
+        extra={
+            "event": "ledger.verify.completed",
+            "run_id": summary["run_id"],
+            "groups": summary["groups"],
+            "mismatches": summary["mismatches"],
+            "duration_ms": summary["duration_ms"],
+        },
+    )
+    return summary
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlmodel import select
+
+from app.core.database import async_session
+from app.models.poker_models import PokerHandAudit
+from app.services.poker.collusion_graph import analyze_collusion_window
+
+logger = logging.getLogger(__name__)
+
+
+async def run_collusion_analysis(
+    *,
+    window_start: datetime,
+    window_end: datetime,
+    tenant_ids: Optional[List[str]] = None,
+    concurrency: int = 2,
+    session_factory: Callable = async_session,
+    **thresholds: Any,
+) -> Dict[str, Any]:
+    """Run the pair/ring collusion analysis for every tenant with hands in the window.
+
+    Tenants are independent (own session and commit); ``concurrency`` bounds
+    how many pair matrices are held in memory at once.
+    """
+
+    started = time.perf_counter()
+    if tenant_ids is None:
+        async with session_factory() as session:
+            stmt = (
+                select(PokerHandAudit.tenant_id)
+                .where(PokerHandAudit.created_at >= window_start, PokerHandAudit.created_at < window_end)
+                .distinct()
+            )
+            tenant_ids = [row[0] for row in (await session.execute(stmt)).all()]
+
+    sem = asyncio.Semaphore(max(1, int(concurrency)))
+
+    async def _one(tenant_id: str) -> Dict[str, Any]:
+        async with sem:
+            async with session_factory() as session:
+                try:
+                    stats = await analyze_collusion_window(
+                        session,
+                        tenant_id=tenant_id,
+                        window_start=window_start,
+                        window_end=window_end,
+                        **thresholds,
+                    )
+                    await session.commit()
+                    return stats
+                except Exception as exc:
+                    await session.rollback()
+                    logger.error(
+                        "poker.collusion.tenant_failed",
+                        extra={"event": "poker.collusion.tenant_failed", "tenant_id": tenant_id, "error": str(exc)},
+                    )
+                    return {"tenant_id": tenant_id, "error": str(exc)}
+
+    results = await asyncio.gather(*[_one(t) for t in tenant_ids])
+
+    return {
+        "window_start": window_start.isoformat(),
+        "window_end": window_end.isoformat(),
+        "tenants": len(tenant_ids),
+        "failed_tenants": [r["tenant_id"] for r in results if "error" in r],
+        "hands": sum(int(r.get("hands", 0)) for r in results),
+        "signals_inserted": sum(int(r.get("signals_inserted", 0)) for r in results),
+        "duration_ms": int((time.perf_counter() - started) * 1000),
+        "results": results,
+    }
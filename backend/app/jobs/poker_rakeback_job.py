@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import logging
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+from sqlmodel import select
+
+from app.core.database import async_session
+from app.models.poker_models import PokerHandAudit, RakeProfile
+from app.models.vip_models import PlayerVipStatus, VipTier
+from app.services.poker.hand_audit import hand_participants
+from app.services.poker.rake_engine import (
+    calculate_rake_batch,
+    calculate_rakeback_batch,
+    split_rake_by_player,
+    to_cents,
+)
+from app.services.wallet_ledger import WalletInvariantError, apply_wallet_delta_with_ledger
+
+logger = logging.getLogger(__name__)
+
+RAKEBACK_EVENT = "poker_rakeback"
+RAKEBACK_PROVIDER = "internal_poker"
+
+DEFAULT_CHUNK_SIZE = 5000
+_CREDIT_COMMIT_EVERY = 200
+_LOOKUP_CHUNK = 1000
+
+
+def rakeback_period_reference(window_start: datetime, window_end: datetime) -> str:
+    return f"{window_start:%Y%m%d}-{window_end:%Y%m%d}"
+
+
+def _aggregate_chunk(
+    rows: List[Any],
+    profiles: Dict[str, RakeProfile],
+    rake_by_player: Counter,
+) -> Dict[str, int]:
+    """Fold one chunk of hands into ``rake_by_player`` (cents); returns chunk stats."""
+
+    settled = to_cents([r.rake_collected for r in rows])
+    pots = np.asarray([r.pot_total for r in rows], dtype=np.float64)
+    counts = np.asarray([r.player_count or 2 for r in rows], dtype=np.int64)
+    profile_ids = np.asarray([r.rake_profile_id or "" for r in rows], dtype=object)
+
+    # Recompute per profile to flag hands whose stored rake disagrees with the
+    # profile (profile edited after the fact, provider-side rake, ...).
+    mismatched = 0
+    for profile_id in set(profile_ids.tolist()):
+        profile = profiles.get(profile_id)
+        if profile is None:
+            continue
+        mask = profile_ids == profile_id
+        expected = calculate_rake_batch(pots[mask], counts[mask], profile)
+        mismatched += int(np.count_nonzero(expected != settled[mask]))
+
+    participants = [hand_participants(r.participants, r.winners) for r in rows]
+    rake_by_player.update(split_rake_by_player(settled, participants))
+
+    return {
+        "hands": len(rows),
+        "rake_cents": int(settled.sum()),
+        "unattributed_hands": sum(1 for p in participants if not p),
+        "rake_mismatches": mismatched,
+    }
+
+
+async def _rakeback_percents(session, tenant_id: str, player_ids: List[str]) -> Dict[str, float]:
+    out: Dict[str, float] = {}
+    for i in range(0, len(player_ids), _LOOKUP_CHUNK):
+        chunk = player_ids[i : i + _LOOKUP_CHUNK]
+        stmt = (
+            select(PlayerVipStatus.player_id, VipTier.rakeback_percent)
+            .join(VipTier, VipTier.id == PlayerVipStatus.current_tier_id)
+            .where(PlayerVipStatus.tenant_id == tenant_id, PlayerVipStatus.player_id.in_(chunk))
+        )
+        for player_id, pct in (await session.execute(stmt)).all():
+            out[str(player_id)] = float(pct or 0.0)
+    return out
+
+
+async def settle_rakeback_for_tenant(
+    *,
+    tenant_id: str,
+    window_start: datetime,
+    window_end: datetime,
+    currency: str = "USD",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    dry_run: bool = False,
+    session_factory: Callable = async_session,
+) -> Dict[str, Any]:
+    """Settle rakeback for one tenant and period.
+
+    Hands are streamed in ``chunk_size`` partitions and reduced to per-player
+    rake in integer cents, so memory is bounded by the number of players, not
+    hands. The stored ``rake_collected`` is what gets paid back on; recomputed
+    rake only feeds the mismatch counter. Credits go through the wallet ledger
+    with a per-(period, player) idempotency key, so re-running a period pays
+    nothing twice.
+    """
+
+    started = time.perf_counter()
+    period = rakeback_period_reference(window_start, window_end)
+    rake_by_player: Counter = Counter()
+    totals = Counter()
+
+    async with session_factory() as session:
+        profiles = {
+            p.id: p
+            for p in (await session.execute(select(RakeProfile).where(RakeProfile.tenant_id == tenant_id))).scalars().all()
+        }
+
+        stmt = (
+            select(
+                PokerHandAudit.pot_total,
+                PokerHandAudit.rake_collected,
+                PokerHandAudit.player_count,
+                PokerHandAudit.participants,
+                PokerHandAudit.winners,
+                PokerHandAudit.rake_profile_id,
+            )
+            .where(
+                PokerHandAudit.tenant_id == tenant_id,
+                PokerHandAudit.created_at >= window_start,
+                PokerHandAudit.created_at < window_end,
+            )
+            .execution_options(yield_per=chunk_size)
+        )
+        result = await session.stream(stmt)
+        async for rows in result.partitions(chunk_size):
+            totals.update(_aggregate_chunk(rows, profiles, rake_by_player))
+
+        percents = await _rakeback_percents(session, tenant_id, sorted(rake_by_player))
+        rakeback = calculate_rakeback_batch(dict(rake_by_player), percents)
+
+        credited = 0
+        missing: List[str] = []
+        if not dry_run:
+            for i, player_id in enumerate(sorted(rakeback)):
+                try:
+                    created = await apply_wallet_delta_with_ledger(
+                        session,
+                        tenant_id=tenant_id,
+                        player_id=player_id,
+                        tx_id=None,
+                        event_type=RAKEBACK_EVENT,
+                        delta_available=rakeback[player_id] / 100.0,
+                        delta_held=0.0,
+                        currency=currency,
+                        idempotency_key=f"rakeback:{period}:{player_id}",
+                        provider=RAKEBACK_PROVIDER,
+                        provider_ref=period,
+                    )
+                except WalletInvariantError as exc:
+                    if str(exc) != "PLAYER_NOT_FOUND":
+                        raise
+                    missing.append(player_id)
+                    continue
+                credited += int(created)
+                if (i + 1) % _CREDIT_COMMIT_EVERY == 0:
+                    await session.commit()
+            await session.commit()
+
+    summary = {
+        "tenant_id": tenant_id,
+        "period": period,
+        "hands": int(totals["hands"]),
+        "rake_total": round(totals["rake_cents"] / 100.0, 2),
+        "unattributed_hands": int(totals["unattributed_hands"]),
+        "rake_mismatches": int(totals["rake_mismatches"]),
+        "players": len(rake_by_player),
+        "rakeback_players": len(rakeback),
+        "rakeback_total": round(sum(rakeback.values()) / 100.0, 2),
+        "credited": credited,
+        "missing_players": missing,
+        "dry_run": dry_run,
+        "duration_ms": int((time.perf_counter() - started) * 1000),
+    }
+    logger.info(
+        "poker.rakeback.settled",
+        extra={
+            "event": "poker.rakeback.settled",
+            "tenant_id": tenant_id,
+            "period": period,
+            "hands": summary["hands"],
+            "credited": credited,
+            "duration_ms": summary["duration_ms"],
+        },
+    )
+    return summary
+
+
+async def run_rakeback_settlements(
+    *,
+    window_start: datetime,
+    window_end: datetime,
+    tenant_ids: Optional[List[str]] = None,
+    dry_run: bool = False,
+    session_factory: Callable = async_session,
+) -> Dict[str, Any]:
+    """Settle rakeback for every tenant with hands in the window, one at a time."""
+
+    if tenant_ids is None:
+        async with session_factory() as session:
+            stmt = (
+                select(PokerHandAudit.tenant_id)
+                .where(PokerHandAudit.created_at >= window_start, PokerHandAudit.created_at < window_end)
+                .distinct()
+            )
+            tenant_ids = [row[0] for row in (await session.execute(stmt)).all()]
+
+    results = []
+    for tenant_id in tenant_ids:
+        try:
+            results.append(
+                await settle_rakeback_for_tenant(
+                    tenant_id=tenant_id,
+                    window_start=window_start,
+                    window_end=window_end,
+                    dry_run=dry_run,
+                    session_factory=session_factory,
+                )
+            )
+        except Exception as exc:
+            logger.error(
+                "poker.rakeback.tenant_failed",
+                extra={"event": "poker.rakeback.tenant_failed", "tenant_id": tenant_id, "error": str(exc)},
+            )
+            results.append({"tenant_id": tenant_id, "error": str(exc)})
+
+    return {
+        "tenants": len(tenant_ids),
+        "failed_tenants": [r["tenant_id"] for r in results if "error" in r],
+        "credited": sum(int(r.get("credited", 0)) for r in results),
+        "results": results,
+    }
@@ -1,20 +1,40 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from fastapi import Request
-from app.services.metrics import metrics
-
-class MetricsMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        metrics.increment_request()
-        
+import time
+
+from app.core.metrics import observe_request
+
+
+class MetricsMiddleware:
+    """Per-route request count/latency (pure ASGI: no per-request task or body wrapping).
+
+    The route label is the matched path template (``/api/v1/players/{player_id}``),
+    which the router leaves on the shared scope; unmatched paths (404s, scanners)
+    share one ``unmatched`` series.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
         try:
-            response = await call_next(request)
-            
-            if 400 <= response.status_code < 500:
-                metrics.increment_error_4xx()
-            elif response.status_code >= 500:
-                metrics.increment_error_5xx()
-                
-            return response
-        except Exception as e:
-            metrics.increment_error_5xx()
-            raise e
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            observe_request(
+                scope["method"],
+                getattr(route, "path", None) or "unmatched",
+                status,
+                time.perf_counter() - started,
+            )
@@ -3,6 +3,11 @@ from starlette.middleware.base import BaseHTTPMiddleware
 import uuid
 import logging
 
+from app.core.context import current_route, reset_request_scope, set_request_scope
+from app.core.metrics import metrics
+from app.core.query_profiler import QueryProfile, start_profile, stop_profile
+from config import settings
+
 logger = logging.getLogger(__name__)
 
 class RequestContextMiddleware(BaseHTTPMiddleware):
@@ -19,6 +24,39 @@ class RequestContextMiddleware(BaseHTTPMiddleware):
         ua = request.headers.get("User-Agent", "unknown")
         request.state.user_agent = ua
         
-        response = await call_next(request)
+        # Lets DB pool/profiling hooks name the route template of the request.
+        token = set_request_scope(request.scope)
+        profile, profile_token = start_profile()
+        request.state.query_profile = profile
+        try:
+            response = await call_next(request)
+        finally:
+            _report_profile(profile, current_route())
+            stop_profile(profile_token)
+            reset_request_scope(token)
         response.headers["X-Request-ID"] = request_id
         return response
+
+
+def _report_profile(profile: QueryProfile, route: str) -> None:
+    if not profile.count:
+        return
+    metrics.http_request_db_queries.labels(route=route).observe(profile.count)
+    metrics.http_request_db_seconds.labels(route=route).observe(profile.db_seconds)
+
+    repeated = profile.repeated(settings.db_repeated_statement_threshold)
+    reasons = [r for r, hit in (("budget", profile.count > settings.db_query_budget), ("repeated", repeated)) if hit]
+    for reason in reasons:
+        metrics.http_request_query_budget_exceeded_total.labels(route=route, reason=reason).inc()
+    if reasons:
+        logger.warning(
+            "db.query_budget_exceeded",
+            extra={
+                "event": "db.query_budget_exceeded",
+                "route": route,
+                "reasons": reasons,
+                "queries": profile.count,
+                "db_ms": round(profile.db_seconds * 1000, 1),
+                "repeated": [{"count": n, "sql": sql[:300]} for sql, n in repeated[:5]],
+            },
+        )
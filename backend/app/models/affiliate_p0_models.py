@@ -4,6 +4,7 @@ from datetime import datetime
 from typing import Optional
 import uuid
 
+from sqlalchemy import Index, text
 from sqlmodel import SQLModel, Field
 
 
@@ -17,12 +18,28 @@ class AffiliateOffer(SQLModel, table=True):
 
     cpa_amount: Optional[float] = None
     min_deposit: Optional[float] = None
+    revshare_percent: Optional[float] = None  # % of NGR; falls back to Affiliate.revshare_percent
 
     status: str = "active"  # active | paused
     created_at: datetime = Field(default_factory=lambda: datetime.utcnow())
 
 
 class AffiliateLedger(SQLModel, table=True):
+    __table_args__ = (
+        # Revshare accruals are written once per (partner, offer, currency, period).
+        Index(
+            "uq_affiliateledger_revshare_period",
+            "tenant_id",
+            "partner_id",
+            "offer_id",
+            "currency",
+            "reference",
+            unique=True,
+            postgresql_where=text("reason = 'REVSHARE_ACCRUAL'"),
+            sqlite_where=text("reason = 'REVSHARE_ACCRUAL'"),
+        ),
+    )
+
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
     tenant_id: str = Field(index=True)
 
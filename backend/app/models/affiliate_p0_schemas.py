@@ -33,11 +33,12 @@ class PartnerStatusRequest(BaseModel):
 
 class OfferCreate(BaseModel):
     name: str
-    model: str  # CPA|REVSHARE (P0: CPA only used for accrual)
+    model: str  # CPA|REVSHARE (CPA accrues on first deposit, REVSHARE via nightly batch)
     currency: str
 
     cpa_amount: Optional[float] = None
     min_deposit: Optional[float] = None
+    revshare_percent: Optional[float] = None
 
 
 class OfferOut(BaseModel):
@@ -50,6 +51,7 @@ class OfferOut(BaseModel):
     currency: str
     cpa_amount: Optional[float] = None
     min_deposit: Optional[float] = None
+    revshare_percent: Optional[float] = None
     status: str
     created_at: datetime
 
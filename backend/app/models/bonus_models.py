@@ -1,7 +1,7 @@
 from typing import Optional, Dict
 from datetime import datetime
 from sqlmodel import SQLModel, Field
-from sqlalchemy import Column, JSON
+from sqlalchemy import Column, Index, JSON, text
 import uuid
 
 # --- BONUS MODULE MODELS ---
@@ -45,6 +45,21 @@ class BonusCampaign(SQLModel, table=True):
 class BonusGrant(SQLModel, table=True):
     """An instance of a bonus given to a player."""
 
+    # Serves the per-player active grant lookups on the launch/bet path.
+    # One active grant per (campaign, player): backs the "already granted"
+    # pre-reads of the admin and bulk grant paths against racing inserts.
+    __table_args__ = (
+        Index("ix_bonusgrant_player_active", "tenant_id", "player_id", "status", "bonus_type", "granted_at"),
+        Index(
+            "ux_bonusgrant_campaign_player_active",
+            "campaign_id",
+            "player_id",
+            unique=True,
+            postgresql_where=text("status = 'active'"),
+            sqlite_where=text("status = 'active'"),
+        ),
+    )
+
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
     tenant_id: str = Field(index=True)
     campaign_id: str = Field(foreign_key="bonuscampaign.id", index=True)
@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import List, Optional
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class BonusCampaignCreate(BaseModel):
@@ -65,3 +65,23 @@ class BonusConsumeRequest(BaseModel):
 
 class BonusAdminActionRequest(BaseModel):
     reason: str
+
+
+class BonusBulkGrantRequest(BaseModel):
+    # None = every active player of the tenant; explicit ids are filtered to active players too.
+    player_ids: Optional[List[str]] = None
+    amount: Optional[float] = None
+    chunk_size: int = Field(default=500, ge=1, le=5000)
+
+
+class BonusBulkGrantStatusOut(BaseModel):
+    campaign_id: str
+    status: Optional[str] = None  # running | completed | failed (None = never run)
+    cursor: Optional[str] = None
+    granted: int = 0
+    skipped: int = 0
+    amount: float = 0.0
+    started_at: Optional[str] = None
+    completed_at: Optional[str] = None
+    heartbeat_at: Optional[str] = None
+    error: Optional[str] = None
@@ -4,7 +4,7 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional
 import uuid
 
-from sqlalchemy import Column
+from sqlalchemy import Column, Index
 from sqlmodel import Field, SQLModel
 from sqlalchemy import JSON
 
@@ -16,7 +16,7 @@ class GameImportJob(SQLModel, table=True):
     tenant_id: str = Field(index=True)
     created_by_admin_id: str = Field(index=True)
 
-    status: str = Field(default="queued", index=True)  # queued|running|ready|failed|completed
+    status: str = Field(default="queued", index=True)  # queued|running|ready|importing|failed|completed
 
     source_label: Optional[str] = None
     notes: Optional[str] = None
@@ -41,6 +41,10 @@ class GameImportJob(SQLModel, table=True):
 
 class GameImportItem(SQLModel, table=True):
     __tablename__ = "game_import_item"
+    __table_args__ = (
+        # Keyset walk of a job's importable items (job_id, status IN ..., id > cursor).
+        Index("ix_game_import_item_job_status_id", "job_id", "status", "id"),
+    )
 
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
     job_id: str = Field(index=True)
@@ -9,7 +9,10 @@ if TYPE_CHECKING:
     from app.models.sql_models import Tenant
 
 class Game(SQLModel, table=True):
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        sa.Index("ux_game_tenant_provider_external", "tenant_id", "provider_id", "external_id", unique=True),
+        {'extend_existing': True},
+    )
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
     tenant_id: str = Field(foreign_key="tenant.id", index=True)
     
@@ -1,7 +1,7 @@
 from typing import Optional, Dict
 from datetime import datetime, timezone
 from sqlmodel import SQLModel, Field
-from sqlalchemy import Column, JSON
+from sqlalchemy import Column, Index, JSON
 import uuid
 
 class Offer(SQLModel, table=True):
@@ -42,6 +42,12 @@ class Experiment(SQLModel, table=True):
 
 class ExperimentAssignment(SQLModel, table=True):
     """Sticky assignment of a player to an experiment variant."""
+
+    # One row per (experiment, player); batched writers insert with ON CONFLICT DO NOTHING.
+    __table_args__ = (
+        Index("ux_experimentassignment_experiment_player", "experiment_id", "player_id", unique=True),
+    )
+
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
     tenant_id: str = Field(index=True)
     
@@ -50,9 +56,6 @@ class ExperimentAssignment(SQLModel, table=True):
     
     variant: str # A, B, Control
     assigned_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-    
-    # Idempotency constraint logic handled in application or unique index
-    # We'll use unique index on (experiment_id, player_id)
 
 class OfferDecisionRecord(SQLModel, table=True):
     """Immutable audit log of why an offer was given or denied."""
@@ -1,7 +1,7 @@
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 from datetime import datetime, timezone
 from sqlmodel import SQLModel, Field
-from sqlalchemy import Column, JSON
+from sqlalchemy import Column, JSON, Index
 import uuid
 
 class RakeProfile(SQLModel, table=True):
@@ -23,6 +23,8 @@ class RakeProfile(SQLModel, table=True):
 
 class PokerHandAudit(SQLModel, table=True):
     """Audit record for a finished poker hand."""
+    __table_args__ = (Index("ix_pokerhandaudit_tenant_created", "tenant_id", "created_at"),)
+
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
     tenant_id: str = Field(index=True)
     
@@ -37,4 +39,8 @@ class PokerHandAudit(SQLModel, table=True):
     # List of winners and amounts: [{"player_id": "...", "win": 50.0}]
     winners: Dict = Field(default={}, sa_column=Column(JSON))
     
+    # Players dealt into the hand (rake attribution for rakeback)
+    player_count: int = 2
+    participants: List[str] = Field(default=[], sa_column=Column(JSON))
+    
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
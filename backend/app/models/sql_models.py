@@ -369,6 +369,8 @@ class APIKey(SQLModel, table=True):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
     tenant_id: str = Field(index=True)
     name: str
+    # Public lookup id (``sk_<key_prefix>.<secret>``); legacy keys get a derived one on first use
+    key_prefix: Optional[str] = Field(default=None, index=True, unique=True)
     key_hash: str
     scopes: str  # comma-separated
     status: str = "active"
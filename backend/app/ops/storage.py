@@ -13,6 +13,10 @@ class StorageClient:
     def get_object(self, key: str) -> bytes:
         raise NotImplementedError
 
+    def open_object(self, key: str) -> BinaryIO:
+        """Readable stream over an object, for segments too big to buffer."""
+        raise NotImplementedError
+
     def list_objects(self, prefix: str) -> List[str]:
         raise NotImplementedError
     
@@ -37,6 +41,9 @@ class LocalFileSystemStorage(StorageClient):
         with open(full_path, "rb") as f:
             return f.read()
 
+    def open_object(self, key: str) -> BinaryIO:
+        return open(os.path.join(self.root_path, key), "rb")
+
     def list_objects(self, prefix: str) -> List[str]:
         # Walk directory
         results = []
@@ -74,6 +81,9 @@ class S3Storage(StorageClient):
         self.s3.download_fileobj(self.bucket, key, obj)
         return obj.getvalue()
 
+    def open_object(self, key: str) -> BinaryIO:
+        return self.s3.get_object(Bucket=self.bucket, Key=key)["Body"]
+
     def list_objects(self, prefix: str) -> List[str]:
         paginator = self.s3.get_paginator("list_objects_v2")
         results = []
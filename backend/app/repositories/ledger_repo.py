@@ -5,6 +5,7 @@ from typing import Optional
 
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field, select
 from typing import Tuple
 
@@ -19,6 +20,11 @@ class LedgerTransaction(SQLModel, table=True):
     later phases (LEDGER-02+).
     """
 
+    __table_args__ = (
+        # Tenant-scoped time-window scans (affiliate revshare, reporting).
+        Index("ix_ledgertransaction_tenant_created", "tenant_id", "created_at"),
+    )
+
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
 
     tx_id: Optional[str] = Field(default=None, index=True)
@@ -66,6 +72,25 @@ class WalletBalance(SQLModel, table=True):
     updated_at: datetime = Field(default_factory=lambda: datetime.utcnow(), index=True)
 
 
+class LedgerBalanceFinding(SQLModel, table=True):
+    """A balance mismatch reported by one full-ledger verification run."""
+
+    __table_args__ = (Index("ix_ledgerbalancefinding_tenant_player", "tenant_id", "player_id"),)
+
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
+    run_id: str = Field(index=True)
+    tenant_id: str
+    player_id: str
+    currency: str = "USD"
+
+    # ledger_spendable|ledger_held|wallet_missing|player_available|player_held|player_bonus
+    kind: str
+    expected: Optional[float] = None
+    actual: Optional[float] = None
+
+    created_at: datetime = Field(default_factory=lambda: datetime.utcnow(), index=True)
+
+
 async def append_event(
     session: AsyncSession,
     *,
@@ -5,7 +5,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_session
 from app.models.sql_models import AdminUser
-from app.utils.auth import get_current_admin, get_password_hash, create_access_token
+from app.utils.auth import get_current_admin, create_access_token
+from app.services.password_hasher import hash_password
+from app.utils.principal_cache import invalidate_admin_principal
 from app.core.errors import AppError
 from app.utils.permissions import require_owner
 from datetime import timedelta
@@ -80,7 +82,7 @@ async def create_admin(
         role=payload.get("role", "Admin"),
         tenant_role=payload.get("tenant_role", "tenant_admin"),
         tenant_id=tenant_id,
-        password_hash=get_password_hash(password),
+        password_hash=await hash_password(password),
         status="active"
     )
 
@@ -174,7 +176,7 @@ async def update_admin_user(
 
     # password (not audited)
     if getattr(payload, "password", None):
-        admin.password_hash = get_password_hash(payload.password)
+        admin.password_hash = await hash_password(payload.password)
 
     session.add(admin)
 
@@ -211,6 +213,7 @@ async def update_admin_user(
 
     await session.commit()
     await session.refresh(admin)
+    await invalidate_admin_principal(admin.id)
 
     return {"user": AdminUserPublic.model_validate(admin)}
 
@@ -256,6 +259,7 @@ async def set_admin_status(
 
     await session.commit()
     await session.refresh(admin)
+    await invalidate_admin_principal(admin.id)
 
     return {"user": AdminUserPublic.model_validate(admin)}
 
@@ -301,7 +305,7 @@ async def create_tenant_admin(
         role="Tenant Admin",
         tenant_role="tenant_admin",
         tenant_id=tenant_id,
-        password_hash=get_password_hash(password),
+        password_hash=await hash_password(password),
         is_platform_owner=False,
         status="active",
         is_active=True,
@@ -352,7 +356,7 @@ async def seed_admin(session: AsyncSession = Depends(get_session)):
                 role="Super Admin",
                 tenant_id="default_casino",
                 is_platform_owner=True,
-                password_hash=get_password_hash("Admin123!"),
+                password_hash=await hash_password("Admin123!"),
                 status="active"
             )
             session.add(super_admin)
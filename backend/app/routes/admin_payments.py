@@ -1,12 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException
+from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 from datetime import datetime, timedelta, timezone
+from typing import List, Optional
 
 from app.core.database import get_session
 from app.models.sql_models import AdminUser
 from app.models.payment_models import PaymentIntent
-from app.models.payment_analytics_models import PaymentAttempt
+from app.models.payment_analytics_models import PaymentAttempt, RoutingRule
+from app.services.payments.routing.routing_table import invalidate_routing_rules
+from app.services.rbac import require_ops
 from app.utils.auth import get_current_admin
 from app.utils.tenant import get_current_tenant_id
 
@@ -78,3 +82,65 @@ async def get_intent_timeline(
         "intent": intent,
         "timeline": attempts
     }
+
+
+class RoutingRuleCreate(BaseModel):
+    country: Optional[str] = None
+    currency: Optional[str] = None
+    method: Optional[str] = None
+    provider_priority: List[str]
+
+
+@router.get("/routing-rules")
+async def list_routing_rules(
+    session: AsyncSession = Depends(get_session),
+    current_admin: AdminUser = Depends(get_current_admin)
+):
+    effective_tenant = await get_current_tenant_id(None, current_admin, session=session)
+    stmt = select(RoutingRule).where(RoutingRule.tenant_id == effective_tenant).order_by(RoutingRule.created_at.desc())
+    return (await session.execute(stmt)).scalars().all()
+
+
+@router.post("/routing-rules")
+async def create_routing_rule(
+    payload: RoutingRuleCreate = Body(...),
+    session: AsyncSession = Depends(get_session),
+    current_admin: AdminUser = Depends(get_current_admin)
+):
+    require_ops(current_admin)
+    effective_tenant = await get_current_tenant_id(None, current_admin, session=session)
+    if not payload.provider_priority:
+        raise HTTPException(400, "provider_priority must not be empty")
+
+    rule = RoutingRule(
+        tenant_id=effective_tenant,
+        country=payload.country,
+        currency=payload.currency.upper() if payload.currency else None,
+        method=payload.method,
+        provider_priority=payload.provider_priority,
+    )
+    session.add(rule)
+    await session.commit()
+    await session.refresh(rule)
+    await invalidate_routing_rules(effective_tenant)
+    return rule
+
+
+@router.post("/routing-rules/{rule_id}/deactivate")
+async def deactivate_routing_rule(
+    rule_id: str,
+    session: AsyncSession = Depends(get_session),
+    current_admin: AdminUser = Depends(get_current_admin)
+):
+    require_ops(current_admin)
+    effective_tenant = await get_current_tenant_id(None, current_admin, session=session)
+
+    rule = await session.get(RoutingRule, rule_id)
+    if not rule or rule.tenant_id != effective_tenant:
+        raise HTTPException(404, "Routing rule not found")
+
+    rule.is_active = False
+    session.add(rule)
+    await session.commit()
+    await invalidate_routing_rules(effective_tenant)
+    return rule
@@ -4,7 +4,7 @@ from datetime import datetime, timedelta, date
 from sqlmodel import select, func, col
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_session
+from app.core.database import get_read_session
 from app.models.game_models import GameRound, DailyGameAggregation, Game
 from app.models.sql_models import AdminUser
 from app.utils.auth import get_current_admin
@@ -15,7 +15,7 @@ router = APIRouter(prefix="/api/v1/admin/reports", tags=["admin_reports"])
 @router.get("/ggr")
 async def get_ggr_report(
     current_admin: AdminUser = Depends(get_current_admin),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     start_date: datetime = Query(...),
     end_date: datetime = Query(...),
     currency: Optional[str] = None,
@@ -119,7 +119,7 @@ async def get_ggr_report(
 @router.get("/financials")
 async def get_financial_report(
     current_admin: AdminUser = Depends(get_current_admin),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     start_date: datetime = Query(...),
     end_date: datetime = Query(...)
 ):
@@ -10,6 +10,7 @@ from app.models.sql_models import Transaction, Player
 from app.utils.auth_player import get_current_player
 from app.services.wallet_ledger import apply_wallet_delta_with_ledger
 from app.services.adyen_psp import AdyenPSP
+from app.services.payments.routing.smart_router import smart_router
 from app.services.metrics import metrics
 from config import settings
 from pydantic import BaseModel, Field
@@ -162,10 +163,16 @@ async def adyen_webhook(
                 session.add(tx)
                 await session.commit()
             else:
+                already_failed = tx.status == "failed"
                 tx.status = "failed"
                 tx.state = "failed"
                 session.add(tx)
                 await session.commit()
+                if already_failed:
+                    # Redelivered failure: counted once already.
+                    continue
+
+            await smart_router.record_attempt(provider="adyen", currency=tx.currency, success=success)
 
         # PAYOUT-REAL-001: Handle Payout Webhooks
         elif event_code == "PAYOUT_THIRDPARTY":
@@ -280,6 +280,7 @@ async def create_offer_route(
         currency=payload.currency,
         cpa_amount=payload.cpa_amount,
         min_deposit=payload.min_deposit,
+        revshare_percent=payload.revshare_percent,
     )
     await session.commit()
     await session.refresh(offer)
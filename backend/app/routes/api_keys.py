@@ -13,6 +13,7 @@ from app.utils.tenant import get_current_tenant_id
 from app.constants.api_keys import API_KEY_SCOPES
 from app.schemas.api_keys import APIKeyPublic, APIKeyCreatedOnce
 from app.services.audit import audit
+from app.utils.api_keys import invalidate_api_key
 
 router = APIRouter(prefix="/api/v1/api-keys", tags=["api_keys"])
 
@@ -57,7 +58,7 @@ async def create_api_key(
     current_admin: AdminUser = Depends(get_current_admin)
 ):
     # Lightweight SQL-only impl for UI: generate a secret shown once.
-    # Persist: key_prefix + bcrypt hash.
+    # Persist: key_prefix (indexed lookup id) + secret hash.
     from app.utils.api_keys import generate_api_key, validate_scopes
 
     name = (payload.get("name") or "New Key").strip()
@@ -72,6 +73,7 @@ async def create_api_key(
     key = APIKey(
         tenant_id=tenant_id,
         name=name,
+        key_prefix=key_prefix,
         key_hash=key_hash,
         scopes=",".join(scopes),
         status="active",
@@ -172,6 +174,9 @@ async def toggle_api_key(
         await session.commit()
         await session.refresh(key)
 
+        if not desired_active:
+            await invalidate_api_key(key.id)
+
         await _audit_best_effort(
             action="api_key.toggled",
             result="success",
@@ -1,21 +1,72 @@
 from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import csv
 import io
+import logging
 import uuid
-from typing import Optional
+from typing import AsyncIterator, Optional
 
-from app.core.database import get_session
+from app.core.database import get_session, read_session
 from app.models.sql_models import AdminUser, AuditEvent
+from app.ops.storage import StorageClient, get_storage_client
+from app.services.audit_archive import iter_audit_rows
 from app.schemas.audit_event import AuditEventListResponse, AuditEventPublic
 from app.utils.auth import get_current_admin
 from app.utils.tenant import get_current_tenant_id
 from app.services.audit import audit # Import service to log export itself
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/api/v1/audit", tags=["audit"])
 
+EXPORT_HEADERS = ["timestamp", "action", "status", "reason", "actor", "resource_type", "resource_id", "request_id", "ip"]
+_EXPORT_FLUSH_ROWS = 500
+
+
+def _archive_storage() -> Optional[StorageClient]:
+    try:
+        return get_storage_client()
+    except Exception as exc:
+        # Hot partitions still export; archived months are skipped.
+        logger.warning("audit.export.archive_unavailable", extra={"event": "audit.export.archive_unavailable", "error": str(exc)})
+        return None
+
+
+def _naive_utc(ts: Optional[datetime]) -> Optional[datetime]:
+    if ts is None or ts.tzinfo is None:
+        return ts
+    return ts.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+async def _export_csv(*, start: datetime, end: Optional[datetime], tenant_id: Optional[str]) -> AsyncIterator[str]:
+    # Own session: the request-scoped one is closed before the body streams.
+    async with read_session() as session:
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(EXPORT_HEADERS)
+        rows = 0
+        async for row in iter_audit_rows(session, _archive_storage(), start=start, end=end, tenant_id=tenant_id):
+            writer.writerow([
+                row["timestamp"].isoformat(),
+                row["action"],
+                row["status"],
+                row["reason"] or "",
+                row["actor_user_id"],
+                row["resource_type"],
+                row["resource_id"] or "",
+                row["request_id"],
+                row["ip_address"] or "",
+            ])
+            rows += 1
+            if rows % _EXPORT_FLUSH_ROWS == 0:
+                yield output.getvalue()
+                output.seek(0)
+                output.truncate(0)
+        yield output.getvalue()
+
 @router.get("/events", response_model=AuditEventListResponse)
 async def list_audit_events(
     request: Request,
@@ -105,13 +156,20 @@ async def export_audit_events(
     session: AsyncSession = Depends(get_session),
     current_admin: AdminUser = Depends(get_current_admin),
     since_hours: int = Query(default=24, ge=1, le=24 * 90),
+    start: Optional[datetime] = Query(default=None, description="Range start (overrides since_hours); may reach archived months"),
+    end: Optional[datetime] = Query(default=None),
 ):
     """
-    Export audit events as CSV.
+    Export audit events as CSV, oldest first, streamed.
+    Spans hot partitions and archived segments (see services/audit_archive.py); no row cap.
     Security: Tenant-scoped. Rate-limiting suggested (omitted for MVP, handled by generic rate-limiter).
     Audit: This action itself is audited as 'AUDIT_EXPORT'.
     """
     tenant_id = await get_current_tenant_id(request, current_admin, session=session)
+
+    # DB stores TIMESTAMP WITHOUT TIME ZONE, keep comparisons naive UTC.
+    range_start = _naive_utc(start) or (datetime.utcnow() - timedelta(hours=since_hours))
+    range_end = _naive_utc(end)
     
     # 1. Self-Audit First
     await audit.log_event(
@@ -128,45 +186,25 @@ async def export_audit_events(
         reason="Manual CSV Export",
         ip_address=getattr(request.state, "ip_address", None),
         user_agent=getattr(request.state, "user_agent", None),
-        details={"since_hours": since_hours, "format": "csv"}
+        details={
+            "since_hours": since_hours,
+            "start": range_start.isoformat(),
+            "end": range_end.isoformat() if range_end else None,
+            "format": "csv",
+        }
     )
     # Commit audit log before streaming response to ensure it's recorded even if export fails mid-stream
     await session.commit()
     
-    # 2. Query
-    # DB stores TIMESTAMP WITHOUT TIME ZONE, keep comparisons naive UTC.
-    cutoff = datetime.utcnow() - timedelta(hours=since_hours)
-    q = select(AuditEvent).where(AuditEvent.timestamp >= cutoff)
-    
-    if not getattr(current_admin, "is_platform_owner", False):
-        q = q.where(AuditEvent.tenant_id == tenant_id)
-    else:
+    # 2. Scope
+    scope_tenant: Optional[str] = tenant_id
+    if getattr(current_admin, "is_platform_owner", False):
         header_tenant = (request.headers.get("X-Tenant-ID") or "").strip()
-        if header_tenant:
-            q = q.where(AuditEvent.tenant_id == tenant_id)
-            
-    q = q.order_by(AuditEvent.timestamp.desc()).limit(10000)
-    
-    res = await session.execute(q)
-    items = res.scalars().all()
-    
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    headers = ["timestamp", "action", "status", "reason", "actor", "resource_type", "resource_id", "request_id", "ip"]
-    writer.writerow(headers)
-    
-    for item in items:
-        writer.writerow([
-            item.timestamp.isoformat(),
-            item.action,
-            item.status,
-            item.reason or "",
-            item.actor_user_id,
-            item.resource_type,
-            item.resource_id or "",
-            item.request_id,
-            item.ip_address or ""
-        ])
-        
-    return Response(content=output.getvalue(), media_type="text/csv", headers={"Content-Disposition": f"attachment; filename=audit_export_{datetime.now().strftime('%Y%m%d')}.csv"})
+        if not header_tenant:
+            scope_tenant = None
+
+    return StreamingResponse(
+        _export_csv(start=range_start, end=range_end, tenant_id=scope_tenant),
+        media_type="text/csv",
+        headers={"Content-Disposition": f"attachment; filename=audit_export_{datetime.now().strftime('%Y%m%d')}.csv"},
+    )
@@ -7,8 +7,6 @@ from sqlmodel import select
 
 from app.models.sql_models import AdminUser
 from app.utils.auth import (
-    verify_password,
-    get_password_hash,
     create_access_token,
     get_current_admin,
 )
@@ -21,6 +19,8 @@ import logging
 logger = logging.getLogger(__name__)
 
 from app.services.audit import audit
+from app.services.password_hasher import hash_password, password_hasher
+from app.utils.principal_cache import invalidate_admin_principal
 from app.utils.security import sha256_surrogate
 
 
@@ -123,7 +123,7 @@ async def login(
         raise auth_error
 
     # 2. Verify Password
-    is_valid = verify_password(form_data.password, admin.password_hash)
+    is_valid, rehashed = await password_hasher.verify_and_update(form_data.password, admin.password_hash)
     if not is_valid:
         admin.failed_login_attempts += 1
 
@@ -144,6 +144,9 @@ async def login(
 
     # 3. Success Update
     admin.failed_login_attempts = 0
+    if rehashed:
+        # Stored hash used an outdated bcrypt cost
+        admin.password_hash = rehashed
 
     await _audit_best_effort(
         request_id=request_id,
@@ -195,14 +198,15 @@ async def change_password(
     if not current_admin.password_hash:
         raise AppError(error_code="PASSWORD_NOT_SET", message="Password is not set", status_code=400)
 
-    if not verify_password(payload.current_password, current_admin.password_hash):
+    if not await password_hasher.verify(payload.current_password, current_admin.password_hash):
         raise AppError(error_code="CURRENT_PASSWORD_INVALID", message="Incorrect password", status_code=400)
 
     _validate_password_policy(payload.new_password)
 
-    current_admin.password_hash = get_password_hash(payload.new_password)
+    current_admin.password_hash = await hash_password(payload.new_password)
     session.add(current_admin)
     await session.commit()
+    await invalidate_admin_principal(current_admin.id)
     
     return {"message": "PASSWORD_CHANGED"}
 
@@ -255,10 +259,11 @@ async def reset_password(payload: PasswordResetConfirmRequest, session: AsyncSes
         raise AppError(error_code="RESET_TOKEN_INVALID", message="Token mismatch or user not found", status_code=400)
 
     _validate_password_policy(payload.new_password)
-    admin.password_hash = get_password_hash(payload.new_password)
+    admin.password_hash = await hash_password(payload.new_password)
     admin.password_reset_token = None
     session.add(admin)
     await session.commit()
+    await invalidate_admin_principal(admin.id)
 
     return {"message": "PASSWORD_RESET_SUCCESS"}
 
@@ -286,11 +291,12 @@ async def accept_invite(payload: AcceptInviteRequest, session: AsyncSession = De
         raise AppError(error_code="INVITE_TOKEN_INVALID", message="Token mismatch", status_code=400)
 
     _validate_password_policy(payload.new_password)
-    admin.password_hash = get_password_hash(payload.new_password)
+    admin.password_hash = await hash_password(payload.new_password)
     admin.invite_token = None
     admin.status = "active"
     
     session.add(admin)
     await session.commit()
+    await invalidate_admin_principal(admin.id)
 
     return {"message": "INVITE_ACCEPTED"}
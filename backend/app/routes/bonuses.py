@@ -1,14 +1,17 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Body, Depends, HTTPException, Request
+from fastapi import APIRouter, BackgroundTasks, Body, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 from typing import List
 
 from app.core.database import get_session
-from app.models.bonus_models import BonusGrant
+from app.jobs.bonus_bulk_grant_job import run_bulk_grant
+from app.models.bonus_models import BonusCampaign, BonusGrant
 from app.models.bonus_schemas import (
     BonusAdminActionRequest,
+    BonusBulkGrantRequest,
+    BonusBulkGrantStatusOut,
     BonusCampaignCreate,
     BonusCampaignOut,
     BonusConsumeRequest,
@@ -23,7 +26,9 @@ from app.services.bonus_lifecycle import (
     grant_bonus_admin,
     list_campaigns_with_games,
     set_campaign_status,
+    start_bulk_grant_admin,
 )
+from app.services.bonus_bulk_grant import bulk_grant_checkpoint
 from app.utils.auth import get_current_admin
 from app.utils.reason import require_reason
 from app.utils.tenant import get_current_tenant_id
@@ -136,6 +141,59 @@ async def grant_bonus(
     return BonusGrantOut.model_validate(grant)
 
 
+@router.post("/campaigns/{campaign_id}/bulk-grant", response_model=BonusBulkGrantStatusOut, status_code=202)
+async def bulk_grant_campaign(
+    request: Request,
+    campaign_id: str,
+    background_tasks: BackgroundTasks,
+    payload: BonusBulkGrantRequest = Body(...),
+    reason: str = Depends(require_reason),
+    session: AsyncSession = Depends(get_session),
+    current_admin: AdminUser = Depends(get_current_admin),
+):
+    """Grant a campaign to a whole segment in the background (resumes a running one)."""
+
+    tenant_id = await get_current_tenant_id(request, current_admin, session=session)
+    require_admin(current_admin)
+
+    campaign = await start_bulk_grant_admin(
+        session,
+        tenant_id=tenant_id,
+        admin=current_admin,
+        request=request,
+        campaign_id=campaign_id,
+        player_ids=payload.player_ids,
+        amount=payload.amount,
+        reason=reason,
+    )
+    await session.commit()
+
+    background_tasks.add_task(
+        run_bulk_grant,
+        tenant_id=tenant_id,
+        campaign_id=campaign.id,
+        reason=reason,
+        player_ids=payload.player_ids,
+        amount_override=payload.amount,
+        chunk_size=payload.chunk_size,
+    )
+    return BonusBulkGrantStatusOut(campaign_id=campaign.id, **bulk_grant_checkpoint(campaign))
+
+
+@router.get("/campaigns/{campaign_id}/bulk-grant", response_model=BonusBulkGrantStatusOut)
+async def get_bulk_grant_status(
+    request: Request,
+    campaign_id: str,
+    session: AsyncSession = Depends(get_session),
+    current_admin: AdminUser = Depends(get_current_admin),
+):
+    tenant_id = await get_current_tenant_id(request, current_admin, session=session)
+    campaign = await session.get(BonusCampaign, campaign_id)
+    if not campaign or campaign.tenant_id != tenant_id:
+        raise HTTPException(status_code=404, detail={"error_code": "CAMPAIGN_NOT_FOUND"})
+    return BonusBulkGrantStatusOut(campaign_id=campaign.id, **bulk_grant_checkpoint(campaign))
+
+
 @router.get("/players/{player_id}/bonuses", response_model=List[BonusGrantOut])
 async def list_player_bonuses(
     request: Request,
@@ -10,6 +10,7 @@ from app.core.database import get_session
 from app.models.game_models import Game
 from app.models.sql_models import Tenant, Transaction
 from app.models.robot_models import RobotDefinition, MathAsset, GameRobotBinding
+from app.services.tenant_snapshot import invalidate_tenant_config
 
 router = APIRouter(prefix="/api/v1/ci", tags=["ci"])
 
@@ -166,6 +167,7 @@ async def ci_seed(session: AsyncSession = Depends(get_session)):
         binding.is_enabled = True
 
     await session.commit()
+    await invalidate_tenant_config(tenant_id)
 
     return {
         "seeded": True,
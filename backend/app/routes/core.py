@@ -15,6 +15,7 @@ from app.models.game_models import Game
 from app.schemas.player import PlayerPublic
 from app.utils.tenant import get_current_tenant_id
 from app.utils.auth import get_current_admin
+from app.utils.principal_cache import invalidate_player_principal
 from app.utils.pagination import get_pagination_params
 from app.models.common import PaginationMeta, PaginationParams
 from app.schemas.pagination import PaginatedResponsePublic
@@ -22,6 +23,7 @@ from app.core.database import get_session
 from app.utils.permissions import require_support_view
 
 from app.core.errors import AppError
+from app.services.admin_search import classify_search, player_search_clause
 
 
 # Router
@@ -118,13 +120,13 @@ async def create_player_admin(
         if existing_email:
             raise HTTPException(status_code=409, detail={"error_code": "EMAIL_EXISTS"})
 
-    from app.utils.auth import get_password_hash
+    from app.services.password_hasher import hash_password
 
     player = Player(
         tenant_id=tenant_id,
         username=username,
         email=email or "",
-        password_hash=get_password_hash(password),
+        password_hash=await hash_password(password),
     )
     session.add(player)
     await session.commit()
@@ -185,11 +187,9 @@ async def get_players(
         if not include:
             query = query.where(Player.status != "disabled")
         
-    if search:
-        query = query.where(
-            (Player.username.ilike(f"%{search}%")) | 
-            (Player.email.ilike(f"%{search}%"))
-        )
+    term = classify_search(search)
+    if term:
+        query = query.where(player_search_clause(term))
 
     query = query.order_by(Player.registered_at.desc())
 
@@ -229,8 +229,9 @@ async def export_players_csv(
     if status and status != "all":
         query = query.where(Player.status == status)
 
-    if search:
-        query = query.where((Player.username.ilike(f"%{search}%")) | (Player.email.ilike(f"%{search}%")))
+    term = classify_search(search)
+    if term:
+        query = query.where(player_search_clause(term))
 
     query = query.order_by(Player.registered_at.desc()).limit(5000)
     result = await session.execute(query)
@@ -315,8 +316,9 @@ async def export_players_xlsx(
     if risk_score and risk_score != "all":
         query = query.where(Player.risk_score == risk_score)
 
-    if search:
-        query = query.where((Player.username.ilike(f"%{search}%")) | (Player.email.ilike(f"%{search}%")))
+    term = classify_search(search)
+    if term:
+        query = query.where(player_search_clause(term))
 
     query = query.order_by(Player.registered_at.desc()).limit(5000)
     result = await session.execute(query)
@@ -409,6 +411,8 @@ async def update_player(
 
     session.add(player)
     await session.commit()
+    if "status" in update_data:
+        await invalidate_player_principal(tenant_id, player.id)
     return {"message": "Player updated"}
 
 
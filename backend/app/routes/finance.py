@@ -10,7 +10,7 @@ from app.models.sql_models import Transaction, Player, PayoutAttempt
 from app.services.audit import audit
 
 
-from app.core.database import get_session
+from app.core.database import get_read_session, get_session
 from app.models.sql_models import ReconciliationReport, ChargebackCase, AdminUser
 from app.utils.auth import get_current_admin
 
@@ -1102,7 +1102,7 @@ async def run_wallet_reconciliation(
 @router.get("/reconciliation/summary")
 async def get_wallet_reconciliation_summary(
     date: Optional[str] = None,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     current_admin: AdminUser = Depends(get_current_admin),
 ):
     from datetime import date as date_cls
@@ -8,8 +8,9 @@ from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
-from app.core.database import get_session
+from app.core.database import get_read_session
 from app.models.sql_models import Transaction, AdminUser, ReconciliationReport, ChargebackCase
+from app.services.admin_search import classify_search, transaction_search_clause
 from app.services.csv_export import dicts_to_csv_bytes
 from app.utils.auth import get_current_admin
 from app.utils.tenant import get_current_tenant_id
@@ -38,7 +39,7 @@ async def export_finance_transactions(
     end_date: Optional[str] = None,
     currency: Optional[str] = None,
     ip_address: Optional[str] = None,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     current_admin: AdminUser = Depends(get_current_admin),
 ):
     tenant_id = await get_current_tenant_id(request, current_admin, session=session)
@@ -55,14 +56,9 @@ async def export_finance_transactions(
         stmt = stmt.where(Transaction.currency == currency)
 
     # P0: player_search/country/ip_address are not first-class columns; treat them as best-effort (tx-scoped).
-    if player_search:
-        like = f"%{player_search.strip()}%"
-        stmt = stmt.where(
-            (Transaction.id.ilike(like))
-            | (Transaction.player_id.ilike(like))
-            | (Transaction.provider_tx_id.ilike(like))
-            | (Transaction.provider_event_id.ilike(like))
-        )
+    term = classify_search(player_search)
+    if term:
+        stmt = stmt.where(transaction_search_clause(term))
 
     # Date filters
     if start_date:
@@ -128,7 +124,7 @@ async def export_finance_reports(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     currency: Optional[str] = None,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     current_admin: AdminUser = Depends(get_current_admin),
 ):
     # Use the same aggregation logic as /finance/reports by importing the function.
@@ -194,7 +190,7 @@ async def export_finance_reports(
 async def export_reconciliation(
     request: Request,
     provider: Optional[str] = None,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     current_admin: AdminUser = Depends(get_current_admin),
 ):
     tenant_id = await get_current_tenant_id(request, current_admin, session=session)
@@ -239,7 +235,7 @@ async def export_reconciliation(
 async def export_chargebacks(
     request: Request,
     status: Optional[str] = None,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     current_admin: AdminUser = Depends(get_current_admin),
 ):
     tenant_id = await get_current_tenant_id(request, current_admin, session=session)
@@ -2,21 +2,21 @@ from __future__ import annotations
 
 import uuid
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Optional
 
-from fastapi import APIRouter, Depends, Request, UploadFile, File, Body
+from fastapi import APIRouter, BackgroundTasks, Depends, Request, UploadFile, File, Body
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
 from app.core.database import get_session
 from app.core.errors import AppError
-from app.models.game_models import Game
+from app.jobs.game_import_job import run_game_import
 from app.models.game_import_sql import GameImportJob, GameImportItem
 from app.services.audit import audit
 from app.services.game_import_service import (
-    extract_json_bytes,
-    normalize_item,
-    parse_items,
+    claim_import_job,
+    import_in_progress,
+    stage_items,
     store_upload_file_to_tmp,
 )
 from app.utils.auth import get_current_admin, AdminUser
@@ -126,45 +126,12 @@ async def manual_upload(
         session.add(job)
         await session.commit()
 
-        json_bytes = extract_json_bytes(stored)
-        raw_items = parse_items(json_bytes)
-
-        items: List[GameImportItem] = []
-        errors_preview: List[Dict[str, Any]] = []
-        total_errors = 0
-
-        for raw in raw_items:
-            external_id, provider_id, name, gtype, rtp, errs = normalize_item(raw)
-            status = "valid" if not errs else "invalid"
-            if errs:
-                total_errors += 1
-                if len(errors_preview) < 20:
-                    errors_preview.append({"external_id": external_id, "errors": errs})
-
-            items.append(
-                GameImportItem(
-                    job_id=job.id,
-                    tenant_id=tenant_id,
-                    provider_id=provider_id,
-                    external_id=external_id or "",
-                    name=name,
-                    type=gtype,
-                    rtp=rtp,
-                    status=status,
-                    errors=errs,
-                    payload=raw,
-                    created_at=datetime.utcnow(),
-                    updated_at=datetime.utcnow(),
-                )
-            )
-
-        for it in items:
-            session.add(it)
-
-        job.total_items = len(raw_items)
-        job.total_errors = total_errors
-        job.error_summary = {"preview": errors_preview} if errors_preview else None
-        job.status = "ready" if total_errors < len(raw_items) else "failed"
+        staged = await stage_items(session, job, stored)
+
+        job.total_items = staged.total_items
+        job.total_errors = staged.total_errors
+        job.error_summary = {"preview": staged.errors_preview} if staged.errors_preview else None
+        job.status = "ready" if staged.total_errors < staged.total_items else "failed"
         job.updated_at = datetime.utcnow()
         session.add(job)
         await session.commit()
@@ -186,6 +153,9 @@ async def manual_upload(
 
     except ValueError as ve:
         code = str(ve)
+        # Discard partially staged items.
+        await session.rollback()
+        await session.refresh(job)
         job.status = "failed"
         job.total_items = 0
         job.total_errors = 1
@@ -258,6 +228,7 @@ async def get_job(
         "status": job.status,
         "total_items": job.total_items,
         "total_errors": job.total_errors,
+        "total_imported": job.total_imported,
         "error_summary": job.error_summary,
         "items": [
             {
@@ -275,13 +246,16 @@ async def get_job(
     }
 
 
-@router.post("/jobs/{job_id}/import")
+@router.post("/jobs/{job_id}/import", status_code=202)
 async def import_job(
     job_id: str,
     request: Request,
+    background_tasks: BackgroundTasks,
     session: AsyncSession = Depends(get_session),
     current_admin: AdminUser = Depends(get_current_admin),
 ):
+    """Queue the upsert of a ready job's items; poll ``GET /jobs/{id}`` for progress."""
+
     tenant_id = await get_current_tenant_id(request, current_admin, session=session)
 
     stmt = select(GameImportJob).where(GameImportJob.id == job_id, GameImportJob.tenant_id == tenant_id)
@@ -289,10 +263,15 @@ async def import_job(
     if not job:
         raise AppError("NOT_FOUND", "Job not found", 404)
 
-    if job.status == "completed":
-        return {"status": "completed", "imported_count": job.total_imported}
+    if job.status == "completed" or import_in_progress(job):
+        return {"job_id": job.id, "status": job.status, "imported_count": job.total_imported}
+
+    if job.status not in {"ready", "importing"}:
+        raise AppError("JOB_NOT_READY", "Job is not ready", 409)
 
-    if job.status != "ready":
+    # Claim the job (or take over a stale claim) so concurrent clicks queue a single import.
+    if not await claim_import_job(session, job_id):
+        await session.rollback()
         raise AppError("JOB_NOT_READY", "Job is not ready", 409)
 
     await _audit_best_effort(
@@ -302,96 +281,21 @@ async def import_job(
         tenant_id=tenant_id,
         action="game_import.import.attempt",
         resource_type="game_import_job",
-        resource_id=job.id,
+        resource_id=job_id,
         result="success",
         status="SUCCESS",
     )
-
-    items_stmt = select(GameImportItem).where(
-        GameImportItem.job_id == job_id,
-        GameImportItem.tenant_id == tenant_id,
-        GameImportItem.status.in_(["valid", "pending"]),
-    )
-    items = (await session.execute(items_stmt)).scalars().all()
-
-    imported = 0
-    for it in items:
-        if it.errors:
-            it.status = "skipped"
-            it.updated_at = datetime.utcnow()
-            session.add(it)
-            continue
-
-        provider_id = it.provider_id or (it.payload.get("provider_id") if isinstance(it.payload, dict) else None) or "unknown"
-        external_id = it.external_id
-
-        existing_stmt = select(Game).where(
-            Game.tenant_id == tenant_id,
-            Game.provider_id == provider_id,
-            Game.external_id == external_id,
-        )
-        existing = (await session.execute(existing_stmt)).scalars().first()
-
-        gtype = it.type or "slot"
-        rtp = it.rtp if it.rtp is not None else 96.5
-        name = it.name or external_id
-
-        if existing:
-            existing.name = name
-            existing.provider = provider_id
-            existing.category = gtype
-            existing.type = gtype
-            existing.rtp = rtp
-            existing.is_active = True
-            # Keep configuration; merge payload as snapshot
-            try:
-                existing.configuration = dict(existing.configuration or {})
-                existing.configuration["import_payload"] = it.payload
-            except Exception:
-                existing.configuration = {"import_payload": it.payload}
-            session.add(existing)
-        else:
-            game = Game(
-                tenant_id=tenant_id,
-                provider_id=provider_id,
-                external_id=external_id,
-                type=gtype,
-                rtp=rtp,
-                is_active=True,
-                name=name,
-                provider=provider_id,
-                category=gtype,
-                status="active",
-                configuration={"import_payload": it.payload},
-            )
-            session.add(game)
-
-        it.status = "imported"
-        it.updated_at = datetime.utcnow()
-        session.add(it)
-        imported += 1
-
-    job.total_imported = imported
-    job.status = "completed"
-    job.updated_at = datetime.utcnow()
-    session.add(job)
-
     await session.commit()
 
-    await _audit_best_effort(
-        session=session,
-        request=request,
-        admin=current_admin,
+    background_tasks.add_task(
+        run_game_import,
         tenant_id=tenant_id,
-        action="game_import.import.completed",
-        resource_type="game_import_job",
-        resource_id=job.id,
-        result="success",
-        status="SUCCESS",
-        details={"imported_count": imported},
+        job_id=job_id,
+        actor_user_id=str(current_admin.id),
+        actor_role=getattr(current_admin, "role", None),
+        request_id=_request_meta(request)["request_id"],
     )
-
-    return {"status": "completed", "imported_count": imported}
+    return {"job_id": job_id, "status": "importing", "imported_count": job.total_imported}
 
 
 # Legacy route kept for compatibility
@@ -5,8 +5,8 @@ from typing import List, Optional
 from app.core.database import get_session
 from app.models.game_models import Game, GameSession
 from app.schemas.game_schemas import GameLaunchRequest, GameLaunchResponse
-from app.utils.auth_player import get_current_player
-from app.models.sql_models import Player
+from app.utils.auth_player import get_current_player_principal
+from app.utils.principal_cache import PlayerPrincipal
 import uuid
 
 router = APIRouter(prefix="/api/v1/player/client-games", tags=["games"])
@@ -14,7 +14,7 @@ router = APIRouter(prefix="/api/v1/player/client-games", tags=["games"])
 @router.get("/", response_model=List[Game])
 async def list_games(
     tenant_id: Optional[str] = None,
-    current_player: Player = Depends(get_current_player),
+    current_player: PlayerPrincipal = Depends(get_current_player_principal),
     session: AsyncSession = Depends(get_session)
 ):
     # Tenant filtering logic based on player's tenant
@@ -29,7 +29,7 @@ async def list_games(
 @router.post("/launch", response_model=GameLaunchResponse)
 async def launch_game(
     body: GameLaunchRequest,
-    current_player: Player = Depends(get_current_player),
+    current_player: PlayerPrincipal = Depends(get_current_player_principal),
     session: AsyncSession = Depends(get_session)
 ):
     game = await session.get(Game, body.game_id)
@@ -112,7 +112,8 @@ async def poker_hand_audit(
         "game_type": "CASH",
         "pot_total": float,
         "winners": [{"player_id": str, "amount": float}],
-        "player_count": int
+        "player_count": int,
+        "players": [str]  (dealt-in player ids, used for rakeback)
     }
     """
     tenant_id = payload.get("tenant_id", "default_casino")
@@ -136,6 +137,11 @@ async def poker_hand_audit(
     )
     
     # 3. Store Audit
+    winners = payload.get("winners", {})
+    participants = [str(p) for p in payload.get("players") or []]
+    if not participants and isinstance(winners, list):
+        participants = [str(w["player_id"]) for w in winners if w.get("player_id")]
+
     audit_record = PokerHandAudit(
         tenant_id=tenant_id,
         provider_hand_id=payload["hand_id"],
@@ -144,7 +150,9 @@ async def poker_hand_audit(
         pot_total=payload["pot_total"],
         rake_collected=calculated_rake,
         rake_profile_id=profile.id,
-        winners=payload.get("winners", {})
+        winners=winners,
+        player_count=int(payload.get("player_count", 2)),
+        participants=participants,
     )
     session.add(audit_record)
     
@@ -8,6 +8,7 @@ from app.models.sql_models import AdminUser, Tenant
 from app.utils.auth import get_current_admin
 from app.utils.permissions import require_owner
 from app.services.feature_access import enforce_module_access
+from app.services.tenant_snapshot import get_tenant_snapshot, invalidate_tenant_config
 from app.utils.tenant import get_current_tenant_id
 
 router = APIRouter(prefix="/api/v1/kill-switch", tags=["kill_switch"])
@@ -24,11 +25,10 @@ async def get_kill_switch_status(
     tenant_id = await get_current_tenant_id(request, current_admin, session=session)
     await enforce_module_access(session=session, tenant_id=tenant_id, module_key="kill_switch")
 
-    tenant = await session.get(Tenant, tenant_id)
-    features = (tenant.features if tenant else {}) or {}
+    snapshot = await get_tenant_snapshot(session, tenant_id)
     return {
         "kill_switch_all": False,  # global status is checked server-side; exposing exact value is optional
-        "tenant_kill_switches": features.get("kill_switches") or {},
+        "tenant_kill_switches": (snapshot.features_dict().get("kill_switches") or {}) if snapshot else {},
     }
 
 
@@ -90,5 +90,6 @@ async def set_tenant_kill_switch(
     )
 
     await session.commit()
+    await invalidate_tenant_config(tenant_id)
 
     return {"message": "UPDATED", "tenant_id": tenant_id, "kill_switches": kill_switches}
@@ -1,15 +1,12 @@
 from fastapi import APIRouter, Response
-from prometheus_fastapi_instrumentator import Instrumentator
-from app.core.metrics import metrics
+
+from app.core.metrics import render_latest
 
 router = APIRouter(prefix="/metrics", tags=["monitoring"])
 
-# Initialize Instrumentator but don't expose route yet (we do it manually or via mount)
-# Actually, the standard way is to use .instrument(app).expose(app) in server.py
-# But we can also expose a custom router if we want auth.
-# For now, let's keep it standard in server.py, this file is just a placeholder or for custom metrics view.
 
-@router.get("/")
+@router.get("", include_in_schema=False)
 def get_metrics():
-    from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
-    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+    # Aggregates all workers when PROMETHEUS_MULTIPROC_DIR is set (see app.core.metrics).
+    payload, content_type = render_latest()
+    return Response(payload, media_type=content_type)
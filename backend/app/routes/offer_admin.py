@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, Body, Request
+from fastapi import APIRouter, Depends, Body, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_session
@@ -7,6 +7,7 @@ from app.models.offer_models import Offer, Experiment
 from app.utils.auth import get_current_admin
 from app.utils.tenant import get_current_tenant_id
 from app.services.offer_engine import OfferEngine
+from app.services.experiment_engine import ExperimentEngine, invalidate_offer_definitions
 
 router = APIRouter(prefix="/api/v1/offers", tags=["offers"])
 
@@ -29,6 +30,7 @@ async def create_offer(
     )
     session.add(offer)
     await session.commit()
+    await invalidate_offer_definitions(tenant_id)
     await session.refresh(offer)
     return offer
 
@@ -50,9 +52,32 @@ async def create_experiment(
     )
     session.add(exp)
     await session.commit()
+    await invalidate_offer_definitions(tenant_id, exp.id)
     await session.refresh(exp)
     return exp
 
+@router.post("/experiments/{experiment_key}/preassign")
+async def preassign_experiment(
+    request: Request,
+    experiment_key: str,
+    payload: dict = Body(default={}),
+    session: AsyncSession = Depends(get_session),
+    current_admin: AdminUser = Depends(get_current_admin)
+):
+    """Bucket a segment (player_ids, or all active players) before the campaign goes live."""
+    tenant_id = await get_current_tenant_id(request, current_admin, session=session)
+
+    result = await ExperimentEngine().preassign_segment(
+        session,
+        tenant_id=tenant_id,
+        experiment_key=experiment_key,
+        player_ids=payload.get("player_ids"),
+        chunk_size=int(payload.get("chunk_size", 1000)),
+    )
+    if result.get("error"):
+        raise HTTPException(status_code=409, detail={"error_code": result["error"]})
+    return result
+
 @router.post("/evaluate")
 async def evaluate_trigger(
     request: Request,
@@ -9,7 +9,8 @@ from app.models.sql_models import Player, Tenant
 from sqlalchemy.exc import IntegrityError
 from app.services.affiliate_engine import AffiliateEngine
 from app.core.database import get_session
-from app.utils.auth import get_password_hash, verify_password, create_access_token
+from app.utils.auth import create_access_token
+from app.services.password_hasher import hash_password, password_hasher
 from app.schemas.player import PlayerPublic
 
 router = APIRouter(prefix="/api/v1/auth/player", tags=["player_auth"])
@@ -62,7 +63,7 @@ async def register_player(
         raise HTTPException(status_code=400, detail="Password must be at least 8 characters")
 
     # Hash password
-    hashed_password = get_password_hash(password)
+    hashed_password = await hash_password(password)
     
     player = Player(
         email=email,
@@ -124,7 +125,11 @@ async def login_player(payload: dict = Body(...), session: AsyncSession = Depend
     res = await session.execute(stmt)
     player = res.scalars().first()
     
-    if not player or not verify_password(payload.get("password"), player.password_hash):
+    if not player:
+        raise HTTPException(status_code=401, detail={"error_code": "INVALID_CREDENTIALS"})
+
+    ok, rehashed = await password_hasher.verify_and_update(payload.get("password"), player.password_hash)
+    if not ok:
         raise HTTPException(status_code=401, detail={"error_code": "INVALID_CREDENTIALS"})
 
     # P1-E1: suspended players cannot login
@@ -142,6 +147,16 @@ async def login_player(payload: dict = Body(...), session: AsyncSession = Depend
         if until and until > datetime.now(timezone.utc):
             raise HTTPException(status_code=403, detail="RG_SELF_EXCLUDED")
 
+    if rehashed:
+        # Stored hash used an outdated bcrypt cost; upgrade it (best-effort).
+        player.password_hash = rehashed
+        session.add(player)
+        try:
+            await session.commit()
+            await session.refresh(player)
+        except Exception:
+            await session.rollback()
+
     token = create_access_token(
         data={"sub": player.id, "role": "player", "tenant_id": tenant_id},
         expires_delta=timedelta(days=7)
@@ -6,8 +6,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_session
 from app.models.game_models import GameRound, Game
-from app.models.sql_models import Player
-from app.utils.auth_player import get_current_player
+from app.utils.auth_player import get_current_player_principal
+from app.utils.principal_cache import PlayerPrincipal
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,7 +16,7 @@ router = APIRouter(prefix="/api/v1/player/history", tags=["player_history"])
 
 @router.get("/games")
 async def get_game_history(
-    current_player: Player = Depends(get_current_player),
+    current_player: PlayerPrincipal = Depends(get_current_player_principal),
     session: AsyncSession = Depends(get_session),
     page: int = Query(1, ge=1),
     limit: int = Query(20, le=100),
@@ -10,6 +10,7 @@ from sqlmodel import select
 
 from app.core.database import get_session
 from app.models.player_ops_models import PlayerManualBonusGrant, PlayerSessionRevocation
+from app.utils.principal_cache import bump_revocation_epoch, invalidate_player_principal
 from app.models.sql_models import AdminUser, Player
 from app.services.audit import audit
 from app.services.wallet_ledger import apply_wallet_delta_with_ledger
@@ -422,6 +423,7 @@ async def suspend_player(
     player.status = "suspended"
     session.add(player)
     await session.commit()
+    await invalidate_player_principal(tenant_id, player.id)
 
     # P1-E3: suspend also revokes sessions immediately
     existing = (
@@ -440,6 +442,7 @@ async def suspend_player(
         session.add(existing)
         await session.commit()
         await session.refresh(existing)
+        rev = existing
     else:
         rev = PlayerSessionRevocation(
             tenant_id=tenant_id,
@@ -450,6 +453,9 @@ async def suspend_player(
         )
         session.add(rev)
         await session.commit()
+        await session.refresh(rev)
+
+    await bump_revocation_epoch(tenant_id, player.id, rev.revoked_at)
 
     await _audit_event(
         session=session,
@@ -498,6 +504,7 @@ async def unsuspend_player(
     player.status = "active"
     session.add(player)
     await session.commit()
+    await invalidate_player_principal(tenant_id, player.id)
 
     await _audit_event(
         session=session,
@@ -566,6 +573,8 @@ async def force_logout(
         await session.commit()
         await session.refresh(rev)
 
+    await bump_revocation_epoch(tenant_id, player.id, rev.revoked_at)
+
     await _audit_event(
         session=session,
         request=request,
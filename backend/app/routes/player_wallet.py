@@ -4,6 +4,7 @@ import uuid
 import hashlib
 import json
 import os
+import time
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select, func
 
@@ -213,8 +214,12 @@ async def create_deposit(
     psp = get_psp()
     psp_idem_key = build_psp_idem_key(str(tx.id))
 
+    from app.services.payments.routing.smart_router import smart_router
+    from app.services.psp.psp_interface import PSPStatus
+
     # Authorize step
-    await psp.authorize_deposit(
+    started = time.perf_counter()
+    psp_auth = await psp.authorize_deposit(
         tx_id=str(tx.id),
         tenant_id=current_player.tenant_id,
         player_id=current_player.id,
@@ -222,6 +227,14 @@ async def create_deposit(
         currency=tx.currency or "USD",
         psp_idem_key=psp_idem_key,
     )
+    # MockPSP answers inline, so the deposit is counted here (the MockPSP
+    # webhook that may follow does not count it again).
+    await smart_router.record_attempt(
+        provider=psp_auth.provider,
+        currency=tx.currency or "USD",
+        success=psp_auth.status != PSPStatus.FAILED,
+        latency_ms=(time.perf_counter() - started) * 1000,
+    )
 
     # Capture step
     psp_cap = await psp.capture_deposit(
@@ -234,7 +247,6 @@ async def create_deposit(
     )
 
     from app.services.wallet_ledger import apply_wallet_delta_with_ledger
-    from app.services.psp.psp_interface import PSPStatus
 
     if psp_cap.status == PSPStatus.CAPTURED:
         await apply_wallet_delta_with_ledger(
@@ -12,6 +12,7 @@ from app.models.poker_mtt_models import PokerTournament, TournamentRegistration
 from app.utils.auth import get_current_admin
 from app.utils.tenant import get_current_tenant_id
 from app.services.audit import audit
+from app.services.poker.mtt_payout_engine import pay_tournament
 from app.utils.reason import require_reason
 
 router = APIRouter(prefix="/api/v1/poker/tournaments", tags=["poker_mtt"])
@@ -182,39 +183,20 @@ async def finish_tournament(
     current_admin: AdminUser = Depends(get_current_admin)
 ):
     trn = await session.get(PokerTournament, tournament_id)
-    if not trn or trn.status != "RUNNING":
+    # PAYING = a previous finish was interrupted mid-payout; retrying resumes it.
+    if not trn or trn.status not in ("RUNNING", "PAYING"):
         raise HTTPException(409, "Tournament not running")
         
-    payouts = payload["payouts"]
-    total_payout = sum(p["amount"] for p in payouts)
+    payouts = payload.get("payouts") or []
     
     # Validation: Payout <= Prize Pool (allow small diff for rounding or guarantee overlay)
     # If guaranteed > collected, total_payout > prize_pool_total is expected (Overlay).
     # If no guarantee, they should match.
     
-    for p in payouts:
-        player_id = p["player_id"]
-        amount = p["amount"]
-        if amount <= 0: continue
-        
-        # Credit Player
-        player = await session.get(Player, player_id)
-        if player:
-            player.balance_real_available += amount
-            player.balance_real += amount
-            session.add(player)
-            
-            # Ledger
-            lt = LedgerTransaction(
-                tenant_id=trn.tenant_id, player_id=player_id, type="mtt_prize",
-                amount=amount, status="success", direction="credit", provider="internal_mtt",
-                provider_ref=tournament_id
-            )
-            session.add(lt)
-            
-    trn.status = "FINISHED"
-    trn.payout_report = {"payouts": payouts, "total_distributed": total_payout}
-    session.add(trn)
+    # Ledger-bound bulk credit: deterministic lock order, per-(tournament, player)
+    # idempotency, chunked commits with a resumable cursor on payout_report.
+    result = await pay_tournament(session, trn, payouts)
+    total_payout = result["total_distributed"]
     
     await audit.log_event(
         session=session,
@@ -226,7 +208,12 @@ async def finish_tournament(
         resource_id=trn.id,
         result="success",
         reason=reason,
-        details={"total_payout": total_payout, "winners_count": len(payouts)}
+        details={
+            "total_payout": total_payout,
+            "winners_count": result["winners"],
+            "credited": result["credited"],
+            "missing_players": result["missing_players"],
+        }
     )
     
     await session.commit()
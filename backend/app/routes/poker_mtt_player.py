@@ -5,8 +5,8 @@ from datetime import datetime, timezone
 
 from app.core.database import get_session
 from app.models.poker_mtt_models import PokerTournament, TournamentRegistration
-from app.models.sql_models import Player
-from app.utils.auth_player import get_current_player
+from app.utils.auth_player import get_current_player_principal
+from app.utils.principal_cache import PlayerPrincipal
 from app.repositories.ledger_repo import append_event, apply_balance_delta, get_balance
 
 router = APIRouter(prefix="/api/v1/poker/mtt", tags=["poker_mtt_player"])
@@ -16,7 +16,7 @@ async def reentry_tournament(
     tournament_id: str,
     request: Request,
     session: AsyncSession = Depends(get_session),
-    player: Player = Depends(get_current_player)
+    player: PlayerPrincipal = Depends(get_current_player_principal)
 ):
     """
     Re-enter a tournament if eliminated and rules allow.
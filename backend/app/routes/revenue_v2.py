@@ -8,7 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select, func
 from pydantic import BaseModel
 
-from app.core.database import get_session
+from app.core.database import get_read_session
 from app.models.sql_models import Transaction, Tenant, AdminUser
 from app.utils.auth import get_current_admin
 
@@ -65,7 +65,7 @@ async def get_all_tenants_revenue_v2(
     request: Request,
     range_days: int = Query(7),
     tenant_id: Optional[str] = Query(None),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     current_admin: AdminUser = Depends(get_current_admin),
 ):
     """Owner-only platform revenue aggregate.
@@ -10,6 +10,7 @@ from app.models.sql_models import AdminUser, Player
 from app.models.rg_models import PlayerRGProfile
 from app.utils.auth import get_current_admin
 from app.utils.auth_player import get_current_player
+from app.utils.principal_cache import invalidate_player_principal
 from app.services.audit import audit
 from app.utils.reason import require_reason
 
@@ -97,6 +98,7 @@ async def self_exclude(
     )
     
     await session.commit()
+    await invalidate_player_principal(current_player.tenant_id, current_player.id)
     return {"status": "excluded", "until": profile.self_excluded_until}
 
 # --- ADMIN OVERRIDES ---
@@ -116,6 +118,7 @@ async def admin_override_rg(
         raise HTTPException(404, "Profile not found")
         
     # Apply changes (e.g. lift exclusion - risky!)
+    player = None
     if "lift_exclusion" in payload and payload["lift_exclusion"]:
         profile.self_excluded_until = None
         profile.self_excluded_permanent = False
@@ -141,4 +144,6 @@ async def admin_override_rg(
         details=payload
     )
     await session.commit()
+    if player:
+        await invalidate_player_principal(player.tenant_id, player.id)
     return profile
@@ -3,6 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_session
 from app.models.sql_models import Player
 from app.utils.auth_player import get_current_player
+from app.utils.principal_cache import invalidate_player_principal
 from app.services.audit import audit
 from app.models.rg_models import PlayerRGProfile
 from datetime import datetime, timedelta
@@ -40,6 +41,7 @@ async def self_exclude(
     
     session.add(current_player)
     await session.commit()
+    await invalidate_player_principal(current_player.tenant_id, current_player.id)
     
 
 
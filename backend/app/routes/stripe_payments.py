@@ -9,6 +9,7 @@ from app.core.database import get_session
 from app.models.sql_models import Transaction, Player
 from app.utils.auth_player import get_current_player
 from app.services.wallet_ledger import apply_wallet_delta_with_ledger
+from app.services.payments.routing.smart_router import smart_router
 from app.services.system_flags import is_system_flag_enabled
 from pydantic import BaseModel, Field
 try:
@@ -402,6 +403,7 @@ async def stripe_webhook(
             tx.state = "completed"
             session.add(tx)
             await session.commit()
+            await smart_router.record_attempt(provider="stripe", currency=tx.currency, success=True)
         else:
             logger.warning(f"Stripe Webhook: Transaction not found for {session_id}")
             # Maybe return 404 to force retry if race condition? Or 200 to ack?
@@ -8,6 +8,7 @@ from app.core.errors import AppError
 from app.utils.auth import get_current_admin
 from app.utils.permissions import require_owner
 from app.schemas.tenant import TenantCreateRequest
+from app.services.tenant_snapshot import get_tenant_snapshot, invalidate_tenant_config
 from app.utils.tenant import get_current_tenant_id
 
 router = APIRouter(prefix="/api/v1/tenants", tags=["tenants"])
@@ -127,15 +128,15 @@ async def get_capabilities(
     # Owner impersonation support via header (P0-TENANT-SCOPE): only owner can override.
     tenant_id = await get_current_tenant_id(request, current_admin, session=session)
 
-    tenant = await session.get(Tenant, tenant_id)
-    features = tenant.features if tenant else {}
+    snapshot = await get_tenant_snapshot(session, tenant_id)
+    features = snapshot.features_dict() if snapshot else {}
 
     return {
         "features": features,
         "is_owner": current_admin.is_platform_owner,
         "tenant_id": tenant_id,
         "tenant_role": current_admin.tenant_role,
-        "tenant_name": tenant.name if tenant else "Unknown",
+        "tenant_name": snapshot.name if snapshot else "Unknown",
     }
 
 
@@ -211,6 +212,7 @@ async def update_payments_policy(
 
     await session.commit()
     await session.refresh(tenant)
+    await invalidate_tenant_config(tenant.id)
 
     return {"message": "UPDATED", "policy": after}
 
@@ -264,6 +266,7 @@ async def update_tenant_features(
 
     await session.commit()
     await session.refresh(tenant)
+    await invalidate_tenant_config(tenant.id)
 
     return {"message": "UPDATED", "tenant": tenant}
 
@@ -324,6 +327,7 @@ async def update_menu_flags(
     )
     
     await session.commit()
+    await invalidate_tenant_config(tenant_id)
     return {"message": "Menu flags updated", "menu_flags": updated_flags}
 
 # Seeding function adapted for SQL
@@ -4,11 +4,12 @@ from sqlmodel import select
 from typing import List
 
 from app.core.database import get_session
-from app.models.sql_models import AdminUser, Player
+from app.models.sql_models import AdminUser
 from app.models.vip_models import VipTier
-from app.services.vip_engine import VipEngine
+from app.services.vip_engine import VipEngine, invalidate_vip_tiers
 from app.utils.auth import get_current_admin
-from app.utils.auth_player import get_current_player
+from app.utils.auth_player import get_current_player_principal
+from app.utils.principal_cache import PlayerPrincipal
 from app.utils.tenant import get_current_tenant_id
 
 router = APIRouter(prefix="/api/v1/vip", tags=["vip"])
@@ -44,6 +45,7 @@ async def create_tier(
     )
     session.add(tier)
     await session.commit()
+    await invalidate_vip_tiers(tenant_id)
     await session.refresh(tier)
     return tier
 
@@ -77,7 +79,7 @@ async def simulate_activity(
 async def get_my_vip_status(
     request: Request,
     session: AsyncSession = Depends(get_session),
-    player: Player = Depends(get_current_player)
+    player: PlayerPrincipal = Depends(get_current_player_principal)
 ):
     engine = VipEngine()
     status = await engine.get_status(session, player.id, player.tenant_id)
@@ -99,7 +101,7 @@ async def redeem_points(
     request: Request,
     payload: dict = Body(...),
     session: AsyncSession = Depends(get_session),
-    player: Player = Depends(get_current_player)
+    player: PlayerPrincipal = Depends(get_current_player_principal)
 ):
     points = float(payload.get("points", 0))
     if points <= 0:
@@ -5,11 +5,18 @@ from typing import Optional, Dict, Any, List
 
 from fastapi import APIRouter, Depends, HTTPException, Body, Request
 from fastapi.responses import StreamingResponse
+from sqlalchemy import or_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select, func
 
 from app.core.database import get_session
 from app.models.sql_models import Transaction, Player, AdminUser
+from app.services.admin_search import (
+    classify_search,
+    player_search_clause,
+    provider_ref_clause,
+    transaction_search_clause,
+)
 from app.services.audit import audit
 from app.services.csv_export import dicts_to_csv_bytes
 from app.services.wallet_ledger import apply_wallet_delta_with_ledger
@@ -97,23 +104,15 @@ def _apply_filters(stmt, *, tenant_id: str, status: Optional[str], q: Optional[s
     if player_id:
         stmt = stmt.where(Transaction.player_id == player_id)
 
-    # Free text search across tx id, player id, player username/email and provider refs
-    if q:
-        like = f"%{q.strip()}%"
-        # Join-based filters are applied in the main query builder where Player is joined.
-        # Here we only cover tx-scoped fields.
-        stmt = stmt.where(
-            (Transaction.id.ilike(like))
-            | (Transaction.player_id.ilike(like))
-            | (Transaction.provider_tx_id.ilike(like))
-            | (Transaction.provider_event_id.ilike(like))
-        )
+    # Free text search across tx id, player id, player username/email and provider refs.
+    # Callers join Player; the strategy (exact / prefix / trigram) follows the input shape.
+    term = classify_search(q)
+    if term:
+        stmt = stmt.where(or_(transaction_search_clause(term), player_search_clause(term)))
 
-    if provider_ref:
-        like = f"%{provider_ref.strip()}%"
-        stmt = stmt.where(
-            (Transaction.provider_tx_id.ilike(like)) | (Transaction.provider_event_id.ilike(like))
-        )
+    ref_term = classify_search(provider_ref)
+    if ref_term:
+        stmt = stmt.where(provider_ref_clause(ref_term))
 
     return stmt
 
@@ -148,10 +147,6 @@ async def list_withdrawals(
         provider_ref=provider_ref,
     )
 
-    if q:
-        like = f"%{q.strip()}%"
-        stmt = stmt.where((Player.username.ilike(like)) | (Player.email.ilike(like)))
-
     # Sorting
     if sort == "created_at_asc":
         stmt = stmt.order_by(Transaction.created_at.asc())
@@ -172,10 +167,6 @@ async def list_withdrawals(
         player_id=player_id,
         provider_ref=provider_ref,
     )
-    if q:
-        like = f"%{q.strip()}%"
-        filtered_ids_stmt = filtered_ids_stmt.where((Player.username.ilike(like)) | (Player.email.ilike(like)))
-
     total = (await session.execute(select(func.count()).select_from(filtered_ids_stmt.subquery()))).scalar() or 0
 
     stmt = stmt.offset(offset).limit(limit)
@@ -487,10 +478,6 @@ async def export_withdrawals_csv(
         player_id=player_id,
         provider_ref=provider_ref,
     )
-    if q:
-        like = f"%{q.strip()}%"
-        stmt = stmt.where((Player.username.ilike(like)) | (Player.email.ilike(like)))
-
     if sort == "created_at_asc":
         stmt = stmt.order_by(Transaction.created_at.asc())
     else:
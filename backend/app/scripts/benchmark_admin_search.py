@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import server  # noqa: F401  (registers the app models on the metadata)
+from app.models.sql_models import Player
+from app.services.admin_search import classify_search, player_search_clause
+
+# Config
+DATABASE_URL = os.getenv("BENCH_DATABASE_URL") or os.getenv("DATABASE_URL", "")
+PLAYERS = int(os.getenv("BENCH_SEARCH_PLAYERS", 5_000_000))
+REPEAT = int(os.getenv("BENCH_SEARCH_REPEAT", 5))
+# Reuse an already seeded tenant instead of inserting again.
+TENANT_ID = os.getenv("BENCH_SEARCH_TENANT", "")
+
+# One term per strategy: exact email, id, short prefix, name fragment.
+TERMS = ["user4242424@bench.test", None, "us", "er31337"]
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("benchmark_admin_search")
+
+
+_GENERATED = {
+    "id": "md5(:tenant || g::text)::uuid::text",
+    "tenant_id": ":tenant",
+    "username": "'user' || g",
+    "email": "'user' || g || '@bench.test'",
+    "registered_at": "now() - (g || ' seconds')::interval",
+}
+
+
+async def _seed(conn, tenant_id: str) -> None:
+    """Insert PLAYERS rows server-side (generate_series) in 500k batches."""
+    await conn.execute(
+        text("INSERT INTO tenant (id, name, type, features, created_at, updated_at) "
+             "VALUES (:id, :id, 'renter', '{}', now(), now()) ON CONFLICT DO NOTHING"),
+        {"id": tenant_id},
+    )
+
+    # Every other column takes the model default, bound once as a parameter.
+    template = Player(tenant_id=tenant_id, username="x", email="x", password_hash="x")
+    columns, values, params = [], [], {"tenant": tenant_id}
+    for col in Player.__table__.columns:
+        columns.append(col.name)
+        if col.name in _GENERATED:
+            values.append(_GENERATED[col.name])
+        else:
+            # Typed casts: INSERT ... SELECT cannot infer parameter types.
+            values.append(f"CAST(:d_{col.name} AS {col.type.compile(dialect=postgresql.dialect())})")
+            params[f"d_{col.name}"] = getattr(template, col.name, None)
+
+    insert_sql = text(
+        f"INSERT INTO player ({', '.join(columns)}) "
+        f"SELECT {', '.join(values)} FROM generate_series(:lo, :hi) AS g"
+    )
+    batch = 500_000
+    for start in range(0, PLAYERS, batch):
+        await conn.execute(insert_sql, {**params, "lo": start, "hi": min(start + batch, PLAYERS) - 1})
+        logger.info(f"seeded {min(start + batch, PLAYERS):,}/{PLAYERS:,}")
+    await conn.execute(text("ANALYZE player"))
+
+
+def _legacy(tenant_id: str, term: str):
+    return select(Player.id).where(
+        Player.tenant_id == tenant_id,
+        (Player.username.ilike(f"%{term}%")) | (Player.email.ilike(f"%{term}%")),
+    ).limit(50)
+
+
+def _strategy(tenant_id: str, term: str):
+    return select(Player.id).where(Player.tenant_id == tenant_id, player_search_clause(classify_search(term))).limit(50)
+
+
+async def _time(conn, stmt) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        (await conn.execute(stmt)).all()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+async def _plan(conn, stmt) -> str:
+    compiled = stmt.compile(conn.sync_connection, compile_kwargs={"literal_binds": True})
+    rows = (await conn.execute(text(f"EXPLAIN {compiled}"))).all()
+    nodes = [r[0].strip() for r in rows if "Scan" in r[0]]
+    return nodes[0] if nodes else rows[0][0]
+
+
+async def main():
+    """Admin player search on a large tenant: legacy ILIKE vs strategy layer.
+
+    PostgreSQL only (needs the 20261019_06 indexes applied). Seeds
+    BENCH_SEARCH_PLAYERS players (default 5M) into a scratch tenant unless
+    BENCH_SEARCH_TENANT points at an existing one, then reports best-of-N
+    latency and the scan node chosen for each search shape.
+    """
+
+    if not DATABASE_URL.startswith("postgresql"):
+        raise SystemExit("Set BENCH_DATABASE_URL to a PostgreSQL URL (postgresql+asyncpg://...)")
+
+    engine = create_async_engine(DATABASE_URL)
+    tenant_id = TENANT_ID or f"bench_search_{uuid.uuid4().hex[:8]}"
+    try:
+        if not TENANT_ID:
+            async with engine.begin() as conn:
+                await _seed(conn, tenant_id)
+
+        async with engine.connect() as conn:
+            id_row = (await conn.execute(select(Player.id).where(Player.tenant_id == tenant_id).limit(1))).first()
+            terms = [t if t is not None else (id_row[0] if id_row else str(uuid.uuid4())) for t in TERMS]
+            for term in terms:
+                kind = classify_search(term).kind
+                legacy_ms = await _time(conn, _legacy(tenant_id, term))
+                strategy_ms = await _time(conn, _strategy(tenant_id, term))
+                logger.info(
+                    f"[{kind:<8}] {term!r}: legacy={legacy_ms:,.1f}ms strategy={strategy_ms:,.1f}ms "
+                    f"plan={await _plan(conn, _strategy(tenant_id, term))}"
+                )
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
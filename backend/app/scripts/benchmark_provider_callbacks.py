@@ -0,0 +1,400 @@
+import asyncio
+import hashlib
+import hmac
+import importlib
+import json
+import logging
+import math
+import os
+import pkgutil
+import random
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import httpx
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import SQLModel
+
+# Config
+# In-process (ASGI) unless BENCH_TARGET_URL points at a running server sharing BENCH_DATABASE_URL.
+DATABASE_URL = os.getenv("BENCH_DATABASE_URL", "")
+TARGET_URL = os.getenv("BENCH_TARGET_URL", "")
+PROVIDER = os.getenv("BENCH_PROVIDER", "pragmatic")
+SECRET_KEY = os.getenv("BENCH_SECRET_KEY", "bench_secret")
+RATE = float(os.getenv("BENCH_RATE", 200))  # arrivals per second (open loop)
+DURATION = float(os.getenv("BENCH_DURATION", 30))
+PLAYERS = int(os.getenv("BENCH_PLAYERS", 200))
+HOT_PLAYERS = int(os.getenv("BENCH_HOT_PLAYERS", 5))
+HOT_SHARE = float(os.getenv("BENCH_HOT_SHARE", 0.3))  # share of traffic on the hot players
+MAX_INFLIGHT = int(os.getenv("BENCH_MAX_INFLIGHT", 512))
+SEED = int(os.getenv("BENCH_SEED", 42))
+BASELINE = os.getenv("BENCH_BASELINE", "")
+WRITE_BASELINE = os.getenv("BENCH_WRITE_BASELINE", "") == "1"
+# Allowed regression vs baseline: p99 may grow / throughput may drop by this fraction.
+TOLERANCE = float(os.getenv("BENCH_TOLERANCE", 0.2))
+
+CALLBACK_PATH = "/api/v1/games/callback/{provider}"
+GAME_ID = "bench_game_1"
+OPENING_BALANCE = 1_000_000.0
+
+# Operation mix (weights); "duplicate" replays an earlier bet/win verbatim.
+MIX = {"authenticate": 3, "balance": 20, "bet": 40, "win": 20, "rollback": 5, "duplicate": 12}
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("benchmark_provider_callbacks")
+
+
+class LatencyHistogram:
+    """HDR-style log-linear histogram: fixed memory, ~1% relative error.
+
+    Values are recorded in microseconds; each power of two is split into
+    ``2**precision_bits`` linear sub-buckets.
+    """
+
+    def __init__(self, precision_bits: int = 7):
+        self.sub = 1 << precision_bits
+        self.counts: Dict[int, int] = defaultdict(int)
+        self.total = 0
+        self.max_us = 0
+
+    def _index(self, us: int) -> int:
+        if us < self.sub:
+            return us
+        exp = us.bit_length() - 1 - int(math.log2(self.sub))
+        return (exp << 16) | (us >> exp)
+
+    def _value(self, index: int) -> int:
+        if index < self.sub:
+            return index
+        exp, mantissa = index >> 16, index & 0xFFFF
+        # Upper edge of the bucket: percentiles never under-report.
+        return ((mantissa + 1) << exp) - 1
+
+    def record(self, seconds: float) -> None:
+        us = max(0, int(seconds * 1_000_000))
+        self.counts[self._index(us)] += 1
+        self.total += 1
+        self.max_us = max(self.max_us, us)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for index, count in other.counts.items():
+            self.counts[index] += count
+        self.total += other.total
+        self.max_us = max(self.max_us, other.max_us)
+
+    def percentile_ms(self, pct: float) -> Optional[float]:
+        if not self.total:
+            return None
+        rank = max(1, math.ceil(self.total * pct / 100.0))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return round(min(self._value(index), self.max_us) / 1000.0, 3)
+        return round(self.max_us / 1000.0, 3)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.total,
+            **{f"p{p:g}": self.percentile_ms(p) for p in (50, 90, 99, 99.9)},
+            "max": round(self.max_us / 1000.0, 3),
+        }
+
+
+def sign(payload: Dict[str, Any], secret: str = SECRET_KEY) -> Dict[str, Any]:
+    canonical = "&".join(f"{k}={v}" for k, v in sorted(payload.items()))
+    return {**payload, "hash": hmac.new(secret.encode(), canonical.encode(), hashlib.sha256).hexdigest()}
+
+
+@dataclass
+class Workload:
+    """Generates the mixed callback stream; keeps recent bets to settle, roll back or replay."""
+
+    player_ids: List[str]
+    tokens: Dict[str, str]
+    hot_players: int = HOT_PLAYERS
+    hot_share: float = HOT_SHARE
+    rng: random.Random = field(default_factory=lambda: random.Random(SEED))
+    open_bets: Deque[Dict[str, Any]] = field(default_factory=lambda: deque(maxlen=5000))
+    sent: Deque[Dict[str, Any]] = field(default_factory=lambda: deque(maxlen=5000))
+
+    def _player(self) -> str:
+        hot = self.player_ids[: self.hot_players]
+        if hot and self.rng.random() < self.hot_share:
+            return self.rng.choice(hot)
+        return self.rng.choice(self.player_ids)
+
+    def next(self) -> Tuple[str, Dict[str, Any]]:
+        op = self.rng.choices(list(MIX), weights=list(MIX.values()))[0]
+        if op in ("win", "rollback") and not self.open_bets:
+            op = "bet"
+        if op == "duplicate":
+            if not self.sent:
+                op = "bet"
+            else:
+                return op, self.rng.choice(self.sent)
+
+        if op == "authenticate":
+            player_id = self._player()
+            return op, sign({"action": "authenticate", "token": self.tokens[player_id]})
+        if op == "balance":
+            return op, sign({"action": "balance", "userId": self._player(), "currency": "USD"})
+        if op == "bet":
+            payload = sign({
+                "action": "bet", "userId": self._player(), "gameId": GAME_ID, "roundId": f"r_{uuid.uuid4().hex}",
+                "reference": f"b_{uuid.uuid4().hex}", "amount": round(self.rng.uniform(0.1, 5.0), 2), "currency": "USD",
+            })
+            self.open_bets.append(payload)
+            self.sent.append(payload)
+            return op, payload
+
+        bet = self.open_bets.popleft()
+        base = {"userId": bet["userId"], "gameId": GAME_ID, "roundId": bet["roundId"], "currency": "USD"}
+        if op == "win":
+            payload = sign({**base, "action": "win", "reference": f"w_{uuid.uuid4().hex}", "amount": round(bet["amount"] * 2, 2)})
+            self.sent.append(payload)
+            return op, payload
+        return op, sign({
+            **base, "action": "rollback", "reference": f"rb_{uuid.uuid4().hex}",
+            "originalReference": bet["reference"], "amount": bet["amount"],
+        })
+
+
+@dataclass
+class Results:
+    histograms: Dict[str, LatencyHistogram] = field(default_factory=lambda: defaultdict(LatencyHistogram))
+    outcomes: Dict[str, Dict[str, int]] = field(default_factory=lambda: defaultdict(lambda: defaultdict(int)))
+    dropped: int = 0
+
+    def record(self, op: str, seconds: float, outcome: str) -> None:
+        self.histograms[op].record(seconds)
+        self.outcomes[op][outcome] += 1
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        overall = LatencyHistogram()
+        for hist in self.histograms.values():
+            overall.merge(hist)
+        ok = sum(o.get("ok", 0) for o in self.outcomes.values())
+        return {
+            "elapsed_s": round(elapsed, 2),
+            "requests": overall.total,
+            "throughput_rps": round(overall.total / elapsed, 1) if elapsed else None,
+            "ok_rps": round(ok / elapsed, 1) if elapsed else None,
+            "dropped": self.dropped,
+            "latency_ms": overall.summary(),
+            "by_op": {
+                op: {"latency_ms": self.histograms[op].summary(), "outcomes": dict(self.outcomes[op])}
+                for op in sorted(self.histograms)
+            },
+        }
+
+
+def _outcome(status_code: int, body: Dict[str, Any]) -> str:
+    if status_code != 200:
+        return f"http_{status_code}"
+    error = body.get("error", 0)
+    if error == 0:
+        return "ok"
+    # Provider error codes (see PragmaticAdapter.map_error): 1 funds, 50 throttled, 100 internal.
+    return {1: "insufficient_funds", 2: "player_not_found", 3: "game_not_found", 50: "throttled"}.get(error, "error")
+
+
+async def run_open_loop(
+    client: httpx.AsyncClient,
+    workload: Workload,
+    *,
+    rate: float = RATE,
+    duration: float = DURATION,
+    max_inflight: int = MAX_INFLIGHT,
+    provider: str = PROVIDER,
+) -> Dict[str, Any]:
+    """Fire callbacks at Poisson arrival times, independent of response times.
+
+    Latency is measured from the scheduled send time, so a stalled server shows
+    up as queueing delay instead of silently lowering the offered load
+    (coordinated omission). Arrivals beyond ``max_inflight`` are dropped and counted.
+    """
+
+    results = Results()
+    path = CALLBACK_PATH.format(provider=provider)
+    inflight: set = set()
+    rng = random.Random(SEED + 1)
+
+    async def fire(op: str, payload: Dict[str, Any], scheduled: float) -> None:
+        try:
+            resp = await client.post(path, json=payload)
+            outcome = _outcome(resp.status_code, resp.json() if resp.status_code == 200 else {})
+        except Exception as exc:  # transport errors count as failures, not crashes
+            outcome = type(exc).__name__
+        results.record(op, time.perf_counter() - scheduled, outcome)
+
+    loop_start = time.perf_counter()
+    next_at = loop_start
+    while next_at - loop_start < duration:
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        op, payload = workload.next()
+        if len(inflight) >= max_inflight:
+            results.dropped += 1
+        else:
+            task = asyncio.create_task(fire(op, payload, next_at))
+            inflight.add(task)
+            task.add_done_callback(inflight.discard)
+        next_at += rng.expovariate(rate)
+
+    if inflight:
+        await asyncio.gather(*inflight)
+    return results.summary(time.perf_counter() - loop_start)
+
+
+def compare(summary: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = TOLERANCE) -> List[str]:
+    """Regressions vs a stored run: p99 per op and overall throughput."""
+
+    problems = []
+    base_rps, rps = baseline.get("ok_rps") or 0, summary.get("ok_rps") or 0
+    if base_rps and rps < base_rps * (1 - tolerance):
+        problems.append(f"ok_rps {rps} < baseline {base_rps} (-{tolerance:.0%})")
+    for op, data in summary["by_op"].items():
+        base_p99 = ((baseline.get("by_op") or {}).get(op) or {}).get("latency_ms", {}).get("p99")
+        p99 = data["latency_ms"]["p99"]
+        if base_p99 and p99 and p99 > base_p99 * (1 + tolerance):
+            problems.append(f"{op} p99 {p99}ms > baseline {base_p99}ms (+{tolerance:.0%})")
+    return problems
+
+
+async def seed(session_factory: Callable, players: int) -> Tuple[List[str], Dict[str, str]]:
+    """Scratch tenant with ``players`` funded players and the bench game."""
+
+    from app.models.game_models import Game
+    from app.models.sql_models import Player, Tenant
+    from app.repositories.ledger_repo import WalletBalance
+    from app.utils.auth import create_access_token
+
+    tenant_id = f"bench_cb_{uuid.uuid4().hex[:8]}"
+    async with session_factory() as session:
+        session.add(Tenant(id=tenant_id, name=tenant_id, type="owner"))
+        if await session.get(Game, GAME_ID) is None:
+            session.add(Game(id=GAME_ID, tenant_id=tenant_id, provider_id=PROVIDER, external_id=GAME_ID, name="Bench Slot"))
+        ids = [str(uuid.uuid4()) for _ in range(players)]
+        session.add_all(
+            Player(
+                id=pid, tenant_id=tenant_id, username=f"bench_{pid[:8]}", email=f"{pid[:8]}@bench.test",
+                password_hash="x", balance_real_available=OPENING_BALANCE, balance_real=OPENING_BALANCE,
+            )
+            for pid in ids
+        )
+        session.add_all(
+            WalletBalance(tenant_id=tenant_id, player_id=pid, currency="USD", balance_real_available=OPENING_BALANCE)
+            for pid in ids
+        )
+        await session.commit()
+
+    tokens = {pid: create_access_token({"sub": pid, "tenant_id": tenant_id}, timedelta(hours=2)) for pid in ids}
+    return ids, tokens
+
+
+async def run_benchmark(
+    *,
+    session_factory: Callable,
+    target_url: str = "",
+    rate: float = RATE,
+    duration: float = DURATION,
+    players: int = PLAYERS,
+) -> Dict[str, Any]:
+    """Seed, run the open-loop mix in-process (ASGI) or over HTTP, return the summary."""
+
+    from config import settings
+
+    player_ids, tokens = await seed(session_factory, players)
+    workload = Workload(player_ids=player_ids, tokens=tokens)
+
+    if target_url:
+        async with httpx.AsyncClient(base_url=target_url, timeout=30.0) as client:
+            summary = await run_open_loop(client, workload, rate=rate, duration=duration)
+        summary["mode"] = "http"
+        return summary
+
+    import server
+    from app.core.database import get_session
+
+    async def _session():
+        async with session_factory() as session:
+            yield session
+
+    previous_secret = settings.pragmatic_secret_key
+    settings.pragmatic_secret_key = SECRET_KEY
+    server.app.dependency_overrides[get_session] = _session
+    try:
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=30.0) as client:
+            summary = await run_open_loop(client, workload, rate=rate, duration=duration)
+    finally:
+        server.app.dependency_overrides.pop(get_session, None)
+        settings.pragmatic_secret_key = previous_secret
+    summary["mode"] = "asgi"
+    return summary
+
+
+async def main():
+    """Provider callback pipeline (GameEngine) under an open-loop mixed workload.
+
+    SQLite by default (scratch file); set BENCH_DATABASE_URL for a local
+    Postgres (migrated schema, or an empty scratch database: tables are created).
+    BENCH_TARGET_URL benchmarks a running server over HTTP instead of in-process;
+    it must use the same database and BENCH_SECRET_KEY as its Pragmatic secret.
+    BENCH_BASELINE compares against (or, with BENCH_WRITE_BASELINE=1, writes) a
+    stored summary; regressions exit non-zero.
+    """
+
+    scratch = None
+    url = DATABASE_URL
+    if not url:
+        fd, scratch = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        url = f"sqlite+aiosqlite:///{scratch}"
+
+    import app.models
+    import server  # noqa: F401  (registers the app models on the metadata)
+
+    # Some models (e.g. discounts) are only imported by their routes' services.
+    for module in pkgutil.walk_packages(app.models.__path__, "app.models."):
+        importlib.import_module(module.name)
+
+    engine = create_async_engine(url)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        summary = await run_benchmark(session_factory=factory, target_url=TARGET_URL)
+    finally:
+        await engine.dispose()
+        if scratch:
+            os.remove(scratch)
+
+    summary.update({"database": engine.dialect.name, "rate": RATE, "duration": DURATION, "players": PLAYERS})
+    print(json.dumps(summary, indent=2))
+
+    if BASELINE and WRITE_BASELINE:
+        with open(BASELINE, "w") as fh:
+            json.dump(summary, fh, indent=2)
+        logger.info(f"Baseline written to {BASELINE}")
+    elif BASELINE and os.path.exists(BASELINE):
+        with open(BASELINE) as fh:
+            problems = compare(summary, json.load(fh))
+        for problem in problems:
+            logger.error(f"REGRESSION {problem}")
+        if problems:
+            sys.exit(1)
+        logger.info("No regression against baseline")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
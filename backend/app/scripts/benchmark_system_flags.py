@@ -0,0 +1,75 @@
+import asyncio
+import json
+import logging
+import os
+import time
+
+import redis.asyncio as redis
+
+from app.core.redis_client import RedisClient
+from app.services import system_flags
+
+# Config
+REDIS_URL = os.getenv("REDIS_URL", "")
+LOOKUPS = int(os.getenv("BENCH_FLAG_LOOKUPS", 5000))
+CONCURRENCY = int(os.getenv("BENCH_FLAG_CONCURRENCY", 20))
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("benchmark_system_flags")
+
+
+async def _legacy_lookup(flag_key: str) -> bool:
+    # Previous behaviour: a fresh client (and TCP connection) per read.
+    client = redis.from_url(REDIS_URL, decode_responses=True)
+    try:
+        raw = await client.get(system_flags.CACHE_KEY)
+        flags = json.loads(raw) if raw else {}
+    finally:
+        await client.close()
+    return bool(flags.get(flag_key, {}).get("enabled"))
+
+
+async def _pooled_lookup(flag_key: str) -> bool:
+    # Warm path never touches the session.
+    return await system_flags.is_system_flag_enabled(None, flag_key)
+
+
+async def _run(label: str, lookup) -> float:
+    per_worker = max(1, LOOKUPS // CONCURRENCY)
+
+    async def worker():
+        for _ in range(per_worker):
+            await lookup("ENABLE_STRIPE")
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(CONCURRENCY)])
+    elapsed = time.perf_counter() - started
+    rate = per_worker * CONCURRENCY / elapsed
+    logger.info(f"[{label}] lookups={per_worker * CONCURRENCY} elapsed={elapsed:.2f}s rate={rate:,.0f}/s")
+    return rate
+
+
+async def main():
+    """Flag lookups/sec: per-call Redis client (before) vs pooled two-level cache (after).
+
+    Needs a reachable REDIS_URL; no database is used (flags are seeded from
+    FLAG_DEFS defaults straight into Redis).
+    """
+
+    if not REDIS_URL:
+        raise SystemExit("REDIS_URL is required")
+
+    seed = {
+        key: {"key": key, "description": meta.get("description"), "enabled": bool(meta.get("default"))}
+        for key, meta in system_flags.FLAG_DEFS.items()
+    }
+    await RedisClient.get_instance().set(system_flags.CACHE_KEY, json.dumps(seed), ex=system_flags.CACHE_TTL_SECONDS)
+
+    before = await _run("before:per-call-client", _legacy_lookup)
+    after = await _run("after:pooled+local", _pooled_lookup)
+    logger.info(f"Speedup: {after / before:.1f}x")
+    await RedisClient.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
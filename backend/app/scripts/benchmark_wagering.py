@@ -0,0 +1,114 @@
+import asyncio
+import logging
+import os
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import SQLModel
+
+import server  # noqa: F401  (registers the app models on the metadata)
+import app.models.discount  # noqa: F401  (ledgertransaction FK target)
+from app.models.bonus_models import BonusCampaign
+from app.models.game_models import Game
+from app.models.sql_models import Player
+from app.services.bonus_engine import grant_campaign_to_player
+from app.services.game_engine import GameEngine
+
+# Config
+DATABASE_URL = os.getenv("BENCH_DATABASE_URL", "")
+BETS = int(os.getenv("BENCH_WAGERING_BETS", 500))
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("benchmark_wagering")
+
+
+# RiskService throttles a player at 60 bets/minute; spread bets below that.
+BETS_PER_PLAYER = 50
+
+
+def _players(tenant_id: str, prefix: str):
+    return [
+        Player(tenant_id=tenant_id, email=f"{prefix}{i}@bench", username=f"{prefix}{i}", password_hash="x", balance_real_available=1e9)
+        for i in range(max(1, -(-BETS // BETS_PER_PLAYER)))
+    ]
+
+
+async def _seed(session, tenant_id: str):
+    game = Game(tenant_id=tenant_id, provider_id="sim", external_id="bench_slot", category="slot")
+    campaign = BonusCampaign(
+        tenant_id=tenant_id, name="Bench", type="MANUAL_CREDIT", bonus_type="MANUAL_CREDIT",
+        status="active", config={"amount": 1, "wagering_mult": 1_000_000},
+    )
+    plain, wagering = _players(tenant_id, "plain"), _players(tenant_id, "wager")
+    session.add_all([game, campaign, *plain, *wagering])
+    await session.flush()
+    for player in wagering:
+        await grant_campaign_to_player(session, tenant_id=tenant_id, player_id=player.id, campaign=campaign, reason="bench")
+    await session.commit()
+    return game, plain, wagering
+
+
+async def _run(label: str, factory, engine, game, players):
+    counter = {"n": 0}
+
+    def _on_execute(*_args, **_kwargs):
+        counter["n"] += 1
+
+    sync_engine = engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _on_execute)
+    started = time.perf_counter()
+    try:
+        for i in range(BETS):
+            player = players[i % len(players)]
+            # One session per bet, as in the provider callback path.
+            async with factory() as session:
+                await GameEngine().process_bet(
+                    session, "simulator", f"tx_{uuid.uuid4().hex}", player.id, game.id,
+                    f"r_{uuid.uuid4().hex}", 1.0, "USD",
+                )
+                await session.commit()
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", _on_execute)
+    elapsed = time.perf_counter() - started
+    logger.info(f"[{label}] bets={BETS} statements/bet={counter['n'] / BETS:.2f} rate={BETS / elapsed:,.0f}/s")
+    return counter["n"] / BETS
+
+
+async def main():
+    """Per-bet cost of wagering progress: statements/bet and bets/sec.
+
+    Compares a player with no outstanding wagering against one with an
+    active wagering grant; the statement delta must stay <= 1. Uses a
+    throwaway SQLite file unless BENCH_DATABASE_URL is set.
+    """
+
+    path = None
+    url = DATABASE_URL
+    if not url:
+        fd, path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        url = f"sqlite+aiosqlite:///{path}"
+
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    try:
+        async with factory() as session:
+            game, plain, wagering = await _seed(session, f"bench_{uuid.uuid4().hex[:8]}")
+        baseline = await _run("no-wagering", factory, engine, game, plain)
+        with_wagering = await _run("active-wagering", factory, engine, game, wagering)
+        logger.info(f"Extra statements per bet: {with_wagering - baseline:.2f}")
+    finally:
+        await engine.dispose()
+        if path:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,120 @@
+import asyncio
+import hashlib
+import hmac
+import logging
+import os
+import time
+import uuid
+
+import httpx
+
+# Config
+BASE_URL = os.getenv("BASE_URL", "http://localhost:8001")  # Internal container URL
+PROVIDER_ENDPOINT = "/api/v1/games/callback/pragmatic"
+LOGIN_ENDPOINT = "/api/v1/auth/player/login"
+SECRET_KEY = os.getenv("TEST_SECRET_KEY", "test_secret")
+TENANT_ID = os.getenv("LOAD_TEST_TENANT_ID", "default_casino")
+LOGIN_EMAIL = os.getenv("LOAD_TEST_LOGIN_EMAIL", "storm@example.com")
+LOGIN_PASSWORD = os.getenv("LOAD_TEST_LOGIN_PASSWORD", "storm-password-1")
+LOGIN_CONCURRENCY = int(os.getenv("LOAD_TEST_LOGIN_CONCURRENCY", 50))
+CALLBACK_REQUESTS = int(os.getenv("LOAD_TEST_CALLBACK_REQUESTS", 300))
+PHASE_SECONDS = float(os.getenv("LOAD_TEST_PHASE_SECONDS", 10))
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("load_test_login_storm")
+
+
+def _p(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+class LoginStormLoadTest:
+    """Provider-callback latency with and without a concurrent login storm.
+
+    Phase 1 measures callback latency alone; phase 2 repeats it while
+    LOGIN_CONCURRENCY clients hammer the player login endpoint. With password
+    hashing off the event loop the two p99s should be close; logins beyond the
+    hashing pool's admission limit get 429 rather than stalling callbacks.
+    """
+
+    def __init__(self):
+        self.client = httpx.AsyncClient(timeout=30.0, limits=httpx.Limits(max_connections=LOGIN_CONCURRENCY + 20))
+        self.login_stats = {"ok": 0, "rejected_429": 0, "fail": 0}
+
+    def sign_payload(self, payload: dict) -> str:
+        canonical = "&".join([f"{k}={v}" for k, v in sorted(payload.items())])
+        return hmac.new(SECRET_KEY.encode("utf-8"), canonical.encode("utf-8"), hashlib.sha256).hexdigest()
+
+    async def ensure_login_user(self):
+        await self.client.post(
+            f"{BASE_URL}/api/v1/auth/player/register",
+            json={"email": LOGIN_EMAIL, "password": LOGIN_PASSWORD, "tenant_id": TENANT_ID},
+        )
+
+    async def callback_phase(self, label: str):
+        latencies = []
+        for i in range(CALLBACK_REQUESTS):
+            payload = {
+                "action": "balance",
+                "userId": f"load_user_{i % 10}",
+                "reference": str(uuid.uuid4()),
+                "currency": "USD",
+            }
+            payload["hash"] = self.sign_payload(payload)
+            start = time.perf_counter()
+            try:
+                await self.client.post(f"{BASE_URL}{PROVIDER_ENDPOINT}", json=payload)
+            except Exception as e:
+                logger.error(f"Callback exception: {e}")
+                continue
+            latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(PHASE_SECONDS / CALLBACK_REQUESTS)
+
+        logger.info(
+            f"[{label}] callbacks={len(latencies)} p50={_p(latencies, 0.5) * 1000:.1f}ms "
+            f"p99={_p(latencies, 0.99) * 1000:.1f}ms"
+        )
+        return latencies
+
+    async def login_worker(self, stop: asyncio.Event):
+        while not stop.is_set():
+            try:
+                resp = await self.client.post(
+                    f"{BASE_URL}{LOGIN_ENDPOINT}",
+                    json={"email": LOGIN_EMAIL, "password": LOGIN_PASSWORD, "tenant_id": TENANT_ID},
+                )
+                if resp.status_code == 200:
+                    self.login_stats["ok"] += 1
+                elif resp.status_code == 429:
+                    self.login_stats["rejected_429"] += 1
+                    await asyncio.sleep(0.1)
+                else:
+                    self.login_stats["fail"] += 1
+            except Exception:
+                self.login_stats["fail"] += 1
+
+    async def run(self):
+        await self.ensure_login_user()
+
+        baseline = await self.callback_phase("baseline")
+
+        stop = asyncio.Event()
+        storm = [asyncio.create_task(self.login_worker(stop)) for _ in range(LOGIN_CONCURRENCY)]
+        try:
+            under_storm = await self.callback_phase("login_storm")
+        finally:
+            stop.set()
+            await asyncio.gather(*storm, return_exceptions=True)
+
+        logger.info(f"Logins: {self.login_stats}")
+        base_p99, storm_p99 = _p(baseline, 0.99), _p(under_storm, 0.99)
+        logger.info(f"Callback p99 baseline={base_p99 * 1000:.1f}ms storm={storm_p99 * 1000:.1f}ms")
+        await self.client.aclose()
+
+
+if __name__ == "__main__":
+    test = LoginStormLoadTest()
+    asyncio.run(test.run())
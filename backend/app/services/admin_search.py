@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import false, func, or_
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models.sql_models import Player, Transaction
+
+# Below this length pg_trgm cannot use the GIN index (no full trigram), so
+# short terms fall back to an indexed prefix match.
+MIN_TRIGRAM_LENGTH = 3
+
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+_UUID_RE = re.compile(r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$")
+
+LIKE_ESCAPE = "\\"
+
+
+@dataclass(frozen=True)
+class SearchTerm:
+    """A normalized admin search input and the strategy chosen for it.
+
+    kind:
+    - ``email``: full address, exact match on lower(email)
+    - ``id``: full UUID, exact match on id columns
+    - ``prefix``: short input, ``LIKE 'term%'`` (B-tree text_pattern_ops)
+    - ``fragment``: ``ILIKE '%term%'`` served by pg_trgm GIN indexes
+    """
+
+    raw: str
+    kind: str
+
+    @property
+    def pattern_prefix(self) -> str:
+        return f"{_escape_like(self.raw.lower())}%"
+
+    @property
+    def pattern_fragment(self) -> str:
+        return f"%{_escape_like(self.raw)}%"
+
+
+def _escape_like(value: str) -> str:
+    return value.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2).replace("%", LIKE_ESCAPE + "%").replace("_", LIKE_ESCAPE + "_")
+
+
+def classify_search(term: Optional[str]) -> Optional[SearchTerm]:
+    raw = (term or "").strip()
+    if not raw:
+        return None
+    if _EMAIL_RE.match(raw):
+        return SearchTerm(raw=raw, kind="email")
+    if _UUID_RE.match(raw):
+        return SearchTerm(raw=raw, kind="id")
+    if len(raw) < MIN_TRIGRAM_LENGTH:
+        return SearchTerm(raw=raw, kind="prefix")
+    return SearchTerm(raw=raw, kind="fragment")
+
+
+def player_search_clause(term: SearchTerm) -> ColumnElement:
+    """WHERE clause matching players by username / email / id for ``term``."""
+
+    if term.kind == "email":
+        return func.lower(Player.email) == term.raw.lower()
+    if term.kind == "id":
+        # Stored ids are lower-case ``str(uuid4())``; pasted ids may not be.
+        return Player.id == term.raw.lower()
+    if term.kind == "prefix":
+        return or_(
+            func.lower(Player.username).like(term.pattern_prefix, escape=LIKE_ESCAPE),
+            func.lower(Player.email).like(term.pattern_prefix, escape=LIKE_ESCAPE),
+        )
+    return or_(
+        Player.username.ilike(term.pattern_fragment, escape=LIKE_ESCAPE),
+        Player.email.ilike(term.pattern_fragment, escape=LIKE_ESCAPE),
+    )
+
+
+def transaction_search_clause(term: SearchTerm) -> ColumnElement:
+    """WHERE clause matching transactions by tx id / player id / provider refs.
+
+    Ids are UUIDs, so partial ids are matched by prefix; provider references
+    are free-form and get substring (trigram) matching.
+    """
+
+    if term.kind == "id":
+        return or_(
+            Transaction.id == term.raw.lower(),
+            Transaction.player_id == term.raw.lower(),
+            Transaction.provider_tx_id == term.raw,
+            Transaction.provider_event_id == term.raw,
+        )
+    if term.kind == "email":
+        return false()
+
+    prefix = f"{_escape_like(term.raw)}%"
+    return or_(
+        Transaction.id.like(prefix, escape=LIKE_ESCAPE),
+        Transaction.player_id.like(prefix, escape=LIKE_ESCAPE),
+        provider_ref_clause(term),
+    )
+
+
+def provider_ref_clause(term: SearchTerm) -> ColumnElement:
+    """Provider reference only (tx / event id), substring or exact by shape."""
+
+    if term.kind in {"id", "email"}:
+        return or_(Transaction.provider_tx_id == term.raw, Transaction.provider_event_id == term.raw)
+    if term.kind == "prefix":
+        prefix = f"{_escape_like(term.raw)}%"
+        return or_(
+            Transaction.provider_tx_id.like(prefix, escape=LIKE_ESCAPE),
+            Transaction.provider_event_id.like(prefix, escape=LIKE_ESCAPE),
+        )
+    return or_(
+        Transaction.provider_tx_id.ilike(term.pattern_fragment, escape=LIKE_ESCAPE),
+        Transaction.provider_event_id.ilike(term.pattern_fragment, escape=LIKE_ESCAPE),
+    )
@@ -2,15 +2,36 @@ from __future__ import annotations
 
 import uuid
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, List, Optional
 
 from fastapi import HTTPException
+from sqlalchemy import and_, case, func, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
 from config import settings
 from app.models.affiliate_p0_models import AffiliateCreative, AffiliateLedger, AffiliateOffer, AffiliatePayout
 from app.models.growth_models import Affiliate, AffiliateAttribution, AffiliateLink
+from app.repositories.ledger_repo import LedgerTransaction
+
+
+REVSHARE_REASON = "REVSHARE_ACCRUAL"
+
+# Ledger statuses (wallet event_type) that make up NGR, with their sign.
+# GGR = bets - wins (rollbacks reverse the original leg); NGR = GGR - bonus cost.
+_GGR_SIGNS = {
+    "game_bet": 1.0,
+    "game_rollback_bet": -1.0,
+    "game_win": -1.0,
+    "game_rollback_win": 1.0,
+}
+_BONUS_COST_SIGNS = {
+    "bonus_granted": 1.0,
+    "bonus_forfeited": -1.0,
+}
+
+_REVSHARE_INSERT_CHUNK = 1000
 
 
 def _now() -> datetime:
@@ -57,7 +78,7 @@ async def set_partner_status(session: AsyncSession, *, tenant_id: str, partner_i
     return partner
 
 
-async def create_offer(session: AsyncSession, *, tenant_id: str, name: str, model: str, currency: str, cpa_amount: Optional[float], min_deposit: Optional[float]) -> AffiliateOffer:
+async def create_offer(session: AsyncSession, *, tenant_id: str, name: str, model: str, currency: str, cpa_amount: Optional[float], min_deposit: Optional[float], revshare_percent: Optional[float] = None) -> AffiliateOffer:
     # unique offer name per tenant
     stmt = select(AffiliateOffer).where(AffiliateOffer.tenant_id == tenant_id, AffiliateOffer.name == name)
     if (await session.execute(stmt)).scalars().first():
@@ -66,6 +87,9 @@ async def create_offer(session: AsyncSession, *, tenant_id: str, name: str, mode
     if model.upper() not in {"CPA", "REVSHARE"}:
         raise HTTPException(status_code=400, detail={"error_code": "OFFER_MODEL_INVALID"})
 
+    if revshare_percent is not None and not (0 < float(revshare_percent) <= 100):
+        raise HTTPException(status_code=400, detail={"error_code": "OFFER_REVSHARE_PERCENT_INVALID"})
+
     offer = AffiliateOffer(
         tenant_id=tenant_id,
         name=name,
@@ -73,6 +97,7 @@ async def create_offer(session: AsyncSession, *, tenant_id: str, name: str, mode
         currency=currency.upper(),
         cpa_amount=cpa_amount,
         min_deposit=min_deposit,
+        revshare_percent=revshare_percent,
         status="paused",
         created_at=_now(),
     )
@@ -272,7 +297,7 @@ async def summary_report(session: AsyncSession, *, tenant_id: str) -> dict:
     stmt_led = select(AffiliateLedger).where(AffiliateLedger.tenant_id == tenant_id)
     entries = (await session.execute(stmt_led)).scalars().all()
 
-    first_deposits = sum(1 for e in entries if e.entry_type == "accrual")
+    first_deposits = sum(1 for e in entries if e.entry_type == "accrual" and e.reason != REVSHARE_REASON)
     payouts = sum(abs(float(e.amount)) for e in entries if e.entry_type == "payout")
 
     return {
@@ -312,7 +337,7 @@ async def accrue_on_first_deposit(
     if not offer or offer.tenant_id != tenant_id:
         return
 
-    # P0: only CPA on first deposit, revshare ignored.
+    # Only CPA accrues on first deposit; revshare is settled by accrue_revshare_for_period.
     if offer.model != "cpa":
         return
 
@@ -353,6 +378,179 @@ async def accrue_on_first_deposit(
     # increment first deposit count (reuse signups? no; keep in ledger)
 
 
+def revshare_period_reference(window_start: datetime, window_end: datetime) -> str:
+    return f"revshare:{window_start:%Y%m%dT%H%M%S}-{window_end:%Y%m%dT%H%M%S}"
+
+
+def _signed_sum(signs: Dict[str, float]):
+    return func.coalesce(
+        func.sum(
+            case(
+                *[(LedgerTransaction.status == status, LedgerTransaction.amount * sign) for status, sign in signs.items()],
+                else_=0.0,
+            )
+        ),
+        0.0,
+    )
+
+
+async def compute_revshare_ngr(
+    session: AsyncSession,
+    *,
+    tenant_id: str,
+    window_start: datetime,
+    window_end: datetime,
+) -> List[dict]:
+    """Aggregate NGR per (partner, revshare offer, currency) over [window_start, window_end).
+
+    Single set-based query: ledger rows are joined to the player's attribution,
+    link and offer and grouped in the database, so the cost does not depend on
+    the number of attributed players being materialised in Python. Only
+    activity after the attribution timestamp counts towards the partner.
+    """
+
+    statuses = list(_GGR_SIGNS) + list(_BONUS_COST_SIGNS)
+    ggr = _signed_sum(_GGR_SIGNS)
+    bonus_cost = _signed_sum(_BONUS_COST_SIGNS)
+
+    stmt = (
+        select(
+            AffiliateLink.affiliate_id,
+            AffiliateOffer.id,
+            AffiliateOffer.currency,
+            func.coalesce(AffiliateOffer.revshare_percent, Affiliate.revshare_percent, 0.0),
+            func.count(func.distinct(LedgerTransaction.player_id)),
+            ggr,
+            bonus_cost,
+        )
+        .select_from(LedgerTransaction)
+        .join(
+            AffiliateAttribution,
+            and_(
+                AffiliateAttribution.tenant_id == LedgerTransaction.tenant_id,
+                AffiliateAttribution.player_id == LedgerTransaction.player_id,
+            ),
+        )
+        .join(AffiliateLink, AffiliateLink.id == AffiliateAttribution.link_id)
+        .join(AffiliateOffer, AffiliateOffer.id == AffiliateLink.offer_id)
+        .join(Affiliate, Affiliate.id == AffiliateLink.affiliate_id)
+        .where(
+            LedgerTransaction.tenant_id == tenant_id,
+            LedgerTransaction.created_at >= window_start,
+            LedgerTransaction.created_at < window_end,
+            LedgerTransaction.created_at >= AffiliateAttribution.attributed_at,
+            LedgerTransaction.status.in_(statuses),
+            LedgerTransaction.currency == AffiliateOffer.currency,
+            AffiliateAttribution.status == "active",
+            AffiliateOffer.tenant_id == tenant_id,
+            AffiliateOffer.model == "revshare",
+        )
+        .group_by(
+            AffiliateLink.affiliate_id,
+            AffiliateOffer.id,
+            AffiliateOffer.currency,
+            AffiliateOffer.revshare_percent,
+            Affiliate.revshare_percent,
+        )
+    )
+
+    rows = (await session.execute(stmt)).all()
+    out: List[dict] = []
+    for partner_id, offer_id, currency, percent, players, ggr_value, bonus_value in rows:
+        ggr_value = float(ggr_value or 0.0)
+        bonus_value = float(bonus_value or 0.0)
+        out.append(
+            {
+                "partner_id": partner_id,
+                "offer_id": offer_id,
+                "currency": currency,
+                "revshare_percent": float(percent or 0.0),
+                "players": int(players or 0),
+                "ggr": round(ggr_value, 2),
+                "bonus_cost": round(bonus_value, 2),
+                "ngr": round(ggr_value - bonus_value, 2),
+            }
+        )
+    return out
+
+
+async def accrue_revshare_for_period(
+    session: AsyncSession,
+    *,
+    tenant_id: str,
+    window_start: datetime,
+    window_end: datetime,
+) -> dict:
+    """Write one revshare AffiliateLedger accrual per (partner, offer, currency) for a period.
+
+    Idempotent per period: rows already accrued under the period reference are
+    skipped, and the partial unique index ``uq_affiliateledger_revshare_period``
+    guards concurrent runs (ON CONFLICT DO NOTHING on Postgres). Negative NGR is
+    not carried over (P1). The caller commits.
+    """
+
+    reference = revshare_period_reference(window_start, window_end)
+    aggregates = await compute_revshare_ngr(
+        session, tenant_id=tenant_id, window_start=window_start, window_end=window_end
+    )
+
+    stmt_existing = select(AffiliateLedger.partner_id, AffiliateLedger.offer_id, AffiliateLedger.currency).where(
+        AffiliateLedger.tenant_id == tenant_id,
+        AffiliateLedger.reason == REVSHARE_REASON,
+        AffiliateLedger.reference == reference,
+    )
+    already = {tuple(r) for r in (await session.execute(stmt_existing)).all()}
+
+    now = _now()
+    rows: List[dict] = []
+    skipped_existing = 0
+    for agg in aggregates:
+        amount = round(agg["ngr"] * agg["revshare_percent"] / 100.0, 2)
+        if amount <= 0:
+            continue
+        if (agg["partner_id"], agg["offer_id"], agg["currency"]) in already:
+            skipped_existing += 1
+            continue
+        rows.append(
+            {
+                "id": str(uuid.uuid4()),
+                "tenant_id": tenant_id,
+                "partner_id": agg["partner_id"],
+                "offer_id": agg["offer_id"],
+                "player_id": None,
+                "entry_type": "accrual",
+                "amount": amount,
+                "currency": agg["currency"],
+                "reference": reference,
+                "reason": REVSHARE_REASON,
+                "created_at": now,
+            }
+        )
+
+    bind = session.get_bind()
+    dialect_name = bind.dialect.name if bind is not None else None
+
+    for i in range(0, len(rows), _REVSHARE_INSERT_CHUNK):
+        chunk = rows[i : i + _REVSHARE_INSERT_CHUNK]
+        if dialect_name == "postgresql":
+            stmt = pg_insert(AffiliateLedger).values(chunk).on_conflict_do_nothing(
+                index_elements=["tenant_id", "partner_id", "offer_id", "currency", "reference"],
+                index_where=AffiliateLedger.reason == REVSHARE_REASON,
+            )
+            await session.execute(stmt)
+        else:
+            await session.execute(insert(AffiliateLedger), chunk)
+
+    return {
+        "tenant_id": tenant_id,
+        "reference": reference,
+        "groups": len(aggregates),
+        "accrued": len(rows),
+        "skipped_existing": skipped_existing,
+        "amount_total": round(sum(r["amount"] for r in rows), 2),
+    }
+
+
 def make_tracking_url(code: str) -> str:
     base = settings.player_app_url.rstrip("/")
     return f"{base}/r/{code}"
@@ -31,6 +31,40 @@ def _mask_sensitive(obj: Any) -> Any:
         return [_mask_sensitive(v) for v in obj]
     return obj
 
+def chain_row_hash(
+    prev_row_hash: str,
+    *,
+    tenant_id: str,
+    actor_user_id: str,
+    action: str,
+    resource_type: str,
+    resource_id: Optional[str],
+    timestamp: datetime,
+    reason: Optional[str],
+    status: Optional[str],
+    details: Optional[Dict[str, Any]],
+    sequence: int,
+) -> str:
+    """D1.4 row hash: sha256(prev_row_hash + canonical JSON of the event).
+
+    Shared by the writer and by chain verification (archival), so both hash
+    exactly the same canonical form.
+    """
+    payload = {
+        "tenant_id": tenant_id,
+        "actor_user_id": actor_user_id,
+        "action": action,
+        "resource_type": resource_type,
+        "resource_id": resource_id,
+        "timestamp": timestamp.isoformat(),
+        "reason": reason,
+        "status": status,
+        "details": _mask_sensitive(details or {}),
+        "sequence": sequence
+    }
+    canonical_str = json.dumps(payload, sort_keys=True)
+    return hashlib.sha256((prev_row_hash + canonical_str).encode('utf-8')).hexdigest()
+
 class AuditLogger:
     """P2 Audit logger (Task 4 Enhanced + D1.4 Hash Chaining)."""
 
@@ -74,23 +108,20 @@ class AuditLogger:
         prev_row_hash = prev_event.row_hash if prev_event and prev_event.row_hash else "0" * 64
         sequence = (prev_event.sequence + 1) if prev_event and prev_event.sequence is not None else 1
         
-        # 2. Canonical JSON for current event
-        payload = {
-            "tenant_id": tenant_id,
-            "actor_user_id": actor_user_id,
-            "action": action,
-            "resource_type": resource_type,
-            "resource_id": resource_id,
-            "timestamp": timestamp.isoformat(),
-            "reason": reason,
-            "status": status,
-            "details": _mask_sensitive(details or {}),
-            "sequence": sequence
-        }
-        canonical_str = json.dumps(payload, sort_keys=True)
-        
-        # 3. Compute Hash
-        row_hash = hashlib.sha256((prev_row_hash + canonical_str).encode('utf-8')).hexdigest()
+        # 2./3. Canonical JSON for current event + hash
+        row_hash = chain_row_hash(
+            prev_row_hash,
+            tenant_id=tenant_id,
+            actor_user_id=actor_user_id,
+            action=action,
+            resource_type=resource_type,
+            resource_id=resource_id,
+            timestamp=timestamp,
+            reason=reason,
+            status=status,
+            details=details,
+            sequence=sequence,
+        )
         
         evt = AuditEvent(
             request_id=request_id,
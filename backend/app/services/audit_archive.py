@@ -0,0 +1,442 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import hashlib
+import io
+import json
+import logging
+import re
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.models.sql_models import AuditEvent
+from app.ops.storage import StorageClient
+from app.services.audit import chain_row_hash
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+AUDIT_TABLE = "auditevent"
+DEFAULT_PARTITION = "auditevent_default"
+PARTITION_MONTHS_AHEAD = 2
+SEGMENT_FORMAT = "ndjson.gz"
+
+_PARTITION_RE = re.compile(r"^auditevent_p(\d{4})(\d{2})$")
+_STREAM_BATCH = 1000
+# Segments are built in a spooled temp file: memory up to this size, disk beyond.
+_SPOOL_BYTES = 8 * 1024 * 1024
+_READ_CHUNK = 1024 * 1024
+
+_COLUMNS = [c.name for c in AuditEvent.__table__.columns]
+
+
+class AuditChainError(ValueError):
+    """A partition's hash chain does not verify; it is not archived."""
+
+
+@dataclass(frozen=True)
+class AuditPartition:
+    name: str
+    lower: datetime
+    upper: datetime
+
+
+def month_start(ts: datetime) -> datetime:
+    return ts.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month(ts: datetime) -> datetime:
+    return month_start(month_start(ts) + timedelta(days=32))
+
+
+def partition_for(ts: datetime) -> AuditPartition:
+    lower = month_start(ts)
+    return AuditPartition(name=f"auditevent_p{lower:%Y%m}", lower=lower, upper=next_month(lower))
+
+
+def _segment_prefix() -> str:
+    return f"{settings.audit_archive_prefix}segments/"
+
+
+def segment_keys(name: str) -> Tuple[str, str]:
+    """(segment, manifest) keys; the manifest is written last and marks a complete segment."""
+
+    base = f"{_segment_prefix()}{name}/"
+    return base + f"events.{SEGMENT_FORMAT}", base + "manifest.json"
+
+
+# --- Partition maintenance (PostgreSQL) ---
+
+
+async def is_partitioned(session: AsyncSession) -> bool:
+    if session.get_bind().dialect.name != "postgresql":
+        return False
+    row = await session.execute(
+        text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:t)"), {"t": AUDIT_TABLE}
+    )
+    return row.first() is not None
+
+
+async def ensure_partitions(session: AsyncSession, *, now: Optional[datetime] = None, months_ahead: int = PARTITION_MONTHS_AHEAD) -> List[str]:
+    """Create the current and next ``months_ahead`` monthly partitions.
+
+    Must run before a month starts: a partition cannot be attached over rows
+    that already landed in the default partition.
+    """
+
+    if not await is_partitioned(session):
+        return []
+    created = []
+    lower = month_start(now or datetime.utcnow())
+    for _ in range(months_ahead + 1):
+        part = partition_for(lower)
+        exists = await session.execute(text("SELECT to_regclass(:n)"), {"n": part.name})
+        if exists.scalar() is None:
+            await session.execute(
+                text(
+                    f"CREATE TABLE {part.name} PARTITION OF {AUDIT_TABLE} "
+                    f"FOR VALUES FROM ('{part.lower:%Y-%m-%d}') TO ('{part.upper:%Y-%m-%d}')"
+                )
+            )
+            created.append(part.name)
+        lower = part.upper
+    await session.commit()
+    return created
+
+
+async def list_partitions(session: AsyncSession) -> List[AuditPartition]:
+    """Attached monthly partitions, oldest first (the default partition excluded)."""
+
+    if not await is_partitioned(session):
+        return []
+    rows = await session.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:t)"
+        ),
+        {"t": AUDIT_TABLE},
+    )
+    parts = []
+    for (name,) in rows.all():
+        m = _PARTITION_RE.match(name)
+        if m:
+            parts.append(partition_for(datetime(int(m.group(1)), int(m.group(2)), 1)))
+    return sorted(parts, key=lambda p: p.lower)
+
+
+# --- Chain verification ---
+
+
+class ChainVerifier:
+    """Checks per-tenant D1.4 hash chains over rows fed in (tenant, sequence) order.
+
+    Each row must hash to its ``row_hash`` and link to a row of the previous
+    sequence. Concurrent writers can fork a chain (two rows with the same
+    sequence and parent); forks are counted, not rejected. ``heads`` seeds
+    each tenant's expected parents from already archived segments, so
+    continuity is checked across partitions. Rows written before hash
+    chaining (no ``row_hash``) are counted, not checked.
+    """
+
+    def __init__(self, heads: Optional[Dict[str, List[str]]] = None):
+        # tenant -> (sequence, hashes at that sequence, hashes at the sequence before)
+        self._state: Dict[str, Tuple[Optional[int], List[str], List[str]]] = {
+            tenant_id: (None, list(hashes), []) for tenant_id, hashes in (heads or {}).items()
+        }
+        self.chains: Dict[str, Dict[str, Any]] = {}
+        self.unchained = 0
+        self.forks = 0
+
+    def feed(self, row: Dict[str, Any]) -> None:
+        if not row.get("row_hash"):
+            self.unchained += 1
+            return
+        tenant_id, sequence = row["tenant_id"], row["sequence"]
+        computed = chain_row_hash(
+            row["prev_row_hash"] or "0" * 64,
+            tenant_id=tenant_id,
+            actor_user_id=row["actor_user_id"],
+            action=row["action"],
+            resource_type=row["resource_type"],
+            resource_id=row["resource_id"],
+            timestamp=row["timestamp"],
+            reason=row["reason"],
+            status=row["status"],
+            details=row["details"],
+            sequence=sequence,
+        )
+        if computed != row["row_hash"]:
+            raise AuditChainError(f"row hash mismatch for tenant {tenant_id} at sequence {sequence}")
+
+        if tenant_id in self._state:
+            level_seq, level, parents = self._state[tenant_id]
+            if sequence == level_seq:
+                self.forks += 1
+                level.append(row["row_hash"])
+            else:
+                parents, level = level, [row["row_hash"]]
+            if row["prev_row_hash"] not in parents:
+                raise AuditChainError(f"chain break for tenant {tenant_id} at sequence {sequence}")
+        else:
+            parents, level = [], [row["row_hash"]]
+        self._state[tenant_id] = (sequence, level, parents)
+
+        chain = self.chains.setdefault(
+            tenant_id, {"first_sequence": sequence, "prev_row_hash": row["prev_row_hash"]}
+        )
+        chain["last_sequence"] = sequence
+        chain["last_row_hashes"] = list(level)
+
+
+def _row_dict(event: AuditEvent) -> Dict[str, Any]:
+    return {name: getattr(event, name) for name in _COLUMNS}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _decode_row(line: bytes) -> Dict[str, Any]:
+    row = json.loads(line)
+    row["timestamp"] = datetime.fromisoformat(row["timestamp"])
+    return row
+
+
+async def _stream_rows(session: AsyncSession, lower: datetime, upper: datetime, *order_by) -> AsyncIterator[Dict[str, Any]]:
+    stmt = (
+        select(AuditEvent)
+        .where(AuditEvent.timestamp >= lower, AuditEvent.timestamp < upper)
+        .order_by(*order_by)
+        .execution_options(yield_per=_STREAM_BATCH)
+    )
+    result = await session.stream(stmt)
+    async for partition in result.scalars().partitions():
+        for event in partition:
+            yield _row_dict(event)
+        session.expunge_all()
+
+
+# --- Segments ---
+
+
+def read_manifest(storage: StorageClient, name: str) -> Optional[Dict[str, Any]]:
+    _segment_key, manifest_key = segment_keys(name)
+    if not storage.exists(manifest_key):
+        return None
+    return json.loads(storage.get_object(manifest_key))
+
+
+def list_segments(storage: StorageClient) -> List[Dict[str, Any]]:
+    """Manifests of complete archived segments, oldest first."""
+
+    manifests = []
+    for key in storage.list_objects(_segment_prefix()):
+        if key.endswith("/manifest.json"):
+            manifest = json.loads(storage.get_object(key))
+            manifest["lower"] = datetime.fromisoformat(manifest["lower"])
+            manifest["upper"] = datetime.fromisoformat(manifest["upper"])
+            manifests.append(manifest)
+    return sorted(manifests, key=lambda m: m["lower"])
+
+
+def archived_chain_heads(manifests: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+    heads: Dict[str, List[str]] = {}
+    for manifest in manifests:
+        for tenant_id, chain in manifest.get("chains", {}).items():
+            heads[tenant_id] = chain["last_row_hashes"]
+    return heads
+
+
+def _file_sha256(fileobj) -> str:
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: fileobj.read(_READ_CHUNK), b""):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+async def write_segment(
+    session: AsyncSession,
+    storage: StorageClient,
+    part: AuditPartition,
+    *,
+    heads: Optional[Dict[str, List[str]]] = None,
+) -> Dict[str, Any]:
+    """Verify ``part``'s hash chains, then upload it as a gzip NDJSON segment.
+
+    Two streaming passes: (tenant, sequence) order for verification, then
+    (timestamp, id) order for the segment so exports read it chronologically.
+    The manifest (row count, sha256, per-tenant chain ends) goes up last.
+    """
+
+    verifier = ChainVerifier(heads)
+    async for row in _stream_rows(session, part.lower, part.upper, AuditEvent.tenant_id, AuditEvent.sequence, AuditEvent.id):
+        verifier.feed(row)
+
+    segment_key, manifest_key = segment_keys(part.name)
+    rows = 0
+    with tempfile.SpooledTemporaryFile(max_size=_SPOOL_BYTES) as buf:
+        with gzip.GzipFile(fileobj=buf, mode="wb", mtime=0) as gz:
+            async for row in _stream_rows(session, part.lower, part.upper, AuditEvent.timestamp, AuditEvent.id):
+                gz.write(json.dumps(row, default=_json_default, sort_keys=True).encode("utf-8") + b"\n")
+                rows += 1
+        buf.seek(0)
+        sha256 = _file_sha256(buf)
+        buf.seek(0)
+        await asyncio.to_thread(storage.put_object, segment_key, buf)
+
+    manifest = {
+        "partition": part.name,
+        "lower": part.lower.isoformat(),
+        "upper": part.upper.isoformat(),
+        "format": SEGMENT_FORMAT,
+        "segment_key": segment_key,
+        "rows": rows,
+        "sha256": sha256,
+        "chains": verifier.chains,
+        "unchained_rows": verifier.unchained,
+        "forks": verifier.forks,
+        "archived_at": datetime.utcnow().isoformat(),
+    }
+    await asyncio.to_thread(
+        storage.put_object, manifest_key, io.BytesIO(json.dumps(manifest, sort_keys=True).encode("utf-8"))
+    )
+    return manifest
+
+
+def verify_segment(storage: StorageClient, manifest: Dict[str, Any]) -> None:
+    """Re-read an uploaded segment and check it against its manifest."""
+
+    with storage.open_object(manifest["segment_key"]) as raw:
+        sha256 = _file_sha256(raw)
+    if sha256 != manifest["sha256"]:
+        raise AuditChainError(f"segment {manifest['partition']} checksum mismatch")
+
+
+def iter_segment_rows(storage: StorageClient, manifest: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    with storage.open_object(manifest["segment_key"]) as raw:
+        with gzip.GzipFile(fileobj=raw, mode="rb") as gz:
+            for line in gz:
+                if line.strip():
+                    yield _decode_row(line)
+
+
+async def archive_closed_partitions(
+    session: AsyncSession,
+    storage: StorageClient,
+    *,
+    retention_days: Optional[int] = None,
+    now: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """Archive, then detach and drop, partitions that ended before the retention window.
+
+    Oldest first, stopping at the first failure so archived chain ends stay
+    contiguous. A partition whose manifest already exists (crash between
+    upload and detach) is only re-checked and detached.
+    """
+
+    retention_days = settings.audit_retention_days if retention_days is None else retention_days
+    cutoff = (now or datetime.utcnow()) - timedelta(days=retention_days)
+    manifests = list_segments(storage)
+    heads = archived_chain_heads(manifests)
+    archived: List[str] = []
+
+    for part in await list_partitions(session):
+        if part.upper > cutoff:
+            break
+        try:
+            manifest = read_manifest(storage, part.name)
+            if manifest is None:
+                manifest = await write_segment(session, storage, part, heads=heads)
+            await asyncio.to_thread(verify_segment, storage, manifest)
+            live = await session.execute(text(f"SELECT COUNT(*) FROM {part.name}"))
+            if live.scalar() != manifest["rows"]:
+                raise AuditChainError(f"segment {part.name} row count differs from the partition")
+
+            await session.execute(text(f"ALTER TABLE {AUDIT_TABLE} DETACH PARTITION {part.name}"))
+            await session.execute(text(f"DROP TABLE {part.name}"))
+            await session.commit()
+        except Exception as exc:
+            await session.rollback()
+            logger.error(
+                "audit.archive.failed",
+                extra={"event": "audit.archive.failed", "partition": part.name, "error": str(exc)},
+            )
+            break
+
+        for tenant_id, chain in manifest.get("chains", {}).items():
+            heads[tenant_id] = chain["last_row_hashes"]
+        archived.append(part.name)
+        logger.info(
+            "audit.archive.partition",
+            extra={"event": "audit.archive.partition", "partition": part.name, "rows": manifest["rows"]},
+        )
+
+    return {"archived": archived, "cutoff": cutoff.isoformat()}
+
+
+# --- Export ---
+
+
+async def iter_audit_rows(
+    session: AsyncSession,
+    storage: Optional[StorageClient],
+    *,
+    start: datetime,
+    end: Optional[datetime] = None,
+    tenant_id: Optional[str] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Events in ``[start, end)`` in time order: archived segments, then hot rows.
+
+    Nothing is buffered beyond one segment read / one DB batch. Hot rows start
+    at the end of the last archived segment, so a partition that was uploaded
+    but not yet detached is not exported twice.
+    """
+
+    hot_start = start
+    manifests = await asyncio.to_thread(list_segments, storage) if storage is not None else []
+    for manifest in manifests:
+        hot_start = max(hot_start, manifest["upper"])
+        if manifest["upper"] <= start or (end is not None and manifest["lower"] >= end):
+            continue
+        reader = iter_segment_rows(storage, manifest)
+        while True:
+            batch = await asyncio.to_thread(_take, reader, _STREAM_BATCH)
+            if not batch:
+                break
+            for row in batch:
+                if row["timestamp"] < start or (end is not None and row["timestamp"] >= end):
+                    continue
+                if tenant_id is not None and row["tenant_id"] != tenant_id:
+                    continue
+                yield row
+
+    stmt = select(AuditEvent).where(AuditEvent.timestamp >= hot_start)
+    if end is not None:
+        stmt = stmt.where(AuditEvent.timestamp < end)
+    if tenant_id is not None:
+        stmt = stmt.where(AuditEvent.tenant_id == tenant_id)
+    result = await session.stream(
+        stmt.order_by(AuditEvent.timestamp, AuditEvent.id).execution_options(yield_per=_STREAM_BATCH)
+    )
+    async for partition in result.scalars().partitions():
+        for event in partition:
+            yield _row_dict(event)
+        session.expunge_all()
+
+
+def _take(it: Iterator[Dict[str, Any]], n: int) -> List[Dict[str, Any]]:
+    out = []
+    for row in it:
+        out.append(row)
+        if len(out) >= n:
+            break
+    return out
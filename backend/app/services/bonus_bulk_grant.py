@@ -0,0 +1,362 @@
+from __future__ import annotations
+
+import bisect
+import hashlib
+import json
+import logging
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.models.bonus_models import BonusCampaign, BonusGrant
+from app.models.sql_models import Player
+from app.repositories.ledger_repo import LedgerTransaction, WalletBalance
+from app.services.bonus_engine import GrantTerms, grant_terms, invalidate_free_grants
+
+logger = logging.getLogger(__name__)
+
+BULK_GRANT_KEY = "bulk_grant"  # checkpoint slot in BonusCampaign.config
+BONUS_PROVIDER = "bonus"
+BONUS_GRANTED_EVENT = "bonus_granted"
+
+DEFAULT_CHUNK_SIZE = 500
+# A running checkpoint with no heartbeat for this long belongs to a dead run and may be resumed.
+BULK_GRANT_STALE_SECONDS = 300
+RESUMABLE_STATUSES = ("running", "failed")
+
+
+def bulk_grant_checkpoint(campaign: BonusCampaign) -> Dict[str, Any]:
+    return dict((campaign.config or {}).get(BULK_GRANT_KEY) or {})
+
+
+def _fresh_checkpoint() -> Dict[str, Any]:
+    return {"status": "running", "cursor": None, "granted": 0, "skipped": 0, "amount": 0.0}
+
+
+def bulk_grant_in_progress(checkpoint: Dict[str, Any], now: Optional[datetime] = None) -> bool:
+    """True while a run holds the campaign (``running`` with a recent heartbeat)."""
+
+    if checkpoint.get("status") != "running" or not checkpoint.get("heartbeat_at"):
+        return False
+    age = ((now or datetime.utcnow()) - datetime.fromisoformat(checkpoint["heartbeat_at"])).total_seconds()
+    return age < BULK_GRANT_STALE_SECONDS
+
+
+def segment_fingerprint(terms: GrantTerms, player_ids: Optional[List[str]]) -> str:
+    """Identify a bulk grant request: its segment plus the per-grant values.
+
+    The checkpoint cursor is a position in one sorted segment, so it is only
+    resumed by a request with the same fingerprint.
+    """
+
+    payload = {
+        "player_ids": sorted(set(player_ids)) if player_ids is not None else None,
+        "bonus_type": terms.bonus_type,
+        "amount": terms.amount,
+        "remaining_uses": terms.remaining_uses,
+        "wagering_target": terms.wagering_target,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _resume_or_start(checkpoint: Dict[str, Any], fingerprint: str) -> Dict[str, Any]:
+    if checkpoint.get("status") in RESUMABLE_STATUSES and checkpoint.get("fingerprint") == fingerprint:
+        checkpoint = dict(checkpoint)
+    else:
+        # Nothing to resume, or an unfinished run over a different segment:
+        # its cursor means nothing here, start over (per-player skip keeps it safe).
+        checkpoint = _fresh_checkpoint()
+        checkpoint["fingerprint"] = fingerprint
+    checkpoint["status"] = "running"
+    checkpoint.pop("error", None)
+    return checkpoint
+
+
+def claim_bulk_grant(
+    session: AsyncSession,
+    campaign: BonusCampaign,
+    *,
+    player_ids: Optional[List[str]] = None,
+    amount_override: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Mark the campaign's bulk grant as running (caller holds the campaign row lock and commits).
+
+    A failed or stale run of the same request keeps its cursor and totals so
+    the job resumes it.
+    """
+
+    terms = grant_terms(campaign, amount_override=amount_override)
+    checkpoint = _resume_or_start(bulk_grant_checkpoint(campaign), segment_fingerprint(terms, player_ids))
+    _save_checkpoint(session, campaign, checkpoint)
+    return checkpoint
+
+
+def mark_bulk_grant_failed(session: AsyncSession, campaign: BonusCampaign, error: str) -> None:
+    checkpoint = bulk_grant_checkpoint(campaign)
+    checkpoint["status"] = "failed"
+    checkpoint["error"] = error
+    _save_checkpoint(session, campaign, checkpoint)
+
+
+def _save_checkpoint(session: AsyncSession, campaign: BonusCampaign, checkpoint: Dict[str, Any]) -> None:
+    checkpoint["heartbeat_at"] = datetime.utcnow().isoformat()
+    # Reassign the whole dict: in-place mutation of a JSON column is not tracked.
+    config = dict(campaign.config or {})
+    config[BULK_GRANT_KEY] = checkpoint
+    campaign.config = config
+    campaign.updated_at = datetime.utcnow()
+    session.add(campaign)
+
+
+async def _next_players(
+    session: AsyncSession,
+    *,
+    tenant_id: str,
+    cursor: Optional[str],
+    chunk_size: int,
+    player_ids: Optional[List[str]],
+) -> Tuple[List[Player], Optional[str]]:
+    """Lock the next chunk of eligible players (id order) and return the new cursor.
+
+    Only active players are eligible. Without ``player_ids`` the segment is
+    every active player of the tenant, streamed by keyset on Player.id. With
+    an explicit (sorted) list the cursor advances over ids that no longer
+    exist or are not eligible, so a stale segment cannot stall.
+    """
+
+    stmt = (
+        select(Player)
+        .where(Player.tenant_id == tenant_id, Player.status == "active")
+        .order_by(Player.id)
+        .with_for_update()
+    )
+    if player_ids is None:
+        stmt = stmt.limit(chunk_size)
+        if cursor is not None:
+            stmt = stmt.where(Player.id > cursor)
+        players = list((await session.execute(stmt)).scalars().all())
+        return players, (players[-1].id if players else cursor)
+
+    start = 0 if cursor is None else bisect.bisect_right(player_ids, cursor)
+    ids = player_ids[start : start + chunk_size]
+    if not ids:
+        return [], cursor
+    players = list((await session.execute(stmt.where(Player.id.in_(ids)))).scalars().all())
+    return players, ids[-1]
+
+
+async def _grant_chunk(
+    session: AsyncSession,
+    *,
+    campaign: BonusCampaign,
+    terms: GrantTerms,
+    players: List[Player],
+    reason: str,
+) -> Dict[str, Any]:
+    """Grant ``campaign`` to one locked chunk of players inside the caller's transaction.
+
+    Mirrors ``grant_campaign_to_player`` + ``apply_bonus_delta_with_ledger``
+    with one SELECT per table and multi-row INSERTs for grants and ledger
+    events instead of per-player round trips. A player who already holds any
+    grant of this campaign is skipped, which makes the run idempotent per
+    (campaign, player).
+    """
+
+    ids = [p.id for p in players]
+    held_stmt = select(BonusGrant.player_id).where(
+        BonusGrant.campaign_id == campaign.id,
+        BonusGrant.player_id.in_(ids),
+    )
+    already_granted = {row[0] for row in (await session.execute(held_stmt)).all()}
+
+    credit = terms.bonus_type == "MANUAL_CREDIT"
+    balances: Dict[str, WalletBalance] = {}
+    if credit:
+        bal_stmt = (
+            select(WalletBalance)
+            .where(
+                WalletBalance.tenant_id == campaign.tenant_id,
+                WalletBalance.player_id.in_(ids),
+                WalletBalance.currency == "USD",
+            )
+            .order_by(WalletBalance.player_id)
+            .with_for_update()
+        )
+        balances = {b.player_id: b for b in (await session.execute(bal_stmt)).scalars().all()}
+
+    now = datetime.utcnow()
+    grant_rows: List[Dict[str, Any]] = []
+    ledger_rows: List[Dict[str, Any]] = []
+
+    for player in players:
+        if player.id in already_granted:
+            continue
+
+        grant_id = str(uuid.uuid4())
+        grant_rows.append(
+            {
+                "id": grant_id,
+                "tenant_id": campaign.tenant_id,
+                "campaign_id": campaign.id,
+                "player_id": player.id,
+                "bonus_type": terms.bonus_type,
+                "amount_granted": terms.amount,
+                "initial_balance": terms.amount,
+                "remaining_uses": terms.remaining_uses,
+                "wagering_target": terms.wagering_target,
+                "wagering_contributed": 0.0,
+                "status": "active",
+                "granted_at": now,
+                "expires_at": terms.expires_at,
+                "completed_at": None,
+                "device_fingerprint": None,
+                "ip_address": None,
+            }
+        )
+
+        if terms.wagering_target > 0:
+            player.wagering_requirement = float(player.wagering_requirement or 0.0) + terms.wagering_target
+            player.wagering_remaining = float(player.wagering_remaining or 0.0) + terms.wagering_target
+
+        if credit:
+            ledger_rows.append(
+                {
+                    "id": str(uuid.uuid4()),
+                    "tx_id": str(uuid.uuid4()),
+                    "tenant_id": campaign.tenant_id,
+                    "player_id": player.id,
+                    "type": "wallet",
+                    "direction": "credit",
+                    "amount": terms.amount,
+                    "currency": "USD",
+                    "status": BONUS_GRANTED_EVENT,
+                    "idempotency_key": None,
+                    "provider": BONUS_PROVIDER,
+                    "provider_ref": reason,
+                    "provider_event_id": f"bonus_grant:{grant_id}",
+                    "discount_amount": 0.0,
+                    "net_amount": terms.amount,
+                    "created_at": now,
+                }
+            )
+
+            bal = balances.get(player.id)
+            if bal is None:
+                bal = WalletBalance(
+                    tenant_id=campaign.tenant_id,
+                    player_id=player.id,
+                    currency="USD",
+                    balance_real_available=float(player.balance_real_available),
+                    balance_real_pending=float(player.balance_real_held),
+                    balance_bonus_available=terms.amount,
+                    balance_bonus_pending=0.0,
+                    updated_at=now,
+                )
+                balances[player.id] = bal
+            else:
+                bal.balance_bonus_available = float(bal.balance_bonus_available) + terms.amount
+                bal.updated_at = now
+            session.add(bal)
+
+            # Mirror snapshot to Player aggregate.
+            player.balance_bonus = float(bal.balance_bonus_available)
+
+        session.add(player)
+
+    if grant_rows:
+        await session.execute(insert(BonusGrant), grant_rows)
+    if ledger_rows:
+        await session.execute(insert(LedgerTransaction), ledger_rows)
+
+    return {
+        "granted": len(grant_rows),
+        "skipped_already_granted": len(already_granted),
+        "amount": round(terms.amount * len(ledger_rows), 2),
+    }
+
+
+async def bulk_grant_campaign(
+    session: AsyncSession,
+    campaign: BonusCampaign,
+    *,
+    reason: str,
+    player_ids: Optional[List[str]] = None,
+    amount_override: Optional[float] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Dict[str, Any]:
+    """Grant ``campaign`` to a player segment in bounded, individually committed chunks.
+
+    The checkpoint (cursor = last processed player id, running totals) is
+    stored on ``BonusCampaign.config["bulk_grant"]`` in the same transaction
+    as each chunk. A run that finds a ``running`` or ``failed`` checkpoint
+    for the same segment and terms (``segment_fingerprint``) resumes from its
+    cursor; any overlap with earlier runs is skipped per (campaign, player). Use ``claim_bulk_grant`` first to keep a second run
+    from starting concurrently.
+    """
+
+    started = time.perf_counter()
+    terms = grant_terms(campaign, amount_override=amount_override)
+    chunk_size = max(1, int(chunk_size))
+    if player_ids is not None:
+        player_ids = sorted(set(player_ids))
+
+    checkpoint = _resume_or_start(bulk_grant_checkpoint(campaign), segment_fingerprint(terms, player_ids))
+    checkpoint["started_at"] = checkpoint.get("started_at") or datetime.utcnow().isoformat()
+    resumed_from = checkpoint.get("cursor")
+
+    granted = skipped = 0
+    while True:
+        players, cursor = await _next_players(
+            session,
+            tenant_id=campaign.tenant_id,
+            cursor=checkpoint.get("cursor"),
+            chunk_size=chunk_size,
+            player_ids=player_ids,
+        )
+        if cursor == checkpoint.get("cursor"):
+            break
+
+        stats = await _grant_chunk(
+            session, campaign=campaign, terms=terms, players=players, reason=reason
+        )
+        granted += stats["granted"]
+        skipped += stats["skipped_already_granted"]
+
+        checkpoint = dict(checkpoint)
+        checkpoint["cursor"] = cursor
+        checkpoint["granted"] = int(checkpoint.get("granted", 0)) + stats["granted"]
+        checkpoint["skipped"] = int(checkpoint.get("skipped", 0)) + stats["skipped_already_granted"]
+        checkpoint["amount"] = round(float(checkpoint.get("amount", 0.0)) + stats["amount"], 2)
+        _save_checkpoint(session, campaign, checkpoint)
+        await session.commit()
+
+        if stats["granted"] and terms.bonus_type != "MANUAL_CREDIT":
+            # Tenant-wide drop: cheaper than one message per player.
+            await invalidate_free_grants(campaign.tenant_id, None)
+
+    elapsed = time.perf_counter() - started
+    checkpoint = dict(checkpoint)
+    checkpoint["status"] = "completed"
+    checkpoint["completed_at"] = datetime.utcnow().isoformat()
+    _save_checkpoint(session, campaign, checkpoint)
+    await session.commit()
+
+    processed = granted + skipped
+    result = {
+        "campaign_id": campaign.id,
+        "bonus_type": terms.bonus_type,
+        "granted": granted,
+        "skipped_already_granted": skipped,
+        "resumed_from": resumed_from,
+        "total_granted": checkpoint["granted"],
+        "total_amount": checkpoint["amount"],
+        "duration_ms": int(elapsed * 1000),
+        "players_per_sec": round(processed / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+    logger.info("bonus.bulk_grant.completed", extra={"event": "bonus.bulk_grant.completed", **result})
+    return result
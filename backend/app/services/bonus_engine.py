@@ -1,15 +1,24 @@
 from __future__ import annotations
 
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional, Sequence
+from typing import Dict, FrozenSet, Optional, Set, Tuple
 import logging
+import time
 import uuid
 
 from fastapi import HTTPException
+from sqlalchemy import case, event, or_, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlmodel import select
 
+from app.core.cache_bus import publish_invalidation, register_invalidation_handler
 from app.models.bonus_models import BonusCampaign, BonusCampaignGame, BonusGrant
+from app.services.wagering_engine import add_wagering_requirement
 from app.services.wallet_ledger import apply_bonus_delta_with_ledger
 
 logger = logging.getLogger(__name__)
@@ -17,6 +26,12 @@ logger = logging.getLogger(__name__)
 
 BONUS_TYPES_P0 = {"FREE_SPIN", "FREE_BET", "MANUAL_CREDIT"}
 
+FREE_GRANTS_TOPIC = "bonus.free_grants"
+# Safety net in case an invalidation message is lost.
+FREE_GRANT_CACHE_TTL_SECONDS = 30
+FREE_GRANT_CACHE_MAX_ENTRIES = 50_000
+_STAGED_INVALIDATIONS_KEY = "bonus_free_grants_invalidate"
+
 
 def _now_utc_naive() -> datetime:
     # DB columns are naive in many places in this codebase.
@@ -74,21 +89,20 @@ async def get_onboarding_campaign(session: AsyncSession, *, tenant_id: str) -> O
     return onboarding[0]
 
 
-async def grant_campaign_to_player(
-    session: AsyncSession,
-    *,
-    tenant_id: str,
-    player_id: str,
-    campaign: BonusCampaign,
-    reason: str,
-    created_by_admin_id: Optional[str] = None,
-    provider_event_id: Optional[str] = None,
-    amount_override: Optional[float] = None,
-) -> BonusGrant:
-    """Create a BonusGrant and apply any wallet effects (MANUAL_CREDIT).
+@dataclass(frozen=True)
+class GrantTerms:
+    bonus_type: str
+    remaining_uses: Optional[int]
+    amount: float
+    wagering_target: float
+    expires_at: Optional[datetime]
 
-    - FREE_SPIN / FREE_BET: only remaining_uses is tracked.
-    - MANUAL_CREDIT: credits bonus balance (WalletBalance.balance_bonus_available) and mirrors Player.balance_bonus.
+
+def grant_terms(campaign: BonusCampaign, *, amount_override: Optional[float] = None) -> GrantTerms:
+    """Validate a campaign for granting and resolve per-grant values.
+
+    Shared by the single-player and bulk grant paths so both reject the same
+    campaigns with the same error codes.
     """
 
     bonus_type = campaign.bonus_type or campaign.type
@@ -121,21 +135,58 @@ async def grant_campaign_to_player(
             raise HTTPException(status_code=400, detail={"error_code": "AMOUNT_REQUIRED"})
         grant_amount = float(amt)
 
-    expires_at = _campaign_expiry(campaign)
+    # Wagering: config.wagering_mult x credited amount (MANUAL_CREDIT only).
+    wagering_target = 0.0
+    if grant_amount > 0:
+        try:
+            wagering_target = round(grant_amount * float((campaign.config or {}).get("wagering_mult") or 0.0), 2)
+        except (TypeError, ValueError):
+            wagering_target = 0.0
+
+    return GrantTerms(
+        bonus_type=bonus_type,
+        remaining_uses=remaining_uses,
+        amount=grant_amount,
+        wagering_target=max(0.0, wagering_target),
+        expires_at=_campaign_expiry(campaign),
+    )
+
+
+async def grant_campaign_to_player(
+    session: AsyncSession,
+    *,
+    tenant_id: str,
+    player_id: str,
+    campaign: BonusCampaign,
+    reason: str,
+    created_by_admin_id: Optional[str] = None,
+    provider_event_id: Optional[str] = None,
+    amount_override: Optional[float] = None,
+) -> BonusGrant:
+    """Create a BonusGrant and apply any wallet effects (MANUAL_CREDIT).
+
+    - FREE_SPIN / FREE_BET: only remaining_uses is tracked.
+    - MANUAL_CREDIT: credits bonus balance (WalletBalance.balance_bonus_available) and mirrors Player.balance_bonus.
+    """
+
+    terms = grant_terms(campaign, amount_override=amount_override)
+    bonus_type = terms.bonus_type
 
     grant = BonusGrant(
         tenant_id=tenant_id,
         campaign_id=campaign.id,
         player_id=player_id,
         bonus_type=bonus_type,
-        amount_granted=grant_amount,
-        initial_balance=grant_amount,
-        remaining_uses=remaining_uses,
-        expires_at=expires_at,
+        amount_granted=terms.amount,
+        initial_balance=terms.amount,
+        remaining_uses=terms.remaining_uses,
+        wagering_target=terms.wagering_target,
+        expires_at=terms.expires_at,
         status="active",
     )
     session.add(grant)
     await session.flush()
+    await add_wagering_requirement(session, player_id=player_id, amount=grant.wagering_target)
 
     # Apply wallet side-effect for MANUAL_CREDIT
     if bonus_type == "MANUAL_CREDIT":
@@ -146,7 +197,7 @@ async def grant_campaign_to_player(
             player_id=player_id,
             tx_id=tx_id,
             event_type="bonus_granted",
-            delta_bonus_available=grant_amount,
+            delta_bonus_available=terms.amount,
             currency="USD",
             idempotency_key=None,
             provider="bonus",
@@ -154,10 +205,131 @@ async def grant_campaign_to_player(
             provider_event_id=provider_event_id or f"bonus_grant:{grant.id}",
             allow_negative=False,
         )
+    else:
+        stage_free_grants_invalidation(session, tenant_id, player_id)
 
     return grant
 
 
+@dataclass(frozen=True)
+class FreeGrantRef:
+    id: str
+    campaign_id: str
+    expires_at: Optional[datetime]
+    game_ids: FrozenSet[str]
+
+
+class ActiveFreeGrantCache:
+    """Per-player list of usable FREE_SPIN/FREE_BET grants with their game scope.
+
+    Loaded with one indexed join; dropped on grant / consume / forfeit via the
+    cache bus. Entries only steer the lookup: the grant row is re-read and
+    consume_free_use is a conditional UPDATE, so a stale entry cannot
+    over-consume.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int = FREE_GRANT_CACHE_TTL_SECONDS,
+        max_entries: int = FREE_GRANT_CACHE_MAX_ENTRIES,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # LRU bounded by max_entries; expired entries are dropped when read.
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Tuple[FreeGrantRef, ...], float]]" = OrderedDict()
+        # Bumped on every invalidation so a load racing with a grant change
+        # does not publish a stale list.
+        self._generation = 0
+
+    def invalidate(self, tenant_id: Optional[str] = None, player_id: Optional[str] = None) -> None:
+        self._generation += 1
+        if tenant_id is None or player_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop((tenant_id, player_id), None)
+
+    async def get(self, session: AsyncSession, tenant_id: str, player_id: str) -> Tuple[FreeGrantRef, ...]:
+        key = (tenant_id, player_id)
+        cached = self._entries.get(key)
+        if cached is not None:
+            if time.monotonic() - cached[1] < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                return cached[0]
+            del self._entries[key]
+
+        generation = self._generation
+        stmt = (
+            select(BonusGrant.id, BonusGrant.campaign_id, BonusGrant.expires_at, BonusCampaignGame.game_id)
+            .join(BonusCampaignGame, BonusCampaignGame.campaign_id == BonusGrant.campaign_id)
+            .where(
+                BonusGrant.tenant_id == tenant_id,
+                BonusGrant.player_id == player_id,
+                BonusGrant.status == "active",
+                BonusGrant.bonus_type.in_(["FREE_SPIN", "FREE_BET"]),
+                BonusGrant.remaining_uses > 0,
+            )
+            .order_by(BonusGrant.granted_at.asc(), BonusGrant.id)
+        )
+        grouped: Dict[str, list] = {}
+        for grant_id, campaign_id, expires_at, game_id in (await session.execute(stmt)).all():
+            entry = grouped.setdefault(grant_id, [campaign_id, expires_at, set()])
+            entry[2].add(game_id)
+        refs = tuple(
+            FreeGrantRef(id=gid, campaign_id=cid, expires_at=exp, game_ids=frozenset(games))
+            for gid, (cid, exp, games) in grouped.items()
+        )
+        if generation == self._generation:
+            self._entries[key] = (refs, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return refs
+
+
+free_grant_cache = ActiveFreeGrantCache()
+
+register_invalidation_handler(
+    FREE_GRANTS_TOPIC,
+    lambda payload: free_grant_cache.invalidate(payload.get("tenant_id"), payload.get("player_id")),
+)
+
+
+async def invalidate_free_grants(tenant_id: str, player_id: Optional[str]) -> None:
+    """Call after committing a change to a player's FREE_SPIN/FREE_BET grants (player_id=None: many players)."""
+    await publish_invalidation(FREE_GRANTS_TOPIC, {"tenant_id": tenant_id, "player_id": player_id})
+
+
+def stage_free_grants_invalidation(session: AsyncSession, tenant_id: str, player_id: Optional[str]) -> None:
+    """Invalidate once ``session`` commits: publishing earlier lets a concurrent lookup re-cache the old list."""
+    session.info.setdefault(_STAGED_INVALIDATIONS_KEY, set()).add((tenant_id, player_id))
+
+
+_publish_tasks: Set[asyncio.Task] = set()
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_staged_invalidations(session: Session) -> None:
+    staged = session.info.pop(_STAGED_INVALIDATIONS_KEY, None)
+    if not staged:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    for tenant_id, player_id in staged:
+        # Local cache right away; peers via the bus.
+        free_grant_cache.invalidate(tenant_id, player_id)
+        if loop is not None:
+            task = loop.create_task(invalidate_free_grants(tenant_id, player_id))
+            _publish_tasks.add(task)
+            task.add_done_callback(_publish_tasks.discard)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_staged_invalidations(session: Session) -> None:
+    session.info.pop(_STAGED_INVALIDATIONS_KEY, None)
+
+
 async def find_applicable_free_grant(
     session: AsyncSession,
     *,
@@ -165,37 +337,26 @@ async def find_applicable_free_grant(
     player_id: str,
     game_id: str,
 ) -> Optional[BonusGrant]:
-    """Return an active FREE_SPIN/FREE_BET grant applicable to this game_id."""
+    """Return the oldest active FREE_SPIN/FREE_BET grant applicable to this game_id.
 
-    now = _now_utc_naive()
+    Warm path: cached per-player grant list + one primary-key read.
+    """
 
-    stmt = (
-        select(BonusGrant)
-        .where(
-            BonusGrant.tenant_id == tenant_id,
-            BonusGrant.player_id == player_id,
-            BonusGrant.status == "active",
-            BonusGrant.bonus_type.in_(["FREE_SPIN", "FREE_BET"]),
-        )
-        .order_by(BonusGrant.granted_at.asc())
-    )
-    grants: Sequence[BonusGrant] = (await session.execute(stmt)).scalars().all()
+    now = _now_utc_naive()
 
-    for g in grants:
+    for ref in await free_grant_cache.get(session, tenant_id, player_id):
         # expiry guard
-        if g.expires_at and g.expires_at < now:
+        if ref.expires_at and ref.expires_at < now:
             continue
-        if g.remaining_uses is None or g.remaining_uses <= 0:
+        # game scope guard
+        if game_id not in ref.game_ids:
             continue
 
-        # game scope guard
-        stmt_map = select(BonusCampaignGame).where(
-            BonusCampaignGame.campaign_id == g.campaign_id,
-            BonusCampaignGame.game_id == game_id,
-        )
-        mapped = (await session.execute(stmt_map)).scalars().first()
-        if mapped:
-            return g
+        grant = await session.get(BonusGrant, ref.id)
+        if grant and grant.status == "active" and (grant.remaining_uses or 0) > 0:
+            return grant
+        # Used up or revoked elsewhere since the list was cached.
+        free_grant_cache.invalidate(tenant_id, player_id)
 
     return None
 
@@ -206,23 +367,48 @@ async def consume_free_use(
     grant: BonusGrant,
     provider_event_id: Optional[str] = None,
 ) -> BonusGrant:
+    """Consume one use with a conditional UPDATE (safe under concurrent spins).
+
+    The decrement only applies while the grant is active, unexpired and has
+    uses left; the last use completes the grant in the same statement.
+    """
+
+    now = _now_utc_naive()
+    stmt = (
+        update(BonusGrant)
+        .where(
+            BonusGrant.id == grant.id,
+            BonusGrant.status == "active",
+            BonusGrant.remaining_uses > 0,
+            or_(BonusGrant.expires_at.is_(None), BonusGrant.expires_at >= now),
+        )
+        .values(
+            remaining_uses=BonusGrant.remaining_uses - 1,
+            status=case((BonusGrant.remaining_uses <= 1, "completed"), else_=BonusGrant.status),
+            completed_at=case((BonusGrant.remaining_uses <= 1, now), else_=BonusGrant.completed_at),
+        )
+        .returning(BonusGrant.remaining_uses, BonusGrant.status, BonusGrant.completed_at)
+        .execution_options(synchronize_session=False)
+    )
+    row = (await session.execute(stmt)).first()
+
+    if row is not None:
+        set_committed_value(grant, "remaining_uses", row[0])
+        set_committed_value(grant, "status", row[1])
+        set_committed_value(grant, "completed_at", row[2])
+        if row[1] != "active":
+            stage_free_grants_invalidation(session, grant.tenant_id, grant.player_id)
+        return grant
+
+    # Nothing consumed: report why from the current row.
+    await session.refresh(grant)
     if grant.status != "active":
         raise HTTPException(status_code=409, detail={"error_code": "GRANT_NOT_ACTIVE"})
 
-    now = _now_utc_naive()
     if grant.expires_at and grant.expires_at < now:
         grant.status = "expired"
         session.add(grant)
+        stage_free_grants_invalidation(session, grant.tenant_id, grant.player_id)
         return grant
 
-    if grant.remaining_uses is None or grant.remaining_uses <= 0:
-        raise HTTPException(status_code=409, detail={"error_code": "NO_REMAINING_USES"})
-
-    grant.remaining_uses = int(grant.remaining_uses) - 1
-    if grant.remaining_uses <= 0:
-        grant.remaining_uses = 0
-        grant.status = "completed"
-        grant.completed_at = now
-
-    session.add(grant)
-    return grant
+    raise HTTPException(status_code=409, detail={"error_code": "NO_REMAINING_USES"})
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import uuid
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 from fastapi import HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -16,6 +16,13 @@ from app.services.bonus_engine import (
     consume_free_use,
     grant_campaign_to_player,
     get_onboarding_campaign,
+    grant_terms,
+    stage_free_grants_invalidation,
+)
+from app.services.bonus_bulk_grant import (
+    bulk_grant_checkpoint,
+    bulk_grant_in_progress,
+    claim_bulk_grant,
 )
 
 
@@ -250,6 +257,57 @@ async def grant_bonus_admin(
     return grant
 
 
+async def start_bulk_grant_admin(
+    session: AsyncSession,
+    *,
+    tenant_id: str,
+    admin: AdminUser,
+    request: Request,
+    campaign_id: str,
+    player_ids: Optional[List[str]],
+    amount: Optional[float],
+    reason: str,
+) -> BonusCampaign:
+    """Validate and audit a bulk grant before it is handed to the background job.
+
+    Campaign errors (type, max_uses, amount) surface here as 4xx instead of in
+    the job. The run is claimed on the locked campaign row: a run still in
+    progress is a 409, a failed or stale one of the same request is resumed
+    by the job (a different segment or amount starts a fresh checkpoint).
+    """
+
+    stmt = select(BonusCampaign).where(BonusCampaign.id == campaign_id).with_for_update()
+    campaign = (await session.execute(stmt)).scalars().first()
+    if not campaign or campaign.tenant_id != tenant_id:
+        raise HTTPException(status_code=404, detail={"error_code": "CAMPAIGN_NOT_FOUND"})
+
+    grant_terms(campaign, amount_override=amount)
+    checkpoint = bulk_grant_checkpoint(campaign)
+    if bulk_grant_in_progress(checkpoint):
+        raise HTTPException(status_code=409, detail={"error_code": "BULK_GRANT_RUNNING"})
+    claimed = claim_bulk_grant(session, campaign, player_ids=player_ids, amount_override=amount)
+
+    await _audit_best_effort(
+        session=session,
+        request=request,
+        admin=admin,
+        tenant_id=tenant_id,
+        action="BONUS_BULK_GRANT",
+        resource_type="bonus_campaign",
+        resource_id=campaign.id,
+        reason=reason,
+        result="success",
+        details={
+            "campaign_id": campaign_id,
+            "player_count": len(player_ids) if player_ids is not None else None,
+            "amount": amount,
+            "resume_cursor": claimed.get("cursor"),
+        },
+    )
+
+    return campaign
+
+
 async def consume_bonus_admin(
     session: AsyncSession,
     *,
@@ -332,6 +390,8 @@ async def forfeit_grant_admin(
     if action == "expire":
         grant.expires_at = _now_utc_naive()
     session.add(grant)
+    if grant.bonus_type in {"FREE_SPIN", "FREE_BET"}:
+        stage_free_grants_invalidation(session, tenant_id, grant.player_id)
 
     await _audit_best_effort(
         session=session,
@@ -1,68 +1,436 @@
+from __future__ import annotations
+
+import asyncio
+import bisect
+import hashlib
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
-import hashlib
 
-from app.models.offer_models import Experiment, ExperimentAssignment
+from app.core.cache_bus import publish_invalidation, register_invalidation_handler
+from app.core.database import async_session
+from app.models.offer_models import Experiment, ExperimentAssignment, Offer
+from app.models.sql_models import Player
+
+logger = logging.getLogger(__name__)
+
+OFFER_DEFINITIONS_TOPIC = "offers.definitions"
+# Safety net in case an invalidation message is lost.
+OFFER_DEFINITIONS_TTL_SECONDS = 60
+
+ASSIGNMENT_CACHE_MAX_ENTRIES = 200_000
+ASSIGNMENT_FLUSH_BATCH = 500
+ASSIGNMENT_FLUSH_INTERVAL_SECONDS = 1.0
+
+
+@dataclass(frozen=True)
+class ExperimentDef:
+    id: str
+    key: str
+    status: str
+    variants: Mapping[str, Any]
+
+
+@dataclass(frozen=True)
+class OfferCatalog:
+    """Per-tenant experiment and active-offer definitions, read-only."""
+
+    experiments: Mapping[str, ExperimentDef]
+    active_offer_ids: Tuple[str, ...]
+
+    def running_experiment(self, key: str) -> Optional[ExperimentDef]:
+        exp = self.experiments.get(key)
+        return exp if exp is not None and exp.status == "running" else None
+
+
+class OfferDefinitionCache:
+    """Tenant -> OfferCatalog, dropped on experiment/offer writes via the cache bus."""
+
+    def __init__(self, ttl_seconds: int = OFFER_DEFINITIONS_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, Tuple[OfferCatalog, float]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._generation = 0
+
+    def invalidate(self, tenant_id: Optional[str] = None) -> None:
+        self._generation += 1
+        if tenant_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(tenant_id, None)
+
+    def _fresh(self, tenant_id: str) -> Optional[OfferCatalog]:
+        entry = self._entries.get(tenant_id)
+        if entry is not None and (time.monotonic() - entry[1]) < self.ttl_seconds:
+            return entry[0]
+        return None
+
+    async def get(self, session: AsyncSession, tenant_id: str) -> OfferCatalog:
+        catalog = self._fresh(tenant_id)
+        if catalog is not None:
+            return catalog
+
+        lock = self._locks.setdefault(tenant_id, asyncio.Lock())
+        async with lock:
+            catalog = self._fresh(tenant_id)
+            if catalog is not None:
+                return catalog
+
+            generation = self._generation
+            catalog = await _load_catalog(session, tenant_id)
+            if generation == self._generation:
+                self._entries[tenant_id] = (catalog, time.monotonic())
+            return catalog
+
+
+async def _load_catalog(session: AsyncSession, tenant_id: str) -> OfferCatalog:
+    experiments = (
+        await session.execute(select(Experiment).where(Experiment.tenant_id == tenant_id))
+    ).scalars().all()
+    offer_ids = (
+        await session.execute(
+            select(Offer.id)
+            .where(Offer.tenant_id == tenant_id, Offer.is_active == True)  # noqa: E712
+            .order_by(Offer.created_at, Offer.id)
+        )
+    ).scalars().all()
+    return OfferCatalog(
+        experiments=MappingProxyType(
+            {
+                e.key: ExperimentDef(
+                    id=e.id, key=e.key, status=e.status, variants=MappingProxyType(dict(e.variants or {}))
+                )
+                for e in experiments
+            }
+        ),
+        active_offer_ids=tuple(offer_ids),
+    )
+
+
+class AssignmentCache:
+    """Bounded LRU of (experiment_id, player_id) -> variant."""
+
+    def __init__(self, max_entries: int = ASSIGNMENT_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+
+    def get(self, experiment_id: str, player_id: str) -> Optional[str]:
+        key = (experiment_id, player_id)
+        variant = self._entries.get(key)
+        if variant is not None:
+            self._entries.move_to_end(key)
+        return variant
+
+    def put(self, experiment_id: str, player_id: str, variant: str) -> None:
+        self._entries[(experiment_id, player_id)] = variant
+        self._entries.move_to_end((experiment_id, player_id))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, experiment_id: Optional[str] = None) -> None:
+        if experiment_id is None:
+            self._entries.clear()
+            return
+        for key in [k for k in self._entries if k[0] == experiment_id]:
+            del self._entries[key]
+
+
+async def load_assignments(session: AsyncSession, experiment_id: str, player_ids: List[str]) -> Dict[str, str]:
+    """Stored variants for ``player_ids`` in one experiment (players without a row are absent)."""
+
+    if not player_ids:
+        return {}
+    stmt = select(ExperimentAssignment.player_id, ExperimentAssignment.variant).where(
+        ExperimentAssignment.experiment_id == experiment_id,
+        ExperimentAssignment.player_id.in_(player_ids),
+    )
+    return dict((await session.execute(stmt)).all())
+
+
+async def persist_assignments(session: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+    """Insert assignment rows, keeping whichever row per (experiment, player) landed first."""
+
+    if not rows:
+        return
+    bind = session.get_bind()
+    insert_fn = pg_insert if bind is not None and bind.dialect.name == "postgresql" else sqlite_insert
+    for i in range(0, len(rows), ASSIGNMENT_FLUSH_BATCH):
+        stmt = insert_fn(ExperimentAssignment).values(rows[i : i + ASSIGNMENT_FLUSH_BATCH])
+        await session.execute(stmt.on_conflict_do_nothing(index_elements=["experiment_id", "player_id"]))
+
+
+class AssignmentWriter:
+    """Buffers new assignments and writes them in batches off the request path.
+
+    Flushes when ``batch_size`` rows are pending, every ``flush_interval``
+    seconds once started, and on shutdown. Rows from a failed flush are kept
+    for the next one; a row lost to a crash is recomputed on the player's next
+    evaluation. When another writer stored a row first, its variant replaces
+    the cached one so the cache never disagrees with the stored assignment.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = ASSIGNMENT_FLUSH_BATCH,
+        flush_interval: float = ASSIGNMENT_FLUSH_INTERVAL_SECONDS,
+        session_factory: Optional[Callable] = None,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.session_factory = session_factory
+        self._pending: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._loop_task: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def pending_variant(self, experiment_id: str, player_id: str) -> Optional[str]:
+        row = self._pending.get((experiment_id, player_id))
+        return row["variant"] if row is not None else None
+
+    def enqueue(self, *, tenant_id: str, experiment_id: str, player_id: str, variant: str) -> None:
+        self._pending.setdefault(
+            (experiment_id, player_id),
+            {
+                "tenant_id": tenant_id,
+                "experiment_id": experiment_id,
+                "player_id": player_id,
+                "variant": variant,
+            },
+        )
+        if len(self._pending) >= self.batch_size and (self._flush_task is None or self._flush_task.done()):
+            try:
+                self._flush_task = asyncio.get_running_loop().create_task(self.flush())
+            except RuntimeError:
+                pass
+
+    async def flush(self, session_factory: Optional[Callable] = None) -> int:
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, {}
+
+            factory = session_factory or self.session_factory or async_session
+            now = datetime.now(timezone.utc)
+            rows = [{"id": str(uuid.uuid4()), "assigned_at": now, **row} for row in batch.values()]
+            try:
+                async with factory() as session:
+                    await persist_assignments(session, rows)
+                    await session.commit()
+                    await self._sync_cache(session, batch)
+            except Exception as exc:
+                for key, row in batch.items():
+                    self._pending.setdefault(key, row)
+                logger.warning(
+                    "experiments.assignment_flush_failed",
+                    extra={"event": "experiments.assignment_flush_failed", "rows": len(rows), "error": str(exc)},
+                )
+                return 0
+            return len(rows)
+
+    async def _sync_cache(self, session: AsyncSession, batch: Dict[Tuple[str, str], Dict[str, Any]]) -> None:
+        by_experiment: Dict[str, List[str]] = {}
+        for experiment_id, player_id in batch:
+            by_experiment.setdefault(experiment_id, []).append(player_id)
+        for experiment_id, player_ids in by_experiment.items():
+            for i in range(0, len(player_ids), self.batch_size):
+                stored = await load_assignments(session, experiment_id, player_ids[i : i + self.batch_size])
+                for player_id, variant in stored.items():
+                    if variant != batch[(experiment_id, player_id)]["variant"]:
+                        assignment_cache.put(experiment_id, player_id, variant)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self) -> None:
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.get_event_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            try:
+                await self._loop_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._loop_task = None
+        await self.flush()
+
+
+offer_definitions = OfferDefinitionCache()
+assignment_cache = AssignmentCache()
+assignment_writer = AssignmentWriter()
+
+
+def _on_definitions_invalidation(payload: Dict[str, Any]) -> None:
+    offer_definitions.invalidate(payload.get("tenant_id"))
+    if payload.get("experiment_id"):
+        assignment_cache.invalidate(payload["experiment_id"])
+
+
+register_invalidation_handler(OFFER_DEFINITIONS_TOPIC, _on_definitions_invalidation)
+
+
+async def invalidate_offer_definitions(tenant_id: str, experiment_id: Optional[str] = None) -> None:
+    """Call after committing experiment or offer changes for ``tenant_id``."""
+    await publish_invalidation(OFFER_DEFINITIONS_TOPIC, {"tenant_id": tenant_id, "experiment_id": experiment_id})
+
 
 class ExperimentEngine:
-    
+
     async def get_assignment(self, session: AsyncSession, tenant_id: str, player_id: str, experiment_key: str) -> str:
         """
         Get or Create Sticky Assignment.
         Deterministic: Hashing (player_id + key) if no override.
+
+        Served from the tenant catalog and the assignment cache. On a miss the
+        stored (or still queued) assignment wins; only players without one
+        are hashed, and the new row is queued on ``assignment_writer``
+        instead of inserted on ``session``.
         """
-        
-        # 1. Check Active Experiment
-        stmt = select(Experiment).where(Experiment.tenant_id == tenant_id, Experiment.key == experiment_key)
-        experiment = (await session.execute(stmt)).scalars().first()
-        
-        if not experiment or experiment.status != "running":
+
+        catalog = await offer_definitions.get(session, tenant_id)
+        experiment = catalog.running_experiment(experiment_key)
+        if experiment is None:
             return "control" # Default fallback
-            
-        # 2. Check Existing Assignment
-        stmt_assign = select(ExperimentAssignment).where(
-            ExperimentAssignment.experiment_id == experiment.id,
-            ExperimentAssignment.player_id == player_id
-        )
-        assignment = (await session.execute(stmt_assign)).scalars().first()
-        
-        if assignment:
-            return assignment.variant
-            
-        # 3. Create New Assignment (Deterministic)
+
+        variant = assignment_cache.get(experiment.id, player_id)
+        if variant is not None:
+            return variant
+
+        variant = assignment_writer.pending_variant(experiment.id, player_id)
+        if variant is None:
+            variant = (await load_assignments(session, experiment.id, [player_id])).get(player_id)
+        if variant is not None:
+            assignment_cache.put(experiment.id, player_id, variant)
+            return variant
+
         variant = self._assign_variant(player_id, experiment)
-        
-        new_assign = ExperimentAssignment(
-            tenant_id=tenant_id,
-            experiment_id=experiment.id,
-            player_id=player_id,
-            variant=variant
+        assignment_cache.put(experiment.id, player_id, variant)
+        assignment_writer.enqueue(
+            tenant_id=tenant_id, experiment_id=experiment.id, player_id=player_id, variant=variant
         )
-        session.add(new_assign)
-        # We rely on caller to commit to make it sticky
         return variant
 
-    def _assign_variant(self, player_id: str, experiment: Experiment) -> str:
+    async def preassign_segment(
+        self,
+        session: AsyncSession,
+        *,
+        tenant_id: str,
+        experiment_key: str,
+        player_ids: Optional[List[str]] = None,
+        chunk_size: int = 1000,
+    ) -> Dict[str, Any]:
+        """Persist and cache assignments for a whole segment ahead of traffic.
+
+        Streams the tenant's active players (or an explicit id list) by id,
+        one commit per chunk. Stored assignments win over the hash, so
+        pre-assigning never moves a player who was already bucketed.
+        """
+
+        catalog = await offer_definitions.get(session, tenant_id)
+        experiment = catalog.running_experiment(experiment_key)
+        if experiment is None:
+            return {"experiment_key": experiment_key, "error": "EXPERIMENT_NOT_RUNNING"}
+
+        started = time.perf_counter()
+        chunk_size = max(1, int(chunk_size))
+        if player_ids is not None:
+            player_ids = sorted(set(player_ids))
+
+        assigned = existing = 0
+        cursor: Optional[str] = None
+        while True:
+            if player_ids is None:
+                stmt = (
+                    select(Player.id)
+                    .where(Player.tenant_id == tenant_id, Player.status == "active")
+                    .order_by(Player.id)
+                    .limit(chunk_size)
+                )
+                if cursor is not None:
+                    stmt = stmt.where(Player.id > cursor)
+                ids = list((await session.execute(stmt)).scalars().all())
+            else:
+                start = 0 if cursor is None else bisect.bisect_right(player_ids, cursor)
+                ids = player_ids[start : start + chunk_size]
+            if not ids:
+                break
+            cursor = ids[-1]
+
+            stored = await load_assignments(session, experiment.id, ids)
+
+            now = datetime.now(timezone.utc)
+            rows = []
+            for player_id in ids:
+                variant = stored.get(player_id)
+                if variant is None:
+                    variant = self._assign_variant(player_id, experiment)
+                    rows.append(
+                        {
+                            "id": str(uuid.uuid4()),
+                            "tenant_id": tenant_id,
+                            "experiment_id": experiment.id,
+                            "player_id": player_id,
+                            "variant": variant,
+                            "assigned_at": now,
+                        }
+                    )
+                assignment_cache.put(experiment.id, player_id, variant)
+
+            await persist_assignments(session, rows)
+            await session.commit()
+            assigned += len(rows)
+            existing += len(stored)
+
+        elapsed = time.perf_counter() - started
+        result = {
+            "experiment_key": experiment_key,
+            "experiment_id": experiment.id,
+            "assigned": assigned,
+            "existing": existing,
+            "duration_ms": int(elapsed * 1000),
+            "players_per_sec": round((assigned + existing) / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+        logger.info("experiments.preassign.completed", extra={"event": "experiments.preassign.completed", **result})
+        return result
+
+    def _assign_variant(self, player_id: str, experiment: ExperimentDef) -> str:
         # Simple Weighted Random logic using Hash
         # Variants: {"A": 50, "B": 50}
-        
+
         if not experiment.variants:
             return "control"
-            
+
         variants = experiment.variants
         total_weight = sum(v.get("weight", 0) for v in variants.values())
         if total_weight == 0:
             return "control"
-            
+
         # Hash: MD5(player_id + key) -> Int -> Modulo Total Weight
         hash_input = f"{player_id}:{experiment.key}"
         hash_val = int(hashlib.md5(hash_input.encode()).hexdigest(), 16)
         point = hash_val % total_weight
-        
+
         current = 0
         for v_name, v_data in variants.items():
             current += v_data.get("weight", 0)
             if point < current:
                 return v_name
-                
+
         return "control"
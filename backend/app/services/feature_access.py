@@ -1,12 +1,13 @@
 from __future__ import annotations
 
 from fastapi import HTTPException
+from typing import Optional
+
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import select
 
 from app.constants.feature_catalog import FEATURE_CATALOG
 from app.core.errors import AppError
-from app.models.sql_models import Tenant
+from app.services.tenant_snapshot import TenantSnapshot, get_tenant_snapshot
 from config import settings
 
 
@@ -15,9 +16,9 @@ def _is_kill_switch_all_enabled() -> bool:
     return raw in {"1", "true", "yes", "on"}
 
 
-async def enforce_module_access(
+def check_module_access(
+    snapshot: Optional[TenantSnapshot],
     *,
-    session: AsyncSession,
     tenant_id: str,
     module_key: str,
 ) -> None:
@@ -27,6 +28,8 @@ async def enforce_module_access(
     1) Global kill switch (ENV: KILL_SWITCH_ALL=true) => 503 for non-core modules
     2) Tenant kill switch (tenant.features.kill_switches[module_key] == true) => 503
     3) Feature flag (tenant.features[required_flag] == true) => 403
+
+    ``snapshot`` is None for an unknown tenant, which has no features enabled.
     """
 
     mod = FEATURE_CATALOG.get(module_key)
@@ -43,13 +46,8 @@ async def enforce_module_access(
             details={"module": module_key, "reason": "global_kill_switch"},
         )
 
-    res = await session.execute(select(Tenant).where(Tenant.id == tenant_id))
-    tenant = res.scalars().first()
-    features = (tenant.features if tenant else {}) or {}
-
     # 2) Tenant kill switch
-    kill_switches = (features.get("kill_switches") or {}) if isinstance(features, dict) else {}
-    if kill_switches.get(module_key) is True:
+    if snapshot is not None and snapshot.module_killed(module_key):
         raise AppError(
             error_code="MODULE_DISABLED",
             message="Module disabled",
@@ -59,10 +57,25 @@ async def enforce_module_access(
 
     # 3) Feature flag
     flag = mod.required_flag
-    if features.get(flag) is not True:
+    if snapshot is None or not snapshot.feature_enabled(flag):
         raise AppError(
             error_code="FEATURE_DISABLED",
             message="Feature is disabled for this tenant",
             status_code=403,
             details={"feature": flag, "module": module_key},
         )
+
+
+async def enforce_module_access(
+    *,
+    session: AsyncSession,
+    tenant_id: str,
+    module_key: str,
+) -> None:
+    """``check_module_access`` against the cached tenant snapshot.
+
+    Only a snapshot cache miss touches ``session``.
+    """
+
+    snapshot = await get_tenant_snapshot(session, tenant_id)
+    check_module_access(snapshot, tenant_id=tenant_id, module_key=module_key)
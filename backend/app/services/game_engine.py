@@ -19,6 +19,8 @@ from app.services.wallet_ledger import (
 from app.core.errors import AppError
 from app.core.metrics import metrics
 from app.services.risk_service import RiskService
+from app.services.wagering_engine import apply_wagering_contribution
+from app.services.vip_engine import WAGER_POINTS_PER_UNIT, vip_accrual
 from app.core.redis_client import get_redis
 
 logger = logging.getLogger(__name__)
@@ -114,6 +116,24 @@ class GameEngine:
             if not success:
                 return await self._get_wallet_snapshot(session, player_id, currency)
 
+            # 4b. Bonus wagering progress (same transaction as the debit)
+            await apply_wagering_contribution(
+                session,
+                tenant_id=game.tenant_id,
+                player_id=player_id,
+                game=game,
+                bet_amount=amount,
+            )
+
+            # 4c. VIP points: staged on the session, written in batches after commit
+            vip_accrual.stage(
+                session,
+                tenant_id=game.tenant_id,
+                player_id=player_id,
+                points=amount * WAGER_POINTS_PER_UNIT,
+                source_ref=round_obj.id,
+            )
+
             # 5. Record Game Event
             event = GameEvent(
                 round_id=round_obj.id,
@@ -1,16 +1,42 @@
 from __future__ import annotations
 
+import io
 import json
+import logging
 import os
+import time
+import uuid
 import zipfile
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
 
 from fastapi import UploadFile
+from sqlalchemy import JSON, and_, cast, func, insert, literal, or_, select, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.game_import_sql import GameImportItem, GameImportJob
+from app.models.game_models import Game
+
+logger = logging.getLogger(__name__)
 
 
 MAX_UPLOAD_BYTES = 50 * 1024 * 1024
-MAX_ITEMS = 10_000
+MAX_ITEMS = 100_000
+
+# Rows per staging INSERT / per import upsert+commit.
+VALIDATION_BATCH = 1000
+IMPORT_CHUNK_SIZE = 1000
+# An ``importing`` job whose progress (updated_at, bumped per chunk) is older
+# than this lost its worker and may be claimed again.
+IMPORT_STALE_SECONDS = 600
+ERRORS_PREVIEW = 20
+
+_READ_CHUNK = 64 * 1024
 
 
 @dataclass
@@ -85,49 +111,138 @@ def _select_zip_member(zf: zipfile.ZipFile) -> str:
     raise ValueError("ZIP_NO_JSON")
 
 
-def extract_json_bytes(stored: StoredUpload) -> bytes:
+@contextmanager
+def open_json_stream(stored: StoredUpload) -> Iterator[IO[bytes]]:
+    """Binary stream over the JSON document (the upload or its zip member)."""
+
     if stored.file_type == "json":
         with open(stored.path, "rb") as f:
-            return f.read()
+            yield f
+        return
 
     if stored.file_type != "zip":
         raise ValueError("UNSUPPORTED_FILE")
 
     with zipfile.ZipFile(stored.path, "r") as zf:
         member = _select_zip_member(zf)
-        data = zf.read(member)
-        return data
-
-
-def parse_items(json_bytes: bytes) -> List[Dict[str, Any]]:
-    try:
-        obj = json.loads(json_bytes.decode("utf-8"))
-    except Exception as exc:
-        raise ValueError("JSON_PARSE_ERROR") from exc
-
-    if isinstance(obj, list):
-        items = obj
-    elif isinstance(obj, dict):
-        # common schema: {items:[...]}
-        items = obj.get("items")
-        if items is None and "games" in obj and isinstance(obj.get("games"), list):
-            items = obj.get("games")
-    else:
-        items = None
+        with zf.open(member) as f:
+            yield f
 
-    if not isinstance(items, list):
-        raise ValueError("JSON_SCHEMA_INVALID")
 
-    if len(items) > MAX_ITEMS:
-        raise ValueError("TOO_MANY_ITEMS")
+class _JsonItemStream:
+    """Incremental reader for the bundle's item array.
 
-    out: List[Dict[str, Any]] = []
-    for it in items:
-        if isinstance(it, dict):
-            out.append(it)
-        else:
-            out.append({"value": it})
-    return out
+    Accepts a top-level list or an object holding it under ``items`` /
+    ``games``. Elements are decoded one at a time with ``raw_decode`` over a
+    sliding text buffer, so memory stays at one read chunk plus one item.
+    """
+
+    def __init__(self, raw: IO[bytes]):
+        self._text = io.TextIOWrapper(raw, encoding="utf-8")
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        try:
+            chunk = self._text.read(_READ_CHUNK)
+        except UnicodeDecodeError as exc:
+            raise ValueError("JSON_PARSE_ERROR") from exc
+        if not chunk:
+            self._eof = True
+            return False
+        if self._pos > _READ_CHUNK:
+            self._buf = self._buf[self._pos :]
+            self._pos = 0
+        self._buf += chunk
+        return True
+
+    def _peek(self) -> str:
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in " \t\r\n":
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, chars: str) -> str:
+        ch = self._peek()
+        if not ch or ch not in chars:
+            raise ValueError("JSON_PARSE_ERROR")
+        self._pos += 1
+        return ch
+
+    def _value(self) -> Any:
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise ValueError("JSON_PARSE_ERROR")
+            # A scalar ending at the buffer edge may continue in the next chunk.
+            if end == len(self._buf) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def _array(self) -> Iterator[Any]:
+        self._expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self._value()
+            if self._expect(",]") == "]":
+                return
+
+    def items(self) -> Iterator[Any]:
+        head = self._peek()
+        if head == "[":
+            yield from self._array()
+            return
+        if head != "{":
+            if not head:
+                raise ValueError("JSON_PARSE_ERROR")
+            # Valid JSON that is not a list/object.
+            self._value()
+            raise ValueError("JSON_SCHEMA_INVALID")
+
+        self._expect("{")
+        if self._peek() == "}":
+            raise ValueError("JSON_SCHEMA_INVALID")
+        while True:
+            key = self._value()
+            self._expect(":")
+            if key in ("items", "games"):
+                if self._peek() != "[":
+                    raise ValueError("JSON_SCHEMA_INVALID")
+                yield from self._array()
+                return
+            self._value()
+            if self._expect(",}") == "}":
+                raise ValueError("JSON_SCHEMA_INVALID")
+
+
+def iter_items(stored: StoredUpload) -> Iterator[Dict[str, Any]]:
+    """Stream bundle items without loading the document.
+
+    Same accepted shapes as before: ``[...]``, ``{"items": [...]}`` or
+    ``{"games": [...]}``; non-object elements are wrapped as ``{"value": x}``.
+    """
+
+    with open_json_stream(stored) as raw:
+        count = 0
+        for it in _JsonItemStream(raw).items():
+            count += 1
+            if count > MAX_ITEMS:
+                raise ValueError("TOO_MANY_ITEMS")
+            yield it if isinstance(it, dict) else {"value": it}
 
 
 def normalize_item(raw: Dict[str, Any]) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[str], Optional[float], List[str]]:
@@ -165,3 +280,244 @@ def normalize_item(raw: Dict[str, Any]) -> Tuple[Optional[str], Optional[str], O
             errors.append("INVALID_RTP")
 
     return external_id, (str(provider_id).strip() if provider_id else None), name, gtype, rtp, errors
+
+
+@dataclass
+class StagingResult:
+    total_items: int
+    total_errors: int
+    errors_preview: List[Dict[str, Any]]
+
+
+async def stage_items(session: AsyncSession, job: GameImportJob, stored: StoredUpload) -> StagingResult:
+    """Validate the streamed bundle into ``GameImportItem`` rows, one INSERT per batch.
+
+    Does not commit; the caller commits together with the job counters (or
+    rolls back on ``ValueError``).
+    """
+
+    total = 0
+    total_errors = 0
+    preview: List[Dict[str, Any]] = []
+    batch: List[Dict[str, Any]] = []
+    now = datetime.utcnow()
+
+    for raw in iter_items(stored):
+        external_id, provider_id, name, gtype, rtp, errs = normalize_item(raw)
+        total += 1
+        if errs:
+            total_errors += 1
+            if len(preview) < ERRORS_PREVIEW:
+                preview.append({"external_id": external_id, "errors": errs})
+
+        batch.append(
+            {
+                "id": str(uuid.uuid4()),
+                "job_id": job.id,
+                "tenant_id": job.tenant_id,
+                "provider_id": provider_id,
+                "external_id": external_id or "",
+                "name": name,
+                "type": gtype,
+                "rtp": rtp,
+                "status": "valid" if not errs else "invalid",
+                "errors": errs,
+                "payload": raw,
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+        if len(batch) >= VALIDATION_BATCH:
+            await session.execute(insert(GameImportItem), batch)
+            batch = []
+
+    if batch:
+        await session.execute(insert(GameImportItem), batch)
+
+    return StagingResult(total_items=total, total_errors=total_errors, errors_preview=preview)
+
+
+def _upsert_games(dialect_name: str):
+    """``INSERT ... ON CONFLICT (tenant_id, provider_id, external_id) DO UPDATE``.
+
+    Catalog fields are overwritten; ``configuration`` keeps its other keys and
+    only ``import_payload`` is replaced, as the per-row importer did. Executed
+    with a list of rows, so the statement compiles once and is sent as
+    multi-row VALUES batches (insertmanyvalues).
+    """
+
+    table = Game.__table__
+    if dialect_name == "postgresql":
+        stmt = pg_insert(table)
+        existing = func.coalesce(cast(table.c.configuration, JSONB), cast(literal("{}"), JSONB))
+        payload = cast(stmt.excluded.configuration, JSONB).op("->")("import_payload")
+        configuration = cast(existing.op("||")(func.jsonb_build_object("import_payload", payload)), JSON)
+    else:
+        stmt = sqlite_insert(table)
+        configuration = func.json_set(
+            func.coalesce(table.c.configuration, "{}"),
+            "$.import_payload",
+            func.json(func.json_extract(stmt.excluded.configuration, "$.import_payload")),
+        )
+
+    return stmt.on_conflict_do_update(
+        index_elements=["tenant_id", "provider_id", "external_id"],
+        set_={
+            "name": stmt.excluded.name,
+            "provider": stmt.excluded.provider,
+            "category": stmt.excluded.category,
+            "type": stmt.excluded.type,
+            "rtp": stmt.excluded.rtp,
+            "is_active": True,
+            "configuration": configuration,
+        },
+    )
+
+
+def _game_row(tenant_id: str, item: Any) -> Dict[str, Any]:
+    payload = item.payload if isinstance(item.payload, dict) else {}
+    provider_id = item.provider_id or payload.get("provider_id") or "unknown"
+    gtype = item.type or "slot"
+    return {
+        "id": str(uuid.uuid4()),
+        "tenant_id": tenant_id,
+        "provider_id": provider_id,
+        "external_id": item.external_id,
+        "type": gtype,
+        "rtp": item.rtp if item.rtp is not None else 96.5,
+        "is_active": True,
+        "name": item.name or item.external_id,
+        "provider": provider_id,
+        "category": gtype,
+        "status": "active",
+        "configuration": {"import_payload": item.payload},
+        "created_at": datetime.utcnow(),
+    }
+
+
+# Plain rows, not ORM objects: nothing accumulates in the identity map.
+_IMPORT_COLUMNS = (
+    GameImportItem.id,
+    GameImportItem.provider_id,
+    GameImportItem.external_id,
+    GameImportItem.name,
+    GameImportItem.type,
+    GameImportItem.rtp,
+    GameImportItem.payload,
+)
+
+
+def import_in_progress(job: GameImportJob, now: Optional[datetime] = None) -> bool:
+    """True while a live worker holds the job (``importing`` with recent progress)."""
+
+    if job.status != "importing" or job.updated_at is None:
+        return False
+    return job.updated_at > (now or datetime.utcnow()) - timedelta(seconds=IMPORT_STALE_SECONDS)
+
+
+async def claim_import_job(session: AsyncSession, job_id: str, now: Optional[datetime] = None) -> bool:
+    """Move a ``ready`` (or stale ``importing``) job to ``importing``; the caller commits.
+
+    Conditional UPDATE, so concurrent clicks queue a single import. A stale
+    claim is taken over and the new run continues with the items not yet
+    imported.
+    """
+
+    now = now or datetime.utcnow()
+    stale_before = now - timedelta(seconds=IMPORT_STALE_SECONDS)
+    claimed = await session.execute(
+        update(GameImportJob)
+        .where(
+            GameImportJob.id == job_id,
+            or_(
+                GameImportJob.status == "ready",
+                and_(GameImportJob.status == "importing", GameImportJob.updated_at < stale_before),
+            ),
+        )
+        .values(status="importing", updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    return claimed.rowcount == 1
+
+
+async def import_staged_items(
+    session: AsyncSession,
+    job: GameImportJob,
+    *,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+) -> Dict[str, Any]:
+    """Upsert a job's valid staged items into ``game`` in committed chunks.
+
+    Walks items by id (keyset), so a re-run after a crash continues with the
+    rows not yet marked ``imported``; the upsert itself is idempotent.
+    ``job.total_imported`` is committed with every chunk as progress.
+    """
+
+    started = time.perf_counter()
+    upsert = _upsert_games(session.get_bind().dialect.name)
+    tenant_id = job.tenant_id
+    job_id = job.id
+    imported = job.total_imported or 0
+    last_id = ""
+
+    def _pending(after: str):
+        # Staging marks error-free rows ``valid``; a single status keeps the
+        # (job_id, status, id) index walk sort-free.
+        return (
+            GameImportItem.job_id == job_id,
+            GameImportItem.tenant_id == tenant_id,
+            GameImportItem.status == "valid",
+            GameImportItem.id > after,
+        )
+
+    while True:
+        items = (
+            await session.execute(
+                select(*_IMPORT_COLUMNS).where(*_pending(last_id)).order_by(GameImportItem.id).limit(chunk_size)
+            )
+        ).all()
+        if not items:
+            break
+
+        # One row per key per statement: Postgres rejects a second update of
+        # the same target row within one INSERT ... ON CONFLICT.
+        rows: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for it in items:
+            row = _game_row(tenant_id, it)
+            rows[(row["provider_id"], row["external_id"])] = row
+        await session.execute(upsert, list(rows.values()))
+
+        now = datetime.utcnow()
+        await session.execute(
+            update(GameImportItem)
+            .where(*_pending(last_id), GameImportItem.id <= items[-1].id)
+            .values(status="imported", updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        last_id = items[-1].id
+        imported += len(items)
+        await session.execute(
+            update(GameImportJob)
+            .where(GameImportJob.id == job_id)
+            .values(total_imported=imported, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+
+    duration = time.perf_counter() - started
+    await session.execute(
+        update(GameImportJob)
+        .where(GameImportJob.id == job_id)
+        .values(status="completed", total_imported=imported, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+
+    stats = {
+        "job_id": job_id,
+        "imported_count": imported,
+        "duration_ms": round(duration * 1000, 1),
+        "games_per_sec": round(imported / duration, 1) if duration > 0 else None,
+    }
+    logger.info("game_import.import.completed", extra={"event": "game_import.import.completed", "tenant_id": tenant_id, **stats})
+    return stats
@@ -1,3 +1,8 @@
+import logging
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
 mismatch_counter = 0
 
 
@@ -17,3 +22,16 @@ def record_balance_mismatch(
     global mismatch_counter
     mismatch_counter += 1
     # TODO: add structured logging here if needed
+
+
+def record_balance_mismatches(*, run_id: str, counts: Dict[str, int]) -> None:
+    """Bulk counterpart of ``record_balance_mismatch`` for verification runs."""
+
+    global mismatch_counter
+    total = sum(counts.values())
+    mismatch_counter += total
+    if total:
+        logger.warning(
+            "ledger.verify.mismatches",
+            extra={"event": "ledger.verify.mismatches", "run_id": run_id, "total": total, "by_kind": dict(counts)},
+        )
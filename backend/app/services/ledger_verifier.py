@@ -0,0 +1,288 @@
+"""Full-ledger balance verification.
+
+Recomputes every (tenant, player, currency) balance from ``LedgerTransaction``
+and compares it with the ``WalletBalance`` snapshot and the ``Player`` mirror.
+
+Wallet events carry ``amount = |delta_available| + |delta_held|`` with the
+direction of the net, so the split is only recoverable for the known
+statuses below. The verifier therefore derives two quantities:
+
+- ``spendable``: real available + bonus available (bets draw from both),
+- ``held``: real funds reserved by pending withdrawals.
+
+The player id space is split into ranges (ids are uuid4, so hex prefixes
+hash evenly); ``workers`` sessions take ranges from a queue. Each range is
+read in its own short read-only transaction (REPEATABLE READ on Postgres, so
+the ledger sums and the snapshots come from one snapshot) and never takes row
+locks, so it can run against a replica or the primary without blocking
+writers. Findings go to ``LedgerBalanceFinding`` in bulk through the
+separate ``session_factory``.
+
+Snapshots seeded from Player balances that predate the ledger show up as
+``ledger_*`` findings until an opening event is recorded for them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, case, func, insert, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.core.database import async_session
+from app.models.sql_models import Player
+from app.repositories.ledger_repo import LedgerBalanceFinding, LedgerTransaction, WalletBalance
+from app.services import ledger_telemetry
+
+logger = logging.getLogger(__name__)
+
+TOLERANCE = 0.005
+FINDINGS_BATCH = 1000
+_STREAM_BATCH = 5000
+
+# Ledger types that move WalletBalance; others (poker_*, chargeback_fee, ...) are side journals.
+BALANCE_TYPES = ("wallet", "deposit", "withdraw")
+# available -> held: amount = 2x the reserved sum.
+HOLD_STATUSES = ("withdraw_requested",)
+# held -> available: amount = 2x the released sum.
+RELEASE_STATUSES = ("withdraw_rejected",)
+# held leaves the wallet.
+SETTLE_HELD_STATUSES = ("withdraw_paid", "withdrawal_succeeded")
+
+IdRange = Tuple[str, Optional[str]]
+
+
+def id_ranges(shards: int) -> List[IdRange]:
+    """Split the player id space into ``shards`` contiguous ``[lo, hi)`` ranges (hi None = open)."""
+
+    shards = max(1, min(shards, 4096))
+    bounds = [""] + [f"{(i * 4096) // shards:03x}" for i in range(1, shards)]
+    return [(lo, bounds[i + 1] if i + 1 < len(bounds) else None) for i, lo in enumerate(bounds)]
+
+
+def _in_range(column, id_range: IdRange):
+    lo, hi = id_range
+    clause = column >= lo
+    return and_(clause, column < hi) if hi is not None else clause
+
+
+def _ledger_aggregate(id_range: IdRange, tenant_id: Optional[str]):
+    lt = LedgerTransaction
+    signed = case((lt.direction == "credit", lt.amount), else_=-lt.amount)
+    spendable = case(
+        (lt.status.in_(HOLD_STATUSES), -lt.amount / 2),
+        (lt.status.in_(RELEASE_STATUSES), lt.amount / 2),
+        (lt.status.in_(SETTLE_HELD_STATUSES), 0.0),
+        else_=signed,
+    )
+    held = case(
+        (lt.status.in_(HOLD_STATUSES), lt.amount / 2),
+        (lt.status.in_(RELEASE_STATUSES), -lt.amount / 2),
+        (lt.status.in_(SETTLE_HELD_STATUSES), signed),
+        else_=0.0,
+    )
+    stmt = (
+        select(
+            lt.tenant_id,
+            lt.player_id,
+            lt.currency,
+            func.sum(spendable),
+            func.sum(held),
+            func.count(),
+        )
+        .where(lt.type.in_(BALANCE_TYPES), _in_range(lt.player_id, id_range))
+        .group_by(lt.tenant_id, lt.player_id, lt.currency)
+    )
+    if tenant_id:
+        stmt = stmt.where(lt.tenant_id == tenant_id)
+    return stmt
+
+
+def _snapshots(id_range: IdRange, tenant_id: Optional[str]):
+    wb = WalletBalance
+    stmt = (
+        select(
+            wb.tenant_id,
+            wb.player_id,
+            wb.currency,
+            wb.balance_real_available,
+            wb.balance_real_pending,
+            wb.balance_bonus_available,
+            Player.balance_real_available,
+            Player.balance_real_held,
+            Player.balance_bonus,
+        )
+        .outerjoin(Player, Player.id == wb.player_id)
+        .where(_in_range(wb.player_id, id_range))
+    )
+    if tenant_id:
+        stmt = stmt.where(wb.tenant_id == tenant_id)
+    return stmt
+
+
+def _drift(expected: float, actual: float, tolerance: float) -> bool:
+    return abs(float(expected or 0.0) - float(actual or 0.0)) > tolerance
+
+
+def _player_findings(snapshot, tolerance: float) -> List[Tuple[str, float, float]]:
+    _t, _p, _c, avail, pending, bonus, p_avail, p_held, p_bonus = snapshot
+    if p_avail is None:
+        return []
+    pairs = (
+        ("player_available", avail, p_avail),
+        ("player_held", pending, p_held),
+        ("player_bonus", bonus, p_bonus),
+    )
+    return [(kind, exp, act) for kind, exp, act in pairs if _drift(exp, act, tolerance)]
+
+
+async def _begin_read(session: AsyncSession) -> None:
+    if session.bind.dialect.name == "postgresql":
+        await session.execute(text("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY"))
+
+
+async def verify_range(
+    session: AsyncSession,
+    id_range: IdRange,
+    *,
+    run_id: str,
+    tenant_id: Optional[str] = None,
+    tolerance: float = TOLERANCE,
+) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """Compare ledger-derived balances with the snapshots for one id range.
+
+    Returns ``(findings, counts)``; findings are insert-ready rows. The read
+    transaction is closed before returning.
+    """
+
+    now = datetime.utcnow()
+    findings: List[Dict[str, Any]] = []
+    counts = {"groups": 0, "ledger_rows": 0}
+
+    def add(key, kind, expected, actual):
+        findings.append(
+            {
+                "id": str(uuid.uuid4()),
+                "run_id": run_id,
+                "tenant_id": key[0],
+                "player_id": key[1],
+                "currency": key[2],
+                "kind": kind,
+                "expected": expected,
+                "actual": actual,
+                "created_at": now,
+            }
+        )
+
+    try:
+        await _begin_read(session)
+        # One row per wallet: bounded by the range size, unlike the ledger side.
+        snapshots = {tuple(r[:3]): r for r in (await session.execute(_snapshots(id_range, tenant_id))).all()}
+        players_per_wallet = Counter((k[0], k[1]) for k in snapshots)
+
+        result = await session.stream(_ledger_aggregate(id_range, tenant_id).execution_options(yield_per=_STREAM_BATCH))
+        async for tenant, player_id, currency, spendable, held, rows in result:
+            key = (tenant, player_id, currency)
+            counts["groups"] += 1
+            counts["ledger_rows"] += int(rows)
+            snap = snapshots.pop(key, None)
+            if snap is None:
+                add(key, "wallet_missing", float(spendable or 0.0), None)
+                continue
+            wallet_spendable = float(snap[3] or 0.0) + float(snap[5] or 0.0)
+            if _drift(spendable, wallet_spendable, tolerance):
+                add(key, "ledger_spendable", float(spendable or 0.0), wallet_spendable)
+            if _drift(held, snap[4], tolerance):
+                add(key, "ledger_held", float(held or 0.0), float(snap[4] or 0.0))
+            # Player carries no currency: only single-wallet players can be compared.
+            if players_per_wallet[(tenant, player_id)] == 1:
+                for kind, exp, act in _player_findings(snap, tolerance):
+                    add(key, kind, exp, act)
+
+        # Wallets without balance-moving ledger events derive to zero.
+        for key, snap in snapshots.items():
+            counts["groups"] += 1
+            if _drift(0.0, float(snap[3] or 0.0) + float(snap[5] or 0.0), tolerance):
+                add(key, "ledger_spendable", 0.0, float(snap[3] or 0.0) + float(snap[5] or 0.0))
+            if _drift(0.0, snap[4], tolerance):
+                add(key, "ledger_held", 0.0, float(snap[4] or 0.0))
+            if players_per_wallet[(key[0], key[1])] == 1:
+                for kind, exp, act in _player_findings(snap, tolerance):
+                    add(key, kind, exp, act)
+    finally:
+        await session.rollback()
+
+    return findings, counts
+
+
+async def _store_findings(session: AsyncSession, findings: List[Dict[str, Any]]) -> None:
+    for start in range(0, len(findings), FINDINGS_BATCH):
+        await session.execute(insert(LedgerBalanceFinding), findings[start : start + FINDINGS_BATCH])
+    await session.commit()
+
+
+async def verify_ledger_balances(
+    *,
+    tenant_id: Optional[str] = None,
+    shards: int = 256,
+    workers: int = 4,
+    tolerance: float = TOLERANCE,
+    persist: bool = True,
+    run_id: Optional[str] = None,
+    session_factory: Callable = async_session,
+    read_session_factory: Optional[Callable] = None,
+) -> Dict[str, Any]:
+    """Verify every wallet against the ledger across ``workers`` concurrent sessions.
+
+    ``read_session_factory`` (defaults to ``session_factory``) serves the scans;
+    findings are written through ``session_factory`` when ``persist`` is set.
+    """
+
+    run_id = run_id or str(uuid.uuid4())
+    read_factory = read_session_factory or session_factory
+    started = time.perf_counter()
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for id_range in id_ranges(shards):
+        queue.put_nowait(id_range)
+
+    totals: Counter = Counter()
+    kinds: Counter = Counter()
+
+    async def worker() -> None:
+        async with read_factory() as reader, session_factory() as writer:
+            while True:
+                try:
+                    id_range = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                findings, counts = await verify_range(
+                    reader, id_range, run_id=run_id, tenant_id=tenant_id, tolerance=tolerance
+                )
+                totals.update(counts)
+                totals["ranges"] += 1
+                kinds.update(f["kind"] for f in findings)
+                if persist and findings:
+                    await _store_findings(writer, findings)
+
+    await asyncio.gather(*(worker() for _ in range(max(1, workers))))
+
+    ledger_telemetry.record_balance_mismatches(run_id=run_id, counts=kinds)
+    duration = time.perf_counter() - started
+    return {
+        "run_id": run_id,
+        "ranges": totals["ranges"],
+        "groups": totals["groups"],
+        "ledger_rows": totals["ledger_rows"],
+        "mismatches": sum(kinds.values()),
+        "by_kind": dict(kinds),
+        "duration_ms": round(duration * 1000, 1),
+        "groups_per_sec": round(totals["groups"] / duration, 1) if duration > 0 else None,
+    }
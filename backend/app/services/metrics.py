@@ -1,22 +1,28 @@
 import logging
 from collections import defaultdict
-from typing import Dict
+from typing import Dict, Optional
+
+from app.core.metrics import RequestWindow, metrics as prom, request_window
 
 logger = logging.getLogger(__name__)
 
 class MetricsService:
-    def __init__(self):
-        # Sliding window for error rates (last 1000 requests?)
-        # Or just simple counters since startup
-        self.request_count = 0
-        self.error_count_4xx = 0
-        self.error_count_5xx = 0
-        
+    """Ops dashboard view over the metrics subsystem (``app.core.metrics``).
+
+    Every record_* call also updates the Prometheus series; the instance keeps
+    the counts behind the dashboard thresholds. HTTP request/error counts come
+    from a sliding ``RequestWindow`` (the shared one fed by MetricsMiddleware
+    for the module singleton).
+    """
+
+    def __init__(self, window: Optional[RequestWindow] = None):
+        self.window = window or RequestWindow()
+
         # Specific counters
         self.webhook_events = defaultdict(int)
         self.webhook_failures = defaultdict(int)
         self.webhook_signatures_failed = defaultdict(int)
-        
+
         self.payout_attempts = 0
         self.payout_success = 0
         self.payout_failed = 0
@@ -29,54 +35,79 @@ class MetricsService:
         self.risk_blocks = 0
         self.risk_flags = 0
         self.risk_score_updates = 0
+
+    # Totals since start (process-local)
+    @property
+    def request_count(self) -> int:
+        return self.window.totals[RequestWindow.REQUESTS]
+
+    @property
+    def error_count_4xx(self) -> int:
+        return self.window.totals[RequestWindow.ERRORS_4XX]
+
+    @property
+    def error_count_5xx(self) -> int:
+        return self.window.totals[RequestWindow.ERRORS_5XX]
+
     def increment_request(self):
-        self.request_count += 1
+        self.window.add(RequestWindow.REQUESTS)
 
     def increment_error_4xx(self):
-        self.error_count_4xx += 1
+        self.window.add(RequestWindow.ERRORS_4XX)
 
     def increment_error_5xx(self):
-        self.error_count_5xx += 1
+        self.window.add(RequestWindow.ERRORS_5XX)
 
     def record_webhook_event(self, provider: str, status: str):
         key = f"{provider}_{status}"
         self.webhook_events[key] += 1
+        prom.webhook_events_total.labels(provider, status).inc()
         if status != "success":
             self.webhook_failures[provider] += 1
 
     def record_webhook_replay(self):
         self.webhook_replay_deduped += 1
+        prom.webhook_replays_deduped_total.inc()
 
     def record_payout_attempt(self):
         self.payout_attempts += 1
+        prom.payout_attempts_total.inc()
 
     def record_payout_result(self, success: bool):
         if success:
             self.payout_success += 1
         else:
             self.payout_failed += 1
+        prom.payout_results_total.labels(result="success" if success else "failed").inc()
 
     def record_webhook_signature_failure(self, provider: str):
         self.webhook_signatures_failed[provider] += 1
         self.webhook_signature_invalid += 1
+        prom.webhook_signature_failures_total.labels(provider).inc()
 
     def record_reconciliation_result(self, findings: int, critical: int):
         self.reconciliation_runs += 1
         self.reconciliation_findings += findings
         self.reconciliation_critical += critical
-        
+        prom.reconciliation_runs_total.inc()
+        prom.reconciliation_findings_total.labels(severity="critical").inc(critical)
+        prom.reconciliation_findings_total.labels(severity="warning").inc(max(0, findings - critical))
+        if critical > 0:
+            logger.error(f"[ALERT] Critical Reconciliation Findings Detected: {critical}")
+
     def record_risk_block(self):
         self.risk_blocks += 1
+        prom.risk_blocks.inc()
 
     def record_risk_flag(self):
         self.risk_flags += 1
+        prom.risk_flags.inc()
 
     def record_risk_score_update(self):
         self.risk_score_updates += 1
-        if critical > 0:
-            logger.error(f"[ALERT] Critical Reconciliation Findings Detected: {critical}")
+        prom.risk_score_updates.inc()
 
-    def get_metrics(self) -> Dict:
+    def get_metrics(self, window_seconds: int = 300) -> Dict:
         # Calculate failure rate
         payout_failure_rate = 0.0
         if self.payout_attempts > 0:
@@ -85,18 +116,19 @@ class MetricsService:
         # Threshold Evaluation
         status = "healthy"
         alerts = []
-        
+
         if payout_failure_rate > 0.15:
             status = "critical"
             alerts.append("Payout Failure Rate > 15%")
         elif payout_failure_rate > 0.05:
             status = "warning"
             alerts.append("Payout Failure Rate > 5%")
-            
+
         if self.reconciliation_critical > 0:
             status = "critical"
             alerts.append("Critical Reconciliation Findings")
 
+        recent = self.window.rates(window_seconds)
         return {
             "status": status,
             "alerts": alerts,
@@ -104,7 +136,9 @@ class MetricsService:
                 "total_requests": self.request_count,
                 "errors_4xx": self.error_count_4xx,
                 "errors_5xx": self.error_count_5xx,
-                "error_rate_5xx": (self.error_count_5xx / self.request_count) if self.request_count > 0 else 0
+                # Rates over the recent window, not since start.
+                "error_rate_5xx": recent["error_rate_5xx"],
+                "recent": recent,
             },
             "webhooks": {
                 "events": dict(self.webhook_events),
@@ -132,5 +166,5 @@ class MetricsService:
             }
         }
 
-# Singleton instance
-metrics = MetricsService()
+# Singleton instance (HTTP counts come from MetricsMiddleware via the shared window)
+metrics = MetricsService(window=request_window)
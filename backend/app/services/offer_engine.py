@@ -1,9 +1,8 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import select
 
-from app.models.offer_models import Offer, OfferDecisionRecord, Experiment
+from app.models.offer_models import OfferDecisionRecord
 from app.models.sql_models import Player
-from app.services.experiment_engine import ExperimentEngine
+from app.services.experiment_engine import ExperimentEngine, offer_definitions
 
 class OfferEngine:
     
@@ -30,45 +29,46 @@ class OfferEngine:
         # 3. Experiment Overlay
         # Is there an experiment for this trigger?
         # e.g. "welcome_offer_ab" for "first_deposit"
+        # Definitions and assignments come from the per-tenant caches (no DB reads).
+        catalog = await offer_definitions.get(session, tenant_id)
         exp_key = f"exp_{trigger_event}"
         variant = await self.exp_engine.get_assignment(session, tenant_id, player_id, exp_key)
-        
+        experiment = catalog.running_experiment(exp_key)
+
         # 4. Select Offer based on Variant/Logic
         # Logic: If variant A -> Offer 1, Variant B -> Offer 2
         # MVP: Hardcoded mapping or lookup
-        
+
         selected_offer_id = None
-        
-        if variant and variant != "control":
-            # Find experiment to get config
-            stmt = select(Experiment).where(Experiment.tenant_id == tenant_id, Experiment.key == exp_key)
-            exp = (await session.execute(stmt)).scalars().first()
-            if exp:
-                variant_config = exp.variants.get(variant, {})
-                selected_offer_id = variant_config.get("offer_id")
-        
+
+        if variant and variant != "control" and experiment is not None:
+            variant_config = experiment.variants.get(variant, {})
+            selected_offer_id = variant_config.get("offer_id")
+
         # If no experiment or control, use Default Logic (Best Offer)
         if not selected_offer_id:
-            # Simple Default: Find active offer matching trigger
-            # (Requires Offer model to have 'trigger' field or similar. 
-            #  For now, we query active offers and pick first valid)
-            stmt_off = select(Offer).where(Offer.tenant_id == tenant_id, Offer.is_active == True)
-            offers = (await session.execute(stmt_off)).scalars().all()
-            if offers:
-                selected_offer_id = offers[0].id # Naive pick
-        
+            # Simple Default: first active offer for the tenant
+            # (Requires Offer model to have 'trigger' field or similar.)
+            if catalog.active_offer_ids:
+                selected_offer_id = catalog.active_offer_ids[0] # Naive pick
+
         if selected_offer_id:
-            return await self._log_decision(session, tenant_id, player_id, trigger_event, "granted", offer_id=selected_offer_id, variant=variant)
+            return await self._log_decision(
+                session, tenant_id, player_id, trigger_event, "granted",
+                offer_id=selected_offer_id, variant=variant,
+                experiment_id=experiment.id if experiment is not None else None,
+            )
         else:
             return await self._log_decision(session, tenant_id, player_id, trigger_event, "denied", reason="NO_OFFER_MATCH")
 
-    async def _log_decision(self, session: AsyncSession, tenant_id: str, player_id: str, trigger: str, decision: str, offer_id: str = None, variant: str = None, reason: str = None):
+    async def _log_decision(self, session: AsyncSession, tenant_id: str, player_id: str, trigger: str, decision: str, offer_id: str = None, variant: str = None, reason: str = None, experiment_id: str = None):
         record = OfferDecisionRecord(
             tenant_id=tenant_id,
             player_id=player_id,
             trigger_event=trigger,
             decision=decision,
             offer_id=offer_id,
+            experiment_id=experiment_id,
             variant=variant,
             deny_reason=reason
         )
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+from app.core.metrics import metrics
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def build_crypt_context(rounds: Optional[int] = None) -> CryptContext:
+    # Hashes with a different cost report needs_update() -> rehash on next login.
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__rounds=int(rounds or settings.password_bcrypt_rounds),
+    )
+
+
+# Shared by the sync helpers in app.utils.auth and the async hasher below.
+pwd_context = build_crypt_context()
+
+
+class PasswordHasher:
+    """Async bcrypt hashing on a dedicated, bounded thread pool.
+
+    bcrypt releases the GIL, so hashing in worker threads keeps the event loop
+    (and every provider callback sharing it) responsive. Admission is bounded
+    to ``workers + max_queue`` outstanding jobs; beyond that callers get a 429
+    instead of an ever-growing queue that would time out anyway.
+    """
+
+    def __init__(
+        self,
+        *,
+        workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        context: Optional[CryptContext] = None,
+    ) -> None:
+        self.workers = max(1, int(workers or settings.password_hash_workers))
+        self.max_queue = max(0, int(settings.password_hash_max_queue if max_queue is None else max_queue))
+        self.context = context or pwd_context
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._inflight = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.max_queue
+
+    @property
+    def inflight(self) -> int:
+        return self._inflight
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pwhash")
+        return self._executor
+
+    def _admit(self) -> None:
+        with self._lock:
+            if self._inflight >= self.capacity:
+                metrics.password_hash_rejected_total.inc()
+                logger.warning(
+                    "password_hasher.saturated",
+                    extra={"event": "password_hasher.saturated", "inflight": self._inflight, "capacity": self.capacity},
+                )
+                raise HTTPException(
+                    status_code=429,
+                    detail={"error_code": "AUTH_BUSY"},
+                    headers={"Retry-After": "1"},
+                )
+            self._inflight += 1
+            metrics.password_hash_queue_depth.set(max(0, self._inflight - self.workers))
+
+    def _release(self) -> None:
+        with self._lock:
+            self._inflight -= 1
+            metrics.password_hash_queue_depth.set(max(0, self._inflight - self.workers))
+
+    async def _run(self, operation: str, fn, *args):
+        self._admit()
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        try:
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self._release()
+            metrics.password_hash_seconds.labels(operation=operation).observe(time.perf_counter() - started)
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", self.context.hash, password)
+
+    async def verify(self, password: Optional[str], password_hash: Optional[str]) -> bool:
+        if not password or not password_hash:
+            return False
+        try:
+            return await self._run("verify", self.context.verify, password, password_hash)
+        except (ValueError, TypeError):
+            # Unknown / malformed hash
+            return False
+
+    async def verify_and_update(
+        self, password: Optional[str], password_hash: Optional[str]
+    ) -> Tuple[bool, Optional[str]]:
+        """Verify and, if the stored hash uses an outdated cost, return a fresh one.
+
+        Returns ``(ok, new_hash)``; ``new_hash`` is None unless the caller should
+        persist a rehash (same thread-pool job, no extra round trip).
+        """
+
+        if not password or not password_hash:
+            return False, None
+        try:
+            return await self._run("verify", self.context.verify_and_update, password, password_hash)
+        except (ValueError, TypeError):
+            return False, None
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher()
+
+
+async def hash_password(password: str) -> str:
+    return await password_hasher.hash(password)
+
+
+async def verify_password_async(password: Optional[str], password_hash: Optional[str]) -> bool:
+    return await password_hasher.verify(password, password_hash)
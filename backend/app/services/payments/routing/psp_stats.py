@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Rolling window made of fixed buckets; keys expire on their own so Redis
+# never holds more than WINDOW_BUCKETS buckets per (provider, currency).
+BUCKET_SECONDS = 60
+WINDOW_BUCKETS = 15
+
+# Beta prior so a PSP with a handful of attempts is neither trusted nor
+# punished too early (equivalent to 9 successes out of 10).
+PRIOR_SUCCESSES = 9.0
+PRIOR_ATTEMPTS = 10.0
+
+# Score penalty per second of average latency.
+LATENCY_WEIGHT_PER_SECOND = 0.05
+
+# attempts, successes, summed latency, attempts that reported a latency
+_FIELDS = ("n", "ok", "lat", "ln")
+
+
+def _key(provider: str, currency: str, bucket: int, field: str) -> str:
+    return f"psp:stats:{provider}:{currency}:{bucket}:{field}"
+
+
+def _bucket(now: Optional[float] = None) -> int:
+    return int((now if now is not None else time.time()) // BUCKET_SECONDS)
+
+
+async def record_attempt(
+    redis: Any,
+    *,
+    provider: str,
+    currency: str,
+    success: bool,
+    latency_ms: Optional[float] = None,
+    now: Optional[float] = None,
+) -> None:
+    """Add one authorization outcome to the provider's current bucket.
+
+    ``latency_ms`` is None for outcomes that arrive asynchronously (webhooks):
+    they count towards the success rate but not the average latency.
+    """
+
+    bucket = _bucket(now)
+    ttl = BUCKET_SECONDS * (WINDOW_BUCKETS + 1)
+    try:
+        pipe = redis.pipeline()
+        pipe.incr(_key(provider, currency, bucket, "n"))
+        pipe.expire(_key(provider, currency, bucket, "n"), ttl)
+        if success:
+            pipe.incr(_key(provider, currency, bucket, "ok"))
+            pipe.expire(_key(provider, currency, bucket, "ok"), ttl)
+        if latency_ms is not None:
+            pipe.incrbyfloat(_key(provider, currency, bucket, "lat"), float(latency_ms))
+            pipe.expire(_key(provider, currency, bucket, "lat"), ttl)
+            pipe.incr(_key(provider, currency, bucket, "ln"))
+            pipe.expire(_key(provider, currency, bucket, "ln"), ttl)
+        await pipe.execute()
+    except Exception as exc:
+        # Stats are advisory; never fail a payment on a Redis glitch.
+        logger.warning("psp_stats.record_failed", extra={"event": "psp_stats.record_failed", "error": str(exc)})
+
+
+async def get_stats(
+    redis: Any,
+    providers: List[str],
+    currency: str,
+    now: Optional[float] = None,
+) -> Dict[str, Dict[str, float]]:
+    """Return rolling attempts/success_rate/avg_latency_ms per provider (single MGET)."""
+
+    current = _bucket(now)
+    buckets = range(current - WINDOW_BUCKETS + 1, current + 1)
+    keys = [_key(p, currency, b, f) for p in providers for b in buckets for f in _FIELDS]
+
+    try:
+        values = await redis.mget(keys) if keys else []
+    except Exception as exc:
+        logger.warning("psp_stats.read_failed", extra={"event": "psp_stats.read_failed", "error": str(exc)})
+        values = [None] * len(keys)
+
+    out: Dict[str, Dict[str, float]] = {}
+    per_provider = WINDOW_BUCKETS * len(_FIELDS)
+    for i, provider in enumerate(providers):
+        chunk = values[i * per_provider : (i + 1) * per_provider]
+        totals = {f: 0.0 for f in _FIELDS}
+        for j, raw in enumerate(chunk):
+            if raw is not None:
+                totals[_FIELDS[j % len(_FIELDS)]] += float(raw)
+        attempts = totals["n"]
+        out[provider] = {
+            "attempts": attempts,
+            "success_rate": (totals["ok"] / attempts) if attempts else 0.0,
+            "avg_latency_ms": (totals["lat"] / totals["ln"]) if totals["ln"] else 0.0,
+        }
+    return out
+
+
+def score(stats: Dict[str, float]) -> float:
+    attempts = float(stats.get("attempts", 0.0))
+    successes = float(stats.get("success_rate", 0.0)) * attempts
+    smoothed = (successes + PRIOR_SUCCESSES) / (attempts + PRIOR_ATTEMPTS)
+    return smoothed - LATENCY_WEIGHT_PER_SECOND * float(stats.get("avg_latency_ms", 0.0)) / 1000.0
+
+
+async def rank_providers(
+    redis: Any,
+    providers: List[str],
+    currency: str,
+    now: Optional[float] = None,
+) -> List[str]:
+    """Order providers by score; ties keep the given (configured) order."""
+
+    if len(providers) < 2:
+        return list(providers)
+    stats = await get_stats(redis, providers, currency, now=now)
+    order = {p: i for i, p in enumerate(providers)}
+    return sorted(providers, key=lambda p: (-score(stats[p]), order[p]))
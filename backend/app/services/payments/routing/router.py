@@ -1,6 +1,10 @@
 from typing import List, Optional
 from app.services.payments.providers.base import PaymentProvider, MockProvider
 
+# Provider names reported by PSP adapters and webhooks -> routing candidate ids.
+PROVIDER_ROUTE_IDS = {"stripe": "stripe_mock", "adyen": "adyen_mock"}
+
+
 class PaymentRouter:
     def __init__(self):
         # In real world, load from DB/Config
@@ -23,3 +27,7 @@ class PaymentRouter:
 
     def get_provider(self, provider_id: str) -> Optional[PaymentProvider]:
         return self.providers.get(provider_id)
+
+    def route_id(self, provider: str) -> str:
+        """Candidate id that ``provider`` (as reported by a PSP) is ranked under."""
+        return PROVIDER_ROUTE_IDS.get(provider, provider)
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.core.cache_bus import publish_invalidation, register_invalidation_handler
+from app.models.payment_analytics_models import RoutingRule
+
+ROUTING_RULES_TOPIC = "payments.routing_rules"
+
+# Safety net in case an invalidation message is lost.
+ROUTING_TABLE_TTL_SECONDS = 300
+
+# Trie levels, most significant first. A rule's specificity is the
+# lexicographic order of "exact" vs "wildcard" across these levels, which is
+# what the previous ORDER BY tried to approximate.
+_LEVELS = ("tenant_id", "currency", "country", "method")
+
+
+def _created_key(rule: RoutingRule) -> datetime:
+    return rule.created_at.replace(tzinfo=None) if rule.created_at else datetime.min
+
+
+@dataclass
+class _Node:
+    children: Dict[Optional[str], "_Node"] = field(default_factory=dict)
+    providers: Optional[List[str]] = None
+
+
+class RoutingTable:
+    """Compiled, immutable routing trie for one tenant (plus global rules).
+
+    Each level keys on the exact value or ``None`` (wildcard). Lookup walks the
+    exact branch before the wildcard one, so the first full match is the most
+    specific rule; cost is bounded by 2^4 node visits regardless of rule count.
+    """
+
+    def __init__(self, rules: List[RoutingRule]):
+        self._root = _Node()
+        self.rule_count = 0
+        # Newest rule wins between rules with an identical key.
+        for rule in sorted(rules, key=_created_key):
+            if not rule.provider_priority:
+                continue
+            node = self._root
+            for level in _LEVELS:
+                key = getattr(rule, level)
+                node = node.children.setdefault(key or None, _Node())
+            node.providers = list(rule.provider_priority)
+            self.rule_count += 1
+
+    def resolve(self, *, tenant_id: str, currency: str, country: str, method: str) -> Optional[List[str]]:
+        keys = (tenant_id, currency, country, method)
+
+        def _walk(node: _Node, depth: int) -> Optional[List[str]]:
+            if depth == len(keys):
+                return node.providers
+            for key in (keys[depth], None):
+                child = node.children.get(key)
+                if child is not None:
+                    found = _walk(child, depth + 1)
+                    if found is not None:
+                        return found
+                if keys[depth] is None:
+                    break
+            return None
+
+        found = _walk(self._root, 0)
+        return list(found) if found is not None else None
+
+
+class RoutingTableCache:
+    """Per-tenant compiled routing tables, refreshed on invalidation or TTL."""
+
+    def __init__(self, ttl_seconds: int = ROUTING_TABLE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._tables: Dict[str, Tuple[RoutingTable, float]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        # Bumped on every invalidation so a load racing with a rule change
+        # does not publish a stale table.
+        self._generation = 0
+
+    def invalidate(self, tenant_id: Optional[str] = None) -> None:
+        self._generation += 1
+        # Global rules are compiled into every tenant table.
+        if tenant_id is None:
+            self._tables.clear()
+        else:
+            self._tables.pop(tenant_id, None)
+
+    async def get_table(self, session: AsyncSession, tenant_id: str) -> RoutingTable:
+        cached = self._tables.get(tenant_id)
+        if cached and time.monotonic() - cached[1] < self.ttl_seconds:
+            return cached[0]
+
+        lock = self._locks.setdefault(tenant_id, asyncio.Lock())
+        async with lock:
+            cached = self._tables.get(tenant_id)
+            if cached and time.monotonic() - cached[1] < self.ttl_seconds:
+                return cached[0]
+
+            generation = self._generation
+            stmt = select(RoutingRule).where(
+                RoutingRule.is_active == True,  # noqa: E712
+                (RoutingRule.tenant_id == tenant_id) | (RoutingRule.tenant_id == None),  # noqa: E711
+            )
+            rules = (await session.execute(stmt)).scalars().all()
+            table = RoutingTable(list(rules))
+            if generation == self._generation:
+                self._tables[tenant_id] = (table, time.monotonic())
+            return table
+
+
+routing_table_cache = RoutingTableCache()
+
+register_invalidation_handler(
+    ROUTING_RULES_TOPIC,
+    lambda payload: routing_table_cache.invalidate(payload.get("tenant_id")),
+)
+
+
+async def invalidate_routing_rules(tenant_id: Optional[str]) -> None:
+    """Call after any RoutingRule write; ``None`` means a global rule changed."""
+    await publish_invalidation(ROUTING_RULES_TOPIC, {"tenant_id": tenant_id})
@@ -1,37 +1,51 @@
-from typing import List
+from typing import Any, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import select
-from app.models.payment_analytics_models import RoutingRule
+from app.core.redis_client import get_redis
+from app.services.payments.routing import psp_stats
+from app.services.payments.routing.routing_table import routing_table_cache
 from app.services.payments.routing.router import PaymentRouter as BaseRouter # Extend V1
 
 class SmartRouter(BaseRouter):
     async def get_smart_route(
-        self, 
+        self,
         session: AsyncSession,
-        tenant_id: str, 
-        currency: str, 
+        tenant_id: str,
+        currency: str,
         country: str,
-        method: str
+        method: str,
+        redis: Optional[Any] = None,
     ) -> List[str]:
-        
-        # 1. Check DB Rules
-        stmt = select(RoutingRule).where(
-            (RoutingRule.tenant_id == tenant_id) | (RoutingRule.tenant_id == None),
-            (RoutingRule.currency == currency) | (RoutingRule.currency == None),
-            (RoutingRule.country == country) | (RoutingRule.country == None),
-            (RoutingRule.method == method) | (RoutingRule.method == None)
-        ).order_by(RoutingRule.tenant_id.desc(), RoutingRule.country.desc()) # Specific first
-        
-        rules = (await session.execute(stmt)).scalars().all()
-        
-        if rules:
-            # Return priority from most specific rule
-            return rules[0].provider_priority
-            
-        # 2. Fallback to Score-based (Simulated here, normally Redis/DB stats)
-        # Mock Logic: Prefer Stripe for USD, Adyen for EUR
-        if currency == "EUR":
-            return ["adyen_mock", "stripe_mock"]
-            
-        # 3. Default V1
-        return ["stripe_mock", "adyen_mock"]
+
+        # 1. Compiled rule table (cached per tenant, invalidated on rule changes)
+        table = await routing_table_cache.get_table(session, tenant_id)
+        route = table.resolve(tenant_id=tenant_id, currency=currency, country=country, method=method)
+        if route:
+            return route
+
+        # 2. Score-based fallback from rolling per-PSP success rate / latency
+        candidates = self.get_route(tenant_id, currency, 0.0)
+        redis = redis if redis is not None else await get_redis()
+        return await psp_stats.rank_providers(redis, candidates, currency)
+
+    async def record_attempt(
+        self,
+        *,
+        provider: str,
+        currency: str,
+        success: bool,
+        latency_ms: Optional[float] = None,
+        redis: Optional[Any] = None,
+    ) -> None:
+        """Feed an authorization outcome into the rolling stats used for fallback ranking.
+
+        Called with the measured latency where the PSP answers inline, and
+        without one where the outcome arrives by webhook. ``provider`` is the
+        PSP's own name; stats are kept under its routing candidate id.
+        """
+        redis = redis if redis is not None else await get_redis()
+        await psp_stats.record_attempt(
+            redis, provider=self.route_id(provider), currency=currency, success=success, latency_ms=latency_ms
+        )
+
+
+smart_router = SmartRouter()
@@ -0,0 +1,364 @@
+from __future__ import annotations
+
+import logging
+import time
+import uuid
+from datetime import datetime
+from itertools import combinations
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.models.poker_models import PokerHandAudit
+from app.models.poker_mtt_models import RiskSignal
+from app.services.poker.hand_audit import hand_participants, hand_winnings
+
+logger = logging.getLogger(__name__)
+
+PAIR_SIGNAL = "collusion_pair"
+CLUSTER_SIGNAL = "collusion_ring"
+
+DEFAULT_CHUNK_SIZE = 5000
+
+# Pairs are packed into one int64 as (lo << 32) | hi over dense player indexes.
+_PAIR_SHIFT = np.int64(32)
+_PAIR_MASK = np.int64((1 << 32) - 1)
+
+
+class PairInteractionMatrix:
+    """Sparse, incrementally built player-pair interaction matrix.
+
+    Stored as COO-style parallel arrays sorted by packed pair key: hands played
+    together, net chip flow toward the lower-index player and gross flow.
+    Chunks are buffered and merged geometrically (only when the buffer
+    outgrows the merged arrays), so memory is bounded by the number of
+    distinct pairs and the total merge cost stays O(P log P).
+    """
+
+    def __init__(self) -> None:
+        self.player_ids: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._hands_per_player = np.zeros(0, dtype=np.int64)
+
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.together = np.zeros(0, dtype=np.int64)
+        self.net_flow = np.zeros(0, dtype=np.float64)
+        self.gross_flow = np.zeros(0, dtype=np.float64)
+
+        self._pending: List[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = []
+        self._pending_len = 0
+        self.hands = 0
+
+    # -- ingestion ---------------------------------------------------------
+
+    def _player_index(self, player_id: str) -> int:
+        idx = self._index.get(player_id)
+        if idx is None:
+            idx = len(self.player_ids)
+            self._index[player_id] = idx
+            self.player_ids.append(player_id)
+        return idx
+
+    def add_hands(self, hands: Sequence[Tuple[Sequence[str], Dict[str, float]]]) -> None:
+        """Add a chunk of ``(participants, winnings)`` hands."""
+
+        hands = [(list(dict.fromkeys(p)), w) for p, w in hands if len(set(p)) >= 2]
+        self.hands += len(hands)
+        if not hands:
+            return
+
+        width = max(len(p) for p, _ in hands)
+        seats = np.full((len(hands), width), -1, dtype=np.int64)
+        won = np.zeros((len(hands), width), dtype=np.float64)
+        for row, (players, winnings) in enumerate(hands):
+            for col, pid in enumerate(players):
+                seats[row, col] = self._player_index(pid)
+                won[row, col] = float(winnings.get(pid, 0.0))
+
+        if len(self.player_ids) > len(self._hands_per_player):
+            grown = np.zeros(max(len(self.player_ids), 2 * len(self._hands_per_player)), dtype=np.int64)
+            grown[: len(self._hands_per_player)] = self._hands_per_player
+            self._hands_per_player = grown
+        seated = seats[seats >= 0]
+        self._hands_per_player += np.bincount(seated, minlength=len(self._hands_per_player))
+
+        # Approximate chip flow: each winner's take is drawn evenly from the
+        # players in the hand who won nothing.
+        losers = (seats >= 0) & (won <= 0)
+        n_losers = losers.sum(axis=1)
+        per_loser = np.divide(1.0, n_losers, out=np.zeros(len(hands)), where=n_losers > 0)
+
+        keys, flows = [], []
+        for a, b in combinations(range(width), 2):
+            mask = (seats[:, a] >= 0) & (seats[:, b] >= 0)
+            if not mask.any():
+                continue
+            pa, pb = seats[mask, a], seats[mask, b]
+            # Chips moving to a from b, minus chips moving to b from a.
+            flow = (won[mask, a] * losers[mask, b] - won[mask, b] * losers[mask, a]) * per_loser[mask]
+            swap = pa > pb
+            lo, hi = np.where(swap, pb, pa), np.where(swap, pa, pb)
+            keys.append((lo << _PAIR_SHIFT) | hi)
+            flows.append(np.where(swap, -flow, flow))
+
+        if keys:
+            self._push(np.concatenate(keys), np.concatenate(flows))
+
+    def _push(self, keys: np.ndarray, flows: np.ndarray) -> None:
+        uniq, inverse = np.unique(keys, return_inverse=True)
+        self._pending.append(
+            (
+                uniq,
+                np.bincount(inverse, minlength=len(uniq)).astype(np.int64),
+                np.bincount(inverse, weights=flows, minlength=len(uniq)),
+                np.bincount(inverse, weights=np.abs(flows), minlength=len(uniq)),
+            )
+        )
+        self._pending_len += len(uniq)
+        if self._pending_len >= max(len(self.keys), 1 << 16):
+            self._merge()
+
+    def _merge(self) -> None:
+        if not self._pending:
+            return
+        parts = [(self.keys, self.together, self.net_flow, self.gross_flow)] + self._pending
+        keys = np.concatenate([p[0] for p in parts])
+        uniq, inverse = np.unique(keys, return_inverse=True)
+        self.keys = uniq
+        self.together = np.bincount(inverse, weights=np.concatenate([p[1] for p in parts]), minlength=len(uniq)).astype(np.int64)
+        self.net_flow = np.bincount(inverse, weights=np.concatenate([p[2] for p in parts]), minlength=len(uniq))
+        self.gross_flow = np.bincount(inverse, weights=np.concatenate([p[3] for p in parts]), minlength=len(uniq))
+        self._pending = []
+        self._pending_len = 0
+
+    # -- read side ---------------------------------------------------------
+
+    def finalize(self) -> None:
+        self._merge()
+
+    def pairs(self) -> Tuple[np.ndarray, np.ndarray]:
+        return self.keys >> _PAIR_SHIFT, self.keys & _PAIR_MASK
+
+    def hands_played(self) -> np.ndarray:
+        return self._hands_per_player[: len(self.player_ids)]
+
+
+def score_pairs(
+    matrix: PairInteractionMatrix,
+    *,
+    min_hands_together: int = 50,
+    concentration_threshold: float = 0.8,
+    flow_threshold: float = 500.0,
+    directionality_threshold: float = 0.8,
+) -> List[Dict[str, Any]]:
+    """Score every pair with enough shared hands and return the flagged ones.
+
+    - concentration: shared hands over the smaller player's total hands
+      (two accounts that only ever sit together).
+    - directionality: |net flow| / gross flow (chips moving one way only).
+    Score is the max of both, boosted when both fire.
+    """
+
+    matrix.finalize()
+    if len(matrix.keys) == 0:
+        return []
+
+    lo, hi = matrix.pairs()
+    played = matrix.hands_played()
+    together = matrix.together
+    concentration = together / np.maximum(np.minimum(played[lo], played[hi]), 1)
+    directionality = np.divide(
+        np.abs(matrix.net_flow), matrix.gross_flow, out=np.zeros(len(together)), where=matrix.gross_flow > 0
+    )
+
+    eligible = together >= min_hands_together
+    concentrated = eligible & (concentration >= concentration_threshold)
+    dumping = eligible & (np.abs(matrix.net_flow) >= flow_threshold) & (directionality >= directionality_threshold)
+    flagged = np.flatnonzero(concentrated | dumping)
+
+    score = np.maximum(concentration, directionality) + 0.5 * (concentrated & dumping)
+
+    out: List[Dict[str, Any]] = []
+    for i in flagged:
+        a, b = matrix.player_ids[lo[i]], matrix.player_ids[hi[i]]
+        net = float(matrix.net_flow[i])
+        out.append(
+            {
+                "players": sorted((a, b)),
+                # Chips flow toward the receiver; the sender is the likely dumper.
+                "receiver": a if net >= 0 else b,
+                "hands_together": int(together[i]),
+                "net_flow": round(abs(net), 2),
+                "gross_flow": round(float(matrix.gross_flow[i]), 2),
+                "concentration": round(float(concentration[i]), 4),
+                "directionality": round(float(directionality[i]), 4),
+                "reasons": [r for r, hit in (("concentration", concentrated[i]), ("chip_flow", dumping[i])) if hit],
+                "score": round(float(score[i]), 4),
+            }
+        )
+    out.sort(key=lambda p: (-p["score"], p["players"]))
+    return out
+
+
+def connected_clusters(pairs: List[Dict[str, Any]], *, min_size: int = 3) -> List[Dict[str, Any]]:
+    """Group flagged pairs into rings (connected components, union-find)."""
+
+    parent: Dict[str, str] = {}
+
+    def find(x: str) -> str:
+        parent.setdefault(x, x)
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for p in pairs:
+        a, b = find(p["players"][0]), find(p["players"][1])
+        if a != b:
+            parent[max(a, b)] = min(a, b)
+
+    groups: Dict[str, Dict[str, Any]] = {}
+    for p in pairs:
+        g = groups.setdefault(find(p["players"][0]), {"players": set(), "edges": 0, "score": 0.0, "net_flow": 0.0})
+        g["players"].update(p["players"])
+        g["edges"] += 1
+        g["score"] += p["score"]
+        g["net_flow"] += p["net_flow"]
+
+    clusters = []
+    for g in groups.values():
+        if len(g["players"]) < min_size:
+            continue
+        members = sorted(g["players"])
+        clusters.append(
+            {
+                "players": members,
+                "edges": g["edges"],
+                # Edge density of the ring: 1.0 when every member pair is flagged.
+                "density": round(g["edges"] / (len(members) * (len(members) - 1) / 2), 4),
+                "net_flow": round(g["net_flow"], 2),
+                "score": round(g["score"], 4),
+            }
+        )
+    clusters.sort(key=lambda c: (-c["score"], c["players"]))
+    return clusters
+
+
+def _severity(score: float) -> str:
+    if score >= 1.4:
+        return "critical"
+    if score >= 1.0:
+        return "high"
+    return "medium"
+
+
+async def analyze_collusion_window(
+    session: AsyncSession,
+    *,
+    tenant_id: str,
+    window_start: datetime,
+    window_end: datetime,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    emit_signals: bool = True,
+    dedupe_since: Optional[datetime] = None,
+    **thresholds: Any,
+) -> Dict[str, Any]:
+    """Stream a window of hands into the pair matrix, score it and emit signals.
+
+    Signals are inserted in one multi-row INSERT; a pair or ring already
+    reported at/after ``dedupe_since`` is not reported again. It defaults to
+    ``window_end``, which covers re-runs of a fixed window; callers with a
+    rolling window pass the start of a fixed bucket instead. The caller
+    commits.
+    """
+
+    started = time.perf_counter()
+    matrix = PairInteractionMatrix()
+
+    stmt = (
+        select(PokerHandAudit.participants, PokerHandAudit.winners)
+        .where(
+            PokerHandAudit.tenant_id == tenant_id,
+            PokerHandAudit.created_at >= window_start,
+            PokerHandAudit.created_at < window_end,
+        )
+        .execution_options(yield_per=chunk_size)
+    )
+    result = await session.stream(stmt)
+    async for rows in result.partitions(chunk_size):
+        matrix.add_hands([(hand_participants(r.participants, r.winners), hand_winnings(r.winners)) for r in rows])
+
+    pairs = score_pairs(matrix, **thresholds)
+    clusters = connected_clusters(pairs)
+
+    inserted = 0
+    if emit_signals and (pairs or clusters):
+        window = {"start": window_start.isoformat(), "end": window_end.isoformat()}
+        candidates = [
+            {
+                "signal_type": PAIR_SIGNAL,
+                "player_id": p["receiver"],
+                "target_resource_type": "player_pair",
+                "target_resource_id": ":".join(p["players"]),
+                "severity": _severity(p["score"]),
+                "evidence_payload": {**p, "window": window},
+            }
+            for p in pairs
+        ] + [
+            {
+                "signal_type": CLUSTER_SIGNAL,
+                "player_id": None,
+                "target_resource_type": "player_cluster",
+                "target_resource_id": ":".join(c["players"]),
+                "severity": _severity(c["score"] / max(c["edges"], 1) + 0.4),
+                "evidence_payload": {**c, "window": window},
+            }
+            for c in clusters
+        ]
+
+        existing = set()
+        targets = [c["target_resource_id"] for c in candidates]
+        for i in range(0, len(targets), 1000):
+            stmt = select(RiskSignal.signal_type, RiskSignal.target_resource_id).where(
+                RiskSignal.tenant_id == tenant_id,
+                RiskSignal.signal_type.in_([PAIR_SIGNAL, CLUSTER_SIGNAL]),
+                RiskSignal.target_resource_id.in_(targets[i : i + 1000]),
+                RiskSignal.created_at >= (dedupe_since or window_end),
+            )
+            existing.update((await session.execute(stmt)).all())
+
+        now = datetime.utcnow()
+        rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "tenant_id": tenant_id,
+                "status": "new",
+                "created_at": now,
+                **c,
+            }
+            for c in candidates
+            if (c["signal_type"], c["target_resource_id"]) not in existing
+        ]
+        if rows:
+            await session.execute(insert(RiskSignal), rows)
+        inserted = len(rows)
+
+    summary = {
+        "tenant_id": tenant_id,
+        "hands": matrix.hands,
+        "players": len(matrix.player_ids),
+        "pairs": int(len(matrix.keys)),
+        "flagged_pairs": len(pairs),
+        "clusters": len(clusters),
+        "signals_inserted": inserted,
+        "duration_ms": int((time.perf_counter() - started) * 1000),
+    }
+    logger.info(
+        "poker.collusion.analyzed",
+        extra={"event": "poker.collusion.analyzed", **summary},
+    )
+    return summary
+
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+# PokerHandAudit.winners has been written both as a list
+# ([{"player_id": ..., "amount": ...}], hand-history payload) and as a
+# {player_id: amount} dict; readers accept either.
+
+
+def hand_winnings(winners: Any) -> Dict[str, float]:
+    """Amount won per player for one hand."""
+    out: Dict[str, float] = {}
+    if isinstance(winners, dict):
+        for pid, amount in winners.items():
+            out[str(pid)] = out.get(str(pid), 0.0) + float(amount or 0.0)
+    elif isinstance(winners, list):
+        for w in winners:
+            if isinstance(w, dict) and w.get("player_id"):
+                pid = str(w["player_id"])
+                amount = w.get("amount", w.get("win", 0.0))
+                out[pid] = out.get(pid, 0.0) + float(amount or 0.0)
+    return out
+
+
+def hand_participants(participants: Any, winners: Any) -> List[str]:
+    """Dealt-in players of a hand; legacy rows without a list fall back to winners."""
+    if participants:
+        return [str(p) for p in participants]
+    return list(hand_winnings(winners))
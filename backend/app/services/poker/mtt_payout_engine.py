@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.models.poker_mtt_models import PokerTournament
+from app.models.sql_models import Player
+from app.repositories.ledger_repo import LedgerTransaction, WalletBalance
+from app.services.wallet_ledger import WalletInvariantError
+
+MTT_PROVIDER = "internal_mtt"
+MTT_PRIZE_EVENT = "mtt_prize"
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+def prize_event_id(tournament_id: str, player_id: str) -> str:
+    """Idempotency key of a prize credit: one per (tournament, player)."""
+    return f"mtt_prize:{tournament_id}:{player_id}"
+
+
+def normalize_payouts(payouts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Merge duplicate players, drop non-positive amounts and sort by player id.
+
+    Sorting by player id gives every payout run the same row-lock order, so two
+    concurrent runs (or a run racing a wallet callback that locks a single
+    player) cannot deadlock on each other.
+    """
+
+    merged: Dict[str, Dict[str, Any]] = {}
+    for p in payouts:
+        player_id = str(p["player_id"])
+        amount = float(p["amount"])
+        if amount <= 0:
+            continue
+        entry = merged.setdefault(player_id, {"player_id": player_id, "amount": 0.0, "rank": p.get("rank")})
+        entry["amount"] = round(entry["amount"] + amount, 2)
+    return [merged[k] for k in sorted(merged)]
+
+
+async def _credit_chunk(
+    session: AsyncSession,
+    *,
+    trn: PokerTournament,
+    chunk: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Credit one chunk of winners inside the caller's transaction.
+
+    Mirrors ``apply_wallet_delta_with_ledger`` for a credit to available
+    balance, but with one locking SELECT per table and one multi-row ledger
+    INSERT for the whole chunk instead of per-player round trips.
+    """
+
+    ids = [p["player_id"] for p in chunk]
+    event_ids = [prize_event_id(trn.id, pid) for pid in ids]
+
+    players_stmt = (
+        select(Player)
+        .where(Player.id.in_(ids), Player.tenant_id == trn.tenant_id)
+        .order_by(Player.id)
+        .with_for_update()
+    )
+    players = {p.id: p for p in (await session.execute(players_stmt)).scalars().all()}
+
+    bal_stmt = (
+        select(WalletBalance)
+        .where(
+            WalletBalance.tenant_id == trn.tenant_id,
+            WalletBalance.player_id.in_(ids),
+            WalletBalance.currency == trn.currency,
+        )
+        .order_by(WalletBalance.player_id)
+        .with_for_update()
+    )
+    balances = {b.player_id: b for b in (await session.execute(bal_stmt)).scalars().all()}
+
+    paid_stmt = select(LedgerTransaction.provider_event_id).where(
+        LedgerTransaction.provider == MTT_PROVIDER,
+        LedgerTransaction.provider_event_id.in_(event_ids),
+    )
+    already_paid = {row[0] for row in (await session.execute(paid_stmt)).all()}
+
+    now = datetime.utcnow()
+    ledger_rows: List[Dict[str, Any]] = []
+    missing: List[str] = []
+    skipped = 0
+    amount_total = 0.0
+
+    for p in chunk:
+        player_id, amount = p["player_id"], float(p["amount"])
+        event_id = prize_event_id(trn.id, player_id)
+        if event_id in already_paid:
+            skipped += 1
+            continue
+        player = players.get(player_id)
+        if player is None:
+            missing.append(player_id)
+            continue
+
+        ledger_rows.append(
+            {
+                "id": str(uuid.uuid4()),
+                "tx_id": None,
+                "tenant_id": trn.tenant_id,
+                "player_id": player_id,
+                "type": "wallet",
+                "direction": "credit",
+                "amount": amount,
+                "currency": trn.currency,
+                "status": MTT_PRIZE_EVENT,
+                "idempotency_key": event_id,
+                "provider": MTT_PROVIDER,
+                "provider_ref": trn.id,
+                "provider_event_id": event_id,
+                "discount_amount": 0.0,
+                "net_amount": amount,
+                "created_at": now,
+            }
+        )
+
+        bal = balances.get(player_id)
+        if bal is None:
+            bal = WalletBalance(
+                tenant_id=trn.tenant_id,
+                player_id=player_id,
+                currency=trn.currency,
+                balance_real_available=float(player.balance_real_available) + amount,
+                balance_real_pending=float(player.balance_real_held),
+                balance_bonus_available=float(player.balance_bonus or 0.0),
+                balance_bonus_pending=0.0,
+                updated_at=now,
+            )
+            balances[player_id] = bal
+        else:
+            bal.balance_real_available = float(bal.balance_real_available) + amount
+            bal.updated_at = now
+        session.add(bal)
+
+        player.balance_real_available = float(player.balance_real_available) + amount
+        # Legacy aggregate, kept in step with the buy-in debit in register_player.
+        player.balance_real = float(player.balance_real or 0.0) + amount
+        if player.balance_real_available < -1e-9:
+            raise WalletInvariantError(f"player.balance_real_available went negative: {player.balance_real_available}")
+        session.add(player)
+        amount_total += amount
+
+    if ledger_rows:
+        await session.execute(insert(LedgerTransaction), ledger_rows)
+
+    return {
+        "credited": len(ledger_rows),
+        "skipped_already_paid": skipped,
+        "missing_players": missing,
+        "amount": round(amount_total, 2),
+    }
+
+
+async def pay_tournament(
+    session: AsyncSession,
+    trn: PokerTournament,
+    payouts: List[Dict[str, Any]],
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Dict[str, Any]:
+    """Pay out a tournament in bounded, individually committed chunks.
+
+    Progress (cursor = last committed player id) is stored on
+    ``PokerTournament.payout_report`` in the same transaction as each chunk,
+    with the tournament in ``PAYING`` until the last chunk lands. A crashed or
+    retried run resumes from the stored payout list and cursor; the
+    per-(tournament, player) ledger key makes any overlap a no-op.
+    """
+
+    started = time.perf_counter()
+
+    report = dict(trn.payout_report or {})
+    if trn.status == "PAYING" and report.get("payouts"):
+        # Resume: the payout list recorded by the first attempt is authoritative.
+        normalized = report["payouts"]
+    else:
+        normalized = normalize_payouts(payouts)
+        report = {
+            "payouts": normalized,
+            "total_distributed": round(sum(p["amount"] for p in normalized), 2),
+            "paid_count": 0,
+            "cursor": None,
+            "missing_players": [],
+        }
+        trn.status = "PAYING"
+        trn.payout_report = report
+        trn.updated_at = datetime.utcnow()
+        session.add(trn)
+        await session.commit()
+
+    cursor = report.get("cursor")
+    pending = [p for p in normalized if cursor is None or p["player_id"] > cursor]
+
+    credited = 0
+    skipped = 0
+    chunk_size = max(1, int(chunk_size))
+    for i in range(0, len(pending), chunk_size):
+        chunk = pending[i : i + chunk_size]
+        stats = await _credit_chunk(session, trn=trn, chunk=chunk)
+        credited += stats["credited"]
+        skipped += stats["skipped_already_paid"]
+
+        report = dict(report)
+        report["paid_count"] = int(report.get("paid_count", 0)) + stats["credited"] + stats["skipped_already_paid"]
+        report["cursor"] = chunk[-1]["player_id"]
+        report["missing_players"] = list(report.get("missing_players", [])) + stats["missing_players"]
+        trn.payout_report = report
+        trn.updated_at = datetime.utcnow()
+        session.add(trn)
+        await session.commit()
+
+    trn.status = "FINISHED"
+    trn.updated_at = datetime.utcnow()
+    session.add(trn)
+    await session.commit()
+
+    return {
+        "tournament_id": trn.id,
+        "winners": len(normalized),
+        "credited": credited,
+        "skipped_already_paid": skipped,
+        "missing_players": report.get("missing_players", []),
+        "total_distributed": report.get("total_distributed", 0.0),
+        "duration_ms": int((time.perf_counter() - started) * 1000),
+    }
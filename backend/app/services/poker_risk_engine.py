@@ -1,30 +1,30 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 from app.models.poker_mtt_models import RiskSignal
 from app.models.poker_models import PokerHandAudit
+from app.services.poker.collusion_graph import analyze_collusion_window
+from app.services.poker.hand_audit import hand_winnings
 
 class PokerRiskEngine:
     
     async def analyze_collusion(self, session: AsyncSession, tenant_id: str):
         """
-        Run collusion heuristics.
+        Run collusion heuristics over the last 24h of hands.
         1. Concentration: Same players meeting too often.
         2. Chip Dumping: Net flow between player pair > Threshold.
+        Pairs and rings are scored on a sparse pair matrix (see
+        app.services.poker.collusion_graph); the nightly job covers all tenants.
         """
-        
-        # --- Signal 1: Repeated Heads-Up / Same Table Concentration ---
-        # Heuristic: Find pairs of players who shared a table > 50 hands in last 24h
-        # (Simplified: Just count hand participation per table)
-        
-        # This requires complex aggregation which might be slow on large datasets.
-        # MVP: Mock the detection or use simplified logic if HandAudit has 'players' list (it currently has 'winners' dict).
-        # Assuming we can extend HandAudit or use existing 'winners' to infer participation? 
-        # Actually, HandAudit is minimal. 'winners' keys are player_ids.
-        
-        # Let's focus on "Chip Dumping via Losses".
-        # If Player A loses to Player B frequently.
-        pass
+        window_end = datetime.utcnow()
+        return await analyze_collusion_window(
+            session,
+            tenant_id=tenant_id,
+            window_start=window_end - timedelta(hours=24),
+            window_end=window_end,
+            # The window rolls with every call: report a pair/ring once per UTC day.
+            dedupe_since=window_end.replace(hour=0, minute=0, second=0, microsecond=0),
+        )
 
     async def report_signal(self, session: AsyncSession, tenant_id: str, player_id: str, signal_type: str, severity: str, payload: dict):
         # Idempotency check: Don't spam same signal for same resource today
@@ -52,7 +52,7 @@ class PokerRiskEngine:
         # MVP: Just flag BIG POTS (> 500.0 amount) as potential dumping for review
         if hand.pot_total > 500.0:
             # Who won?
-            winners = hand.winners # Dict[player_id, amount]
+            winners = hand_winnings(hand.winners)
             for pid, amt in winners.items():
                 await self.report_signal(
                     session, 
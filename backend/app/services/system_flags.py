@@ -1,17 +1,26 @@
 import json
+import logging
 import os
+import time
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 
-import redis.asyncio as redis
 from sqlmodel import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache_bus import publish_invalidation, register_invalidation_handler
+from app.core.redis_client import RedisClient
 from app.models.sql_models import FeatureFlag
 
+logger = logging.getLogger(__name__)
 
 CACHE_KEY = "system_feature_flags:v1"
 CACHE_TTL_SECONDS = 60
+# Worker-local snapshot in front of Redis; updates reach peers via the cache
+# bus, this only bounds staleness if a message is lost.
+LOCAL_CACHE_TTL_SECONDS = 5
+
+SYSTEM_FLAGS_TOPIC = "system.flags"
 
 
 FLAG_DEFS: Dict[str, Dict[str, object]] = {
@@ -26,34 +35,48 @@ FLAG_DEFS: Dict[str, Dict[str, object]] = {
 }
 
 
-async def _get_redis_client() -> Optional[redis.Redis]:
-    redis_url = os.getenv("REDIS_URL")
-    if not redis_url:
+class _LocalFlagsCache:
+    def __init__(self, ttl_seconds: float = LOCAL_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._entry: Optional[Tuple[Dict[str, Dict[str, object]], float]] = None
+        # Bumped on invalidation so a load racing with an update is not kept.
+        self.generation = 0
+
+    def get(self) -> Optional[Dict[str, Dict[str, object]]]:
+        if self._entry and time.monotonic() < self._entry[1]:
+            return self._entry[0]
         return None
-    return redis.from_url(redis_url, decode_responses=True)
+
+    def put(self, flags: Dict[str, Dict[str, object]], generation: int) -> None:
+        if generation == self.generation:
+            self._entry = (flags, time.monotonic() + self.ttl_seconds)
+
+    def invalidate(self) -> None:
+        self.generation += 1
+        self._entry = None
+
+
+_local_flags = _LocalFlagsCache()
+
+register_invalidation_handler(SYSTEM_FLAGS_TOPIC, lambda payload: _local_flags.invalidate())
 
 
 async def _get_cached_flags() -> Optional[Dict[str, Dict[str, object]]]:
-    client = await _get_redis_client()
-    if client is None:
-        return None
     try:
-        raw = await client.get(CACHE_KEY)
-        if not raw:
-            return None
-        return json.loads(raw)
-    finally:
-        await client.close()
+        raw = await RedisClient.get_instance().get(CACHE_KEY)
+    except Exception as exc:
+        logger.warning("system_flags.redis_read_failed", extra={"event": "system_flags.redis_read_failed", "error": str(exc)})
+        return None
+    if not raw:
+        return None
+    return json.loads(raw)
 
 
 async def _set_cached_flags(flags: Dict[str, Dict[str, object]]) -> None:
-    client = await _get_redis_client()
-    if client is None:
-        return
     try:
-        await client.set(CACHE_KEY, json.dumps(flags), ex=CACHE_TTL_SECONDS)
-    finally:
-        await client.close()
+        await RedisClient.get_instance().set(CACHE_KEY, json.dumps(flags), ex=CACHE_TTL_SECONDS)
+    except Exception as exc:
+        logger.warning("system_flags.redis_write_failed", extra={"event": "system_flags.redis_write_failed", "error": str(exc)})
 
 
 async def _load_flags_from_db(session: AsyncSession) -> Dict[str, Dict[str, object]]:
@@ -89,11 +112,21 @@ async def _load_flags_from_db(session: AsyncSession) -> Dict[str, Dict[str, obje
 
 
 async def get_system_flags(session: AsyncSession) -> Dict[str, Dict[str, object]]:
-    cached = await _get_cached_flags()
-    if cached is not None:
-        return cached
-    flags = await _load_flags_from_db(session)
-    await _set_cached_flags(flags)
+    """Flag map; worker-local snapshot -> shared Redis (pooled client) -> DB.
+
+    The returned dict is shared by callers and must not be mutated.
+    """
+
+    flags = _local_flags.get()
+    if flags is not None:
+        return flags
+
+    generation = _local_flags.generation
+    flags = await _get_cached_flags()
+    if flags is None:
+        flags = await _load_flags_from_db(session)
+        await _set_cached_flags(flags)
+    _local_flags.put(flags, generation)
     return flags
 
 
@@ -122,4 +155,5 @@ async def update_system_flag(
 
     flags = await _load_flags_from_db(session)
     await _set_cached_flags(flags)
+    await publish_invalidation(SYSTEM_FLAGS_TOPIC)
     return {"before": before, "after": enabled}
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import asyncio
+import copy
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache_bus import publish_invalidation, register_invalidation_handler
+from app.models.sql_models import Tenant
+
+TENANT_CONFIG_TOPIC = "tenants.config"
+
+# Safety net in case an invalidation message is lost.
+TENANT_SNAPSHOT_TTL_SECONDS = 60
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return {k: _thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    return value
+
+
+@dataclass(frozen=True)
+class TenantSnapshot:
+    """Immutable view of a tenant's configuration (features, kill switches, policy).
+
+    ``version`` is the cache generation the snapshot was loaded under; two
+    snapshots with the same id and version hold the same configuration.
+    """
+
+    id: str
+    name: str
+    type: str
+    features: Mapping[str, Any]
+    kill_switches: Mapping[str, Any]
+    daily_deposit_limit: Optional[float]
+    daily_withdraw_limit: Optional[float]
+    payout_retry_limit: Optional[int]
+    payout_cooldown_seconds: Optional[int]
+    version: int
+
+    @classmethod
+    def from_tenant(cls, tenant: Tenant, version: int) -> "TenantSnapshot":
+        features = copy.deepcopy(tenant.features or {}) if isinstance(tenant.features, dict) else {}
+        kill_switches = features.get("kill_switches") or {}
+        return cls(
+            id=tenant.id,
+            name=tenant.name,
+            type=tenant.type,
+            features=_freeze(features),
+            kill_switches=_freeze(kill_switches if isinstance(kill_switches, dict) else {}),
+            daily_deposit_limit=tenant.daily_deposit_limit,
+            daily_withdraw_limit=tenant.daily_withdraw_limit,
+            payout_retry_limit=tenant.payout_retry_limit,
+            payout_cooldown_seconds=tenant.payout_cooldown_seconds,
+            version=version,
+        )
+
+    def feature_enabled(self, flag: str) -> bool:
+        return self.features.get(flag) is True
+
+    def module_killed(self, module_key: str) -> bool:
+        return self.kill_switches.get(module_key) is True
+
+    def features_dict(self) -> Dict[str, Any]:
+        """Mutable deep copy, for API responses."""
+        return _thaw(self.features)
+
+
+class TenantSnapshotCache:
+    """Per-tenant snapshots, refreshed on invalidation or TTL.
+
+    Unknown tenant ids are not cached, so a tenant created outside the tenant
+    routes is visible on the next lookup.
+    """
+
+    def __init__(self, ttl_seconds: int = TENANT_SNAPSHOT_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._snapshots: Dict[str, Tuple[TenantSnapshot, float]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        # Bumped on every invalidation so a load racing with a tenant update
+        # does not publish a stale snapshot.
+        self._generation = 0
+
+    @property
+    def version(self) -> int:
+        return self._generation
+
+    def invalidate(self, tenant_id: Optional[str] = None) -> None:
+        self._generation += 1
+        if tenant_id is None:
+            self._snapshots.clear()
+        else:
+            self._snapshots.pop(tenant_id, None)
+
+    def _fresh(self, tenant_id: str) -> Optional[TenantSnapshot]:
+        cached = self._snapshots.get(tenant_id)
+        if cached and time.monotonic() - cached[1] < self.ttl_seconds:
+            return cached[0]
+        return None
+
+    async def get(self, session: AsyncSession, tenant_id: str) -> Optional[TenantSnapshot]:
+        snapshot = self._fresh(tenant_id)
+        if snapshot is not None:
+            return snapshot
+
+        lock = self._locks.setdefault(tenant_id, asyncio.Lock())
+        async with lock:
+            snapshot = self._fresh(tenant_id)
+            if snapshot is not None:
+                return snapshot
+
+            generation = self._generation
+            tenant = await session.get(Tenant, tenant_id)
+            if tenant is None:
+                return None
+            snapshot = TenantSnapshot.from_tenant(tenant, generation)
+            if generation == self._generation:
+                self._snapshots[tenant_id] = (snapshot, time.monotonic())
+            return snapshot
+
+
+tenant_snapshot_cache = TenantSnapshotCache()
+
+register_invalidation_handler(
+    TENANT_CONFIG_TOPIC,
+    lambda payload: tenant_snapshot_cache.invalidate(payload.get("tenant_id")),
+)
+
+
+async def invalidate_tenant_config(tenant_id: Optional[str]) -> None:
+    """Call after committing any Tenant write; ``None`` drops every snapshot."""
+    await publish_invalidation(TENANT_CONFIG_TOPIC, {"tenant_id": tenant_id})
+
+
+async def get_tenant_snapshot(session: AsyncSession, tenant_id: str) -> Optional[TenantSnapshot]:
+    return await tenant_snapshot_cache.get(session, tenant_id)
+
@@ -1,10 +1,114 @@
+from __future__ import annotations
+
+import asyncio
+import bisect
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import event, insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 from sqlmodel import select
-from datetime import datetime
 
+from app.core.cache_bus import publish_invalidation, register_invalidation_handler
+from app.core.database import async_session
 from app.models.vip_models import PlayerVipStatus, VipTier, LoyaltyTransaction
 from app.repositories.ledger_repo import append_event, apply_balance_delta
 
+logger = logging.getLogger(__name__)
+
+VIP_TIERS_TOPIC = "vip.tiers"
+# Safety net in case an invalidation message is lost.
+VIP_TIER_CACHE_TTL_SECONDS = 300
+
+# Points per unit wagered on the bet path.
+WAGER_POINTS_PER_UNIT = 1.0
+ACCRUAL_FLUSH_INTERVAL_SECONDS = 2.0
+ACCRUAL_FLUSH_MAX_PLAYERS = 1000
+_ACCRUAL_CHUNK = 500
+_STAGED_KEY = "vip_accrual_staged"
+
+
+@dataclass(frozen=True)
+class TierTable:
+    """A tenant's tiers sorted by min_points, resolved with bisect."""
+
+    min_points: Tuple[float, ...]
+    tier_ids: Tuple[str, ...]
+
+    def resolve(self, lifetime_points: float) -> Optional[str]:
+        """Highest tier with ``min_points <= lifetime_points`` (None below the first)."""
+        idx = bisect.bisect_right(self.min_points, float(lifetime_points)) - 1
+        return self.tier_ids[idx] if idx >= 0 else None
+
+
+class TierTableCache:
+    """Tenant -> TierTable, dropped on tier writes via the cache bus."""
+
+    def __init__(self, ttl_seconds: int = VIP_TIER_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, Tuple[TierTable, float]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._generation = 0
+
+    def invalidate(self, tenant_id: Optional[str] = None) -> None:
+        self._generation += 1
+        if tenant_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(tenant_id, None)
+
+    def _fresh(self, tenant_id: str) -> Optional[TierTable]:
+        entry = self._entries.get(tenant_id)
+        if entry is not None and (time.monotonic() - entry[1]) < self.ttl_seconds:
+            return entry[0]
+        return None
+
+    async def get(self, session: AsyncSession, tenant_id: str) -> TierTable:
+        table = self._fresh(tenant_id)
+        if table is not None:
+            return table
+
+        lock = self._locks.setdefault(tenant_id, asyncio.Lock())
+        async with lock:
+            table = self._fresh(tenant_id)
+            if table is not None:
+                return table
+
+            generation = self._generation
+            stmt = (
+                select(VipTier.min_points, VipTier.id)
+                .where(VipTier.tenant_id == tenant_id)
+                .order_by(VipTier.min_points.asc(), VipTier.id.asc())
+            )
+            rows = (await session.execute(stmt)).all()
+            table = TierTable(
+                min_points=tuple(float(r[0] or 0.0) for r in rows),
+                tier_ids=tuple(r[1] for r in rows),
+            )
+            if generation == self._generation:
+                self._entries[tenant_id] = (table, time.monotonic())
+            return table
+
+
+tier_tables = TierTableCache()
+
+
+def _on_tiers_invalidation(payload: Dict[str, Any]) -> None:
+    tier_tables.invalidate(payload.get("tenant_id"))
+
+
+register_invalidation_handler(VIP_TIERS_TOPIC, _on_tiers_invalidation)
+
+
+async def invalidate_vip_tiers(tenant_id: str) -> None:
+    """Call after committing tier changes for ``tenant_id``."""
+    await publish_invalidation(VIP_TIERS_TOPIC, {"tenant_id": tenant_id})
+
 class VipEngine:
     
     async def get_status(self, session: AsyncSession, player_id: str, tenant_id: str) -> PlayerVipStatus:
@@ -96,16 +200,177 @@ class VipEngine:
         return cash_amount
 
     async def _check_tier_upgrade(self, session: AsyncSession, status: PlayerVipStatus):
-        # Find highest eligible tier
-        stmt = select(VipTier).where(
-            VipTier.tenant_id == status.tenant_id, 
-            VipTier.min_points <= status.lifetime_points
-        ).order_by(VipTier.min_points.desc())
-        
-        best_tier = (await session.execute(stmt)).scalars().first()
-        
-        if best_tier and best_tier.id != status.current_tier_id:
+        # Find highest eligible tier (cached table, no query when warm)
+        table = await tier_tables.get(session, status.tenant_id)
+        best_tier_id = table.resolve(status.lifetime_points)
+
+        if best_tier_id and best_tier_id != status.current_tier_id:
             # Upgrade!
-            status.current_tier_id = best_tier.id
+            status.current_tier_id = best_tier_id
             session.add(status)
             # TODO: Fire notification event
+
+
+class VipAccrualPipeline:
+    """Aggregates wager points per player and writes them in batches.
+
+    The bet path only stages points on its session (``stage``); they join the
+    pending window when that transaction commits and are dropped if it rolls
+    back. A flush (every ``flush_interval`` seconds, at ``max_players``
+    pending players, and on shutdown) writes one ACCRUAL LoyaltyTransaction
+    per player per window with multi-row INSERTs, and resolves tiers against
+    the cached TierTable. Windows are per process and in memory: a crash
+    loses at most the current window.
+    """
+
+    def __init__(
+        self,
+        flush_interval: float = ACCRUAL_FLUSH_INTERVAL_SECONDS,
+        max_players: int = ACCRUAL_FLUSH_MAX_PLAYERS,
+        session_factory: Optional[Callable] = None,
+    ):
+        self.flush_interval = flush_interval
+        self.max_players = max_players
+        self.session_factory = session_factory
+        # (tenant_id, player_id) -> [points, bets, last_source_ref]
+        self._pending: Dict[Tuple[str, str], List[Any]] = {}
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._loop_task: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def stage(self, session: AsyncSession, *, tenant_id: str, player_id: str, points: float, source_ref: Optional[str]) -> None:
+        if points <= 0:
+            return
+        session.info.setdefault(_STAGED_KEY, []).append((tenant_id, player_id, float(points), source_ref))
+
+    def add(self, *, tenant_id: str, player_id: str, points: float, source_ref: Optional[str] = None, bets: int = 1) -> None:
+        entry = self._pending.setdefault((tenant_id, player_id), [0.0, 0, None])
+        entry[0] += float(points)
+        entry[1] += bets
+        entry[2] = source_ref or entry[2]
+        if len(self._pending) >= self.max_players and (self._flush_task is None or self._flush_task.done()):
+            try:
+                self._flush_task = asyncio.get_running_loop().create_task(self.flush())
+            except RuntimeError:
+                pass
+
+    async def flush(self, session_factory: Optional[Callable] = None) -> Dict[str, Any]:
+        async with self._flush_lock:
+            if not self._pending:
+                return {"players": 0, "points": 0.0, "tier_changes": 0}
+            batch, self._pending = self._pending, {}
+
+            factory = session_factory or self.session_factory or async_session
+            started = time.perf_counter()
+            try:
+                async with factory() as session:
+                    stats = await _write_accruals(session, batch)
+                    await session.commit()
+            except Exception as exc:
+                for key, (points, bets, ref) in batch.items():
+                    self.add(tenant_id=key[0], player_id=key[1], points=points, source_ref=ref, bets=bets)
+                logger.warning(
+                    "vip.accrual_flush_failed",
+                    extra={"event": "vip.accrual_flush_failed", "players": len(batch), "error": str(exc)},
+                )
+                return {"players": 0, "points": 0.0, "tier_changes": 0, "error": str(exc)}
+
+            stats["duration_ms"] = int((time.perf_counter() - started) * 1000)
+            return stats
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self) -> None:
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.get_event_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            try:
+                await self._loop_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._loop_task = None
+        await self.flush()
+
+
+async def _write_accruals(session: AsyncSession, batch: Dict[Tuple[str, str], List[Any]]) -> Dict[str, Any]:
+    now = datetime.utcnow()
+    tier_changes = 0
+    points_total = 0.0
+
+    by_tenant: Dict[str, List[str]] = {}
+    for tenant_id, player_id in batch:
+        by_tenant.setdefault(tenant_id, []).append(player_id)
+
+    for tenant_id, player_ids in by_tenant.items():
+        table = await tier_tables.get(session, tenant_id)
+        player_ids.sort()
+        for i in range(0, len(player_ids), _ACCRUAL_CHUNK):
+            chunk = player_ids[i : i + _ACCRUAL_CHUNK]
+            stmt = (
+                select(PlayerVipStatus)
+                .where(PlayerVipStatus.player_id.in_(chunk))
+                .order_by(PlayerVipStatus.player_id)
+                .with_for_update()
+            )
+            statuses = {s.player_id: s for s in (await session.execute(stmt)).scalars().all()}
+
+            tx_rows: List[Dict[str, Any]] = []
+            for player_id in chunk:
+                points, bets, source_ref = batch[(tenant_id, player_id)]
+                status = statuses.get(player_id)
+                if status is None:
+                    status = PlayerVipStatus(player_id=player_id, tenant_id=tenant_id)
+                status.lifetime_points = float(status.lifetime_points or 0.0) + points
+                status.current_points = float(status.current_points or 0.0) + points
+                status.last_updated = now
+
+                tier_id = table.resolve(status.lifetime_points)
+                if tier_id and tier_id != status.current_tier_id:
+                    status.current_tier_id = tier_id
+                    tier_changes += 1
+                session.add(status)
+
+                tx_rows.append(
+                    {
+                        "id": str(uuid.uuid4()),
+                        "tenant_id": tenant_id,
+                        "player_id": player_id,
+                        "type": "ACCRUAL",
+                        "amount": points,
+                        "source_type": "WAGER",
+                        # Last round of the window; the row aggregates ``bets`` bets.
+                        "source_ref": source_ref,
+                        "balance_after": status.current_points,
+                        "created_at": now,
+                    }
+                )
+                points_total += points
+
+            await session.execute(insert(LoyaltyTransaction), tx_rows)
+
+    return {"players": len(batch), "points": round(points_total, 6), "tier_changes": tier_changes}
+
+
+vip_accrual = VipAccrualPipeline()
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_staged_accruals(session: Session) -> None:
+    staged = session.info.pop(_STAGED_KEY, None)
+    for tenant_id, player_id, points, source_ref in staged or ():
+        vip_accrual.add(tenant_id=tenant_id, player_id=player_id, points=points, source_ref=source_ref)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_staged_accruals(session: Session) -> None:
+    session.info.pop(_STAGED_KEY, None)
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import case, exists, literal, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.bonus_models import BonusCampaignGame, BonusGrant
+from app.models.game_models import Game
+from app.models.sql_models import Player
+
+logger = logging.getLogger(__name__)
+
+# Share of a bet that counts toward wagering, by game category. Games can
+# override with Game.configuration["wagering_contribution"] (0..1).
+DEFAULT_CATEGORY_WEIGHTS: Dict[str, float] = {
+    "slot": 1.0,
+    "slots": 1.0,
+    "crash": 0.5,
+    "dice": 0.5,
+    "table": 0.1,
+    "live": 0.1,
+    "blackjack": 0.1,
+    "roulette": 0.1,
+    "poker": 0.0,
+}
+DEFAULT_WEIGHT = 1.0
+
+_EPS = 1e-9
+
+
+def _now_utc_naive() -> datetime:
+    return datetime.utcnow()
+
+
+def contribution_weight(game: Optional[Game]) -> float:
+    """Fraction of a bet on ``game`` that counts toward wagering targets."""
+
+    if game is None:
+        return DEFAULT_WEIGHT
+    override = (game.configuration or {}).get("wagering_contribution") if isinstance(game.configuration, dict) else None
+    if override is not None:
+        try:
+            return min(1.0, max(0.0, float(override)))
+        except (TypeError, ValueError):
+            pass
+    return DEFAULT_CATEGORY_WEIGHTS.get(str(game.category or "").lower(), DEFAULT_WEIGHT)
+
+
+@dataclass
+class WageringProgress:
+    contribution: float
+    grants_updated: int = 0
+    completed: List[str] = field(default_factory=list)
+    expired: List[str] = field(default_factory=list)
+    released: float = 0.0
+
+
+async def apply_wagering_contribution(
+    session: AsyncSession,
+    *,
+    tenant_id: str,
+    player_id: str,
+    game: Optional[Game],
+    bet_amount: float,
+    now: Optional[datetime] = None,
+) -> Optional[WageringProgress]:
+    """Advance wagering on the player's active grants for one bet.
+
+    Must run in the bet's transaction, after ``spend_with_bonus_precedence``
+    (which has locked and loaded the Player row). Cost per bet:
+
+    - no outstanding wagering (``Player.wagering_remaining <= 0``) or a
+      zero-weight game: no statement;
+    - otherwise a single ``UPDATE bonusgrant ... RETURNING``; progress is an
+      atomic ``wagering_contributed + :c`` on grants whose campaign covers the
+      game (no BonusCampaignGame rows = all games). Expired grants match
+      with ``+ 0`` so they can be transitioned.
+
+    ``Player.wagering_remaining`` is decremented with a SQL expression that
+    rides on the Player UPDATE the wallet debit already flushes. Completion
+    and expiry transitions cost one more UPDATE, only on the bet that
+    triggers them.
+    """
+
+    player = await session.get(Player, player_id)
+    if player is None or float(player.wagering_remaining or 0.0) <= _EPS:
+        return None
+
+    contribution = round(float(bet_amount) * contribution_weight(game), 6)
+    if contribution <= 0:
+        return None
+
+    now = now or _now_utc_naive()
+    game_id = game.id if game is not None else None
+
+    live = or_(BonusGrant.expires_at.is_(None), BonusGrant.expires_at >= now)
+    scoped = exists().where(BonusCampaignGame.campaign_id == BonusGrant.campaign_id)
+    in_scope = exists().where(
+        BonusCampaignGame.campaign_id == BonusGrant.campaign_id,
+        BonusCampaignGame.game_id == game_id,
+    )
+    stmt = (
+        update(BonusGrant)
+        .where(
+            BonusGrant.tenant_id == tenant_id,
+            BonusGrant.player_id == player_id,
+            BonusGrant.status == "active",
+            BonusGrant.wagering_target > 0,
+            # Expired grants are matched too (for +0) so they can be transitioned.
+            or_(~live, ~scoped, in_scope),
+        )
+        .values(
+            wagering_contributed=BonusGrant.wagering_contributed
+            + case((live, literal(contribution)), else_=literal(0.0))
+        )
+        .returning(
+            BonusGrant.id,
+            BonusGrant.wagering_contributed,
+            BonusGrant.wagering_target,
+            BonusGrant.expires_at,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    # No autoflush: the wallet debit's pending Player UPDATE must stay pending
+    # so the wagering_remaining decrement below joins it instead of costing
+    # a second UPDATE.
+    with session.no_autoflush:
+        rows = (await session.execute(stmt)).all()
+
+    progress = WageringProgress(contribution=contribution, grants_updated=len(rows))
+    for grant_id, contributed, target, expires_at in rows:
+        contributed, target = float(contributed or 0.0), float(target or 0.0)
+        if expires_at is not None and expires_at < now:
+            progress.expired.append(grant_id)
+            progress.released += max(0.0, target - contributed)
+            continue
+        # Only the part of this bet that was still needed reduces the requirement.
+        progress.released += min(contribution, max(0.0, target - (contributed - contribution)))
+        if contributed + _EPS >= target:
+            progress.completed.append(grant_id)
+
+    if progress.completed:
+        await session.execute(
+            update(BonusGrant)
+            .where(BonusGrant.id.in_(progress.completed), BonusGrant.status == "active")
+            .values(status="completed", completed_at=now)
+        )
+    if progress.expired:
+        await session.execute(
+            update(BonusGrant)
+            .where(BonusGrant.id.in_(progress.expired), BonusGrant.status == "active")
+            .values(status="expired")
+        )
+
+    if progress.released > 0:
+        released = round(progress.released, 6)
+        player.wagering_remaining = case(
+            (Player.wagering_remaining > released, Player.wagering_remaining - released),
+            else_=0.0,
+        )
+        session.add(player)
+
+    if progress.completed or progress.expired:
+        logger.info(
+            "wagering.grants_transitioned",
+            extra={
+                "event": "wagering.grants_transitioned",
+                "tenant_id": tenant_id,
+                "player_id": player_id,
+                "completed": progress.completed,
+                "expired": progress.expired,
+            },
+        )
+    return progress
+
+
+async def add_wagering_requirement(session: AsyncSession, *, player_id: str, amount: float) -> None:
+    """Atomically raise a player's outstanding wagering (on grant creation)."""
+
+    if amount <= 0:
+        return
+    await session.execute(
+        update(Player)
+        .where(Player.id == player_id)
+        .values(
+            wagering_requirement=Player.wagering_requirement + amount,
+            wagering_remaining=Player.wagering_remaining + amount,
+        )
+    )
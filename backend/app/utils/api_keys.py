@@ -4,7 +4,7 @@ from jose import jwt, JWTError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
-from app.core.database import get_session
+from app.core.database import async_session, get_session
 from app.models.sql_models import AdminUser, APIKey
 from config import settings
 
@@ -81,29 +81,16 @@ async def get_api_key_context(
             detail="API Key missing"
         )
 
-    # In a real system, you'd look up the key by hash.
-    # Since we store hashes, we have to iterate (inefficient but secure for MVP)
-    # OR better: use a prefix-based lookup if the key format allowed it.
-    # Here, we will fetch all active keys and verify.
-    stmt = select(APIKey).where(APIKey.status == "active")
-    result = await session.execute(stmt)
-    keys = result.scalars().all()
-    
-    valid_key = None
-    for k in keys:
-        if verify_password(api_key_header, k.key_hash):
-            valid_key = k
-            break
-            
-    if not valid_key:
+    verified = await resolve_api_key(session, api_key_header)
+    if verified is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid API Key"
         )
 
     return AdminAPIKeyContext(
-        tenant_id=valid_key.tenant_id,
-        scopes=valid_key.scopes.split(",") if valid_key.scopes else []
+        tenant_id=verified.tenant_id,
+        scopes=list(verified.scopes)
     )
 
 def require_scope(ctx: AdminAPIKeyContext, scope: str):
@@ -134,14 +121,219 @@ def validate_scopes(scopes: list) -> None:
 def generate_api_key() -> tuple[str, str, str]:
     """Generate a new API key.
 
-    Returns: (full_key, key_prefix, bcrypt_hash)
+    Returns: (full_key, key_prefix, key_hash)
+
+    Format: ``sk_<key_prefix>.<secret>``. The prefix is a public lookup id
+    (stored, indexed); the secret is 256 bits of randomness, so a single
+    SHA-256 comparison is enough to verify it (bcrypt's work factor exists
+    for low-entropy passwords and buys nothing here).
 
     Notes:
     - full_key must be returned ONLY once (create endpoint)
-    - we store only the hash in DB
+    - we store only the prefix and the hash in DB
     """
 
-    full_key = "sk_" + secrets.token_urlsafe(32)
-    key_prefix = full_key[:12]
-    key_hash = get_password_hash(full_key)
+    key_prefix = secrets.token_hex(8)
+    full_key = f"{API_KEY_PREFIX}{key_prefix}.{secrets.token_urlsafe(32)}"
+    key_hash = hash_api_key(full_key)
     return full_key, key_prefix, key_hash
+
+
+# ------------------------------------------------------------
+# API key verification (prefix lookup + verified-key cache)
+# ------------------------------------------------------------
+import hashlib
+import hmac
+import logging
+import re
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+from sqlalchemy import update
+
+from app.core.cache_bus import publish_invalidation, register_invalidation_handler
+
+logger = logging.getLogger(__name__)
+
+API_KEY_PREFIX = "sk_"
+_SHA256_SCHEME = "sha256$"
+
+# Legacy (pre-prefix) keys get a derived lookup id after their first
+# successful bcrypt verification; see resolve_api_key.
+_LEGACY_LOOKUP_PREFIX = "lg_"
+# Pre-prefix keys were "sk_" + token_urlsafe(32); anything else cannot be one.
+_LEGACY_KEY_RE = re.compile(r"sk_[A-Za-z0-9_-]{32,64}")
+
+API_KEYS_TOPIC = "auth.api_keys"
+API_KEY_CACHE_TTL_SECONDS = 30
+API_KEY_CACHE_MAX_ENTRIES = 10_000
+
+
+def hash_api_key(full_key: str) -> str:
+    return _SHA256_SCHEME + hashlib.sha256(full_key.encode()).hexdigest()
+
+
+def parse_api_key(full_key: str) -> Optional[str]:
+    """Return the lookup prefix of a prefixed key, None for legacy keys."""
+    if not full_key.startswith(API_KEY_PREFIX) or "." not in full_key:
+        return None
+    prefix, _, secret = full_key[len(API_KEY_PREFIX) :].partition(".")
+    if not prefix or not secret:
+        return None
+    return prefix
+
+
+def is_legacy_shaped(full_key: str) -> bool:
+    return _LEGACY_KEY_RE.fullmatch(full_key) is not None
+
+
+def legacy_lookup_prefix(full_key: str) -> str:
+    return _LEGACY_LOOKUP_PREFIX + hashlib.sha256(full_key.encode()).hexdigest()[:16]
+
+
+def _verify_hash(full_key: str, key_hash: str) -> bool:
+    if key_hash.startswith(_SHA256_SCHEME):
+        return hmac.compare_digest(hash_api_key(full_key), key_hash)
+    try:
+        return verify_password(full_key, key_hash)
+    except (ValueError, TypeError):
+        # Unparseable / placeholder hash
+        return False
+
+
+@dataclass(frozen=True)
+class VerifiedAPIKey:
+    key_id: str
+    tenant_id: str
+    scopes: Tuple[str, ...]
+
+
+class APIKeyVerificationCache:
+    """Short-TTL cache of successfully verified keys.
+
+    Entries are keyed by HMAC-SHA256 of the presented key under a per-process
+    random secret, so the raw key never sits in memory beyond the request and
+    cache keys are useless outside this process. Only successes are cached; a
+    deactivated key stops working within the TTL on every worker, immediately
+    on workers reached by the invalidation message.
+    """
+
+    def __init__(self, ttl_seconds: float = API_KEY_CACHE_TTL_SECONDS, max_entries: int = API_KEY_CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._secret = secrets.token_bytes(32)
+        self._entries: Dict[bytes, Tuple[float, VerifiedAPIKey]] = {}
+
+    def _digest(self, full_key: str) -> bytes:
+        return hmac.new(self._secret, full_key.encode(), hashlib.sha256).digest()
+
+    def get(self, full_key: str) -> Optional[VerifiedAPIKey]:
+        digest = self._digest(full_key)
+        hit = self._entries.get(digest)
+        if hit is None:
+            return None
+        if hit[0] < time.monotonic():
+            self._entries.pop(digest, None)
+            return None
+        return hit[1]
+
+    def put(self, full_key: str, verified: VerifiedAPIKey) -> None:
+        if len(self._entries) >= self.max_entries:
+            now = time.monotonic()
+            self._entries = {k: v for k, v in self._entries.items() if v[0] >= now}
+            if len(self._entries) >= self.max_entries:
+                self._entries.clear()
+        self._entries[self._digest(full_key)] = (time.monotonic() + self.ttl_seconds, verified)
+
+    def invalidate(self, key_id: Optional[str] = None) -> None:
+        if key_id is None:
+            self._entries.clear()
+            return
+        self._entries = {k: v for k, v in self._entries.items() if v[1].key_id != key_id}
+
+
+api_key_cache = APIKeyVerificationCache()
+
+register_invalidation_handler(API_KEYS_TOPIC, lambda payload: api_key_cache.invalidate(payload.get("key_id")))
+
+
+async def invalidate_api_key(key_id: Optional[str]) -> None:
+    """Call after an API key is deactivated, re-scoped or deleted."""
+    await publish_invalidation(API_KEYS_TOPIC, {"key_id": key_id})
+
+
+def _verified(key: APIKey) -> VerifiedAPIKey:
+    return VerifiedAPIKey(
+        key_id=key.id,
+        tenant_id=key.tenant_id,
+        scopes=tuple(key.scopes.split(",")) if key.scopes else (),
+    )
+
+
+async def resolve_api_key(
+    session: AsyncSession, full_key: str, *, session_factory: Optional[Callable] = None
+) -> Optional[VerifiedAPIKey]:
+    """Resolve a presented API key to its (active) key record, or None.
+
+    1. Verified-key cache hit: no DB, no hashing beyond one HMAC.
+    2. Prefixed key: indexed lookup by ``key_prefix`` + one constant-time compare.
+    3. Legacy key: indexed lookup by its derived lookup id + one bcrypt verify
+       (off the event loop). A legacy-shaped key not yet migrated is matched
+       against the remaining un-prefixed keys once (only while
+       ``settings.api_key_legacy_migration`` is on), then gets its lookup id
+       stored through ``session_factory`` so every later miss takes path 3.
+    """
+
+    cached = api_key_cache.get(full_key)
+    if cached is not None:
+        return cached
+
+    prefix = parse_api_key(full_key)
+    lookup = prefix if prefix is not None else legacy_lookup_prefix(full_key)
+
+    stmt = select(APIKey).where(APIKey.key_prefix == lookup, APIKey.status == "active")
+    key = (await session.execute(stmt)).scalars().first()
+    if key is not None:
+        verified = _verified(key) if await _verify_hash_async(full_key, key.key_hash) else None
+    elif prefix is None and settings.api_key_legacy_migration and is_legacy_shaped(full_key):
+        verified = await _match_unmigrated_legacy_key(session, full_key, lookup, session_factory or async_session)
+    else:
+        verified = None
+
+    if verified is not None:
+        api_key_cache.put(full_key, verified)
+    return verified
+
+
+async def _verify_hash_async(full_key: str, key_hash: str) -> bool:
+    if key_hash.startswith(_SHA256_SCHEME):
+        return _verify_hash(full_key, key_hash)
+    # bcrypt (legacy keys): keep the ~100ms of hashing off the event loop.
+    from app.services.password_hasher import password_hasher
+
+    return await password_hasher.verify(full_key, key_hash)
+
+
+async def _match_unmigrated_legacy_key(
+    session: AsyncSession, full_key: str, lookup: str, session_factory: Callable
+) -> Optional[VerifiedAPIKey]:
+    stmt = select(APIKey).where(APIKey.key_prefix.is_(None), APIKey.status == "active")
+    candidates = (await session.execute(stmt)).scalars().all()
+    for candidate in candidates:
+        if await _verify_hash_async(full_key, candidate.key_hash):
+            verified = _verified(candidate)
+            # Own session: the request's transaction is not ours to commit.
+            try:
+                async with session_factory() as writer:
+                    await writer.execute(
+                        update(APIKey)
+                        .where(APIKey.id == candidate.id, APIKey.key_prefix.is_(None))
+                        .values(key_prefix=lookup)
+                    )
+                    await writer.commit()
+            except Exception as exc:
+                # Migration is an optimisation; the key is still valid.
+                logger.warning("api_keys.legacy_migration_failed", extra={"event": "api_keys.legacy_migration_failed", "key_id": candidate.id, "error": str(exc)})
+            return verified
+    return None
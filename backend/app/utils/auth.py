@@ -1,24 +1,29 @@
+import time
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, APIKeyHeader
 from jose import jwt, JWTError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 from sqlmodel import select
 
 from app.core.database import get_session
-from app.models.sql_models import AdminUser, APIKey
+from app.models.sql_models import AdminUser
+from app.utils.api_keys import resolve_api_key
+from app.utils.principal_cache import PRINCIPAL_CACHE_TTL_SECONDS, admin_principals, token_cache_key
 from config import settings
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
 def verify_password(plain_password, hashed_password):
-    from passlib.context import CryptContext
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    # Blocking (bcrypt). In async handlers use app.services.password_hasher.
+    from app.services.password_hasher import pwd_context
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password):
-    from passlib.context import CryptContext
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    # Blocking (bcrypt). In async handlers use app.services.password_hasher.
+    from app.services.password_hasher import pwd_context
     return pwd_context.hash(password)
 
 def create_access_token(data: dict, expires_delta):
@@ -33,6 +38,19 @@ def create_access_token(data: dict, expires_delta):
     encoded_jwt = jwt.encode(to_encode, settings.jwt_secret, algorithm=settings.jwt_algorithm)
     return encoded_jwt
 
+def _admin_snapshot(admin: AdminUser) -> dict:
+    return {c.name: getattr(admin, c.name) for c in AdminUser.__table__.columns}
+
+
+def _admin_from_snapshot(snapshot: dict) -> AdminUser:
+    # Fresh instance per request, in "detached" state: handlers may read it
+    # freely, and session.add() + changes emit an UPDATE of the changed
+    # columns only (never an INSERT).
+    admin = AdminUser(**snapshot)
+    make_transient_to_detached(admin)
+    return admin
+
+
 async def get_current_admin(
     token: str = Depends(oauth2_scheme),
     session: AsyncSession = Depends(get_session)
@@ -42,9 +60,19 @@ async def get_current_admin(
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+    # Principal cache: token digest -> admin row snapshot (short TTL, never
+    # past the token's exp since hits skip jwt.decode; dropped on admin
+    # updates via invalidate_admin_principal).
+    cache_key = token_cache_key(token)
+    cached = admin_principals.get(cache_key)
+    if cached is not None:
+        return _admin_from_snapshot(cached[1])
+
     try:
         payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
         email: str = payload.get("email")
+        exp = payload.get("exp")
         if email is None:
             raise credentials_exception
     except JWTError:
@@ -56,6 +84,10 @@ async def get_current_admin(
     
     if admin is None:
         raise credentials_exception
+
+    cache_ttl = PRINCIPAL_CACHE_TTL_SECONDS if exp is None else min(PRINCIPAL_CACHE_TTL_SECONDS, float(exp) - time.time())
+    if cache_ttl > 0:
+        admin_principals.put(cache_key, (admin.id, _admin_snapshot(admin)), ttl_seconds=cache_ttl)
     return admin
 
 
@@ -86,29 +118,16 @@ async def get_api_key_context(
             detail="API Key missing"
         )
 
-    # In a real system, you'd look up the key by hash.
-    # Since we store hashes, we have to iterate (inefficient but secure for MVP)
-    # OR better: use a prefix-based lookup if the key format allowed it.
-    # Here, we will fetch all active keys and verify.
-    stmt = select(APIKey).where(APIKey.status == "active")
-    result = await session.execute(stmt)
-    keys = result.scalars().all()
-    
-    valid_key = None
-    for k in keys:
-        if verify_password(api_key_header, k.key_hash):
-            valid_key = k
-            break
-            
-    if not valid_key:
+    verified = await resolve_api_key(session, api_key_header)
+    if verified is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid API Key"
         )
 
     return AdminAPIKeyContext(
-        tenant_id=valid_key.tenant_id,
-        scopes=valid_key.scopes.split(",") if valid_key.scopes else []
+        tenant_id=verified.tenant_id,
+        scopes=list(verified.scopes)
     )
 
 def require_scope(ctx: AdminAPIKeyContext, scope: str):
@@ -1,98 +1,134 @@
+import time
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import select
-from datetime import datetime, timezone
 
 from app.core.database import get_session
 from app.models.sql_models import Player
-from app.models.player_ops_models import PlayerSessionRevocation
+from app.utils.principal_cache import (
+    PRINCIPAL_CACHE_TTL_SECONDS,
+    PlayerPrincipal,
+    get_revoked_at_ms,
+    player_principals,
+    token_cache_key,
+)
 from config import settings
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/player/login")
 
-async def get_current_player(
-    token: str = Depends(oauth2_scheme),
-    session: AsyncSession = Depends(get_session)
-) -> Player:
-    credentials_exception = HTTPException(
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _token_revoked() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail={"error_code": "TOKEN_REVOKED"},
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def _decode_player_token(token: str) -> tuple[str, str, int, float | None]:
     try:
         payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
-        player_id: str = payload.get("sub")
-        role: str = payload.get("role")
-        iat = payload.get("iat")
-        tenant_id = payload.get("tenant_id")
-
-        if player_id is None or role != "player":
-            raise credentials_exception
-
-        # P1-E2: iat is mandatory for revocation enforcement
-        if iat is None or tenant_id is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail={"error_code": "TOKEN_REVOKED"},
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-
     except JWTError:
-        raise credentials_exception
-        
-    player = await session.get(Player, player_id)
-    if player is None:
-        raise credentials_exception
-        
+        raise _credentials_exception()
 
-    # P1-E2: session revocation enforcement (check before status so old tokens get 401 TOKEN_REVOKED)
-    stmt = select(PlayerSessionRevocation).where(
-        PlayerSessionRevocation.tenant_id == tenant_id,
-        PlayerSessionRevocation.player_id == player_id,
-    )
-    rev = (await session.execute(stmt)).scalars().first()
-    if rev and rev.revoked_at:
-        try:
-            # iat can be seconds (int) or ms (int). Detect by magnitude.
-            iat_int = int(iat)
-            # keep conversion here for debugging/trace purposes if needed
-            _ = datetime.fromtimestamp(
-                (iat_int / 1000.0) if iat_int > 10_000_000_000 else iat_int,
-                tz=timezone.utc,
-            )
-        except Exception:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail={"error_code": "TOKEN_REVOKED"},
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-
-        # Compare using millisecond precision to avoid same-second edge cases.
-        revoked_at = rev.revoked_at
-        if getattr(revoked_at, "tzinfo", None) is None:
-            revoked_at = revoked_at.replace(tzinfo=timezone.utc)
-        revoked_ms = int(revoked_at.timestamp() * 1000)
+    player_id: str = payload.get("sub")
+    role: str = payload.get("role")
+    iat = payload.get("iat")
+    tenant_id = payload.get("tenant_id")
+    exp = payload.get("exp")
+
+    if player_id is None or role != "player":
+        raise _credentials_exception()
 
+    # P1-E2: iat is mandatory for revocation enforcement
+    if iat is None or tenant_id is None:
+        raise _token_revoked()
+
+    try:
         # iat can be seconds or ms; we normalize to ms here.
         iat_int = int(iat)
-        token_iat_ms = iat_int if iat_int > 10_000_000_000 else (iat_int * 1000)
+    except (TypeError, ValueError):
+        raise _token_revoked()
+    token_iat_ms = iat_int if iat_int > 10_000_000_000 else (iat_int * 1000)
+    return str(player_id), str(tenant_id), token_iat_ms, float(exp) if exp is not None else None
+
+
+async def get_current_player_principal(
+    token: str = Depends(oauth2_scheme),
+    session: AsyncSession = Depends(get_session),
+) -> PlayerPrincipal:
+    """Authenticated player identity without loading the Player row.
+
+    Use this for handlers that only need ``id`` / ``tenant_id``. The decoded
+    principal is cached per token for a short TTL (never past the token's
+    ``exp``, since hits skip ``jwt.decode``); session revocation
+    (force-logout, suspend) is still checked on every request against the
+    player's revocation epoch, which is shared through Redis and bumped by
+    the admin endpoints.
+    """
 
-        if token_iat_ms <= revoked_ms:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail={"error_code": "TOKEN_REVOKED"},
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+    cache_key = token_cache_key(token)
+    principal = player_principals.get(cache_key)
+
+    cache_ttl = None
+    if principal is None:
+        player_id, tenant_id, token_iat_ms, exp = _decode_player_token(token)
+        player = await session.get(Player, player_id)
+        if player is None:
+            raise _credentials_exception()
+        principal = PlayerPrincipal(
+            id=player.id,
+            tenant_id=tenant_id,
+            status=getattr(player, "status", None),
+            token_iat_ms=token_iat_ms,
+        )
+        cache_principal = True
+        if exp is not None:
+            cache_ttl = min(PRINCIPAL_CACHE_TTL_SECONDS, exp - time.time())
+    else:
+        cache_principal = False
 
-        # Token issued after revocation -> allow request to proceed.
+    # P1-E2: session revocation enforcement (check before status so old tokens get 401 TOKEN_REVOKED)
+    # Compare using millisecond precision to avoid same-second edge cases.
+    revoked_ms = await get_revoked_at_ms(session, principal.tenant_id, principal.id)
+    if revoked_ms and principal.token_iat_ms <= revoked_ms:
+        player_principals.discard(cache_key)
+        raise _token_revoked()
 
-    # P1-E3: suspended players cannot access protected endpoints
-    if getattr(player, "status", None) == "suspended":
+    # P1-E3: suspended players cannot access protected endpoints. Self-exclusion
+    # is enforced at login from PlayerRGProfile, which expires on its own.
+    if principal.status == "suspended":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail={"error_code": "PLAYER_SUSPENDED"},
         )
 
+    if cache_principal and (cache_ttl is None or cache_ttl > 0):
+        player_principals.put(cache_key, principal, ttl_seconds=cache_ttl)
+    return principal
+
+
+async def get_current_player(
+    principal: PlayerPrincipal = Depends(get_current_player_principal),
+    session: AsyncSession = Depends(get_session),
+) -> Player:
+    """Authenticated Player row, loaded fresh in the request's session.
+
+    Handlers read balances and KYC flags from it, so the row itself is never
+    served from cache; on a principal cache miss this is an identity-map hit.
+    """
+
+    player = await session.get(Player, principal.id)
+    if player is None:
+        raise _credentials_exception()
     return player
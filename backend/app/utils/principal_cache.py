@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Generic, Optional, Tuple, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.core.cache_bus import publish_invalidation, register_invalidation_handler
+from app.core.redis_client import RedisClient
+from app.models.player_ops_models import PlayerSessionRevocation
+
+logger = logging.getLogger(__name__)
+
+PRINCIPALS_TOPIC = "auth.principals"
+
+PRINCIPAL_CACHE_TTL_SECONDS = 30
+PRINCIPAL_CACHE_MAX_ENTRIES = 20_000
+
+# How long a worker trusts its local copy of a player's revocation epoch
+# before re-reading Redis; bounds revocation latency on workers that missed
+# the invalidation message.
+REVOCATION_EPOCH_TTL_SECONDS = 5
+# Bounds how long a lost Redis write can mask a revocation on peers.
+_REVOCATION_KEY_TTL_SECONDS = 3600
+
+V = TypeVar("V")
+
+
+def token_cache_key(token: str) -> bytes:
+    # Bearer tokens are credentials; keep only a digest in memory.
+    return hashlib.sha256(token.encode()).digest()
+
+
+class TTLCache(Generic[V]):
+    """Small LRU with per-entry expiry (single event loop, no locking)."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Any, Tuple[float, V]]" = OrderedDict()
+
+    def get(self, key: Any) -> Optional[V]:
+        hit = self._entries.get(key)
+        if hit is None:
+            return None
+        if hit[0] < time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return hit[1]
+
+    def put(self, key: Any, value: V, ttl_seconds: Optional[float] = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def discard(self, key: Any) -> None:
+        self._entries.pop(key, None)
+
+    def discard_where(self, predicate) -> None:
+        for key in [k for k, (_, v) in self._entries.items() if predicate(v)]:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+@dataclass(frozen=True)
+class PlayerPrincipal:
+    """What player-facing handlers usually need from the token, without a DB row."""
+
+    id: str
+    tenant_id: str
+    status: Optional[str]
+    token_iat_ms: int
+
+
+# token digest -> PlayerPrincipal
+player_principals: TTLCache[PlayerPrincipal] = TTLCache(PRINCIPAL_CACHE_TTL_SECONDS, PRINCIPAL_CACHE_MAX_ENTRIES)
+# token digest -> (admin_id, column snapshot)
+admin_principals: TTLCache[Tuple[str, Dict[str, Any]]] = TTLCache(PRINCIPAL_CACHE_TTL_SECONDS, PRINCIPAL_CACHE_MAX_ENTRIES)
+# (tenant_id, player_id) -> revoked_at in ms (0 = never revoked)
+_revocation_epochs: TTLCache[int] = TTLCache(REVOCATION_EPOCH_TTL_SECONDS, PRINCIPAL_CACHE_MAX_ENTRIES)
+
+
+def _on_invalidate(payload: Dict[str, Any]) -> None:
+    player_id = payload.get("player_id")
+    admin_id = payload.get("admin_id")
+    if player_id:
+        _revocation_epochs.discard((payload.get("tenant_id"), player_id))
+        player_principals.discard_where(lambda p: p.id == player_id)
+    if admin_id:
+        admin_principals.discard_where(lambda entry: entry[0] == admin_id)
+    if not player_id and not admin_id:
+        clear_principal_caches()
+
+
+register_invalidation_handler(PRINCIPALS_TOPIC, _on_invalidate)
+
+
+def clear_principal_caches() -> None:
+    player_principals.clear()
+    admin_principals.clear()
+    _revocation_epochs.clear()
+
+
+def _revocation_key(tenant_id: str, player_id: str) -> str:
+    return f"auth:revoked_at:{tenant_id}:{player_id}"
+
+
+def _to_ms(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
+
+
+async def get_revoked_at_ms(session: AsyncSession, tenant_id: str, player_id: str) -> int:
+    """Latest session revocation for a player, in ms (0 if none).
+
+    Lookup order: worker-local copy (a few seconds) -> Redis -> DB. The DB
+    answer is written back to Redis so a cold or flushed Redis heals itself.
+    """
+
+    local_key = (tenant_id, player_id)
+    cached = _revocation_epochs.get(local_key)
+    if cached is not None:
+        return cached
+
+    redis = RedisClient.get_instance()
+    key = _revocation_key(tenant_id, player_id)
+    value: Optional[int] = None
+    try:
+        raw = await redis.get(key)
+        if raw is not None:
+            value = int(raw)
+    except Exception as exc:
+        logger.warning("principal_cache.redis_read_failed", extra={"event": "principal_cache.redis_read_failed", "error": str(exc)})
+
+    if value is None:
+        stmt = select(PlayerSessionRevocation.revoked_at).where(
+            PlayerSessionRevocation.tenant_id == tenant_id,
+            PlayerSessionRevocation.player_id == player_id,
+        )
+        revoked_at = (await session.execute(stmt)).scalars().first()
+        value = _to_ms(revoked_at) if revoked_at else 0
+        try:
+            await redis.set(key, str(value), ex=_REVOCATION_KEY_TTL_SECONDS)
+        except Exception:
+            pass
+
+    _revocation_epochs.put(local_key, value)
+    return value
+
+
+async def bump_revocation_epoch(tenant_id: str, player_id: str, revoked_at: datetime) -> None:
+    """Call after writing PlayerSessionRevocation (force-logout, suspend)."""
+
+    try:
+        await RedisClient.get_instance().set(
+            _revocation_key(tenant_id, player_id), str(_to_ms(revoked_at)), ex=_REVOCATION_KEY_TTL_SECONDS
+        )
+    except Exception as exc:
+        # Peers still pick the revocation up from the DB once their local
+        # copy expires and Redis has no value.
+        logger.warning("principal_cache.redis_write_failed", extra={"event": "principal_cache.redis_write_failed", "error": str(exc)})
+    await publish_invalidation(PRINCIPALS_TOPIC, {"tenant_id": tenant_id, "player_id": player_id})
+
+
+async def invalidate_player_principal(tenant_id: str, player_id: str) -> None:
+    """Call after a player's status changes without a session revocation."""
+    await publish_invalidation(PRINCIPALS_TOPIC, {"tenant_id": tenant_id, "player_id": player_id})
+
+
+async def invalidate_admin_principal(admin_id: str) -> None:
+    """Call after an admin's role, tenant, status or credentials change."""
+    await publish_invalidation(PRINCIPALS_TOPIC, {"admin_id": admin_id})
@@ -2,6 +2,11 @@ from datetime import datetime, timedelta
 from arq import cron
 from app.core.database import get_session
 from app.jobs.reconciliation_run_job import run_reconciliation_for_run_id
+from app.jobs.affiliate_revshare_job import run_revshare_accruals
+from app.jobs.audit_archive_job import run_audit_archive
+from app.jobs.ledger_verify_job import run_ledger_verification
+from app.jobs.poker_rakeback_job import run_rakeback_settlements
+from app.jobs.poker_collusion_job import run_collusion_analysis
 from app.models.reconciliation_run import ReconciliationRun
 from app.services.metrics import metrics
 from config import settings
@@ -68,10 +73,74 @@ async def run_daily_reconciliation(ctx):
                 logger.error(f"Failed daily reconciliation for {provider}: {e}")
         break # get_session is a generator, we just need one session context
 
+async def run_daily_affiliate_revshare(ctx):
+    """
+    Cron job to accrue affiliate revshare commissions for the previous day.
+    """
+    now = datetime.utcnow()
+    window_end = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    window_start = window_end - timedelta(days=1)
+
+    summary = await run_revshare_accruals(window_start=window_start, window_end=window_end)
+    logger.info(
+        f"Daily affiliate revshare completed. tenants={summary['tenants']} "
+        f"accrued={summary['accrued']} failed={len(summary['failed_tenants'])}"
+    )
+
+async def run_monthly_poker_rakeback(ctx):
+    """
+    Cron job to settle poker rakeback for the previous calendar month.
+    """
+    window_end = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    window_start = (window_end - timedelta(days=1)).replace(day=1)
+
+    summary = await run_rakeback_settlements(window_start=window_start, window_end=window_end)
+    logger.info(
+        f"Monthly poker rakeback completed. tenants={summary['tenants']} "
+        f"credited={summary['credited']} failed={len(summary['failed_tenants'])}"
+    )
+
+async def run_daily_poker_collusion(ctx):
+    """
+    Cron job to score player pairs / rings for collusion over the previous day.
+    """
+    window_end = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    window_start = window_end - timedelta(days=1)
+
+    summary = await run_collusion_analysis(window_start=window_start, window_end=window_end)
+    logger.info(
+        f"Daily poker collusion analysis completed. tenants={summary['tenants']} "
+        f"hands={summary['hands']} signals={summary['signals_inserted']}"
+    )
+
+async def run_daily_audit_archive(ctx):
+    """
+    Cron job to roll audit partitions: create upcoming months, archive expired ones.
+    """
+    summary = await run_audit_archive()
+    logger.info(
+        f"Daily audit archive completed. archived={summary['archived']} created={summary['created']}"
+    )
+
+async def run_daily_ledger_verification(ctx):
+    """
+    Cron job to recompute every wallet from the ledger and record mismatches.
+    """
+    summary = await run_ledger_verification()
+    logger.info(
+        f"Daily ledger verification completed. run_id={summary['run_id']} "
+        f"groups={summary['groups']} mismatches={summary['mismatches']}"
+    )
+
 class WorkerSettings:
     functions = [run_reconciliation_for_run_id]
     cron_jobs = [
-        cron(run_daily_reconciliation, hour=2, minute=0) # Run at 2 AM UTC
+        cron(run_daily_reconciliation, hour=2, minute=0), # Run at 2 AM UTC
+        cron(run_daily_affiliate_revshare, hour=3, minute=0),
+        cron(run_monthly_poker_rakeback, day=1, hour=4, minute=0),
+        cron(run_daily_poker_collusion, hour=4, minute=30),
+        cron(run_daily_audit_archive, hour=5, minute=0),
+        cron(run_daily_ledger_verification, hour=5, minute=30),
     ]
     redis_settings = settings.arq_redis_settings
     on_startup = startup
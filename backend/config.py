@@ -17,12 +17,41 @@ class Settings(BaseSettings):
     )
     db_pool_size: int = 5
     db_max_overflow: int = 10
+    # Pool telemetry / adaptive sizing (overflow ceiling follows measured load)
+    db_pool_slow_checkout_ms: float = 100.0
+    db_pool_autosize: bool = False
+    db_pool_autosize_max: int = 50
+    db_pool_autosize_window_seconds: float = 30.0
+    # Per-request query budget: log requests over it or repeating one statement (N+1)
+    db_query_budget: int = 50
+    db_repeated_statement_threshold: int = 10
+
+    # Metrics: label sets per metric before folding into "__overflow__"; dashboard error-rate window
+    metrics_max_series_per_metric: int = 2000
+    metrics_window_seconds: int = 300
+
+    # Read replica for reports/exports (unset: reads go to the primary)
+    database_replica_url: Optional[str] = Field(
+        default=None,
+        validation_alias=AliasChoices("DATABASE_REPLICA_URL", "DATABASE_READ_URL"),
+    )
+    db_replica_pool_size: int = 5
+    db_replica_max_overflow: int = 10
+    db_replica_max_lag_seconds: float = 30.0
+    db_replica_lag_check_interval_seconds: float = 5.0
 
     # Auth
     jwt_secret: str = "secret"
     jwt_algorithm: str = "HS256"
     jwt_access_token_expires_minutes: int = 1440
 
+    # Password hashing (bcrypt cost; hashes with another cost are upgraded on login)
+    password_bcrypt_rounds: int = 12
+    password_hash_workers: int = 4
+    password_hash_max_queue: int = 64
+    # Match un-migrated (pre-prefix, bcrypt) API keys by scanning them; turn off once all are migrated.
+    api_key_legacy_migration: bool = True
+
     # App
     debug: bool = True
     cors_origins: str = '["http://localhost:3000", "http://localhost:3001"]'
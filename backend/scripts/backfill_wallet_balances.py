@@ -1,8 +1,14 @@
 import argparse
 import asyncio
+import json
 import logging
-from typing import Optional
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
+from sqlalchemy import and_, distinct, func, insert, literal, or_, update
 from sqlmodel import select
 
 from app.core.database import async_session
@@ -11,6 +17,304 @@ from app.repositories.ledger_repo import WalletBalance
 
 logger = logging.getLogger(__name__)
 
+CURRENCY = "USD"
+DRIFT_EPSILON = 0.005
+DRIFT_SAMPLE = 20
+PROGRESS_EVERY_SECONDS = 10.0
+
+# Counters every engine op reports (missing keys count as 0).
+_COUNTERS = ("scanned", "created", "skipped_exists", "updated_forced", "missing", "drifted", "errors")
+
+
+@dataclass(frozen=True)
+class WorkUnit:
+    """One tenant's slice of the player id space: ``lo <= id < hi`` (hi None = open)."""
+
+    tenant_id: str
+    lo: str
+    hi: Optional[str]
+
+    @property
+    def key(self) -> str:
+        # Both bounds: a checkpoint written with another --shards layout must
+        # not mark a wider range as done.
+        return f"{self.tenant_id}:{self.lo}:{self.hi or ''}"
+
+
+def _id_boundaries(shards: int) -> List[str]:
+    # Player ids are uuid4 strings: split the leading hex digits evenly.
+    # Ranges still cover every possible id, only the balance assumes uuids.
+    shards = max(1, min(shards, 4096))
+    return [f"{(i * 4096) // shards:03x}" for i in range(1, shards)]
+
+
+def _units(tenant_ids: List[str], shards: int) -> List[WorkUnit]:
+    bounds = [""] + _id_boundaries(shards)
+    units = []
+    for tenant_id in tenant_ids:
+        for i, lo in enumerate(bounds):
+            hi = bounds[i + 1] if i + 1 < len(bounds) else None
+            units.append(WorkUnit(tenant_id=tenant_id, lo=lo, hi=hi))
+    return units
+
+
+class Checkpoint:
+    """Per-unit resume cursor (last processed player id, done flag) in a JSON file."""
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.state: Dict[str, Dict[str, Any]] = {}
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.state = json.load(f)
+
+    def cursor(self, unit: WorkUnit) -> Optional[Dict[str, Any]]:
+        return self.state.get(unit.key)
+
+    def save(self, unit: WorkUnit, last_id: str, done: bool = False) -> None:
+        self.state[unit.key] = {"last_id": last_id, "done": done}
+        if not self.path:
+            return
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+        os.replace(tmp, self.path)
+
+
+def _wb_join():
+    return and_(
+        WalletBalance.tenant_id == Player.tenant_id,
+        WalletBalance.player_id == Player.id,
+        WalletBalance.currency == CURRENCY,
+    )
+
+
+def _in_batch(unit: WorkUnit, after: str, last: str):
+    # ``last`` is below ``unit.hi`` by construction; ``after`` may predate ``unit.lo``.
+    return and_(Player.tenant_id == unit.tenant_id, Player.id > after, Player.id >= unit.lo, Player.id <= last)
+
+
+def _backfill_op(*, dry_run: bool, force: bool):
+    """Per-batch set-based backfill: one anti-join INSERT ... SELECT (+ one UPDATE with --force)."""
+
+    async def op(session, unit: WorkUnit, after: str, last: str, scanned: int) -> Dict[str, int]:
+        missing = (
+            select(
+                Player.tenant_id,
+                Player.id,
+                literal(CURRENCY),
+                Player.balance_real_available,
+                Player.balance_real_held,
+                literal(0.0),
+                literal(0.0),
+                literal(datetime.utcnow()),
+            )
+            .outerjoin(WalletBalance, _wb_join())
+            .where(_in_batch(unit, after, last), WalletBalance.player_id.is_(None))
+        )
+        if dry_run:
+            created = (await session.execute(select(func.count()).select_from(missing.subquery()))).scalar_one()
+        else:
+            result = await session.execute(
+                insert(WalletBalance).from_select(
+                    [
+                        "tenant_id",
+                        "player_id",
+                        "currency",
+                        "balance_real_available",
+                        "balance_real_pending",
+                        "balance_bonus_available",
+                        "balance_bonus_pending",
+                        "updated_at",
+                    ],
+                    missing,
+                )
+            )
+            created = result.rowcount
+
+        counts = {"scanned": scanned, "created": created}
+        if not force:
+            counts["skipped_exists"] = scanned - created
+            return counts
+
+        in_range = and_(
+            WalletBalance.tenant_id == unit.tenant_id,
+            WalletBalance.player_id > after,
+            WalletBalance.player_id >= unit.lo,
+            WalletBalance.player_id <= last,
+            WalletBalance.currency == CURRENCY,
+        )
+        if dry_run:
+            counts["updated_forced"] = (
+                await session.execute(select(func.count()).select_from(WalletBalance).where(in_range))
+            ).scalar_one()
+            return counts
+
+        source = select(Player).where(Player.tenant_id == WalletBalance.tenant_id, Player.id == WalletBalance.player_id)
+        result = await session.execute(
+            update(WalletBalance)
+            .where(in_range, source.exists())
+            .values(
+                balance_real_available=source.with_only_columns(Player.balance_real_available).scalar_subquery(),
+                balance_real_pending=source.with_only_columns(Player.balance_real_held).scalar_subquery(),
+                updated_at=datetime.utcnow(),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        # Rows inserted above in this batch were rewritten with the same values.
+        counts["updated_forced"] = result.rowcount - created
+        return counts
+
+    return op
+
+
+def _verify_op(samples: List[Dict[str, Any]]):
+    """Per-batch drift check: players with no WalletBalance or differing real balances."""
+
+    async def op(session, unit: WorkUnit, after: str, last: str, scanned: int) -> Dict[str, int]:
+        rows = (
+            await session.execute(
+                select(
+                    Player.id,
+                    Player.balance_real_available,
+                    Player.balance_real_held,
+                    WalletBalance.balance_real_available,
+                    WalletBalance.balance_real_pending,
+                    WalletBalance.player_id,
+                )
+                .outerjoin(WalletBalance, _wb_join())
+                .where(
+                    _in_batch(unit, after, last),
+                    or_(
+                        WalletBalance.player_id.is_(None),
+                        func.abs(WalletBalance.balance_real_available - Player.balance_real_available) > DRIFT_EPSILON,
+                        func.abs(WalletBalance.balance_real_pending - Player.balance_real_held) > DRIFT_EPSILON,
+                    ),
+                )
+            )
+        ).all()
+        counts = {"scanned": scanned, "missing": 0, "drifted": 0}
+        for player_id, p_avail, p_held, wb_avail, wb_pending, wb_player in rows:
+            counts["missing" if wb_player is None else "drifted"] += 1
+            if len(samples) < DRIFT_SAMPLE:
+                samples.append(
+                    {
+                        "tenant_id": unit.tenant_id,
+                        "player_id": player_id,
+                        "player": [p_avail, p_held],
+                        "wallet_balance": None if wb_player is None else [wb_avail, wb_pending],
+                    }
+                )
+        return counts
+
+    return op
+
+
+BatchOp = Callable[[Any, WorkUnit, str, str, int], Awaitable[Dict[str, int]]]
+
+
+class _Progress:
+    def __init__(self, label: str):
+        self.label = label
+        self.totals = {k: 0 for k in _COUNTERS}
+        self.started = time.perf_counter()
+        self._last_report = self.started
+
+    def add(self, counts: Dict[str, int]) -> None:
+        for k, v in counts.items():
+            self.totals[k] += v
+        now = time.perf_counter()
+        if now - self._last_report >= PROGRESS_EVERY_SECONDS:
+            self._last_report = now
+            logger.info("%s progress | %s", self.label, self._line())
+
+    def summary(self) -> Dict[str, Any]:
+        duration = time.perf_counter() - self.started
+        return {
+            **self.totals,
+            "duration_ms": round(duration * 1000, 1),
+            "players_per_sec": round(self.totals["scanned"] / duration, 1) if duration > 0 else None,
+        }
+
+    def _line(self) -> str:
+        s = self.summary()
+        return " ".join(f"{k}={s[k]}" for k in (*_COUNTERS, "players_per_sec") if s[k])
+
+
+async def _run_ranges(
+    *,
+    factory,
+    tenant_id: Optional[str],
+    batch_size: int,
+    workers: int,
+    shards: Optional[int],
+    op: BatchOp,
+    commit: bool,
+    checkpoint: Checkpoint,
+    progress: _Progress,
+) -> None:
+    """Keyset-walk every (tenant, id-range) unit with ``workers`` concurrent sessions.
+
+    Each batch reads only the next ``batch_size`` player ids (index seek,
+    no OFFSET), hands the id window to ``op`` and commits it with the
+    unit's checkpoint, so an interrupted run resumes at the last batch. A
+    failed batch stops its unit without advancing the cursor.
+    """
+
+    if tenant_id:
+        tenant_ids = [tenant_id]
+    else:
+        async with factory() as session:
+            tenant_ids = sorted((await session.execute(select(distinct(Player.tenant_id)))).scalars().all())
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for unit in _units(tenant_ids, shards or workers):
+        if not (checkpoint.cursor(unit) or {}).get("done"):
+            queue.put_nowait(unit)
+
+    async def worker() -> None:
+        async with factory() as session:
+            while True:
+                try:
+                    unit = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                after = (checkpoint.cursor(unit) or {}).get("last_id") or ""
+                while True:
+                    stmt = select(Player.id).where(Player.tenant_id == unit.tenant_id, Player.id > after)
+                    if unit.lo:
+                        stmt = stmt.where(Player.id >= unit.lo)
+                    if unit.hi is not None:
+                        stmt = stmt.where(Player.id < unit.hi)
+                    ids = (await session.execute(stmt.order_by(Player.id).limit(batch_size))).scalars().all()
+                    if not ids:
+                        checkpoint.save(unit, after, done=True)
+                        break
+                    try:
+                        counts = await op(session, unit, after, ids[-1], len(ids))
+                        if commit:
+                            await session.commit()
+                        else:
+                            await session.rollback()
+                    except Exception as exc:
+                        await session.rollback()
+                        progress.add({"scanned": len(ids), "errors": len(ids)})
+                        # Leave the cursor before the failed batch and stop this unit:
+                        # a resume retries it instead of skipping it.
+                        logger.error(
+                            "Error processing batch (tenant=%s, after=%s, last=%s), unit stopped: %s",
+                            unit.tenant_id,
+                            after,
+                            ids[-1],
+                            exc,
+                        )
+                        break
+                    after = ids[-1]
+                    checkpoint.save(unit, after)
+                    progress.add(counts)
+
+    await asyncio.gather(*(worker() for _ in range(max(1, workers))))
+
 
 async def _backfill_wallet_balances(
     *,
@@ -19,7 +323,10 @@ async def _backfill_wallet_balances(
     dry_run: bool,
     force: bool,
     session_factory=None,
-) -> None:
+    workers: int = 1,
+    shards: Optional[int] = None,
+    checkpoint_path: Optional[str] = None,
+) -> Dict[str, Any]:
     """Backfill WalletBalance rows from Player aggregates.
 
     Mapping:
@@ -29,92 +336,74 @@ async def _backfill_wallet_balances(
     Idempotency:
     - Default: if WalletBalance exists, skip.
     - With --force: overwrite existing balances.
+
+    Runs as keyset batches over (tenant, id-range) units on ``workers``
+    concurrent sessions; see ``_run_ranges``.
     """
 
-    scanned_players = 0
-    created = 0
-    skipped_exists = 0
-    updated_forced = 0
-    errors = 0
-
-    factory = session_factory or async_session
-
-    async with factory() as session:
-        offset = 0
-        while True:
-            stmt = select(Player)
-            if tenant_id:
-                stmt = stmt.where(Player.tenant_id == tenant_id)
-            stmt = stmt.offset(offset).limit(batch_size)
-
-            result = await session.execute(stmt)
-            players = result.scalars().all()
-            if not players:
-                break
-
-            for p in players:
-                scanned_players += 1
-                try:
-                    wb_stmt = select(WalletBalance).where(
-                        WalletBalance.tenant_id == p.tenant_id,
-                        WalletBalance.player_id == p.id,
-                        WalletBalance.currency == "USD",
-                    )
-                    wb_res = await session.execute(wb_stmt)
-                    wb = wb_res.scalars().first()
-
-                    target_available = float(p.balance_real_available)
-                    target_pending = float(p.balance_real_held)
-
-                    if wb is None:
-                        if dry_run:
-                            created += 1
-                            continue
-
-                        wb = WalletBalance(
-                            tenant_id=p.tenant_id,
-                            player_id=p.id,
-                            currency="USD",
-                            balance_real_available=target_available,
-                            balance_real_pending=target_pending,
-                        )
-                        session.add(wb)
-                        created += 1
-                    else:
-                        if not force:
-                            skipped_exists += 1
-                            continue
-
-                        if dry_run:
-                            updated_forced += 1
-                            continue
-
-                        wb.balance_real_available = target_available
-                        wb.balance_real_pending = target_pending
-                        updated_forced += 1
-
-                except Exception as exc:  # pragma: no cover - defensive
-                    errors += 1
-                    logger.error(
-                        "Error processing player %s (tenant=%s): %s",
-                        p.id,
-                        p.tenant_id,
-                        exc,
-                    )
-
-            if not dry_run:
-                await session.commit()
-
-            offset += batch_size
+    progress = _Progress("Backfill")
+    await _run_ranges(
+        factory=session_factory or async_session,
+        tenant_id=tenant_id,
+        batch_size=batch_size,
+        workers=workers,
+        shards=shards,
+        op=_backfill_op(dry_run=dry_run, force=force),
+        commit=not dry_run,
+        checkpoint=Checkpoint(checkpoint_path),
+        progress=progress,
+    )
+    summary = progress.summary()
+    logger.info(
+        "Backfill summary | scanned=%s created=%s skipped_exists=%s updated_forced=%s errors=%s "
+        "duration_ms=%s players_per_sec=%s",
+        summary["scanned"],
+        summary["created"],
+        summary["skipped_exists"],
+        summary["updated_forced"],
+        summary["errors"],
+        summary["duration_ms"],
+        summary["players_per_sec"],
+    )
+    return summary
+
 
+async def _verify_wallet_balances(
+    *,
+    tenant_id: Optional[str],
+    batch_size: int,
+    session_factory=None,
+    workers: int = 1,
+    shards: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Report players whose WalletBalance is missing or differs from the Player aggregates."""
+
+    samples: List[Dict[str, Any]] = []
+    progress = _Progress("Verify")
+    await _run_ranges(
+        factory=session_factory or async_session,
+        tenant_id=tenant_id,
+        batch_size=batch_size,
+        workers=workers,
+        shards=shards,
+        op=_verify_op(samples),
+        commit=False,
+        checkpoint=Checkpoint(None),
+        progress=progress,
+    )
+    summary = {**progress.summary(), "samples": samples}
     logger.info(
-        "Backfill summary | scanned=%s created=%s skipped_exists=%s updated_forced=%s errors=%s",
-        scanned_players,
-        created,
-        skipped_exists,
-        updated_forced,
-        errors,
+        "Verify summary | scanned=%s missing=%s drifted=%s errors=%s duration_ms=%s players_per_sec=%s",
+        summary["scanned"],
+        summary["missing"],
+        summary["drifted"],
+        summary["errors"],
+        summary["duration_ms"],
+        summary["players_per_sec"],
     )
+    for sample in samples:
+        logger.info("Drift sample | %s", sample)
+    return summary
 
 
 def main() -> None:
@@ -123,11 +412,29 @@ def main() -> None:
     parser.add_argument("--batch-size", dest="batch_size", type=int, default=1000)
     parser.add_argument("--dry-run", dest="dry_run", action="store_true")
     parser.add_argument("--force", dest="force", action="store_true")
+    parser.add_argument("--workers", dest="workers", type=int, default=4, help="Concurrent sessions")
+    parser.add_argument("--shards", dest="shards", type=int, default=None, help="Id ranges per tenant (default: --workers)")
+    parser.add_argument("--checkpoint", dest="checkpoint", default=None, help="JSON file to resume an interrupted run")
+    parser.add_argument("--verify", dest="verify", action="store_true", help="Only report Player/WalletBalance drift")
 
     args = parser.parse_args()
 
     if args.batch_size <= 0:
         raise SystemExit("--batch-size must be a positive integer")
+    if args.workers <= 0:
+        raise SystemExit("--workers must be a positive integer")
+
+    logging.basicConfig(level=logging.INFO)
+    if args.verify:
+        asyncio.run(
+            _verify_wallet_balances(
+                tenant_id=args.tenant_id,
+                batch_size=args.batch_size,
+                workers=args.workers,
+                shards=args.shards,
+            )
+        )
+        return
 
     asyncio.run(
         _backfill_wallet_balances(
@@ -135,6 +442,9 @@ def main() -> None:
             batch_size=args.batch_size,
             dry_run=bool(args.dry_run),
             force=bool(args.force),
+            workers=args.workers,
+            shards=args.shards,
+            checkpoint_path=args.checkpoint,
         )
     )
 
@@ -105,16 +105,12 @@ app.add_middleware(
 # Rate limiting (basic IP-based)
 app.add_middleware(RateLimitMiddleware)
 
-# Prometheus Monitoring
-from prometheus_fastapi_instrumentator import Instrumentator
-instrumentator = Instrumentator().instrument(app).expose(app, include_in_schema=False)
-
 # Request logging & correlation ID (outermost middleware; runs before rate limiting)
 app.add_middleware(RequestLoggingMiddleware)
 # Request Context (Task 4)
 from app.middleware.request_context import RequestContextMiddleware
 app.add_middleware(RequestContextMiddleware)
-# Metrics Middleware
+# Metrics Middleware (per-route Prometheus series + ops dashboard window; exposed at /metrics)
 from app.middleware.metrics_middleware import MetricsMiddleware
 app.add_middleware(MetricsMiddleware)
 
@@ -150,6 +146,8 @@ from app.routes import risk_dashboard
 app.include_router(tenant.router)
 app.include_router(api_keys.router) 
 app.include_router(health_router.router)
+from app.routes import monitoring
+app.include_router(monitoring.router)
 
 # 2. Player Side
 from app.routes import player_auth, player_lobby, player_wallet, player_verification, telemetry, player_payments
@@ -379,6 +377,18 @@ async def on_startup():
         else:
             logger.info("Startup complete: Database initialized. Seeding skipped.")
 
+        # Cross-worker cache invalidation (payment routing tables)
+        from app.core.cache_bus import start_invalidation_listener
+        start_invalidation_listener()
+
+        # Batched persistence of experiment assignments
+        from app.services.experiment_engine import assignment_writer
+        assignment_writer.start()
+
+        # Batched VIP points accrual from the bet path
+        from app.services.vip_engine import vip_accrual
+        vip_accrual.start()
+
         # Initialise ARQ queue only when explicitly configured
         if settings.recon_runner == "queue":
             try:
@@ -498,6 +508,7 @@ async def readiness_check():
 @app.on_event("shutdown")
 async def on_shutdown():
     from app.queue.arq_client import close_queue
+    from app.core.cache_bus import stop_invalidation_listener
 
     try:
         await close_queue()
@@ -505,6 +516,20 @@ async def on_shutdown():
         # Best-effort cleanup; don't block shutdown
         pass
 
+    await stop_invalidation_listener()
+
+    from app.services.experiment_engine import assignment_writer
+
+    await assignment_writer.stop()
+
+    from app.services.vip_engine import vip_accrual
+
+    await vip_accrual.stop()
+
+    from app.services.password_hasher import password_hasher
+
+    password_hasher.shutdown()
+
 
 # Alias for common ops naming
 @app.get("/api/ready")
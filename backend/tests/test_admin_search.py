@@ -0,0 +1,61 @@
+import uuid
+
+import pytest
+from sqlmodel import select
+
+from app.models.sql_models import Player, Transaction
+from app.services.admin_search import (
+    classify_search,
+    player_search_clause,
+    transaction_search_clause,
+)
+
+
+def test_classify_picks_strategy_by_input_shape():
+    assert classify_search("  ") is None
+    assert classify_search("Jane.Doe@Example.com").kind == "email"
+    assert classify_search(str(uuid.uuid4())).kind == "id"
+    assert classify_search("ja").kind == "prefix"
+    assert classify_search("jane@").kind == "fragment"
+    assert classify_search("doe").kind == "fragment"
+
+
+@pytest.mark.asyncio
+async def test_player_and_transaction_search_on_sqlite(async_session_factory):
+    tenant_id = f"t_{uuid.uuid4().hex[:8]}"
+
+    async with async_session_factory() as session:
+        jane = Player(tenant_id=tenant_id, username="jane_doe", email="Jane.Doe@Example.com", password_hash="x")
+        janet = Player(tenant_id=tenant_id, username="janetx", email="janet@example.com", password_hash="x")
+        bob = Player(tenant_id=tenant_id, username="bob", email="bob@example.com", password_hash="x")
+        session.add_all([jane, janet, bob])
+        await session.flush()
+        tx = Transaction(
+            tenant_id=tenant_id, player_id=bob.id, type="withdrawal", amount=10.0,
+            status="pending", method="bank", provider_tx_id="PSP-ABC-123",
+        )
+        session.add(tx)
+        await session.commit()
+
+        async def players(term):
+            stmt = select(Player.username).where(Player.tenant_id == tenant_id, player_search_clause(classify_search(term)))
+            return sorted((await session.execute(stmt)).scalars().all())
+
+        async def txs(term):
+            stmt = select(Transaction.id).where(Transaction.tenant_id == tenant_id, transaction_search_clause(classify_search(term)))
+            return (await session.execute(stmt)).scalars().all()
+
+        assert await players("jane.doe@example.com") == ["jane_doe"]
+        assert await players(jane.id) == ["jane_doe"]
+        assert await players(jane.id.upper()) == ["jane_doe"]
+        assert await players("JA") == ["jane_doe", "janetx"]
+        assert await players("netx") == ["janetx"]
+        # LIKE wildcards in the input are literals.
+        assert await players("e_d") == ["jane_doe"]
+        assert await players("e%d") == []
+
+        assert await txs("abc-1") == [tx.id]
+        assert await txs(tx.id[:6]) == [tx.id]
+        assert await txs(bob.id) == [tx.id]
+        assert await txs(tx.id.upper()) == [tx.id]
+        assert await txs("bob@example.com") == []
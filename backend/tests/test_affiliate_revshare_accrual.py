@@ -0,0 +1,141 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import select
+
+from app.jobs.affiliate_revshare_job import run_revshare_accruals
+from app.models.affiliate_p0_models import AffiliateLedger, AffiliateOffer
+from app.models.growth_models import Affiliate, AffiliateAttribution, AffiliateLink
+from app.repositories.ledger_repo import LedgerTransaction
+from app.services.affiliate_p0_engine import REVSHARE_REASON, accrue_revshare_for_period
+
+
+WINDOW_START = datetime(2026, 1, 10)
+WINDOW_END = datetime(2026, 1, 11)
+
+
+def _ledger(tenant_id: str, player_id: str, status: str, amount: float, at: datetime) -> LedgerTransaction:
+    return LedgerTransaction(
+        tenant_id=tenant_id,
+        player_id=player_id,
+        type="wallet",
+        direction="debit" if status == "game_bet" else "credit",
+        amount=amount,
+        currency="USD",
+        status=status,
+        created_at=at,
+    )
+
+
+async def _seed_partner(session, tenant_id: str, percent: float = 25.0):
+    partner = Affiliate(tenant_id=tenant_id, username="p", email=f"{uuid.uuid4().hex}@aff.test", code=uuid.uuid4().hex[:8])
+    offer = AffiliateOffer(tenant_id=tenant_id, name=f"rs-{uuid.uuid4().hex[:6]}", model="revshare", currency="USD", revshare_percent=percent)
+    session.add(partner)
+    session.add(offer)
+    await session.flush()
+
+    link = AffiliateLink(tenant_id=tenant_id, affiliate_id=partner.id, code=f"aff_{uuid.uuid4().hex[:8]}", offer_id=offer.id)
+    session.add(link)
+    await session.flush()
+    return partner, offer, link
+
+
+@pytest.mark.asyncio
+async def test_revshare_accrues_ngr_per_partner_once_per_period(async_session_factory):
+    tenant_id = f"t_{uuid.uuid4().hex[:8]}"
+    in_window = WINDOW_START + timedelta(hours=5)
+
+    async with async_session_factory() as session:
+        partner, offer, link = await _seed_partner(session, tenant_id)
+        for player_id in ("p1", "p2"):
+            session.add(
+                AffiliateAttribution(
+                    tenant_id=tenant_id,
+                    player_id=f"{tenant_id}-{player_id}",
+                    affiliate_id=partner.id,
+                    link_id=link.id,
+                    attributed_at=WINDOW_START - timedelta(days=3),
+                )
+            )
+
+        p1, p2 = f"{tenant_id}-p1", f"{tenant_id}-p2"
+        session.add_all(
+            [
+                _ledger(tenant_id, p1, "game_bet", 100.0, in_window),
+                _ledger(tenant_id, p1, "game_win", 40.0, in_window),
+                _ledger(tenant_id, p2, "game_bet", 30.0, in_window),
+                _ledger(tenant_id, p2, "bonus_granted", 10.0, in_window),
+                # Outside window / unattributed player: ignored
+                _ledger(tenant_id, p1, "game_bet", 500.0, WINDOW_END + timedelta(hours=1)),
+                _ledger(tenant_id, "stranger", "game_bet", 999.0, in_window),
+            ]
+        )
+        await session.commit()
+
+    async with async_session_factory() as session:
+        stats = await accrue_revshare_for_period(
+            session, tenant_id=tenant_id, window_start=WINDOW_START, window_end=WINDOW_END
+        )
+        await session.commit()
+    assert stats["accrued"] == 1
+
+    # Re-running the same period is a no-op.
+    summary = await run_revshare_accruals(
+        window_start=WINDOW_START,
+        window_end=WINDOW_END,
+        tenant_ids=[tenant_id],
+        session_factory=async_session_factory,
+    )
+    assert summary["accrued"] == 0
+    assert summary["failed_tenants"] == []
+
+    async with async_session_factory() as session:
+        stmt = select(AffiliateLedger).where(
+            AffiliateLedger.tenant_id == tenant_id,
+            AffiliateLedger.reason == REVSHARE_REASON,
+        )
+        entries = (await session.execute(stmt)).scalars().all()
+
+    assert len(entries) == 1
+    entry = entries[0]
+    assert entry.partner_id == partner.id
+    assert entry.offer_id == offer.id
+    assert entry.entry_type == "accrual"
+    # NGR = (100 - 40) + 30 - 10 bonus = 80; 25% -> 20
+    assert entry.amount == pytest.approx(20.0)
+
+
+@pytest.mark.asyncio
+async def test_revshare_skips_negative_ngr_and_runs_across_tenants(async_session_factory):
+    t_win = f"t_{uuid.uuid4().hex[:8]}"
+    t_loss = f"t_{uuid.uuid4().hex[:8]}"
+    in_window = WINDOW_START + timedelta(hours=1)
+
+    async with async_session_factory() as session:
+        for tenant_id, bet, win in ((t_win, 200.0, 0.0), (t_loss, 10.0, 90.0)):
+            partner, _offer, link = await _seed_partner(session, tenant_id, percent=50.0)
+            session.add(
+                AffiliateAttribution(
+                    tenant_id=tenant_id,
+                    player_id=f"{tenant_id}-pl",
+                    affiliate_id=partner.id,
+                    link_id=link.id,
+                    attributed_at=WINDOW_START,
+                )
+            )
+            session.add(_ledger(tenant_id, f"{tenant_id}-pl", "game_bet", bet, in_window))
+            session.add(_ledger(tenant_id, f"{tenant_id}-pl", "game_win", win, in_window))
+        await session.commit()
+
+    summary = await run_revshare_accruals(
+        window_start=WINDOW_START,
+        window_end=WINDOW_END,
+        tenant_ids=[t_win, t_loss],
+        concurrency=2,
+        session_factory=async_session_factory,
+    )
+
+    assert summary["tenants"] == 2
+    assert summary["accrued"] == 1
+    assert summary["amount_total"] == pytest.approx(100.0)
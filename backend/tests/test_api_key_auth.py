@@ -0,0 +1,102 @@
+import time
+import uuid
+
+import pytest
+from sqlmodel import select
+
+from app.models.sql_models import APIKey
+from app.utils import api_keys as api_keys_module
+from app.utils.api_keys import (
+    api_key_cache,
+    generate_api_key,
+    get_password_hash,
+    invalidate_api_key,
+    legacy_lookup_prefix,
+    parse_api_key,
+    resolve_api_key,
+)
+from config import settings
+
+
+def test_generate_api_key_format():
+    full_key, key_prefix, key_hash = generate_api_key()
+    assert full_key.startswith(f"sk_{key_prefix}.")
+    assert parse_api_key(full_key) == key_prefix
+    assert key_hash.startswith("sha256$")
+    # Legacy keys (sk_ + urlsafe token, no '.') have no embedded prefix.
+    assert parse_api_key("sk_" + "A-b_c" * 8) is None
+
+
+@pytest.mark.asyncio
+async def test_prefixed_key_resolves_and_cache_is_invalidated(async_session_factory):
+    api_key_cache.invalidate()
+    tenant_id = f"t_{uuid.uuid4().hex[:8]}"
+    full_key, key_prefix, key_hash = generate_api_key()
+
+    async with async_session_factory() as session:
+        key = APIKey(tenant_id=tenant_id, name="robot", key_prefix=key_prefix, key_hash=key_hash, scopes="robot.run")
+        session.add(key)
+        await session.commit()
+
+        verified = await resolve_api_key(session, full_key)
+        assert verified.tenant_id == tenant_id
+        assert verified.scopes == ("robot.run",)
+
+        assert await resolve_api_key(session, full_key[:-1] + ("x" if full_key[-1] != "x" else "y")) is None
+        assert await resolve_api_key(session, f"sk_{'0' * 16}.nope") is None
+
+        key.status = "inactive"
+        session.add(key)
+        await session.commit()
+
+        # Served from the verified-key cache until invalidated.
+        assert await resolve_api_key(session, full_key) is not None
+        await invalidate_api_key(key.id)
+        assert await resolve_api_key(session, full_key) is None
+
+    api_key_cache.invalidate()
+
+
+@pytest.mark.asyncio
+async def test_legacy_key_is_migrated_to_prefix_lookup(async_session_factory, monkeypatch):
+    api_key_cache.invalidate()
+    tenant_id = f"t_{uuid.uuid4().hex[:8]}"
+    legacy_key = "sk_" + uuid.uuid4().hex
+
+    async with async_session_factory() as session:
+        session.add(APIKey(tenant_id=tenant_id, name="old", key_hash=get_password_hash(legacy_key), scopes=""))
+        await session.commit()
+
+        # Wrong shape, or migration window closed: never reaches the bcrypt scan.
+        scans = []
+        real_scan = api_keys_module._match_unmigrated_legacy_key
+
+        async def counting_scan(*args):
+            scans.append(args[1])
+            return await real_scan(*args)
+
+        monkeypatch.setattr(api_keys_module, "_match_unmigrated_legacy_key", counting_scan)
+        assert await resolve_api_key(session, "not-a-key", session_factory=async_session_factory) is None
+        monkeypatch.setattr(settings, "api_key_legacy_migration", False)
+        assert await resolve_api_key(session, legacy_key, session_factory=async_session_factory) is None
+        assert scans == []
+
+        monkeypatch.setattr(settings, "api_key_legacy_migration", True)
+        assert await resolve_api_key(session, legacy_key, session_factory=async_session_factory) is not None
+        assert not session.dirty and not session.new
+
+    async with async_session_factory() as session:
+        # The lookup id is written in its own session, not the caller's.
+        stored = (await session.execute(select(APIKey).where(APIKey.tenant_id == tenant_id))).scalars().one()
+        assert stored.key_prefix == legacy_lookup_prefix(legacy_key)
+
+        api_key_cache.invalidate()
+        assert (await resolve_api_key(session, legacy_key)).tenant_id == tenant_id
+
+        started = time.perf_counter()
+        for _ in range(1000):
+            await resolve_api_key(session, legacy_key)
+        # Cached path: no DB round trip and no bcrypt.
+        assert (time.perf_counter() - started) / 1000 < 0.001
+
+    api_key_cache.invalidate()
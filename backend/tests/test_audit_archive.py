@@ -0,0 +1,104 @@
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import delete, update
+from sqlmodel import select
+
+from app.models.sql_models import AuditEvent
+from app.ops.storage import LocalFileSystemStorage
+from app.services import audit as audit_module
+from app.services.audit import audit
+from app.services.audit_archive import (
+    AuditChainError,
+    ChainVerifier,
+    iter_audit_rows,
+    list_segments,
+    partition_for,
+    verify_segment,
+    write_segment,
+)
+
+
+class _Clock(datetime):
+    now_value = datetime(2026, 7, 10, 12, 0, 0)
+
+    @classmethod
+    def utcnow(cls):
+        return cls.now_value
+
+
+async def _log(session, tenant_id, action, at):
+    _Clock.now_value = at
+    await audit.log_event(
+        session=session, request_id=str(uuid.uuid4()), actor_user_id="admin", tenant_id=tenant_id,
+        action=action, resource_type="player", resource_id="p1", result="success", details={"token": "x", "n": 1},
+    )
+    await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_segment_roundtrip_and_export_spans_archive_and_hot(async_session_factory, tmp_path, monkeypatch):
+    monkeypatch.setattr(audit_module, "datetime", _Clock)
+    storage = LocalFileSystemStorage(str(tmp_path))
+    t1, t2 = f"t_{uuid.uuid4().hex[:8]}", f"t_{uuid.uuid4().hex[:8]}"
+    july, august = partition_for(datetime(2026, 7, 1)), partition_for(datetime(2026, 8, 1))
+
+    async with async_session_factory() as session:
+        for day in (3, 9, 20):
+            await _log(session, t1, f"july.{day}", datetime(2026, 7, day, 8))
+        await _log(session, t2, "july.t2", datetime(2026, 7, 15, 8))
+        await _log(session, t1, "august.1", datetime(2026, 8, 2, 8))
+        await _log(session, t1, "august.2", datetime(2026, 8, 5, 8))
+
+        manifest = await write_segment(session, storage, july)
+        assert manifest["rows"] == 4 and manifest["forks"] == 0
+        assert (manifest["chains"][t1]["first_sequence"], manifest["chains"][t1]["last_sequence"]) == (1, 3)
+        verify_segment(storage, manifest)
+
+        # Detach: the month now lives only in the archive.
+        await session.execute(delete(AuditEvent).where(AuditEvent.timestamp < july.upper))
+        await session.commit()
+
+        # August links onto July's chain end kept in the manifest.
+        heads = {t: c["last_row_hashes"] for t, c in list_segments(storage)[0]["chains"].items()}
+        await write_segment(session, storage, august, heads=heads)
+
+        rows = [r async for r in iter_audit_rows(session, storage, start=datetime(2026, 7, 5), tenant_id=t1)]
+        assert [r["action"] for r in rows] == ["july.9", "july.20", "august.1", "august.2"]
+        assert rows[0]["details"]["token"] == "[REDACTED]"
+
+        everyone = [r async for r in iter_audit_rows(session, storage, start=datetime(2026, 1, 1), end=august.lower)]
+        assert [r["action"] for r in everyone] == ["july.3", "july.9", "july.t2", "july.20"]
+
+        # Tampering with a hot row fails verification.
+        await session.execute(update(AuditEvent).where(AuditEvent.action == "august.2").values(reason="edited"))
+        await session.commit()
+        with pytest.raises(AuditChainError):
+            await write_segment(session, storage, august, heads=heads)
+
+
+@pytest.mark.asyncio
+async def test_verifier_accepts_forks_but_not_breaks(async_session_factory, monkeypatch):
+    monkeypatch.setattr(audit_module, "datetime", _Clock)
+    tenant_id = f"t_{uuid.uuid4().hex[:8]}"
+
+    async with async_session_factory() as session:
+        await _log(session, tenant_id, "a", datetime(2026, 7, 1, 8))
+        await _log(session, tenant_id, "b", datetime(2026, 7, 1, 9))
+        rows = (await session.execute(select(AuditEvent).where(AuditEvent.tenant_id == tenant_id).order_by(AuditEvent.sequence))).scalars().all()
+        first, second = [{c: getattr(e, c) for c in AuditEvent.__table__.columns.keys()} for e in rows]
+
+    # A concurrent writer that read the same head produces a sibling at the same sequence.
+    sibling = dict(second, id="sibling", action="b2")
+    sibling["row_hash"] = audit_module.chain_row_hash(
+        sibling["prev_row_hash"], tenant_id=tenant_id, actor_user_id="admin", action="b2", resource_type="player",
+        resource_id="p1", timestamp=sibling["timestamp"], reason=None, status="SUCCESS", details=sibling["details"], sequence=2,
+    )
+    verifier = ChainVerifier()
+    for row in (first, second, sibling):
+        verifier.feed(row)
+    assert verifier.forks == 1 and sorted(verifier.chains[tenant_id]["last_row_hashes"]) == sorted([second["row_hash"], sibling["row_hash"]])
+
+    with pytest.raises(AuditChainError):
+        ChainVerifier({tenant_id: ["f" * 64]}).feed(first)
@@ -0,0 +1,35 @@
+import random
+
+import pytest
+
+from app.scripts.benchmark_provider_callbacks import LatencyHistogram, compare, run_benchmark
+
+
+def test_histogram_percentiles_within_bucket_error():
+    rng = random.Random(1)
+    values = [rng.uniform(0.0001, 2.0) for _ in range(20000)]
+    hist = LatencyHistogram()
+    for v in values:
+        hist.record(v)
+    values.sort()
+    for pct in (50, 90, 99):
+        exact_ms = values[int(len(values) * pct / 100) - 1] * 1000
+        assert exact_ms <= hist.percentile_ms(pct) <= exact_ms * 1.01 + 0.001
+    assert hist.summary()["count"] == 20000
+
+
+def test_compare_flags_p99_and_throughput_regressions():
+    baseline = {"ok_rps": 100.0, "by_op": {"bet": {"latency_ms": {"p99": 10.0}}}}
+    ok = {"ok_rps": 95.0, "by_op": {"bet": {"latency_ms": {"p99": 11.0}}}}
+    bad = {"ok_rps": 70.0, "by_op": {"bet": {"latency_ms": {"p99": 13.0}}}}
+    assert compare(ok, baseline, tolerance=0.2) == []
+    assert len(compare(bad, baseline, tolerance=0.2)) == 2
+
+
+@pytest.mark.asyncio
+async def test_in_process_open_loop_run(async_session_factory):
+    summary = await run_benchmark(session_factory=async_session_factory, rate=40, duration=1.0, players=10)
+    assert summary["mode"] == "asgi" and summary["requests"] > 10
+    outcomes = {op: data["outcomes"] for op, data in summary["by_op"].items()}
+    assert outcomes["bet"].get("ok", 0) > 0
+    assert summary["latency_ms"]["p50"] is not None
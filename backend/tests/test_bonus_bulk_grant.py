@@ -0,0 +1,172 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+
+from app.models.bonus_models import BonusCampaign, BonusGrant
+from app.models.sql_models import Player
+from app.repositories.ledger_repo import LedgerTransaction, WalletBalance
+from app.services import bonus_bulk_grant
+from app.services.bonus_bulk_grant import (
+    bulk_grant_campaign,
+    bulk_grant_checkpoint,
+    bulk_grant_in_progress,
+    claim_bulk_grant,
+)
+from app.services.bonus_engine import grant_campaign_to_player
+
+
+async def _seed(session, tenant_id, n):
+    players = [
+        Player(tenant_id=tenant_id, email=f"b{i}@x.io", username=f"b{i}", password_hash="x", balance_real_available=5.0)
+        for i in range(n)
+    ]
+    players.append(Player(tenant_id=tenant_id, email="closed@x.io", username="closed", password_hash="x", status="closed"))
+    campaign = BonusCampaign(
+        tenant_id=tenant_id, name="Reload", type="MANUAL_CREDIT", bonus_type="MANUAL_CREDIT",
+        status="active", config={"amount": 10, "wagering_mult": 3},
+    )
+    session.add_all([*players, campaign])
+    await session.commit()
+    return sorted((p for p in players if p.status == "active"), key=lambda p: p.id), campaign
+
+
+@pytest.mark.asyncio
+async def test_bulk_grant_is_idempotent_per_player_and_mirrors_single_grant(async_session_factory):
+    tenant_id = f"t_{uuid.uuid4().hex[:8]}"
+
+    async with async_session_factory() as session:
+        players, campaign = await _seed(session, tenant_id, 7)
+        # One player already got the campaign through the single-grant path.
+        await grant_campaign_to_player(session, tenant_id=tenant_id, player_id=players[0].id, campaign=campaign, reason="single")
+        await session.commit()
+
+        result = await bulk_grant_campaign(session, campaign, reason="reload", chunk_size=3)
+        assert (result["granted"], result["skipped_already_granted"]) == (6, 1)
+        assert result["players_per_sec"] > 0
+
+        again = await bulk_grant_campaign(session, campaign, reason="reload", chunk_size=3)
+        assert (again["granted"], again["skipped_already_granted"]) == (0, 7)
+
+        grants = (await session.execute(select(BonusGrant).where(BonusGrant.campaign_id == campaign.id))).scalars().all()
+        assert sorted(g.player_id for g in grants) == [p.id for p in players]
+        assert all(g.wagering_target == 30.0 and g.status == "active" for g in grants)
+
+        ledger = (
+            await session.execute(
+                select(LedgerTransaction).where(
+                    LedgerTransaction.tenant_id == tenant_id, LedgerTransaction.status == "bonus_granted"
+                )
+            )
+        ).scalars().all()
+        assert {e.provider_event_id for e in ledger} == {f"bonus_grant:{g.id}" for g in grants}
+
+        for player in players:
+            await session.refresh(player)
+            bal = (
+                await session.execute(select(WalletBalance).where(WalletBalance.player_id == player.id))
+            ).scalars().one()
+            assert player.balance_bonus == bal.balance_bonus_available == 10.0
+            assert player.wagering_remaining == 30.0
+
+
+async def _die_after_first_chunk(monkeypatch, session, campaign, player_ids):
+    real_grant_chunk = bonus_bulk_grant._grant_chunk
+    calls = []
+
+    async def grant_chunk(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 2:
+            raise RuntimeError("worker died")
+        return await real_grant_chunk(*args, **kwargs)
+
+    monkeypatch.setattr(bonus_bulk_grant, "_grant_chunk", grant_chunk)
+    with pytest.raises(RuntimeError):
+        await bulk_grant_campaign(session, campaign, reason="reload", player_ids=player_ids, chunk_size=2)
+    monkeypatch.setattr(bonus_bulk_grant, "_grant_chunk", real_grant_chunk)
+    await session.rollback()
+    await session.refresh(campaign)
+
+
+@pytest.mark.asyncio
+async def test_bulk_grant_resumes_from_checkpoint(async_session_factory, monkeypatch):
+    tenant_id = f"t_{uuid.uuid4().hex[:8]}"
+
+    async with async_session_factory() as session:
+        players, campaign = await _seed(session, tenant_id, 5)
+        # A previous run committed the first chunk (two players), then died.
+        ids = [p.id for p in players]
+        await _die_after_first_chunk(monkeypatch, session, campaign, ids)
+        assert bulk_grant_checkpoint(campaign)["cursor"] == ids[1]
+
+        resumed = await bulk_grant_campaign(session, campaign, reason="reload", player_ids=ids, chunk_size=2)
+        assert resumed["resumed_from"] == ids[1]
+        assert (resumed["granted"], resumed["skipped_already_granted"]) == (3, 0)
+
+        checkpoint = bulk_grant_checkpoint(campaign)
+        assert (checkpoint["status"], checkpoint["cursor"], checkpoint["granted"]) == ("completed", ids[-1], 5)
+        assert checkpoint["amount"] == 50.0
+
+
+@pytest.mark.asyncio
+async def test_unfinished_run_is_not_resumed_for_a_different_segment(async_session_factory, monkeypatch):
+    tenant_id = f"t_{uuid.uuid4().hex[:8]}"
+
+    async with async_session_factory() as session:
+        players, campaign = await _seed(session, tenant_id, 5)
+        ids = [p.id for p in players]
+        await _die_after_first_chunk(monkeypatch, session, campaign, ids[1:])
+        assert bulk_grant_checkpoint(campaign)["cursor"] == ids[2]
+
+        # ids[0] sorts below the old cursor; resuming would silently skip it.
+        result = await bulk_grant_campaign(session, campaign, reason="reload", player_ids=ids, chunk_size=2)
+        assert result["resumed_from"] is None
+        assert (result["granted"], result["skipped_already_granted"]) == (3, 2)
+        granted = (await session.execute(select(BonusGrant.player_id).where(BonusGrant.campaign_id == campaign.id))).scalars().all()
+        assert sorted(granted) == ids
+
+        # Same segment, different amount: also a new request.
+        claim_bulk_grant(session, campaign, player_ids=ids, amount_override=5.0)
+        assert bulk_grant_checkpoint(campaign)["cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_second_active_grant_of_a_campaign_is_rejected(async_session_factory):
+    tenant_id = f"t_{uuid.uuid4().hex[:8]}"
+
+    async with async_session_factory() as session:
+        players, campaign = await _seed(session, tenant_id, 1)
+        await grant_campaign_to_player(session, tenant_id=tenant_id, player_id=players[0].id, campaign=campaign, reason="a")
+        await session.commit()
+        with pytest.raises(IntegrityError):
+            await grant_campaign_to_player(session, tenant_id=tenant_id, player_id=players[0].id, campaign=campaign, reason="b")
+        await session.rollback()
+
+
+@pytest.mark.asyncio
+async def test_bulk_grant_explicit_ids_skip_ineligible_and_runs_are_claimed(async_session_factory):
+    tenant_id = f"t_{uuid.uuid4().hex[:8]}"
+
+    async with async_session_factory() as session:
+        players, campaign = await _seed(session, tenant_id, 3)
+        excluded = Player(tenant_id=tenant_id, email="se@x.io", username="se", password_hash="x", status="self_excluded")
+        session.add(excluded)
+        await session.commit()
+        closed = (await session.execute(select(Player).where(Player.tenant_id == tenant_id, Player.status == "closed"))).scalars().one()
+
+        ids = [p.id for p in players] + [excluded.id, closed.id]
+        result = await bulk_grant_campaign(session, campaign, reason="reload", player_ids=ids, chunk_size=2)
+        assert result["granted"] == 3
+        granted = (await session.execute(select(BonusGrant.player_id).where(BonusGrant.campaign_id == campaign.id))).scalars().all()
+        assert sorted(granted) == [p.id for p in players]
+
+        # A claimed run blocks a second start until its heartbeat goes stale.
+        assert not bulk_grant_in_progress(bulk_grant_checkpoint(campaign))
+        claim_bulk_grant(session, campaign)
+        await session.commit()
+        checkpoint = bulk_grant_checkpoint(campaign)
+        assert checkpoint["status"] == "running" and checkpoint["cursor"] is None
+        assert bulk_grant_in_progress(checkpoint)
+        assert not bulk_grant_in_progress(checkpoint, now=datetime.utcnow() + timedelta(hours=1))
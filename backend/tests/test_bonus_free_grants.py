@@ -0,0 +1,121 @@
+import time
+import uuid
+
+import pytest
+from fastapi import HTTPException
+
+from app.models.bonus_models import BonusCampaign, BonusCampaignGame, BonusGrant
+from app.services.bonus_engine import (
+    ActiveFreeGrantCache,
+    consume_free_use,
+    find_applicable_free_grant,
+    free_grant_cache,
+    grant_campaign_to_player,
+)
+
+
+async def _free_spin_grant(session, tenant_id, player_id, game_ids, max_uses):
+    campaign = BonusCampaign(
+        tenant_id=tenant_id, name=f"fs_{uuid.uuid4().hex[:6]}", type="FREE_SPIN", bonus_type="FREE_SPIN",
+        status="active", max_uses=max_uses,
+    )
+    session.add(campaign)
+    await session.flush()
+    for gid in game_ids:
+        session.add(BonusCampaignGame(campaign_id=campaign.id, game_id=gid))
+    grant = await grant_campaign_to_player(
+        session, tenant_id=tenant_id, player_id=player_id, campaign=campaign, reason="test"
+    )
+    await session.commit()
+    return grant
+
+
+@pytest.mark.asyncio
+async def test_lookup_uses_cached_scope_and_sees_new_grants(async_session_factory):
+    free_grant_cache.invalidate()
+    tenant_id, player_id = f"t_{uuid.uuid4().hex[:8]}", f"p_{uuid.uuid4().hex[:8]}"
+
+    async with async_session_factory() as session:
+        older = await _free_spin_grant(session, tenant_id, player_id, ["g1", "g2"], max_uses=3)
+        assert (await find_applicable_free_grant(session, tenant_id=tenant_id, player_id=player_id, game_id="g2")).id == older.id
+        assert await find_applicable_free_grant(session, tenant_id=tenant_id, player_id=player_id, game_id="g3") is None
+
+        # Granting invalidates the player's cached list.
+        newer = await _free_spin_grant(session, tenant_id, player_id, ["g3"], max_uses=1)
+        assert (await find_applicable_free_grant(session, tenant_id=tenant_id, player_id=player_id, game_id="g3")).id == newer.id
+
+        consumed = await consume_free_use(session, grant=newer)
+        await session.commit()
+        assert (consumed.remaining_uses, consumed.status) == (0, "completed")
+        assert await find_applicable_free_grant(session, tenant_id=tenant_id, player_id=player_id, game_id="g3") is None
+
+    free_grant_cache.invalidate()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_consume_cannot_double_spend(async_session_factory):
+    tenant_id, player_id = f"t_{uuid.uuid4().hex[:8]}", f"p_{uuid.uuid4().hex[:8]}"
+
+    async with async_session_factory() as setup:
+        grant = await _free_spin_grant(setup, tenant_id, player_id, ["g1"], max_uses=1)
+
+    async with async_session_factory() as first, async_session_factory() as second:
+        # Both workers loaded the grant while it still had one use left.
+        g_first = await first.get(BonusGrant, grant.id)
+        g_second = await second.get(BonusGrant, grant.id)
+        assert g_first.remaining_uses == g_second.remaining_uses == 1
+
+        await consume_free_use(first, grant=g_first)
+        await first.commit()
+
+        with pytest.raises(HTTPException) as exc:
+            await consume_free_use(second, grant=g_second)
+        assert exc.value.status_code == 409
+
+    async with async_session_factory() as check:
+        final = await check.get(BonusGrant, grant.id)
+        assert (final.remaining_uses, final.status) == (0, "completed")
+
+
+@pytest.mark.asyncio
+async def test_invalidation_waits_for_commit(async_session_factory):
+    free_grant_cache.invalidate()
+    tenant_id, player_id = f"t_{uuid.uuid4().hex[:8]}", f"p_{uuid.uuid4().hex[:8]}"
+    key = (tenant_id, player_id)
+
+    async with async_session_factory() as session:
+        grant = await _free_spin_grant(session, tenant_id, player_id, ["g1"], max_uses=1)
+        assert (await find_applicable_free_grant(session, tenant_id=tenant_id, player_id=player_id, game_id="g1")).id == grant.id
+        assert key in free_grant_cache._entries
+
+        # A rolled-back change publishes nothing.
+        await consume_free_use(session, grant=grant)
+        assert key in free_grant_cache._entries
+        await session.rollback()
+        assert key in free_grant_cache._entries
+
+        await session.refresh(grant)
+        await consume_free_use(session, grant=grant)
+        assert key in free_grant_cache._entries
+        await session.commit()
+        assert key not in free_grant_cache._entries
+        assert await find_applicable_free_grant(session, tenant_id=tenant_id, player_id=player_id, game_id="g1") is None
+
+    free_grant_cache.invalidate()
+
+
+@pytest.mark.asyncio
+async def test_free_grant_cache_is_bounded_and_drops_expired_entries(async_session_factory):
+    tenant_id = f"t_{uuid.uuid4().hex[:8]}"
+    cache = ActiveFreeGrantCache(ttl_seconds=30, max_entries=2)
+
+    async with async_session_factory() as session:
+        for player_id in ("p1", "p2", "p1", "p3"):
+            await cache.get(session, tenant_id, player_id)
+        # p2 was least recently used.
+        assert list(cache._entries) == [(tenant_id, "p1"), (tenant_id, "p3")]
+
+        # An expired entry is dropped and reloaded rather than served.
+        cache._entries[(tenant_id, "p1")] = (("stale",), time.monotonic() - 60)
+        assert await cache.get(session, tenant_id, "p1") == ()
+        assert list(cache._entries) == [(tenant_id, "p3"), (tenant_id, "p1")]
@@ -0,0 +1,62 @@
+import asyncio
+import logging
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.context import reset_request_scope, set_request_scope
+from app.core.db_pool import InstrumentedAsyncQueuePool, instrument_pool
+from app.core.metrics import metrics
+
+
+def _hold_count(route):
+    for metric in metrics.db_pool_checkout_hold_seconds.collect():
+        for sample in metric.samples:
+            if sample.name.endswith("_count") and sample.labels == {"engine": "test", "route": route}:
+                return sample.value
+    return 0.0
+
+
+@pytest.mark.asyncio
+async def test_slow_checkout_names_holding_route_and_autosize(tmp_path, caplog):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedAsyncQueuePool, pool_size=1, max_overflow=0, pool_timeout=5,
+    )
+    monitor = instrument_pool("test", engine, slow_checkout_seconds=0.05, autosize=True, autosize_max=4)
+    before = _hold_count("/api/v1/reports/{id}")
+
+    async def holder(release):
+        token = set_request_scope({"route": SimpleNamespace(path="/api/v1/reports/{id}")})
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                await release.wait()
+        finally:
+            reset_request_scope(token)
+
+    release = asyncio.Event()
+    task = asyncio.create_task(holder(release))
+    await asyncio.sleep(0.05)
+    assert monitor.holders()["/api/v1/reports/{id}"][0] == 1
+
+    asyncio.get_running_loop().call_later(0.1, release.set)
+    with caplog.at_level(logging.WARNING, logger="app.core.db_pool"):
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    await task
+
+    slow = [r for r in caplog.records if r.getMessage() == "db.pool.slow_checkout"]
+    assert slow and "/api/v1/reports/{id}" in slow[0].holding_routes and slow[0].route == "-"
+    assert _hold_count("/api/v1/reports/{id}") == before + 1
+
+    # 20 checkouts/s held 200ms each -> 4 busy connections * 1.5 headroom, capped at 4.
+    assert monitor.recommend(20.0, 0.2) == 4
+    assert engine.sync_engine.pool._max_overflow == 3
+    assert monitor.recommend(1.0, 0.01) == 1
+    assert engine.sync_engine.pool._max_overflow == 0
+
+    await engine.dispose()
+    assert engine.sync_engine.pool.monitor is monitor and monitor.pool is engine.sync_engine.pool
@@ -0,0 +1,143 @@
+import uuid
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+from sqlmodel import select
+
+from app.models.offer_models import Experiment, ExperimentAssignment, Offer
+from app.models.sql_models import Player
+from app.services.experiment_engine import (
+    ExperimentEngine,
+    assignment_cache,
+    assignment_writer,
+    offer_definitions,
+)
+from app.services.offer_engine import OfferEngine
+
+
+@contextmanager
+def _count_selects(session):
+    counter = {"n": 0}
+
+    def _on_execute(_conn, _cursor, statement, *_args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            counter["n"] += 1
+
+    engine = session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", _on_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", _on_execute)
+
+
+async def _seed(session, tenant_id, n_players):
+    offer_a = Offer(tenant_id=tenant_id, name="A", type="BONUS_GRANT")
+    offer_b = Offer(tenant_id=tenant_id, name="B", type="BONUS_GRANT")
+    session.add_all([offer_a, offer_b])
+    await session.flush()
+    exp = Experiment(
+        tenant_id=tenant_id, key="exp_first_deposit", name="FD", status="running",
+        variants={"A": {"weight": 50, "offer_id": offer_a.id}, "B": {"weight": 50, "offer_id": offer_b.id}},
+    )
+    players = [
+        Player(tenant_id=tenant_id, email=f"e{i}@x.io", username=f"e{i}", password_hash="x") for i in range(n_players)
+    ]
+    session.add_all([exp, *players])
+    await session.commit()
+    return exp, {"A": offer_a.id, "B": offer_b.id}, players
+
+
+@pytest.mark.asyncio
+async def test_decisions_use_cached_definitions_and_batched_assignment_writes(async_session_factory):
+    offer_definitions.invalidate()
+    assignment_cache.invalidate()
+    tenant_id = f"t_{uuid.uuid4().hex[:8]}"
+
+    async with async_session_factory() as session:
+        exp, offers, players = await _seed(session, tenant_id, 3)
+        engine = OfferEngine()
+
+        first = await engine.evaluate_trigger(session, tenant_id, players[0].id, "first_deposit")
+        assert first.decision == "granted" and first.experiment_id == exp.id
+        assert first.offer_id == offers[first.variant]
+
+        # Warm catalog + identity-mapped players: only the stored-assignment lookup per new player.
+        with _count_selects(session) as selects:
+            for player in players[1:]:
+                record = await engine.evaluate_trigger(session, tenant_id, player.id, "first_deposit")
+                assert record.offer_id == offers[record.variant]
+        assert selects["n"] == len(players) - 1
+
+        # Cached afterwards: no SELECT at all.
+        with _count_selects(session) as selects:
+            for player in players[1:]:
+                await engine.evaluate_trigger(session, tenant_id, player.id, "first_deposit")
+        assert selects["n"] == 0
+        await session.commit()
+
+        # Assignments are persisted by the writer, not the decision transaction.
+        stored = (await session.execute(select(ExperimentAssignment).where(ExperimentAssignment.experiment_id == exp.id))).scalars().all()
+        assert stored == []
+        assert await assignment_writer.flush(session_factory=async_session_factory) >= len(players)
+
+        stored = (await session.execute(select(ExperimentAssignment).where(ExperimentAssignment.experiment_id == exp.id))).scalars().all()
+        assert sorted(a.player_id for a in stored) == sorted(p.id for p in players)
+
+    offer_definitions.invalidate()
+    assignment_cache.invalidate()
+
+
+@pytest.mark.asyncio
+async def test_preassign_segment_keeps_stored_variants(async_session_factory):
+    offer_definitions.invalidate()
+    assignment_cache.invalidate()
+    tenant_id = f"t_{uuid.uuid4().hex[:8]}"
+
+    async with async_session_factory() as session:
+        exp, _offers, players = await _seed(session, tenant_id, 5)
+        # Bucketed before a weight change: the stored variant must survive.
+        session.add(ExperimentAssignment(tenant_id=tenant_id, experiment_id=exp.id, player_id=players[0].id, variant="legacy"))
+        await session.commit()
+
+        engine = ExperimentEngine()
+        result = await engine.preassign_segment(session, tenant_id=tenant_id, experiment_key=exp.key, chunk_size=2)
+        assert (result["assigned"], result["existing"]) == (4, 1)
+
+        again = await engine.preassign_segment(session, tenant_id=tenant_id, experiment_key=exp.key, chunk_size=2)
+        assert (again["assigned"], again["existing"]) == (0, 5)
+
+        assert await engine.get_assignment(session, tenant_id, players[0].id, exp.key) == "legacy"
+        assert assignment_writer.pending == 0
+
+    offer_definitions.invalidate()
+    assignment_cache.invalidate()
+
+
+@pytest.mark.asyncio
+async def test_stored_assignment_survives_cache_loss_and_write_races(async_session_factory):
+    offer_definitions.invalidate()
+    assignment_cache.invalidate()
+    tenant_id = f"t_{uuid.uuid4().hex[:8]}"
+
+    async with async_session_factory() as session:
+        exp, _offers, players = await _seed(session, tenant_id, 2)
+        session.add(ExperimentAssignment(tenant_id=tenant_id, experiment_id=exp.id, player_id=players[0].id, variant="legacy"))
+        await session.commit()
+
+        engine = ExperimentEngine()
+        # Cold cache (restart, eviction, weight change): the stored row wins over the hash.
+        assert await engine.get_assignment(session, tenant_id, players[0].id, exp.key) == "legacy"
+        assert assignment_writer.pending == 0
+
+        # Another worker stores a different variant before our queued row is flushed.
+        served = await engine.get_assignment(session, tenant_id, players[1].id, exp.key)
+        session.add(ExperimentAssignment(tenant_id=tenant_id, experiment_id=exp.id, player_id=players[1].id, variant="other"))
+        await session.commit()
+        await assignment_writer.flush(session_factory=async_session_factory)
+        assert served != "other"
+        assert assignment_cache.get(exp.id, players[1].id) == "other"
+
+    offer_definitions.invalidate()
+    assignment_cache.invalidate()
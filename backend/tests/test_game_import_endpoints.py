@@ -45,9 +45,16 @@ async def test_game_import_flow_json(client, session, admin_token):
         f"/api/v1/game-import/jobs/{job_id}/import",
         headers={"Authorization": f"Bearer {admin_token}"},
     )
-    assert res3.status_code == 200
-    assert res3.json()["status"] == "completed"
-    assert res3.json()["imported_count"] >= 1
+    assert res3.status_code == 202
+    assert res3.json()["status"] == "importing"
+
+    # The import runs as a background task; it has finished once the response is returned.
+    res4 = await client.get(
+        f"/api/v1/game-import/jobs/{job_id}",
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert res4.json()["status"] == "completed"
+    assert res4.json()["total_imported"] >= 1
 
     # DB assertions (games created)
     stmt = select(Game).where(Game.external_id.in_(["g1", "g2"]))
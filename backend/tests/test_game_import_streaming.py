@@ -0,0 +1,128 @@
+import json
+import uuid
+import zipfile
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import select
+
+from app.models.game_import_sql import GameImportItem, GameImportJob
+from app.models.game_models import Game
+from app.services import game_import_service
+from app.services.game_import_service import (
+    IMPORT_STALE_SECONDS,
+    StoredUpload,
+    claim_import_job,
+    import_in_progress,
+    import_staged_items,
+    iter_items,
+    stage_items,
+)
+
+
+def _stored(tmp_path, document, *, as_zip=False):
+    raw = document if isinstance(document, str) else json.dumps(document)
+    if not as_zip:
+        path = tmp_path / "games.json"
+        path.write_text(raw, encoding="utf-8")
+        return StoredUpload(path=str(path), file_name="games.json", file_type="json", size_bytes=len(raw))
+    path = tmp_path / "bundle.zip"
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("readme.txt", "x")
+        zf.writestr("catalog/games.json", raw)
+    return StoredUpload(path=str(path), file_name="bundle.zip", file_type="zip", size_bytes=0)
+
+
+def test_iter_items_streams_across_read_chunks(tmp_path, monkeypatch):
+    # Tiny reads force values (numbers, strings, unicode) to straddle chunk edges.
+    monkeypatch.setattr(game_import_service, "_READ_CHUNK", 7)
+    games = [{"external_id": f"g{i}", "name": f"Spïn {i}", "rtp": 96.25 + i} for i in range(50)]
+
+    assert list(iter_items(_stored(tmp_path, games))) == games
+    doc = {"meta": {"source": "agg", "tags": [1, 2]}, "games": games + [12345]}
+    assert list(iter_items(_stored(tmp_path, doc, as_zip=True))) == games + [{"value": 12345}]
+    assert list(iter_items(_stored(tmp_path, {"items": []}))) == []
+
+    for bad, code in (('{"items": [{"a": 1}', "JSON_PARSE_ERROR"), ('{"other": []}', "JSON_SCHEMA_INVALID"), ("42", "JSON_SCHEMA_INVALID")):
+        with pytest.raises(ValueError, match=code):
+            list(iter_items(_stored(tmp_path, bad)))
+
+    monkeypatch.setattr(game_import_service, "MAX_ITEMS", 10)
+    with pytest.raises(ValueError, match="TOO_MANY_ITEMS"):
+        list(iter_items(_stored(tmp_path, games)))
+
+
+@pytest.mark.asyncio
+async def test_stage_and_upsert_in_chunks(tmp_path, async_session_factory):
+    tenant_id = f"t_{uuid.uuid4().hex[:8]}"
+    items = [{"provider_id": "agg", "external_id": f"g{i}", "name": f"Game {i}", "rtp": 95} for i in range(7)]
+    items += [
+        {"provider_id": "agg", "external_id": "g0", "name": "Game 0 v2"},  # repeated key: one game
+        {"provider_id": "agg", "name": "no id"},
+        {"provider_id": "agg", "external_id": "bad", "rtp": "n/a"},
+    ]
+
+    async with async_session_factory() as session:
+        existing = Game(
+            tenant_id=tenant_id, provider_id="agg", external_id="g1", name="Old", status="draft",
+            configuration={"limits": {"max_bet": 5}},
+        )
+        job = GameImportJob(tenant_id=tenant_id, created_by_admin_id="admin", status="running")
+        session.add_all([existing, job])
+        await session.commit()
+        existing_id, job_id = existing.id, job.id
+
+        staged = await stage_items(session, job, _stored(tmp_path, {"items": items}))
+        assert (staged.total_items, staged.total_errors) == (10, 2)
+        job.status = "importing"
+        await session.commit()
+
+        stats = await import_staged_items(session, job, chunk_size=3)
+        assert stats["imported_count"] == 8
+
+        session.expire_all()  # upserts bypass the identity map
+        games = {
+            g.external_id: g
+            for g in (await session.execute(select(Game).where(Game.tenant_id == tenant_id))).scalars().all()
+        }
+        assert sorted(games) == [f"g{i}" for i in range(7)]
+        assert games["g0"].name in {"Game 0", "Game 0 v2"}
+        updated = games["g1"]
+        assert (updated.id, updated.name, updated.rtp, updated.status) == (existing_id, "Game 1", 95.0, "draft")
+        assert updated.configuration["limits"] == {"max_bet": 5}
+        assert updated.configuration["import_payload"]["name"] == "Game 1"
+
+        job = await session.get(GameImportJob, job_id)
+        assert (job.status, job.total_imported) == ("completed", 8)
+        statuses = (
+            await session.execute(select(GameImportItem.status).where(GameImportItem.job_id == job_id))
+        ).scalars().all()
+        assert sorted(statuses).count("imported") == 8 and statuses.count("invalid") == 2
+
+
+@pytest.mark.asyncio
+async def test_stale_import_claim_is_taken_over(async_session_factory):
+    tenant_id = f"t_{uuid.uuid4().hex[:8]}"
+
+    async with async_session_factory() as session:
+        job = GameImportJob(tenant_id=tenant_id, created_by_admin_id="admin", status="ready")
+        session.add(job)
+        await session.commit()
+        job_id = job.id
+
+        assert await claim_import_job(session, job_id)
+        await session.commit()
+        # A live claim is not taken twice.
+        assert not await claim_import_job(session, job_id)
+        await session.rollback()
+
+        # The worker died: no progress for longer than the stale window.
+        job = await session.get(GameImportJob, job_id)
+        assert import_in_progress(job)
+        later = datetime.utcnow() + timedelta(seconds=IMPORT_STALE_SECONDS + 1)
+        assert not import_in_progress(job, now=later)
+        assert await claim_import_job(session, job_id, now=later)
+        await session.commit()
+
+        await session.refresh(job)
+        assert job.status == "importing" and job.updated_at == later
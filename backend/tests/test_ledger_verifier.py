@@ -0,0 +1,85 @@
+import uuid
+
+import pytest
+from sqlalchemy import update
+from sqlmodel import select
+
+from app.models.sql_models import Player
+from app.repositories.ledger_repo import LedgerBalanceFinding, LedgerTransaction, WalletBalance, append_event
+from app.services.ledger_verifier import id_ranges, verify_ledger_balances
+from app.services.wallet_ledger import (
+    apply_bonus_delta_with_ledger,
+    apply_wallet_delta_with_ledger,
+    spend_with_bonus_precedence,
+)
+
+
+async def _wallet(session, tenant_id, player_id, event_type, available, held):
+    await apply_wallet_delta_with_ledger(
+        session, tenant_id=tenant_id, player_id=player_id, tx_id=str(uuid.uuid4()),
+        event_type=event_type, delta_available=available, delta_held=held,
+    )
+
+
+async def _lifecycle(session, tenant_id, player_id):
+    await _wallet(session, tenant_id, player_id, "deposit_succeeded", 100.0, 0.0)
+    await _wallet(session, tenant_id, player_id, "withdraw_requested", -30.0, 30.0)
+    await _wallet(session, tenant_id, player_id, "withdraw_rejected", 10.0, -10.0)
+    await _wallet(session, tenant_id, player_id, "withdraw_paid", 0.0, -15.0)
+    await apply_bonus_delta_with_ledger(
+        session, tenant_id=tenant_id, player_id=player_id, tx_id=str(uuid.uuid4()),
+        event_type="bonus_granted", delta_bonus_available=50.0,
+    )
+    await spend_with_bonus_precedence(
+        session, tenant_id=tenant_id, player_id=player_id, tx_id=str(uuid.uuid4()), event_type="game_bet", amount=60.0,
+    )
+    await session.commit()
+
+
+def test_id_ranges_cover_the_id_space():
+    ranges = id_ranges(3)
+    assert ranges[0][0] == "" and ranges[-1][1] is None
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+
+
+@pytest.mark.asyncio
+async def test_verifier_reports_only_drifted_wallets(async_session_factory):
+    tenant_id = f"t_{uuid.uuid4().hex[:8]}"
+    async with async_session_factory() as session:
+        players = [Player(tenant_id=tenant_id, username=f"v{i}", email=f"v{i}@x.io", password_hash="x") for i in range(5)]
+        session.add_all(players)
+        await session.commit()
+        ids = [p.id for p in players]
+
+        for player_id in ids[:4]:
+            await _lifecycle(session, tenant_id, player_id)
+        # Side-journal rows (poker) do not move WalletBalance and are ignored.
+        session.add(LedgerTransaction(tenant_id=tenant_id, player_id=ids[0], type="poker_bet", direction="debit", amount=7.0, status="success"))
+        # A balance-moving event whose snapshot was never written.
+        await append_event(
+            session, tenant_id=tenant_id, player_id=ids[4], tx_id=None, type="deposit", direction="credit",
+            amount=12.0, currency="USD", status="deposit_captured", autocommit=False,
+        )
+        await session.execute(
+            update(WalletBalance).where(WalletBalance.player_id == ids[1]).values(balance_real_available=WalletBalance.balance_real_available + 5)
+        )
+        await session.execute(update(Player).where(Player.id == ids[2]).values(balance_real_held=3.0))
+        await session.commit()
+
+        wallet = (await session.execute(select(WalletBalance).where(WalletBalance.player_id == ids[3]))).scalars().one()
+        assert (wallet.balance_real_available, wallet.balance_real_pending, wallet.balance_bonus_available) == (70.0, 5.0, 0.0)
+
+    summary = await verify_ledger_balances(tenant_id=tenant_id, shards=4, workers=2, session_factory=async_session_factory)
+    assert summary["ranges"] == 4 and summary["groups"] == 5
+    assert summary["ledger_rows"] == 6 * 4 + 1
+    assert summary["by_kind"] == {"ledger_spendable": 1, "player_available": 1, "player_held": 1, "wallet_missing": 1}
+
+    async with async_session_factory() as session:
+        rows = (await session.execute(select(LedgerBalanceFinding).where(LedgerBalanceFinding.run_id == summary["run_id"]))).scalars().all()
+        found = {(r.player_id, r.kind): (r.expected, r.actual) for r in rows}
+    assert found == {
+        (ids[1], "ledger_spendable"): (70.0, 75.0),
+        (ids[1], "player_available"): (75.0, 70.0),
+        (ids[2], "player_held"): (5.0, 3.0),
+        (ids[4], "wallet_missing"): (12.0, None),
+    }
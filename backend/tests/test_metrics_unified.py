@@ -0,0 +1,130 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from prometheus_client import CollectorRegistry, Counter
+
+from app.core.metrics import OVERFLOW, GuardedMetric, RequestWindow, metrics, render_latest, series_overflow_total
+from app.middleware.metrics_middleware import MetricsMiddleware
+from app.scripts.benchmark_metrics_recording import run_benchmark
+from app.services.metrics import MetricsService
+
+
+def _sample(metric, name, labels):
+    for family in metric.collect():
+        for sample in family.samples:
+            if sample.name == name and sample.labels == labels:
+                return sample.value
+    return 0.0
+
+
+def test_guard_folds_new_label_sets_into_overflow():
+    registry = CollectorRegistry()
+    guarded = GuardedMetric(Counter("guard_test_total", "t", ["route"], registry=registry), max_series=2)
+    before = _sample(series_overflow_total, "metrics_label_overflow_total", {"metric": "guard_test"})
+
+    for route in ("/a", "/b", "/c", "/d", "/a"):
+        guarded.labels(route).inc()
+    guarded.labels(route="/b").inc()
+
+    values = {s.labels["route"]: s.value for s in guarded.collect()[0].samples if s.name == "guard_test_total"}
+    assert values == {"/a": 2.0, "/b": 2.0, OVERFLOW: 2.0}
+    assert _sample(series_overflow_total, "metrics_label_overflow_total", {"metric": "guard_test"}) == before + 2
+
+
+def test_request_window_rates_slide():
+    window = RequestWindow(60)
+    for status in (200, 200, 404, 503):
+        window.record(status, now=1000)
+    window.record(500, now=1050)
+
+    rates = window.rates(30, now=1055)
+    assert rates["requests"] == 1 and rates["error_rate_5xx"] == 1.0
+
+    rates = window.rates(60, now=1055)
+    assert rates["requests"] == 5
+    assert rates["errors_4xx"] == 1 and rates["errors_5xx"] == 2
+    assert rates["error_rate_5xx"] == pytest.approx(0.4)
+
+    # Buckets are reused once they age out; totals keep counting.
+    window.record(200, now=1060)
+    assert window.rates(60, now=1060)["requests"] == 2
+    assert window.totals == [6, 1, 2]
+
+
+def test_metrics_service_reads_window():
+    service = MetricsService(window=RequestWindow(60))
+    service.increment_request()
+    service.increment_request()
+    service.increment_error_5xx()
+    service.record_reconciliation_result(3, 0)
+
+    data = service.get_metrics(window_seconds=60)
+    assert data["http"]["total_requests"] == 2
+    assert data["http"]["error_rate_5xx"] == 0.5
+    assert data["status"] == "healthy"
+
+
+@pytest.mark.asyncio
+async def test_middleware_labels_route_template():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/unified/items/{item_id}")
+    async def item(item_id: str):
+        return {"id": item_id}
+
+    @app.get("/unified/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    def count(route, status):
+        labels = {"method": "GET", "route": route, "status": status}
+        return _sample(metrics.http_requests_total, "http_requests_total", labels)
+
+    before = (count("/unified/items/{item_id}", "200"), count("unmatched", "404"), count("/unified/boom", "500"))
+
+    transport = ASGITransport(app=app, raise_app_exceptions=False)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        for i in range(3):
+            assert (await client.get(f"/unified/items/{i}")).status_code == 200
+        assert (await client.get("/unified/nope")).status_code == 404
+        assert (await client.get("/unified/boom")).status_code == 500
+
+    assert count("/unified/items/{item_id}", "200") == before[0] + 3
+    assert count("unmatched", "404") == before[1] + 1
+    assert count("/unified/boom", "500") == before[2] + 1
+    duration = _sample(
+        metrics.http_request_duration_seconds,
+        "http_request_duration_seconds_count",
+        {"method": "GET", "route": "/unified/items/{item_id}"},
+    )
+    assert duration >= 3
+
+
+_WORKER_SCRIPT = """
+from app.core.metrics import observe_request
+observe_request("GET", "/mp/{id}", 200, 0.01)
+observe_request("GET", "/mp/{id}", 200, 0.02)
+"""
+
+
+def test_multiprocess_render_aggregates_workers(tmp_path, monkeypatch):
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path), "PYTHONPATH": "."}
+    for _ in range(2):  # two "workers", each writing its own sample files
+        out = subprocess.run([sys.executable, "-c", _WORKER_SCRIPT], env=env, capture_output=True, text=True, timeout=60)
+        assert out.returncode == 0, out.stderr
+
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    payload = render_latest()[0].decode()
+    line = next(l for l in payload.splitlines() if l.startswith("http_requests_total{") and "/mp/{id}" in l)
+    assert float(line.rsplit(" ", 1)[1]) == 4.0
+
+
+def test_recording_benchmark_runs():
+    results = run_benchmark(iterations=200, routes=5)
+    assert results["guarded_labels_ns"] > 0
+    assert results["middleware_overhead_ns"] is not None
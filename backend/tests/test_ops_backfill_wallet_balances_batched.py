@@ -0,0 +1,109 @@
+import json
+import uuid
+
+import pytest
+from sqlmodel import select
+
+from app.models.sql_models import Player
+from app.repositories.ledger_repo import WalletBalance
+from scripts.backfill_wallet_balances import _backfill_wallet_balances, _verify_wallet_balances
+
+
+async def _seed(session, n_players):
+    tenant_id = f"t_{uuid.uuid4().hex[:8]}"
+    players = [
+        Player(
+            tenant_id=tenant_id, username=f"b{i}", email=f"b{i}@x.io", password_hash="x",
+            balance_real_available=float(i), balance_real_held=1.0,
+        )
+        for i in range(n_players)
+    ]
+    session.add_all(players)
+    await session.commit()
+    return tenant_id, players
+
+
+@pytest.mark.asyncio
+async def test_concurrent_ranges_resume_and_verify(async_session_factory, tmp_path):
+    async with async_session_factory() as session:
+        tenant_id, players = await _seed(session, 23)
+        # One player already has a (stale) balance: skipped without --force.
+        session.add(WalletBalance(tenant_id=tenant_id, player_id=players[0].id, balance_real_available=-1.0))
+        await session.commit()
+
+    before = await _verify_wallet_balances(tenant_id=tenant_id, batch_size=5, session_factory=async_session_factory, workers=2, shards=3)
+    assert (before["scanned"], before["missing"], before["drifted"]) == (23, 22, 1)
+
+    # Every (tenant, id-range) unit is checkpointed; a rerun on the same file scans nothing.
+    checkpoint = tmp_path / "cp.json"
+    first = await _backfill_wallet_balances(
+        tenant_id=tenant_id, batch_size=5, dry_run=False, force=False,
+        session_factory=async_session_factory, workers=2, shards=3, checkpoint_path=str(checkpoint),
+    )
+    assert (first["scanned"], first["created"], first["skipped_exists"]) == (23, 22, 1)
+    state = json.loads(checkpoint.read_text())
+    assert len(state) == 3 and all(v["done"] for v in state.values())
+
+    rerun = await _backfill_wallet_balances(
+        tenant_id=tenant_id, batch_size=5, dry_run=False, force=False,
+        session_factory=async_session_factory, workers=2, shards=3, checkpoint_path=str(checkpoint),
+    )
+    assert rerun["scanned"] == 0
+
+    # A different shard layout does not reuse "done" flags of narrower ranges.
+    reshard = await _backfill_wallet_balances(
+        tenant_id=tenant_id, batch_size=5, dry_run=False, force=False,
+        session_factory=async_session_factory, checkpoint_path=str(checkpoint),
+    )
+    assert (reshard["scanned"], reshard["created"]) == (23, 0)
+
+    forced = await _backfill_wallet_balances(
+        tenant_id=tenant_id, batch_size=4, dry_run=False, force=True, session_factory=async_session_factory, workers=3,
+    )
+    assert (forced["created"], forced["updated_forced"]) == (0, 23)
+
+    after = await _verify_wallet_balances(tenant_id=tenant_id, batch_size=7, session_factory=async_session_factory)
+    assert (after["missing"], after["drifted"]) == (0, 0)
+
+    async with async_session_factory() as session:
+        rows = (await session.execute(select(WalletBalance).where(WalletBalance.tenant_id == tenant_id))).scalars().all()
+        assert sorted(r.balance_real_available for r in rows) == [float(i) for i in range(23)]
+        assert {r.balance_real_pending for r in rows} == {1.0}
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_retried_on_resume(async_session_factory, tmp_path, monkeypatch):
+    import scripts.backfill_wallet_balances as backfill
+
+    async with async_session_factory() as session:
+        tenant_id, players = await _seed(session, 9)
+
+    real_op = backfill._backfill_op
+    calls = []
+
+    def failing_second_batch(**kwargs):
+        op = real_op(**kwargs)
+
+        async def wrapped(session, unit, after, last, scanned):
+            calls.append(last)
+            if len(calls) == 2:
+                raise RuntimeError("deadlock")
+            return await op(session, unit, after, last, scanned)
+
+        return wrapped
+
+    checkpoint = tmp_path / "cp.json"
+    monkeypatch.setattr(backfill, "_backfill_op", failing_second_batch)
+    first = await _backfill_wallet_balances(
+        tenant_id=tenant_id, batch_size=3, dry_run=False, force=False,
+        session_factory=async_session_factory, checkpoint_path=str(checkpoint),
+    )
+    assert (first["created"], first["errors"]) == (3, 3)
+    assert not any(v["done"] for v in json.loads(checkpoint.read_text()).values())
+
+    monkeypatch.setattr(backfill, "_backfill_op", real_op)
+    resumed = await _backfill_wallet_balances(
+        tenant_id=tenant_id, batch_size=3, dry_run=False, force=False,
+        session_factory=async_session_factory, checkpoint_path=str(checkpoint),
+    )
+    assert (resumed["scanned"], resumed["created"], resumed["errors"]) == (6, 6, 0)
@@ -0,0 +1,160 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from unittest.mock import patch
+
+from app.core.redis_client import InMemoryRedis, RedisClient
+from app.models.payment_analytics_models import RoutingRule
+from app.models.sql_models import Player, Transaction
+from app.services.payments.routing import psp_stats
+from app.services.payments.routing.routing_table import (
+    RoutingTable,
+    invalidate_routing_rules,
+    routing_table_cache,
+)
+from app.services.payments.routing.smart_router import SmartRouter
+
+
+def _rule(providers, tenant_id=None, currency=None, country=None, method=None, age_s=0):
+    return RoutingRule(
+        tenant_id=tenant_id,
+        currency=currency,
+        country=country,
+        method=method,
+        provider_priority=providers,
+        created_at=datetime.now(timezone.utc) - timedelta(seconds=age_s),
+    )
+
+
+def test_routing_table_prefers_most_specific_rule():
+    table = RoutingTable(
+        [
+            _rule(["global"]),
+            _rule(["global_eur"], currency="EUR"),
+            _rule(["tenant"], tenant_id="t1"),
+            _rule(["tenant_eur_de"], tenant_id="t1", currency="EUR", country="DE"),
+            _rule(["tenant_card"], tenant_id="t1", method="card"),
+        ]
+    )
+
+    assert table.resolve(tenant_id="t1", currency="EUR", country="DE", method="card") == ["tenant_eur_de"]
+    assert table.resolve(tenant_id="t1", currency="EUR", country="FR", method="card") == ["tenant_card"]
+    assert table.resolve(tenant_id="t1", currency="USD", country="US", method="sepa") == ["tenant"]
+    assert table.resolve(tenant_id="t2", currency="EUR", country="DE", method="card") == ["global_eur"]
+    assert table.resolve(tenant_id="t2", currency="USD", country="US", method="card") == ["global"]
+
+
+def test_routing_table_newest_rule_wins_on_identical_key():
+    table = RoutingTable([_rule(["new"], tenant_id="t1"), _rule(["old"], tenant_id="t1", age_s=60)])
+    assert table.resolve(tenant_id="t1", currency="USD", country="US", method="card") == ["new"]
+    assert RoutingTable([]).resolve(tenant_id="t1", currency="USD", country="US", method="card") is None
+
+
+@pytest.mark.asyncio
+async def test_psp_stats_rank_by_success_rate_and_latency():
+    redis = InMemoryRedis()
+    now = 1_700_000_000.0
+    for i in range(40):
+        await psp_stats.record_attempt(redis, provider="stripe_mock", currency="USD", success=i % 2 == 0, latency_ms=200, now=now)
+        await psp_stats.record_attempt(redis, provider="adyen_mock", currency="USD", success=True, latency_ms=250, now=now)
+
+    stats = await psp_stats.get_stats(redis, ["stripe_mock", "adyen_mock"], "USD", now=now)
+    assert stats["stripe_mock"]["attempts"] == 40
+    assert stats["stripe_mock"]["success_rate"] == pytest.approx(0.5)
+    assert stats["adyen_mock"]["avg_latency_ms"] == pytest.approx(250.0)
+
+    ranked = await psp_stats.rank_providers(redis, ["stripe_mock", "adyen_mock"], "USD", now=now)
+    assert ranked == ["adyen_mock", "stripe_mock"]
+
+    # Outside the rolling window the stats no longer count: configured order wins.
+    later = now + psp_stats.BUCKET_SECONDS * (psp_stats.WINDOW_BUCKETS + 1)
+    assert await psp_stats.rank_providers(redis, ["stripe_mock", "adyen_mock"], "USD", now=later) == [
+        "stripe_mock",
+        "adyen_mock",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_smart_router_uses_cached_table_until_invalidated(async_session_factory):
+    routing_table_cache.invalidate()
+    router = SmartRouter()
+    redis = InMemoryRedis()
+
+    async with async_session_factory() as session:
+        session.add(_rule(["adyen_mock"], tenant_id="t_route", currency="EUR"))
+        await session.commit()
+
+        route = await router.get_smart_route(session, "t_route", "EUR", "DE", "card", redis=redis)
+        assert route == ["adyen_mock"]
+
+        session.add(_rule(["stripe_mock"], tenant_id="t_route", currency="EUR", country="DE"))
+        await session.commit()
+
+        # Cached table is still served until the rule change is published.
+        assert await router.get_smart_route(session, "t_route", "EUR", "DE", "card", redis=redis) == ["adyen_mock"]
+
+        await invalidate_routing_rules("t_route")
+        assert await router.get_smart_route(session, "t_route", "EUR", "DE", "card", redis=redis) == ["stripe_mock"]
+
+        # No rule for USD: score-based fallback over the default candidates.
+        for _ in range(20):
+            await router.record_attempt(provider="stripe_mock", currency="USD", success=False, latency_ms=900, redis=redis)
+        assert await router.get_smart_route(session, "t_route", "USD", "US", "card", redis=redis) == [
+            "adyen_mock",
+            "stripe_mock",
+        ]
+
+    routing_table_cache.invalidate()
+
+
+def _authorisation(tx_id, success):
+    item = {"eventCode": "AUTHORISATION", "merchantReference": tx_id, "pspReference": f"psp_{tx_id}", "success": success}
+    return {"notificationItems": [{"NotificationRequestItem": item}]}
+
+
+@pytest.mark.asyncio
+async def test_adyen_webhook_outcomes_feed_psp_stats(client, session, monkeypatch):
+    redis = InMemoryRedis()
+    monkeypatch.setattr(RedisClient, "_instance", redis)
+    player = Player(tenant_id="default_casino", username="psp_stats", email="psp_stats@example.com", password_hash="x")
+    session.add(player)
+    await session.flush()
+    declined, paid = (
+        Transaction(tenant_id="default_casino", player_id=player.id, type="deposit", amount=10.0, currency="SEK",
+                    status="pending", state="pending_provider", provider="adyen")
+        for _ in range(2)
+    )
+    session.add_all([declined, paid])
+    await session.commit()
+
+    with patch("app.services.adyen_psp.AdyenPSP.verify_webhook_signature", return_value=True):
+        for payload in (_authorisation(declined.id, "false"), _authorisation(declined.id, "false"), _authorisation(paid.id, "true")):
+            assert (await client.post("/api/v1/payments/adyen/webhook", json=payload)).status_code == 200
+
+    # The redelivered failure is counted once; webhooks carry no latency.
+    stats = (await psp_stats.get_stats(redis, ["adyen_mock"], "SEK"))["adyen_mock"]
+    assert stats["attempts"] == 2
+    assert stats["success_rate"] == pytest.approx(0.5)
+    assert stats["avg_latency_ms"] == 0.0
+
+
+@pytest.mark.asyncio
+async def test_recorded_psp_outcomes_reorder_fallback_route(async_session_factory):
+    routing_table_cache.invalidate()
+    router = SmartRouter()
+    redis = InMemoryRedis()
+
+    async with async_session_factory() as session:
+        assert await router.get_smart_route(session, "t_fallback", "GBP", "GB", "card", redis=redis) == [
+            "stripe_mock",
+            "adyen_mock",
+        ]
+        # Outcomes arrive under the PSP's own name ("stripe", as webhooks report it).
+        for _ in range(20):
+            await router.record_attempt(provider="stripe", currency="GBP", success=False, redis=redis)
+        assert await router.get_smart_route(session, "t_fallback", "GBP", "GB", "card", redis=redis) == [
+            "adyen_mock",
+            "stripe_mock",
+        ]
+
+    routing_table_cache.invalidate()
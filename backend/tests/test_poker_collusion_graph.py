@@ -0,0 +1,123 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import select
+
+from app.models.poker_models import PokerHandAudit
+from app.models.poker_mtt_models import RiskSignal
+from app.services.poker_risk_engine import PokerRiskEngine
+from app.services.poker.collusion_graph import (
+    CLUSTER_SIGNAL,
+    PAIR_SIGNAL,
+    PairInteractionMatrix,
+    analyze_collusion_window,
+    connected_clusters,
+    score_pairs,
+)
+
+
+def test_pair_matrix_counts_and_chip_flow_across_chunks():
+    matrix = PairInteractionMatrix()
+    # a always wins from b heads-up; c sits in a 3-way hand once.
+    for _ in range(3):
+        matrix.add_hands([(["a", "b"], {"a": 10.0})] * 40)
+    matrix.add_hands([(["a", "b", "c"], {"c": 6.0}), (["solo"], {"solo": 1.0})])
+
+    pairs = score_pairs(matrix, min_hands_together=100, flow_threshold=500.0)
+    assert matrix.hands == 121
+    assert len(pairs) == 1
+    ab = pairs[0]
+    assert ab["players"] == ["a", "b"]
+    assert ab["receiver"] == "a"
+    assert ab["hands_together"] == 121
+    assert ab["net_flow"] == pytest.approx(1200.0)
+    assert set(ab["reasons"]) == {"concentration", "chip_flow"}
+
+
+def test_connected_clusters_groups_flagged_pairs():
+    def pair(a, b, score=1.0):
+        return {"players": [a, b], "score": score, "net_flow": 10.0}
+
+    clusters = connected_clusters([pair("a", "b"), pair("b", "c"), pair("a", "c"), pair("x", "y")])
+    assert len(clusters) == 1
+    assert clusters[0]["players"] == ["a", "b", "c"]
+    assert clusters[0]["density"] == pytest.approx(1.0)
+
+
+async def _seed_ring_hands(async_session_factory, tenant_id, first_hand_at, hands=90):
+    async with async_session_factory() as session:
+        ring = ["r1", "r2", "r3"]
+        for i in range(hands):
+            a, b = ring[i % 3], ring[(i + 1) % 3]
+            session.add(
+                PokerHandAudit(
+                    tenant_id=tenant_id,
+                    provider_hand_id=f"h{i}",
+                    table_id="tbl",
+                    game_type="CASH",
+                    pot_total=50.0,
+                    rake_collected=1.0,
+                    rake_profile_id=None,
+                    participants=[a, b],
+                    winners=[{"player_id": b, "amount": 20.0}],
+                    created_at=first_hand_at + timedelta(minutes=i),
+                )
+            )
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_analyze_window_emits_signals_once(async_session_factory):
+    tenant_id = f"t_{uuid.uuid4().hex[:8]}"
+    window_start = datetime(2026, 10, 1)
+    window_end = window_start + timedelta(days=1)
+
+    await _seed_ring_hands(async_session_factory, tenant_id, window_start)
+
+    kwargs = dict(
+        tenant_id=tenant_id,
+        window_start=window_start,
+        window_end=window_end,
+        chunk_size=16,
+        min_hands_together=20,
+    )
+    async with async_session_factory() as session:
+        first = await analyze_collusion_window(session, **kwargs)
+        await session.commit()
+    async with async_session_factory() as session:
+        second = await analyze_collusion_window(session, **kwargs)
+        await session.commit()
+
+    assert first["hands"] == 90
+    assert first["flagged_pairs"] == 3
+    assert first["clusters"] == 1
+    assert first["signals_inserted"] == 4
+    assert second["signals_inserted"] == 0
+
+    async with async_session_factory() as session:
+        signals = (
+            await session.execute(select(RiskSignal).where(RiskSignal.tenant_id == tenant_id))
+        ).scalars().all()
+    assert sorted(s.signal_type for s in signals) == [PAIR_SIGNAL] * 3 + [CLUSTER_SIGNAL]
+    ring_signal = next(s for s in signals if s.signal_type == CLUSTER_SIGNAL)
+    assert ring_signal.target_resource_id == "r1:r2:r3"
+
+
+@pytest.mark.asyncio
+async def test_rolling_window_reports_once_per_day(async_session_factory):
+    tenant_id = f"t_{uuid.uuid4().hex[:8]}"
+    # 60 hands per pair clears the engine's default thresholds.
+    await _seed_ring_hands(async_session_factory, tenant_id, datetime.utcnow() - timedelta(hours=4), hands=180)
+
+    engine = PokerRiskEngine()
+    async with async_session_factory() as session:
+        first = await engine.analyze_collusion(session, tenant_id)
+        await session.commit()
+    async with async_session_factory() as session:
+        # The window end has moved on, but the pairs were already reported today.
+        second = await engine.analyze_collusion(session, tenant_id)
+        await session.commit()
+
+    assert first["signals_inserted"] == 4
+    assert second["signals_inserted"] == 0
@@ -0,0 +1,123 @@
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from sqlmodel import select
+
+from app.models.poker_mtt_models import PokerTournament
+from app.models.sql_models import Player
+from app.repositories.ledger_repo import LedgerTransaction, WalletBalance
+from app.services.poker.mtt_payout_engine import MTT_PROVIDER, normalize_payouts, pay_tournament
+
+
+async def _seed(session, n_players: int):
+    tenant_id = f"t_{uuid.uuid4().hex[:8]}"
+    players = []
+    for i in range(n_players):
+        p = Player(
+            id=f"{tenant_id}-p{i:03d}",
+            tenant_id=tenant_id,
+            username=f"u{i}",
+            email=f"u{i}@{tenant_id}.test",
+            password_hash="x",
+            balance_real_available=10.0,
+        )
+        session.add(p)
+        players.append(p)
+    trn = PokerTournament(
+        tenant_id=tenant_id,
+        name="Sunday Million",
+        buy_in=10.0,
+        fee=1.0,
+        start_at=datetime.now(timezone.utc),
+        status="RUNNING",
+    )
+    session.add(trn)
+    await session.commit()
+    return tenant_id, trn, players
+
+
+def test_normalize_payouts_merges_and_sorts():
+    out = normalize_payouts(
+        [
+            {"player_id": "b", "amount": 5, "rank": 2},
+            {"player_id": "a", "amount": 10, "rank": 1},
+            {"player_id": "b", "amount": 1.5},
+            {"player_id": "c", "amount": 0},
+        ]
+    )
+    assert [p["player_id"] for p in out] == ["a", "b"]
+    assert out[1]["amount"] == pytest.approx(6.5)
+
+
+@pytest.mark.asyncio
+async def test_pay_tournament_chunked_and_idempotent(async_session_factory):
+    async with async_session_factory() as session:
+        tenant_id, trn, players = await _seed(session, 5)
+        payouts = [{"player_id": p.id, "amount": 100.0 - 10 * i, "rank": i + 1} for i, p in enumerate(players)]
+        payouts.append({"player_id": "ghost", "amount": 1.0})
+
+        result = await pay_tournament(session, trn, payouts, chunk_size=2)
+        assert result["credited"] == 5
+        assert result["missing_players"] == ["ghost"]
+        assert trn.status == "FINISHED"
+        assert trn.payout_report["cursor"] == max(p.id for p in players)
+
+        # A retry that lands while the tournament is still flagged PAYING must
+        # not pay anyone twice.
+        trn.status = "PAYING"
+        trn.payout_report = {**trn.payout_report, "cursor": None, "paid_count": 0}
+        await session.commit()
+        retry = await pay_tournament(session, trn, [], chunk_size=2)
+        assert retry["credited"] == 0
+        assert retry["skipped_already_paid"] == 5
+
+    async with async_session_factory() as session:
+        first = await session.get(Player, players[0].id)
+        assert first.balance_real_available == pytest.approx(110.0)
+
+        wb = (
+            await session.execute(
+                select(WalletBalance).where(WalletBalance.tenant_id == tenant_id, WalletBalance.player_id == players[4].id)
+            )
+        ).scalars().first()
+        assert wb.balance_real_available == pytest.approx(70.0)
+
+        rows = (
+            await session.execute(
+                select(LedgerTransaction).where(
+                    LedgerTransaction.tenant_id == tenant_id,
+                    LedgerTransaction.provider == MTT_PROVIDER,
+                )
+            )
+        ).scalars().all()
+        assert len(rows) == 5
+        assert {r.status for r in rows} == {"mtt_prize"}
+        assert all(r.provider_ref == trn.id for r in rows)
+
+
+@pytest.mark.asyncio
+async def test_pay_tournament_resumes_from_cursor(async_session_factory):
+    async with async_session_factory() as session:
+        _tenant_id, trn, players = await _seed(session, 4)
+        payouts = normalize_payouts([{"player_id": p.id, "amount": 25.0} for p in players])
+
+        # Simulate a crash after the first two players were committed.
+        trn.status = "PAYING"
+        trn.payout_report = {
+            "payouts": payouts,
+            "total_distributed": 100.0,
+            "paid_count": 2,
+            "cursor": players[1].id,
+            "missing_players": [],
+        }
+        await session.commit()
+
+        result = await pay_tournament(session, trn, [{"player_id": "ignored", "amount": 999}])
+        assert result["credited"] == 2
+        assert trn.payout_report["paid_count"] == 4
+        assert trn.status == "FINISHED"
+
+    async with async_session_factory() as session:
+        assert (await session.get(Player, players[0].id)).balance_real_available == pytest.approx(10.0)
+        assert (await session.get(Player, players[3].id)).balance_real_available == pytest.approx(35.0)
@@ -0,0 +1,125 @@
+import random
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import select
+
+from app.jobs.poker_rakeback_job import RAKEBACK_EVENT, settle_rakeback_for_tenant
+from app.models.poker_models import PokerHandAudit, RakeProfile
+from app.models.sql_models import Player
+from app.models.vip_models import PlayerVipStatus, VipTier
+from app.repositories.ledger_repo import LedgerTransaction
+from app.services.poker.rake_engine import (
+    RakeEngine,
+    calculate_rake_batch,
+    calculate_rakeback_batch,
+    split_rake_by_player,
+)
+
+
+def test_rake_batch_matches_scalar_engine():
+    profile = RakeProfile(tenant_id="t", name="NL", percentage=4.5, cap=3.0, rules={"2": 1.0, "3": 2.0})
+    rng = random.Random(7)
+    pots = [round(rng.uniform(0, 150), 2) for _ in range(5000)] + [0.0, 0.1, 0.11, 66.67]
+    counts = [rng.randint(2, 9) for _ in range(len(pots) - 4)] + [2, 2, 6, 6]
+
+    batch = calculate_rake_batch(pots, counts, profile)
+    for pot, count, rake_cents in zip(pots, counts, batch):
+        assert int(rake_cents) == round(RakeEngine.calculate_rake(pot, profile, count) * 100)
+
+
+def test_split_and_rakeback_keep_every_cent():
+    by_player = split_rake_by_player([10, 7, 5, 3], [["a", "b", "c"], ["b", "a"], [], ["c"]])
+    # 10 -> a4 b3 c3, 7 -> b4 a3, 5 unattributed, 3 -> c3
+    assert by_player == {"a": 7, "b": 7, "c": 6}
+
+    rakeback = calculate_rakeback_batch({"a": 333, "b": 1000, "c": 50}, {"a": 25.0, "b": 0.0, "c": 1.0})
+    assert rakeback == {"a": 83, "c": 1}
+
+
+@pytest.mark.asyncio
+async def test_settle_rakeback_streams_hands_and_is_idempotent(async_session_factory):
+    tenant_id = f"t_{uuid.uuid4().hex[:8]}"
+    window_start = datetime(2026, 9, 1)
+    window_end = datetime(2026, 10, 1)
+
+    async with async_session_factory() as session:
+        tier = VipTier(tenant_id=tenant_id, name="Gold", rakeback_percent=20.0)
+        profile = RakeProfile(tenant_id=tenant_id, name="Standard", percentage=5.0, cap=3.0)
+        session.add_all([tier, profile])
+        for pid in ("alice", "bob"):
+            session.add(
+                Player(
+                    id=f"{tenant_id}-{pid}",
+                    tenant_id=tenant_id,
+                    username=pid,
+                    email=f"{pid}@{tenant_id}.test",
+                    password_hash="x",
+                )
+            )
+        session.add(PlayerVipStatus(player_id=f"{tenant_id}-alice", tenant_id=tenant_id, current_tier_id=tier.id))
+        await session.flush()
+
+        alice, bob = f"{tenant_id}-alice", f"{tenant_id}-bob"
+        for i in range(30):
+            session.add(
+                PokerHandAudit(
+                    tenant_id=tenant_id,
+                    provider_hand_id=f"h{i}",
+                    table_id="tbl",
+                    game_type="CASH",
+                    pot_total=20.0,
+                    rake_collected=1.0,
+                    rake_profile_id=profile.id,
+                    player_count=2,
+                    participants=[alice, bob],
+                    created_at=window_start + timedelta(hours=i),
+                )
+            )
+        # Outside the window: ignored.
+        session.add(
+            PokerHandAudit(
+                tenant_id=tenant_id,
+                provider_hand_id="late",
+                table_id="tbl",
+                game_type="CASH",
+                pot_total=20.0,
+                rake_collected=1.0,
+                rake_profile_id=profile.id,
+                participants=[alice],
+                created_at=window_end,
+            )
+        )
+        await session.commit()
+
+    kwargs = dict(
+        tenant_id=tenant_id,
+        window_start=window_start,
+        window_end=window_end,
+        chunk_size=7,
+        session_factory=async_session_factory,
+    )
+    dry = await settle_rakeback_for_tenant(dry_run=True, **kwargs)
+    assert dry["hands"] == 30
+    assert dry["rake_total"] == pytest.approx(30.0)
+    assert dry["rake_mismatches"] == 0
+    assert dry["rakeback_total"] == pytest.approx(3.0)  # 20% of alice's 15.00
+    assert dry["credited"] == 0
+
+    first = await settle_rakeback_for_tenant(**kwargs)
+    second = await settle_rakeback_for_tenant(**kwargs)
+    assert first["credited"] == 1
+    assert second["credited"] == 0
+
+    async with async_session_factory() as session:
+        player = await session.get(Player, alice)
+        assert player.balance_real_available == pytest.approx(3.0)
+        rows = (
+            await session.execute(
+                select(LedgerTransaction).where(
+                    LedgerTransaction.tenant_id == tenant_id, LedgerTransaction.status == RAKEBACK_EVENT
+                )
+            )
+        ).scalars().all()
+        assert len(rows) == 1
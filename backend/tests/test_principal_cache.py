@@ -0,0 +1,152 @@
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from app.models.rg_models import PlayerRGProfile
+from app.models.sql_models import AdminUser, Player
+from app.utils.auth import create_access_token, get_current_admin
+from app.utils.auth_player import get_current_player_principal
+from app.utils.principal_cache import (
+    TTLCache,
+    admin_principals,
+    bump_revocation_epoch,
+    clear_principal_caches,
+    invalidate_player_principal,
+    player_principals,
+    token_cache_key,
+)
+
+
+def test_ttl_cache_expiry_and_lru_bound():
+    cache = TTLCache(ttl_seconds=30, max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)  # evicts least recently used ("b")
+    assert cache.get("b") is None and cache.get("a") == 1
+
+    cache.put("d", 4, ttl_seconds=-1)
+    assert cache.get("d") is None
+
+
+def _player_token(player: Player, issued_at: datetime) -> str:
+    return create_access_token(
+        data={
+            "sub": player.id,
+            "tenant_id": player.tenant_id,
+            "role": "player",
+            "iat": int(issued_at.timestamp() * 1000),
+        },
+        expires_delta=timedelta(hours=1),
+    )
+
+
+@pytest.mark.asyncio
+async def test_player_principal_cached_and_revoked_immediately(async_session_factory):
+    clear_principal_caches()
+    tenant_id = f"t_{uuid.uuid4().hex[:8]}"
+
+    async with async_session_factory() as session:
+        player = Player(tenant_id=tenant_id, email=f"{tenant_id}@test.com", username=tenant_id, password_hash="x")
+        session.add(player)
+        await session.commit()
+        await session.refresh(player)
+
+        token = _player_token(player, datetime.now(timezone.utc) - timedelta(seconds=5))
+        principal = await get_current_player_principal(token=token, session=session)
+        assert (principal.id, principal.tenant_id) == (player.id, tenant_id)
+        assert len(player_principals) == 1
+
+        # Status changes reach the cache only through invalidation.
+        player.status = "suspended"
+        session.add(player)
+        await session.commit()
+        assert (await get_current_player_principal(token=token, session=session)).status != "suspended"
+        await invalidate_player_principal(tenant_id, player.id)
+        with pytest.raises(HTTPException) as exc:
+            await get_current_player_principal(token=token, session=session)
+        assert exc.value.status_code == 403
+
+        player.status = "active"
+        session.add(player)
+        await session.commit()
+        await invalidate_player_principal(tenant_id, player.id)
+        await get_current_player_principal(token=token, session=session)
+
+        # Force-logout: the cached principal must not outlive the revocation.
+        await bump_revocation_epoch(tenant_id, player.id, datetime.now(timezone.utc))
+        with pytest.raises(HTTPException) as exc:
+            await get_current_player_principal(token=token, session=session)
+        assert exc.value.status_code == 401
+        assert exc.value.detail == {"error_code": "TOKEN_REVOKED"}
+
+    clear_principal_caches()
+
+
+@pytest.mark.asyncio
+async def test_player_principal_allows_expired_exclusion_and_expires_with_token(async_session_factory):
+    clear_principal_caches()
+    tenant_id = f"t_{uuid.uuid4().hex[:8]}"
+
+    async with async_session_factory() as session:
+        player = Player(
+            tenant_id=tenant_id, email=f"{tenant_id}@test.com", username=tenant_id, password_hash="x",
+            status="self_excluded",
+        )
+        session.add(player)
+        await session.commit()
+        await session.refresh(player)
+
+        # The exclusion has run out: login lets the player back in, so must every endpoint.
+        session.add(
+            PlayerRGProfile(
+                player_id=player.id, tenant_id=tenant_id,
+                self_excluded_until=datetime.now(timezone.utc) - timedelta(hours=1),
+            )
+        )
+        await session.commit()
+        token = _player_token(player, datetime.now(timezone.utc) - timedelta(seconds=5))
+        assert (await get_current_player_principal(token=token, session=session)).status == "self_excluded"
+
+        # A token about to expire is cached only until its exp.
+        short = create_access_token(
+            data={"sub": player.id, "tenant_id": tenant_id, "role": "player", "iat": int(datetime.now(timezone.utc).timestamp())},
+            expires_delta=timedelta(seconds=2),
+        )
+        await get_current_player_principal(token=short, session=session)
+        key = token_cache_key(short)
+        expires_at, _ = player_principals._entries[key]
+        assert expires_at - time.monotonic() <= 2.5
+
+    clear_principal_caches()
+
+
+@pytest.mark.asyncio
+async def test_admin_principal_cached_only_until_token_exp(async_session_factory):
+    clear_principal_caches()
+    tenant_id = f"t_{uuid.uuid4().hex[:8]}"
+
+    async with async_session_factory() as session:
+        admin = AdminUser(
+            tenant_id=tenant_id, username=tenant_id, email=f"{tenant_id}@admin.test", full_name="Test Admin",
+            password_hash="noop", role="Admin",
+        )
+        session.add(admin)
+        await session.commit()
+
+        short = create_access_token(data={"email": admin.email}, expires_delta=timedelta(seconds=2))
+        await get_current_admin(token=short, session=session)
+        expires_at, _ = admin_principals._entries[token_cache_key(short)]
+        assert expires_at - time.monotonic() <= 2.5
+
+        # Already expired by the time it is decoded: rejected, never cached.
+        expired = create_access_token(data={"email": admin.email}, expires_delta=timedelta(seconds=-1))
+        with pytest.raises(HTTPException) as exc:
+            await get_current_admin(token=expired, session=session)
+        assert exc.value.status_code == 401
+        assert token_cache_key(expired) not in admin_principals._entries
+
+    clear_principal_caches()
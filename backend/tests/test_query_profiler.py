@@ -0,0 +1,64 @@
+import logging
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+
+from app.core.query_profiler import assert_max_queries, fingerprint
+from app.middleware.request_context import RequestContextMiddleware
+
+
+def test_fingerprint_collapses_literals_and_in_lists():
+    a = fingerprint("SELECT * FROM player WHERE id IN (?, ?, ?) AND name = 'x' LIMIT 10")
+    b = fingerprint("SELECT * FROM player\n WHERE id IN (?, ?) AND name = 'y''s' LIMIT 20")
+    assert a == b == "SELECT * FROM player WHERE id IN (?...) AND name = ? LIMIT ?"
+
+
+def _app(session_factory):
+    app = FastAPI()
+    app.add_middleware(RequestContextMiddleware)
+
+    @app.get("/items/{n}")
+    async def items(n: int):
+        async with session_factory() as session:
+            for i in range(n):
+                await session.execute(text("SELECT :i"), {"i": i})
+        return {"n": n}
+
+    return app
+
+
+@pytest.mark.asyncio
+async def test_request_profile_budget_and_test_helper(async_session_factory, caplog, monkeypatch):
+    from config import settings
+
+    monkeypatch.setattr(settings, "db_repeated_statement_threshold", 5)
+    transport = ASGITransport(app=_app(async_session_factory))
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        with assert_max_queries(3, repeated_threshold=3) as profile:
+            assert (await client.get("/items/2")).status_code == 200
+        assert profile.count == 2
+
+        with pytest.raises(AssertionError, match="N\\+1"):
+            with assert_max_queries(10, repeated_threshold=3):
+                await client.get("/items/4")
+
+        with caplog.at_level(logging.WARNING, logger="app.middleware.request_context"):
+            await client.get("/items/6")
+    flagged = [r for r in caplog.records if r.getMessage() == "db.query_budget_exceeded"]
+    assert len(flagged) == 1
+    assert flagged[0].route == "/items/{n}" and flagged[0].reasons == ["repeated"] and flagged[0].queries == 6
+
+
+@pytest.mark.asyncio
+async def test_failed_statement_leaves_no_timing_state(async_session_factory):
+    async with async_session_factory() as session:
+        with assert_max_queries(5) as profile:
+            with pytest.raises(Exception):
+                await session.execute(text("SELECT * FROM no_such_table"))
+            await session.rollback()
+            await session.execute(text("SELECT 1"))
+        conn = await session.connection()
+        assert "_query_profiler_started" not in conn.info
+        assert profile.count == 1 and profile.db_seconds < 5
@@ -0,0 +1,50 @@
+import pytest
+
+from app.core import database
+from app.core.database import ReplicaHealth, get_read_session, read_session
+
+
+class _Broken:
+    def __call__(self):
+        raise ConnectionError("replica down")
+
+
+@pytest.mark.asyncio
+async def test_replica_health_caches_and_falls_back(async_session_factory):
+    health = ReplicaHealth(max_lag_seconds=5.0, check_interval_seconds=60.0)
+    assert await health.usable(async_session_factory)
+    assert (health.reason, health.lag_seconds) == ("ok", 0.0)
+
+    # Cached until the interval passes, even if the replica breaks meanwhile.
+    assert await health.usable(_Broken())
+    health.check_interval_seconds = 0.0
+    assert not await health.usable(_Broken())
+    assert health.reason == "replica_error"
+
+    lagging = ReplicaHealth(max_lag_seconds=-1.0, check_interval_seconds=0.0)
+    assert not await lagging.usable(async_session_factory)
+    assert lagging.reason == "replica_lagging"
+
+
+@pytest.mark.asyncio
+async def test_reads_route_to_replica_only_when_healthy(async_session_factory, monkeypatch):
+    primary = object()
+    monkeypatch.setattr(database, "replica_session", async_session_factory)
+    monkeypatch.setattr(database, "replica_health", ReplicaHealth(max_lag_seconds=5.0, check_interval_seconds=0.0))
+
+    dependency = get_read_session(primary)
+    session = await dependency.__anext__()
+    assert session is not primary and session.bind.url.database.endswith(".db")
+    await dependency.aclose()
+
+    async with read_session() as session:
+        assert session.bind is not database.engine
+
+    monkeypatch.setattr(database, "replica_health", ReplicaHealth(max_lag_seconds=-1.0, check_interval_seconds=0.0))
+    dependency = get_read_session(primary)
+    assert await dependency.__anext__() is primary
+    await dependency.aclose()
+
+    monkeypatch.setattr(database, "replica_session", None)
+    async with read_session() as session:
+        assert session.bind is database.engine
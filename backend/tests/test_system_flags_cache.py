@@ -0,0 +1,27 @@
+import pytest
+
+from app.core.redis_client import RedisClient
+from app.services import system_flags
+
+
+@pytest.mark.asyncio
+async def test_flags_served_locally_and_invalidated_on_update(async_session_factory):
+    system_flags._local_flags.invalidate()
+    await RedisClient.get_instance().delete(system_flags.CACHE_KEY)
+
+    default = bool(system_flags.FLAG_DEFS["ENABLE_STRIPE"]["default"])
+
+    async with async_session_factory() as session:
+        assert await system_flags.is_system_flag_enabled(session, "ENABLE_STRIPE") is default
+
+        # Warm: neither Redis nor the DB is consulted.
+        await RedisClient.get_instance().delete(system_flags.CACHE_KEY)
+        assert await system_flags.is_system_flag_enabled(None, "ENABLE_STRIPE") is default
+
+        result = await system_flags.update_system_flag(session, "ENABLE_STRIPE", not default)
+        await session.commit()
+        assert result == {"before": default, "after": not default}
+        assert await system_flags.is_system_flag_enabled(None, "ENABLE_STRIPE") is (not default)
+
+    system_flags._local_flags.invalidate()
+    await RedisClient.get_instance().delete(system_flags.CACHE_KEY)
@@ -0,0 +1,48 @@
+import uuid
+
+import pytest
+
+from app.core.errors import AppError
+from app.models.sql_models import Tenant
+from app.services.feature_access import enforce_module_access
+from app.services.tenant_snapshot import get_tenant_snapshot, invalidate_tenant_config, tenant_snapshot_cache
+
+
+@pytest.mark.asyncio
+async def test_module_access_served_from_snapshot_until_invalidated(async_session_factory):
+    tenant_snapshot_cache.invalidate()
+    tenant_id = f"t_{uuid.uuid4().hex[:8]}"
+
+    async with async_session_factory() as session:
+        tenant = Tenant(id=tenant_id, name=tenant_id, type="renter", features={"can_use_crm": True})
+        session.add(tenant)
+        await session.commit()
+
+        await enforce_module_access(session=session, tenant_id=tenant_id, module_key="crm")
+        snapshot = await get_tenant_snapshot(session, tenant_id)
+        with pytest.raises(TypeError):
+            snapshot.features["can_use_crm"] = False  # immutable
+
+        # Cache hit: no session needed at all.
+        await enforce_module_access(session=None, tenant_id=tenant_id, module_key="crm")
+
+        tenant.features = {"can_use_crm": True, "kill_switches": {"crm": True}}
+        session.add(tenant)
+        await session.commit()
+        await invalidate_tenant_config(tenant_id)
+
+        with pytest.raises(AppError) as exc:
+            await enforce_module_access(session=session, tenant_id=tenant_id, module_key="crm")
+        assert exc.value.status_code == 503
+
+        refreshed = await get_tenant_snapshot(session, tenant_id)
+        assert refreshed.version > snapshot.version
+        assert refreshed.features_dict()["kill_switches"] == {"crm": True}
+
+        # Unknown tenants are not cached and have no modules enabled.
+        with pytest.raises(AppError) as exc:
+            await enforce_module_access(session=session, tenant_id="t_missing", module_key="crm")
+        assert exc.value.status_code == 403
+        assert await get_tenant_snapshot(session, "t_missing") is None
+
+    tenant_snapshot_cache.invalidate()
@@ -0,0 +1,67 @@
+import uuid
+
+import pytest
+from sqlmodel import select
+
+from app.models.game_models import Game
+from app.models.sql_models import Player
+from app.models.vip_models import LoyaltyTransaction, PlayerVipStatus, VipTier
+from app.services.game_engine import GameEngine
+from app.services.vip_engine import TierTable, tier_tables, vip_accrual
+
+
+def test_tier_table_resolves_highest_reached_tier():
+    table = TierTable(min_points=(0.0, 100.0, 1000.0), tier_ids=("bronze", "silver", "gold"))
+    assert table.resolve(0) == "bronze"
+    assert table.resolve(99.9) == "bronze"
+    assert table.resolve(100) == "silver"
+    assert table.resolve(5000) == "gold"
+    assert TierTable(min_points=(50.0,), tier_ids=("vip",)).resolve(10) is None
+
+
+@pytest.mark.asyncio
+async def test_bets_accrue_points_in_one_batched_flush(async_session_factory):
+    tier_tables.invalidate()
+    await vip_accrual.flush(session_factory=async_session_factory)
+    tenant_id = f"t_{uuid.uuid4().hex[:8]}"
+    engine = GameEngine()
+
+    async with async_session_factory() as session:
+        game = Game(tenant_id=tenant_id, provider_id="sim", external_id="slot", category="slot")
+        players = [
+            Player(tenant_id=tenant_id, email=f"v{i}@x.io", username=f"v{i}", password_hash="x", balance_real_available=500.0)
+            for i in range(2)
+        ]
+        silver = VipTier(tenant_id=tenant_id, name="Silver", min_points=50.0)
+        session.add_all([game, *players, silver, VipTier(tenant_id=tenant_id, name="Bronze", min_points=0.0)])
+        await session.commit()
+        ids, silver_id = [p.id for p in players], silver.id
+
+        async def bet(player, amount):
+            return await engine.process_bet(
+                session, "simulator", f"tx_{uuid.uuid4().hex}", player.id, game.id, f"r_{uuid.uuid4().hex}", amount, "USD"
+            )
+
+        for amount in (10.0, 20.0, 30.0):
+            await bet(players[0], amount)
+            await session.commit()
+        await bet(players[1], 5.0)
+        await session.commit()
+
+        # A rolled-back bet earns nothing.
+        await bet(players[1], 100.0)
+        await session.rollback()
+
+        assert (await session.execute(select(LoyaltyTransaction).where(LoyaltyTransaction.tenant_id == tenant_id))).first() is None
+        stats = await vip_accrual.flush(session_factory=async_session_factory)
+        assert (stats["players"], stats["points"]) == (2, 65.0)
+
+        txs = (await session.execute(select(LoyaltyTransaction).where(LoyaltyTransaction.tenant_id == tenant_id))).scalars().all()
+        assert sorted((t.player_id, t.amount) for t in txs) == sorted([(ids[0], 60.0), (ids[1], 5.0)])
+
+        top = await session.get(PlayerVipStatus, ids[0])
+        low = await session.get(PlayerVipStatus, ids[1])
+        assert (top.lifetime_points, top.current_tier_id) == (60.0, silver_id)
+        assert low.current_tier_id != silver_id and low.current_points == 5.0
+
+    tier_tables.invalidate()
@@ -0,0 +1,104 @@
+import uuid
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from app.models.bonus_models import BonusCampaign, BonusCampaignGame, BonusGrant
+from app.models.game_models import Game
+from app.models.sql_models import Player
+from app.services.bonus_engine import grant_campaign_to_player
+from app.services.game_engine import GameEngine
+from app.services.wagering_engine import contribution_weight
+
+
+@contextmanager
+def _count_statements(session):
+    counter = {"n": 0}
+
+    def _on_execute(*_args, **_kwargs):
+        counter["n"] += 1
+
+    engine = session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", _on_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", _on_execute)
+
+
+def test_contribution_weight_by_category_and_override():
+    assert contribution_weight(Game(tenant_id="t", provider_id="p", external_id="x", category="slot")) == 1.0
+    assert contribution_weight(Game(tenant_id="t", provider_id="p", external_id="x", category="Roulette")) == 0.1
+    override = Game(tenant_id="t", provider_id="p", external_id="x", category="slot", configuration={"wagering_contribution": 0.25})
+    assert contribution_weight(override) == 0.25
+
+
+@pytest.mark.asyncio
+async def test_bets_progress_and_complete_wagering_with_one_extra_statement(async_session_factory):
+    tenant_id = f"t_{uuid.uuid4().hex[:8]}"
+    engine = GameEngine()
+
+    async with async_session_factory() as session:
+        slot = Game(tenant_id=tenant_id, provider_id="sim", external_id="slot", category="slot")
+        table = Game(tenant_id=tenant_id, provider_id="sim", external_id="table", category="table")
+        with_wagering = Player(tenant_id=tenant_id, email="w@x.io", username="w", password_hash="x", balance_real_available=500.0)
+        plain = Player(tenant_id=tenant_id, email="p@x.io", username="p", password_hash="x", balance_real_available=500.0)
+        campaign = BonusCampaign(
+            tenant_id=tenant_id, name="Welcome", type="MANUAL_CREDIT", bonus_type="MANUAL_CREDIT",
+            status="active", config={"amount": 10, "wagering_mult": 5},
+        )
+        # Scoped campaign: only bets on `slot` count toward it.
+        scoped = BonusCampaign(
+            tenant_id=tenant_id, name="Slots only", type="MANUAL_CREDIT", bonus_type="MANUAL_CREDIT",
+            status="active", config={"amount": 10, "wagering_mult": 100},
+        )
+        session.add_all([slot, table, with_wagering, plain, campaign, scoped])
+        await session.flush()
+        session.add(BonusCampaignGame(campaign_id=scoped.id, game_id=slot.id))
+
+        grant = await grant_campaign_to_player(
+            session, tenant_id=tenant_id, player_id=with_wagering.id, campaign=campaign, reason="test"
+        )
+        scoped_grant = await grant_campaign_to_player(
+            session, tenant_id=tenant_id, player_id=with_wagering.id, campaign=scoped, reason="test"
+        )
+        await session.commit()
+        assert (grant.wagering_target, scoped_grant.wagering_target) == (50.0, 1000.0)
+
+        async def bet(player, game, amount):
+            return await engine.process_bet(
+                session, "simulator", f"tx_{uuid.uuid4().hex}", player.id, game.id, f"r_{uuid.uuid4().hex}", amount, "USD"
+            )
+
+        # Warm both paths (first bet creates the WalletBalance row).
+        await bet(plain, slot, 1.0)
+        await bet(with_wagering, slot, 1.0)
+        await session.commit()
+
+        with _count_statements(session) as baseline:
+            await bet(plain, slot, 5.0)
+            await session.commit()
+        with _count_statements(session) as wagering:
+            await bet(with_wagering, slot, 5.0)
+            await session.commit()
+        assert wagering["n"] - baseline["n"] <= 1
+
+        # 10% contribution on table games, and the scoped grant ignores them.
+        await bet(with_wagering, table, 100.0)
+        await session.commit()
+        await session.refresh(grant)
+        await session.refresh(scoped_grant)
+        assert grant.wagering_contributed == pytest.approx(16.0)
+        assert scoped_grant.wagering_contributed == pytest.approx(6.0)
+
+        await bet(with_wagering, slot, 40.0)
+        await session.commit()
+        await session.refresh(grant)
+        await session.refresh(scoped_grant)
+        await session.refresh(with_wagering)
+        assert grant.status == "completed" and grant.completed_at is not None
+        assert scoped_grant.status == "active"
+        # 1050 required; 50 released by the completed grant, 46 by the scoped one.
+        assert with_wagering.wagering_remaining == pytest.approx(1050.0 - 50.0 - 46.0)
+        assert (await session.get(BonusGrant, grant.id)).wagering_contributed == pytest.approx(56.0)
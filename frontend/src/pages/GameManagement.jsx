@@ -61,6 +61,8 @@ const GameManagement = () => {
   const [isPreviewOpen, setIsPreviewOpen] = useState(false);
   const [importJobId, setImportJobId] = useState(null);
   const [pollActive, setPollActive] = useState(false);
+  // 'upload' = staging/validation (ends at ready), 'import' = background import (ends at completed/failed)
+  const importPhaseRef = useRef('upload');
 
   const fetchAll = useCallback(async (category = 'all', page = 1, pageSizeOverride) => {
     await gamesTable.run(async () => {
@@ -157,6 +159,7 @@ const GameManagement = () => {
       status,
       total_items: res.data?.total_items,
       total_errors: res.data?.total_errors,
+      total_imported: res.data?.total_imported,
       error_summary: res.data?.error_summary,
     });
     setImportItems(res.data?.items || []);
@@ -175,6 +178,40 @@ const GameManagement = () => {
         const data = await fetchJob(importJobId);
         if (cancelled) return;
 
+        if (importPhaseRef.current === 'import') {
+          // Import runs in the background; the job row carries progress and the result.
+          const importError = data?.error_summary?.import_error;
+          if (data?.status === 'importing') {
+            const total = data?.total_items || 0;
+            const done = data?.total_imported || 0;
+            setImportProgress(total ? Math.min(99, 85 + Math.floor((done / total) * 14)) : 90);
+            return;
+          }
+
+          setPollActive(false);
+          setIsImporting(false);
+          importPhaseRef.current = 'upload';
+
+          if (data?.status === 'completed') {
+            toast.success('Import completed', {
+              description: `Imported: ${data?.total_imported ?? 0}`,
+            });
+            setIsPreviewOpen(false);
+            setImportJobId(null);
+            setImportJob(null);
+            setImportItems([]);
+            setImportProgress(100);
+            await fetchAll(gameCategory, 1);
+          } else {
+            // failed, or back to ready after an import error (re-runnable)
+            toast.error('Manual import failed', {
+              description: importError || JSON.stringify(data?.error_summary || data?.status || 'Import failed'),
+            });
+            setImportProgress(0);
+          }
+          return;
+        }
+
         // Map backend status -> UI progress
         if (data?.status === 'queued') setImportProgress(20);
         if (data?.status === 'running') setImportProgress(50);
@@ -201,6 +238,10 @@ const GameManagement = () => {
         }
       } catch (e) {
         if (cancelled) return;
+        if (importPhaseRef.current === 'import') {
+          importPhaseRef.current = 'upload';
+          toast.error('Manual import failed', { description: 'Could not read import status' });
+        }
         setPollActive(false);
         setIsImporting(false);
       }
@@ -214,7 +255,7 @@ const GameManagement = () => {
       cancelled = true;
       clearInterval(id);
     };
-  }, [importJobId, pollActive, fetchJob]);
+  }, [importJobId, pollActive, fetchJob, fetchAll, gameCategory]);
 
   const handleUpload = async () => {
     if (isImporting) return;
@@ -225,6 +266,7 @@ const GameManagement = () => {
     setImportJob(null);
     setImportItems([]);
     setIsPreviewOpen(false);
+    importPhaseRef.current = 'upload';
 
     try {
       // --- Provider auto-fetch flow is out of scope; keep UX but avoid broken endpoint.
@@ -314,30 +356,19 @@ const GameManagement = () => {
       setIsImporting(true);
       setImportProgress((p) => (p < 85 ? 85 : p));
 
-      const res = await api.post(`/v1/game-import/jobs/${importJob.id}/import`);
+      // 202 + status "importing": the import runs in the background. Poll the job
+      // until it is completed or failed; the poller reports the result.
+      await api.post(`/v1/game-import/jobs/${importJob.id}/import`);
 
-      setImportProgress(95);
-
-      // Import is synchronous in backend; refresh list now.
-      toast.success('Import completed', {
-        description: `Imported: ${res.data?.imported_count ?? 0}`,
-      });
-
-      setIsPreviewOpen(false);
-      setImportJobId(null);
-      setPollActive(false);
-      setImportJob(null);
-      setImportItems([]);
-
-      await fetchAll(gameCategory, 1);
-      setImportProgress(100);
+      importPhaseRef.current = 'import';
+      setImportJobId(importJob.id);
+      setPollActive(true);
     } catch (err) {
       const status = err?.response?.status;
       toast.error('Manual import failed', {
         description: status ? `HTTP ${status}` : undefined,
       });
       setImportProgress(0);
-    } finally {
       setIsImporting(false);
     }
   };